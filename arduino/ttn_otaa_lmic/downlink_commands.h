@@ -0,0 +1,145 @@
+#ifndef TIDEGAUGE_DOWNLINK_COMMANDS_H
+#define TIDEGAUGE_DOWNLINK_COMMANDS_H
+
+#include <cmath>
+#include <cstddef>
+#include <cstdint>
+
+// Same protocol as tidegauge/downlink.py: a sequence byte, then commands of
+// opcode + fixed-size big-endian argument. The outcome is acknowledged with a
+// 9-byte command ack frame (type 0x05) on the next uplink.
+namespace tidegauge {
+
+constexpr std::uint8_t DOWNLINK_FPORT = 10;
+
+constexpr std::uint8_t COMMAND_SET_INTERVAL = 0x01;
+constexpr std::uint8_t COMMAND_SET_MAX_SEND_ATTEMPTS = 0x02;
+constexpr std::uint8_t COMMAND_SET_DATUM_OFFSET = 0x03;
+constexpr std::uint8_t COMMAND_SET_MODES = 0x04;
+
+constexpr std::uint8_t MODE_BATCHING = 0x01;
+constexpr std::uint8_t MODE_BURST = 0x02;
+
+constexpr std::uint8_t ACK_APPLIED = 0;
+constexpr std::uint8_t ACK_DUPLICATE = 1;
+constexpr std::uint8_t ACK_MALFORMED = 2;
+constexpr std::uint8_t ACK_UNSUPPORTED = 3;
+constexpr std::uint8_t ACK_OUT_OF_RANGE = 4;
+
+constexpr std::uint16_t MIN_COMMAND_INTERVAL_S = 10;
+constexpr std::uint8_t MAX_COMMAND_SEND_ATTEMPTS = 10;
+
+constexpr std::uint8_t FRAME_TYPE_COMMAND_ACK = 0x05;
+constexpr std::size_t COMMAND_ACK_LENGTH = 9;
+
+struct GaugeSettings {
+    std::uint16_t interval_s;
+    std::uint8_t max_send_attempts;
+    std::uint8_t modes;
+    float datum_offset_m;
+};
+
+struct CommandState {
+    bool has_sequence;
+    std::uint8_t last_sequence;
+};
+
+inline std::size_t command_argument_length(std::uint8_t opcode) {
+    switch (opcode) {
+        case COMMAND_SET_INTERVAL:
+        case COMMAND_SET_DATUM_OFFSET:
+            return 2;
+        case COMMAND_SET_MAX_SEND_ATTEMPTS:
+        case COMMAND_SET_MODES:
+            return 1;
+        default:
+            return 0;
+    }
+}
+
+// Validate the whole downlink into a copy of the settings and commit it only
+// if every command is acceptable. Bit n of supported_commands enables opcode n.
+inline std::uint8_t apply_downlink_commands(
+    const std::uint8_t *data,
+    std::size_t length,
+    std::uint8_t supported_commands,
+    CommandState *state,
+    GaugeSettings *settings
+) {
+    if (data == nullptr || state == nullptr || settings == nullptr || length < 2) {
+        return ACK_MALFORMED;
+    }
+    if (state->has_sequence && data[0] == state->last_sequence) {
+        return ACK_DUPLICATE;
+    }
+
+    GaugeSettings updated = *settings;
+    std::size_t offset = 1;
+    while (offset < length) {
+        const std::uint8_t opcode = data[offset];
+        const std::size_t argument_length = command_argument_length(opcode);
+        if (argument_length == 0 || offset + 1 + argument_length > length) {
+            return ACK_MALFORMED;
+        }
+        if ((supported_commands & (1U << opcode)) == 0) {
+            return ACK_UNSUPPORTED;
+        }
+
+        const std::uint16_t value = argument_length == 1
+            ? data[offset + 1]
+            : static_cast<std::uint16_t>((data[offset + 1] << 8) | data[offset + 2]);
+        if (opcode == COMMAND_SET_INTERVAL) {
+            if (value < MIN_COMMAND_INTERVAL_S) {
+                return ACK_OUT_OF_RANGE;
+            }
+            updated.interval_s = value;
+        } else if (opcode == COMMAND_SET_MAX_SEND_ATTEMPTS) {
+            if (value < 1 || value > MAX_COMMAND_SEND_ATTEMPTS) {
+                return ACK_OUT_OF_RANGE;
+            }
+            updated.max_send_attempts = static_cast<std::uint8_t>(value);
+        } else if (opcode == COMMAND_SET_DATUM_OFFSET) {
+            updated.datum_offset_m = static_cast<float>(static_cast<std::int16_t>(value)) / 1000.0f;
+        } else {
+            if (value & ~(MODE_BATCHING | MODE_BURST)) {
+                return ACK_OUT_OF_RANGE;
+            }
+            updated.modes = static_cast<std::uint8_t>(value);
+        }
+        offset += 1 + argument_length;
+    }
+
+    *settings = updated;
+    state->has_sequence = true;
+    state->last_sequence = data[0];
+    return ACK_APPLIED;
+}
+
+inline void encode_command_ack(
+    std::uint8_t sequence,
+    std::uint8_t status,
+    const GaugeSettings &settings,
+    std::uint8_t out_payload[COMMAND_ACK_LENGTH]
+) {
+    long datum_offset_mm = lroundf(settings.datum_offset_m * 1000.0f);
+    if (datum_offset_mm < -32767L) {
+        datum_offset_mm = -32767L;
+    } else if (datum_offset_mm > 32767L) {
+        datum_offset_mm = 32767L;
+    }
+    const std::uint16_t datum_bits = static_cast<std::uint16_t>(static_cast<std::int16_t>(datum_offset_mm));
+
+    out_payload[0] = FRAME_TYPE_COMMAND_ACK;
+    out_payload[1] = sequence;
+    out_payload[2] = status;
+    out_payload[3] = static_cast<std::uint8_t>(settings.interval_s >> 8);
+    out_payload[4] = static_cast<std::uint8_t>(settings.interval_s & 0xFF);
+    out_payload[5] = settings.max_send_attempts;
+    out_payload[6] = settings.modes;
+    out_payload[7] = static_cast<std::uint8_t>(datum_bits >> 8);
+    out_payload[8] = static_cast<std::uint8_t>(datum_bits & 0xFF);
+}
+
+}  // namespace tidegauge
+
+#endif
@@ -11,6 +11,7 @@
 #else
 #  include "config.h"
 #endif
+#include "downlink_commands.h"
 #include "tide_math.h"
 
 static uint8_t APPEUI[8];
@@ -18,9 +19,17 @@ static uint8_t DEVEUI[8];
 static uint8_t APPKEY[16];
 
 static osjob_t sendjob;
-static const unsigned TX_INTERVAL_S = 300;
 static const unsigned RETRY_INTERVAL_S = 5;
 
+// Interval and datum can be changed by downlink; this firmware sends once per
+// cycle and has no batching or burst modes, so those commands are unsupported.
+static const uint8_t SUPPORTED_COMMANDS =
+    (1U << tidegauge::COMMAND_SET_INTERVAL) | (1U << tidegauge::COMMAND_SET_DATUM_OFFSET);
+static tidegauge::GaugeSettings gauge_settings = {300, 1, 0, tg_config::DATUM_OFFSET_M};
+static tidegauge::CommandState command_state = {false, 0};
+static uint8_t ack_payload[tidegauge::COMMAND_ACK_LENGTH];
+static bool ack_pending = false;
+
 // HC-SR04 wiring (Adafruit Feather labels):
 // TRIG -> D6, ECHO -> D5
 static const int HCSR04_TRIG_PIN = D6;
@@ -95,7 +104,7 @@ static void do_send(osjob_t *j) {
         const unsigned long pulse_us = pulseIn(HCSR04_ECHO_PIN, HIGH, HCSR04_TIMEOUT_US);
         if (pulse_us == 0UL) {
             Serial.println("SENSOR: timeout waiting for echo pulse");
-            os_setTimedCallback(&sendjob, os_getTime() + sec2osticks(TX_INTERVAL_S), do_send);
+            os_setTimedCallback(&sendjob, os_getTime() + sec2osticks(gauge_settings.interval_s), do_send);
             return;
         }
 
@@ -103,9 +112,9 @@ static void do_send(osjob_t *j) {
         const float battery_voltage_v = read_battery_voltage_v();
         float tide_height_m = 0.0f;
         if (!tidegauge::compute_tide_height_m(
-                tg_config::GEOMETRY_REFERENCE_M, measured_distance_m, tg_config::DATUM_OFFSET_M, &tide_height_m)) {
+                tg_config::GEOMETRY_REFERENCE_M, measured_distance_m, gauge_settings.datum_offset_m, &tide_height_m)) {
             Serial.println("SENSOR: invalid tide height input");
-            os_setTimedCallback(&sendjob, os_getTime() + sec2osticks(TX_INTERVAL_S), do_send);
+            os_setTimedCallback(&sendjob, os_getTime() + sec2osticks(gauge_settings.interval_s), do_send);
             return;
         }
 
@@ -113,7 +122,7 @@ static void do_send(osjob_t *j) {
         if (!tidegauge::encode_tide_distance_battery_payload(
                 tide_height_m, measured_distance_m, battery_voltage_v, payload)) {
             Serial.println("PAYLOAD: tide/distance/battery out of encodable range");
-            os_setTimedCallback(&sendjob, os_getTime() + sec2osticks(TX_INTERVAL_S), do_send);
+            os_setTimedCallback(&sendjob, os_getTime() + sec2osticks(gauge_settings.interval_s), do_send);
             return;
         }
 
@@ -139,6 +148,39 @@ static void do_send(osjob_t *j) {
     }
 }
 
+static void do_send_ack(osjob_t *j) {
+    (void)j;
+
+    if (LMIC.opmode & OP_TXRXPEND) {
+        os_setTimedCallback(&sendjob, os_getTime() + sec2osticks(RETRY_INTERVAL_S), do_send_ack);
+        return;
+    }
+    LMIC_setTxData2(1, ack_payload, sizeof(ack_payload), 0);
+    ack_pending = false;
+    Serial.print("LMIC: queued command ack status=");
+    Serial.println(ack_payload[2]);
+}
+
+static void handle_downlink() {
+    if (!(LMIC.txrxFlags & TXRX_PORT) || LMIC.frame[LMIC.dataBeg - 1] != tidegauge::DOWNLINK_FPORT) {
+        return;
+    }
+
+    const uint8_t sequence = LMIC.frame[LMIC.dataBeg];
+    const uint8_t status = tidegauge::apply_downlink_commands(
+        &LMIC.frame[LMIC.dataBeg], LMIC.dataLen, SUPPORTED_COMMANDS, &command_state, &gauge_settings);
+    tidegauge::encode_command_ack(sequence, status, gauge_settings, ack_payload);
+    ack_pending = true;
+    Serial.print("CMD: seq=");
+    Serial.print(sequence);
+    Serial.print(" status=");
+    Serial.print(status);
+    Serial.print(" interval_s=");
+    Serial.print(gauge_settings.interval_s);
+    Serial.print(" datum_offset_m=");
+    Serial.println(gauge_settings.datum_offset_m, 3);
+}
+
 void onEvent(ev_t ev) {
     Serial.print(os_getTime());
     Serial.print(": ");
@@ -160,8 +202,13 @@ void onEvent(ev_t ev) {
             if (LMIC.dataLen) {
                 Serial.print("LMIC: downlink bytes=");
                 Serial.println(LMIC.dataLen);
+                handle_downlink();
+            }
+            if (ack_pending) {
+                os_setTimedCallback(&sendjob, os_getTime() + sec2osticks(RETRY_INTERVAL_S), do_send_ack);
+            } else {
+                os_setTimedCallback(&sendjob, os_getTime() + sec2osticks(gauge_settings.interval_s), do_send);
             }
-            os_setTimedCallback(&sendjob, os_getTime() + sec2osticks(TX_INTERVAL_S), do_send);
             break;
         default:
             Serial.print("EV_");
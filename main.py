@@ -6,12 +6,61 @@ ECHO_PIN_ID = 5
 CALIBRATION_PATH = "/calibration.json"
 MEASUREMENT_INTERVAL_S = 60
 MAX_SEND_ATTEMPTS = 3
+DEEP_SLEEP = False
+# Offset within each measurement interval; stagger this across gauges sharing a gateway.
+PHASE_OFFSET_S = 0
+BURST_SAMPLE_COUNT = 5
+# Readings per uplink; 1 keeps the legacy 2-byte single-reading frame. Single readings
+# every 60 s need ~67 s of airtime a day, over DAILY_AIRTIME_BUDGET_MS; see the README.
+BATCH_SIZE = 10
+BATCH_FLUSH_INTERVAL_S = 600
+# Previous readings repeated in every uplink so the host can fill single lost frames;
+# 0 disables it. Needs BATCH_SIZE = 1. See scripts/redundancy_sim.py.
+REDUNDANCY_DEPTH = 0
+# Unsent readings kept for re-delivery; falls back to RAM if the filesystem is read-only.
+UPLINK_QUEUE_CAPACITY = 1440
+UPLINK_QUEUE_PATH = "/uplink_queue.bin"
+# TTN fair-use policy: 30 s of uplink airtime per device per day.
+DAILY_AIRTIME_BUDGET_MS = 30_000
+# Longest wait for the oldest airtime hour to expire before a send is deferred to the queue.
+AIRTIME_MAX_DELAY_S = 0
+RETRY_BACKOFF_BASE_S = 2
+# Set above MEASUREMENT_INTERVAL_S to stretch the interval at slack water.
+ADAPTIVE_MAX_INTERVAL_S = 0
+ADAPTIVE_ALERT_HEIGHT_M = None
+# Farthest echo accepted; None derives it from the calibrated geometry reference.
+RANGE_GATE_MAX_DISTANCE_M = None
+# Typical air temperature at the site for speed-of-sound compensation; None uses 343 m/s.
+AIR_TEMPERATURE_C = None
+# Readings in the spike-rejection window ahead of the Kalman smoother; 0 sends raw heights.
+HEIGHT_FILTER_WINDOW = 7
+# Time each cycle stage; every STAGE_TIMING_FLUSH_CYCLES cycles (0 = never) the
+# summary is logged and sent as a diagnostic frame.
+STAGE_TIMING = False
+STAGE_TIMING_FLUSH_CYCLES = 0
+# Cycles between health frames (send/sensor counters, memory, battery); 0 disables them.
+HEALTH_REPORT_CYCLES = 60
+# Board pin wired to the VBAT divider, e.g. "A3"; None leaves battery_mv unreported.
+BATTERY_MONITOR_PIN = None
+# Log per-stage heap allocation (gc.mem_alloc deltas) instead of stage timings.
+HEAP_PROFILE = False
+# Print each cycle's progress to the serial console; formatting the lines allocates,
+# so leave it off in the field. HEAP_PROFILE reports are printed either way.
+VERBOSE = False
+# Save the LoRaWAN session to microcontroller.nvm every N uplinks so a reset resumes
+# without rejoining; 0 rejoins on every boot.
+SESSION_PERSIST_FRAMES = 16
+# Apply interval/retry/datum/mode commands sent on FPort 10. Needs a radio driver
+# that can receive; TinyLoRa is uplink-only.
+DOWNLINK_COMMANDS = False
 
 
 def create_lora_client(
     *,
     driver_factory=None,
     credentials_loader=None,
+    nvm=None,
+    session_persist_frames=SESSION_PERSIST_FRAMES,
 ):
     """Return configured LoRaWAN client for the board."""
     from tidegauge.adapters.lorawan_client import LoRaWanClientAdapter
@@ -26,8 +75,17 @@ def create_lora_client(
 
         credentials_loader = load_ttn_credentials
 
+    session_store = None
+    if nvm is not None and session_persist_frames > 0:
+        from tidegauge.lorawan_session import SessionStore
+
+        session_store = SessionStore(nvm=nvm, persist_every_frames=session_persist_frames)
+
     credentials = credentials_loader()
-    return LoRaWanClientAdapter(driver=driver_factory(credentials=credentials))
+    return LoRaWanClientAdapter(
+        driver=driver_factory(credentials=credentials),
+        session_store=session_store,
+    )
 
 
 def main() -> int:
@@ -43,17 +101,76 @@ def main() -> int:
         board_module=board,
         digitalio_module=digitalio,
     )
-    time_module = CircuitPythonTimeModule(time_module=time)
+    try:
+        import supervisor
+    except ImportError:
+        supervisor = None
+    time_module = CircuitPythonTimeModule(time_module=time, supervisor_module=supervisor)
+    try:
+        import alarm
+    except ImportError:
+        alarm = None
+    try:
+        import pulseio
+    except ImportError:
+        pulseio = None
+    try:
+        import microcontroller
+    except ImportError:
+        nvm = None
+    else:
+        nvm = microcontroller.nvm
+    profiler = None
+    if HEAP_PROFILE:
+        import gc
+        from tidegauge.heap_profile import create_heap_profiler
+
+        profiler = create_heap_profiler(gc_module=gc)
+    battery_monitor = None
+    if BATTERY_MONITOR_PIN is not None:
+        import analogio
+        from tidegauge.adapters.battery import AnalogBatteryMonitor
+
+        battery_monitor = AnalogBatteryMonitor(
+            analog_in=analogio.AnalogIn(getattr(board, BATTERY_MONITOR_PIN)),
+        )
 
     return run_main(
         machine_module=machine_module,
         time_module=time_module,
-        lora_client=create_lora_client(),
+        lora_client=create_lora_client(nvm=nvm),
         trigger_pin_id=TRIGGER_PIN_ID,
         echo_pin_id=ECHO_PIN_ID,
         calibration_path=CALIBRATION_PATH,
         measurement_interval_s=MEASUREMENT_INTERVAL_S,
         max_send_attempts=MAX_SEND_ATTEMPTS,
+        alarm_module=alarm,
+        pulseio_module=pulseio,
+        board_module=board,
+        battery_monitor=battery_monitor,
+        nvm=nvm,
+        profiler=profiler,
+        log_fn=print if VERBOSE or HEAP_PROFILE else None,
+        deep_sleep=DEEP_SLEEP,
+        phase_offset_s=PHASE_OFFSET_S,
+        burst_sample_count=BURST_SAMPLE_COUNT,
+        batch_size=BATCH_SIZE,
+        batch_flush_interval_s=BATCH_FLUSH_INTERVAL_S,
+        redundancy_depth=REDUNDANCY_DEPTH,
+        uplink_queue_capacity=UPLINK_QUEUE_CAPACITY,
+        uplink_queue_path=UPLINK_QUEUE_PATH,
+        daily_airtime_budget_ms=DAILY_AIRTIME_BUDGET_MS,
+        airtime_max_delay_s=AIRTIME_MAX_DELAY_S,
+        retry_backoff_base_s=RETRY_BACKOFF_BASE_S,
+        adaptive_max_interval_s=ADAPTIVE_MAX_INTERVAL_S,
+        adaptive_alert_height_m=ADAPTIVE_ALERT_HEIGHT_M,
+        range_gate_max_distance_m=RANGE_GATE_MAX_DISTANCE_M,
+        air_temperature_c=AIR_TEMPERATURE_C,
+        height_filter_window=HEIGHT_FILTER_WINDOW,
+        stage_timing=STAGE_TIMING,
+        stage_timing_flush_cycles=STAGE_TIMING_FLUSH_CYCLES,
+        health_report_cycles=HEALTH_REPORT_CYCLES,
+        downlink_commands=DOWNLINK_COMMANDS,
     )
 
 
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+import sys
+
+from tidegauge.redundancy_sim import run_redundancy_sim_cli
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_redundancy_sim_cli(argv=sys.argv[1:]))
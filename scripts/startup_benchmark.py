@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+import sys
+
+from tidegauge.startup_benchmark import run_startup_benchmark_cli
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_startup_benchmark_cli(argv=sys.argv[1:]))
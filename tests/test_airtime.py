@@ -0,0 +1,197 @@
+import importlib
+import math
+from pathlib import Path
+
+import pytest
+
+from tidegauge.adapters.airtime import (
+    AirtimeBudgetExceededError,
+    AirtimeBudgetRadio,
+    lora_time_on_air_ms,
+)
+from tidegauge.adapters.fakes import FakeRadioPort
+from tidegauge.adapters.radio import RadioSendError
+from tidegauge.app.runtime_loop import run_runtime_iterations
+from tidegauge.batching import UplinkBatcher
+from tidegauge.calibration import CalibrationConfig
+from tidegauge.calibration_store import save_calibration_config
+from tidegauge.health import HealthMonitor
+from tidegauge.scheduler import DeadlineScheduler
+from tidegauge.uplink_queue import UplinkQueue
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now_s = 0
+
+    def now(self) -> int:
+        return self.now_s
+
+
+def test_lora_time_on_air_matches_reference_values() -> None:
+    assert lora_time_on_air_ms(payload_length=2, spreading_factor=7) == pytest.approx(46.336)
+    assert lora_time_on_air_ms(payload_length=2, spreading_factor=10) == pytest.approx(329.728)
+    assert lora_time_on_air_ms(payload_length=51, spreading_factor=12) == pytest.approx(2793.472)
+
+
+def test_airtime_budget_radio_accumulates_airtime_and_forwards_sends() -> None:
+    clock = FakeClock()
+    inner = FakeRadioPort()
+    radio = AirtimeBudgetRadio(radio=inner, now_s=clock.now, daily_budget_ms=1_000)
+
+    radio.send(b"\x01\x02")
+    radio.send(b"\x03\x04")
+
+    assert inner.sent_payloads == [b"\x01\x02", b"\x03\x04"]
+    assert radio.used_ms == 94
+    assert radio.remaining_ms == 906
+
+
+def test_airtime_budget_radio_rejects_sends_over_budget() -> None:
+    clock = FakeClock()
+    inner = FakeRadioPort()
+    radio = AirtimeBudgetRadio(radio=inner, now_s=clock.now, daily_budget_ms=100)
+
+    radio.send(b"\x01\x02")
+    radio.send(b"\x01\x02")
+    with pytest.raises(AirtimeBudgetExceededError):
+        radio.send(b"\x01\x02")
+
+    assert len(inner.sent_payloads) == 2
+    assert radio.rejected_count == 1
+    assert isinstance(AirtimeBudgetExceededError("x"), RadioSendError)
+
+
+def test_airtime_budget_radio_frees_budget_after_24_hours() -> None:
+    clock = FakeClock()
+    radio = AirtimeBudgetRadio(radio=FakeRadioPort(), now_s=clock.now, daily_budget_ms=50)
+    radio.send(b"\x01\x02")
+
+    clock.now_s = 23 * 3600
+    assert radio.used_ms == 47
+
+    clock.now_s = 24 * 3600
+    assert radio.used_ms == 0
+    radio.send(b"\x01\x02")
+
+
+def test_airtime_budget_radio_delays_until_oldest_bucket_expires() -> None:
+    clock = FakeClock()
+    sleeps: list[int] = []
+
+    def sleep(seconds: int) -> None:
+        sleeps.append(seconds)
+        clock.now_s += seconds
+
+    inner = FakeRadioPort()
+    radio = AirtimeBudgetRadio(
+        radio=inner,
+        now_s=clock.now,
+        daily_budget_ms=50,
+        sleep_fn=sleep,
+        max_delay_s=600,
+    )
+    radio.send(b"\x01\x02")
+
+    clock.now_s = 24 * 3600 - 300
+    radio.send(b"\x01\x02")
+
+    assert sleeps == [300]
+    assert len(inner.sent_payloads) == 2
+
+
+def test_airtime_budget_radio_costs_sends_at_the_current_data_rate() -> None:
+    clock = FakeClock()
+    inner = FakeRadioPort(limits=(0, 11))
+    radio = AirtimeBudgetRadio(radio=inner, now_s=clock.now, daily_budget_ms=10_000)
+
+    radio.send(b"\x01\x02")
+    assert radio.used_ms == 330
+
+    inner.limits = (4, 242)
+    radio.send(b"\x01\x02")
+    assert radio.used_ms == 330 + int(
+        lora_time_on_air_ms(payload_length=2, spreading_factor=8, bandwidth_hz=500_000) + 0.999
+    )
+
+
+def test_airtime_budget_radio_charges_only_successful_sends() -> None:
+    class FailingRadio:
+        def send(self, payload: bytes) -> None:
+            raise RadioSendError("no ack")
+
+    radio = AirtimeBudgetRadio(radio=FailingRadio(), now_s=FakeClock().now, daily_budget_ms=100)
+
+    with pytest.raises(RadioSendError):
+        radio.send(b"\x01\x02")
+
+    assert radio.used_ms == 0
+
+
+class SteppingClock:
+    def __init__(self) -> None:
+        self.now = 0
+
+    def now_s(self) -> int:
+        return self.now
+
+    def sleep_s(self, seconds: int) -> None:
+        self.now += seconds
+
+
+class TideSensor:
+    def __init__(self, clock: SteppingClock) -> None:
+        self._clock = clock
+
+    def read_distance_m(self) -> float:
+        return 1.5 + 0.8 * math.sin(2 * math.pi * self._clock.now / 44_700)
+
+
+def test_default_settings_fit_one_day_in_airtime_budget(tmp_path: Path) -> None:
+    board_main = importlib.import_module("main")
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    clock = SteppingClock()
+    inner = FakeRadioPort()
+    radio = AirtimeBudgetRadio(
+        radio=inner,
+        now_s=clock.now_s,
+        daily_budget_ms=board_main.DAILY_AIRTIME_BUDGET_MS,
+    )
+    queue = UplinkQueue(capacity=board_main.UPLINK_QUEUE_CAPACITY, now_s=clock.now_s)
+    ticks = iter(range(0, 10**9, 5))
+
+    run_runtime_iterations(
+        iterations=86_400 // board_main.MEASUREMENT_INTERVAL_S,
+        calibration_path=calibration_path,
+        scheduler=DeadlineScheduler(
+            now_s=clock.now_s,
+            interval_s=board_main.MEASUREMENT_INTERVAL_S,
+        ),
+        sensor=TideSensor(clock),
+        radio=radio,
+        sleeper=clock,
+        sleep_seconds=board_main.MEASUREMENT_INTERVAL_S,
+        max_send_attempts=board_main.MAX_SEND_ATTEMPTS,
+        batcher=UplinkBatcher(
+            now_s=clock.now_s,
+            max_readings=board_main.BATCH_SIZE,
+            flush_interval_s=board_main.BATCH_FLUSH_INTERVAL_S,
+        ),
+        uplink_queue=queue,
+        clock=clock,
+        health=HealthMonitor(
+            ticks_ms=lambda: next(ticks),
+            ticks_diff=lambda current, start: current - start,
+            report_every_cycles=board_main.HEALTH_REPORT_CYCLES,
+        ),
+    )
+
+    assert radio.rejected_count == 0
+    assert queue.depth == 0
+    assert len(inner.sent_payloads) >= 86_400 // board_main.BATCH_FLUSH_INTERVAL_S
+    # Half the budget stays free for draining the backlog after an outage.
+    assert radio.used_ms <= board_main.DAILY_AIRTIME_BUDGET_MS // 2
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import subprocess
+import tempfile
+from pathlib import Path
+
+from tidegauge.downlink import encode_downlink_commands
+from tidegauge.payload import encode_command_ack_payload
+
+
+def _compile_and_run(program_source: str) -> str:
+    repo_root = Path(__file__).resolve().parents[1]
+    include_dir = repo_root / "arduino" / "ttn_otaa_lmic"
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp_path = Path(tmpdir)
+        source_path = tmp_path / "main.cpp"
+        binary_path = tmp_path / "main"
+        source_path.write_text(program_source, encoding="utf-8")
+
+        subprocess.run(
+            [
+                "g++",
+                "-std=c++17",
+                "-I",
+                str(include_dir),
+                str(source_path),
+                "-o",
+                str(binary_path),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+        result = subprocess.run(
+            [str(binary_path)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return result.stdout.strip()
+
+
+def _apply_program(downlinks: list[bytes], supported: str) -> str:
+    arrays = "\n".join(
+        "    const std::uint8_t d{}[] = {{{}}};".format(index, ", ".join(str(b) for b in downlink))
+        for index, downlink in enumerate(downlinks)
+    )
+    calls = "\n".join(
+        "    status = tidegauge::apply_downlink_commands(d{0}, sizeof(d{0}), {1}, &state, &settings);\n"
+        "    std::cout << static_cast<unsigned>(status) << \" \";".format(index, supported)
+        for index in range(len(downlinks))
+    )
+    return (
+        """
+        #include <iostream>
+        #include "downlink_commands.h"
+
+        int main() {
+            tidegauge::GaugeSettings settings = {300, 1, 0, 0.2f};
+            tidegauge::CommandState state = {false, 0};
+            std::uint8_t status = 0;
+        """
+        + arrays
+        + "\n"
+        + calls
+        + """
+            std::uint8_t ack[tidegauge::COMMAND_ACK_LENGTH];
+            tidegauge::encode_command_ack(d0[0], status, settings, ack);
+            for (std::size_t i = 0; i < sizeof(ack); ++i) {
+                std::cout << static_cast<unsigned>(ack[i]) << (i + 1 < sizeof(ack) ? "," : "");
+            }
+            return 0;
+        }
+        """
+    )
+
+
+def test_firmware_applies_commands_and_encodes_python_compatible_ack() -> None:
+    downlink = encode_downlink_commands(sequence=5, interval_s=600, datum_offset_m=-0.05)
+    output = _compile_and_run(_apply_program([downlink, downlink], "0xFF"))
+
+    statuses, ack = output.rsplit(" ", 1)
+    assert statuses == "0 1"
+    expected = encode_command_ack_payload(
+        sequence=5,
+        status=1,
+        interval_s=600,
+        max_send_attempts=1,
+        modes=0,
+        datum_offset_mm=-50,
+    )
+    assert bytes(int(value) for value in ack.split(",")) == expected
+
+
+def test_firmware_rejects_unsupported_and_invalid_commands_atomically() -> None:
+    supported = "(1U << tidegauge::COMMAND_SET_INTERVAL) | (1U << tidegauge::COMMAND_SET_DATUM_OFFSET)"
+    program = _apply_program(
+        [
+            encode_downlink_commands(sequence=1, interval_s=600, modes=1),
+            encode_downlink_commands(sequence=2, interval_s=5),
+            bytes([3, 0x01, 0x02]),
+        ],
+        supported,
+    )
+    output = _compile_and_run(program)
+
+    statuses, ack = output.rsplit(" ", 1)
+    assert statuses == "3 4 2"
+    assert [int(value) for value in ack.split(",")][3:5] == [0x01, 0x2C]
@@ -0,0 +1,25 @@
+import pytest
+
+from tidegauge.backoff import ExponentialBackoff
+
+
+def test_exponential_backoff_doubles_delay_up_to_cap() -> None:
+    backoff = ExponentialBackoff(base_s=2, factor=2, max_s=10, jitter=0.0)
+
+    assert [backoff.delay_s(attempt) for attempt in (1, 2, 3, 4)] == [2, 4, 8, 10]
+
+
+def test_exponential_backoff_applies_jitter_below_nominal_delay() -> None:
+    backoff = ExponentialBackoff(base_s=4, jitter=0.5, random_fn=lambda: 0.5)
+
+    assert backoff.delay_s(1) == pytest.approx(3.0)
+
+
+def test_exponential_backoff_waits_in_its_own_sleep_fn() -> None:
+    waits: list[float] = []
+    backoff = ExponentialBackoff(base_s=2, jitter=0.0, sleep_fn=waits.append)
+
+    backoff.wait(1)
+    backoff.wait(2)
+
+    assert waits == [2, 4]
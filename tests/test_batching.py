@@ -0,0 +1,154 @@
+import pytest
+
+from tidegauge.batching import UplinkBatcher
+from tidegauge.payload import decode_tide_height_batch_payload
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now_s = 0
+
+    def now(self) -> int:
+        return self.now_s
+
+
+def test_uplink_batcher_flushes_when_batch_is_full() -> None:
+    clock = FakeClock()
+    batcher = UplinkBatcher(now_s=clock.now, max_readings=3, flush_interval_s=3600)
+
+    assert batcher.add_reading_m(0.900) is None
+    clock.now_s = 60
+    assert batcher.add_reading_m(0.905) is None
+    clock.now_s = 120
+    payload = batcher.add_reading_m(0.899)
+
+    assert payload is not None
+    assert decode_tide_height_batch_payload(payload, received_at_s=120) == [
+        (0, 900),
+        (60, 905),
+        (120, 899),
+    ]
+    assert batcher.pending_count == 0
+
+
+def test_uplink_batcher_flushes_after_flush_interval() -> None:
+    clock = FakeClock()
+    batcher = UplinkBatcher(now_s=clock.now, max_readings=10, flush_interval_s=120)
+
+    batcher.add_reading_m(1.0)
+    clock.now_s = 60
+    batcher.add_reading_m(1.0)
+    clock.now_s = 120
+    payload = batcher.add_reading_m(1.0)
+
+    assert payload is not None
+    assert len(decode_tide_height_batch_payload(payload, received_at_s=120)) == 3
+
+
+def test_uplink_batcher_flushes_early_when_spacing_changes() -> None:
+    clock = FakeClock()
+    batcher = UplinkBatcher(now_s=clock.now, max_readings=10, flush_interval_s=3600)
+
+    batcher.add_reading_m(1.0)
+    clock.now_s = 60
+    batcher.add_reading_m(1.001)
+    clock.now_s = 240
+    payload = batcher.add_reading_m(1.002)
+
+    assert payload is not None
+    assert decode_tide_height_batch_payload(payload, received_at_s=240) == [
+        (0, 1000),
+        (60, 1001),
+    ]
+    assert batcher.pending_count == 1
+
+
+def test_uplink_batcher_flushes_early_when_delta_exceeds_int8() -> None:
+    clock = FakeClock()
+    batcher = UplinkBatcher(now_s=clock.now, max_readings=10, flush_interval_s=3600)
+
+    batcher.add_reading_m(1.0)
+    clock.now_s = 60
+    payload = batcher.add_reading_m(1.5)
+
+    assert payload is not None
+    assert decode_tide_height_batch_payload(payload, received_at_s=60) == [(0, 1000)]
+    assert batcher.pending_count == 1
+
+
+def test_uplink_batcher_increments_sequence_per_batch() -> None:
+    clock = FakeClock()
+    batcher = UplinkBatcher(now_s=clock.now, max_readings=1)
+
+    first = batcher.add_reading_m(1.0)
+    second = batcher.add_reading_m(1.0)
+
+    assert first is not None and second is not None
+    assert (first[1], second[1]) == (0, 1)
+
+
+def test_uplink_batcher_rejects_invalid_size() -> None:
+    with pytest.raises(ValueError, match="max_readings must be between 1 and 255"):
+        UplinkBatcher(now_s=lambda: 0, max_readings=0)
+
+
+def test_uplink_batcher_packs_only_what_fits_the_max_payload() -> None:
+    clock = FakeClock()
+    batcher = UplinkBatcher(now_s=clock.now, max_readings=50, flush_interval_s=3600)
+    batcher.set_max_payload_length(11)
+
+    assert batcher.capacity == 3
+    payloads = []
+    for index in range(6):
+        clock.now_s = index * 60
+        payloads.append(batcher.add_reading_m(0.9 + index / 1000))
+
+    assert [len(payload) for payload in payloads if payload is not None] == [11, 11]
+    batcher.set_max_payload_length(242)
+    assert batcher.capacity == 50
+
+
+def test_uplink_batcher_splits_buffered_readings_when_limit_drops() -> None:
+    clock = FakeClock()
+    batcher = UplinkBatcher(now_s=clock.now, max_readings=20, flush_interval_s=3600)
+    for index in range(7):
+        clock.now_s = index * 60
+        assert batcher.add_reading_m(1.0 + index / 1000) is None
+
+    batcher.set_max_payload_length(11)
+    clock.now_s = 420
+    first = batcher.add_reading_m(1.007)
+
+    frames = [first] + batcher.ready_payloads
+    assert [len(frame) for frame in frames] == [11, 11, 9]
+    samples = []
+    for frame in frames:
+        samples.extend(decode_tide_height_batch_payload(frame, received_at_s=420))
+    assert samples == [(index * 60, 1000 + index) for index in range(7)]
+    assert batcher.pending_count == 1
+
+
+def test_uplink_batcher_caps_frames_waiting_to_be_sent() -> None:
+    clock = FakeClock()
+    batcher = UplinkBatcher(
+        now_s=clock.now,
+        max_readings=20,
+        flush_interval_s=3600,
+        max_ready_payloads=1,
+    )
+    for index in range(7):
+        clock.now_s = index * 60
+        batcher.add_reading_m(1.0 + index / 1000)
+
+    batcher.set_max_payload_length(11)
+    clock.now_s = 420
+    first = batcher.add_reading_m(1.007)
+
+    assert len(first) == 11
+    assert len(batcher.ready_payloads) == 1
+    assert decode_tide_height_batch_payload(batcher.ready_payloads[0], received_at_s=420) == [
+        (360, 1006),
+    ]
+    assert batcher.dropped_payload_count == 1
+    with pytest.raises(ValueError, match="max_ready_payloads"):
+        UplinkBatcher(now_s=clock.now, max_ready_payloads=0)
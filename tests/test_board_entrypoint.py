@@ -1,6 +1,8 @@
 from pathlib import Path
 
 from tidegauge.board import run_device_loop
+from tidegauge.calibration import CalibrationConfig
+from tidegauge.calibration_store import save_calibration_config
 from tidegauge.hardware import HardwareConfig, RuntimeDependencies
 
 
@@ -8,6 +10,9 @@ class FakeScheduler:
     def is_due(self) -> bool:
         return True
 
+    def seconds_until_due(self) -> int:
+        return 60
+
 
 class FakeSleeper:
     def sleep_s(self, seconds: int) -> None:
@@ -77,6 +82,45 @@ def test_run_device_loop_builds_dependencies_and_runs_iterations() -> None:
     assert run_iterations.calls[0]["iterations"] == 1
     assert run_iterations.calls[0]["max_send_attempts"] == 4
     assert run_iterations.calls[0]["calibration_path"] == calibration_path
+    assert run_iterations.calls[0]["calibration_provider"] is not None
+    assert run_iterations.calls[0]["sleep_seconds"] is None
+    assert run_iterations.calls[0]["log_fn"] is None
+    assert build_deps.calls[0]["calibration_config"] is not None
+
+
+def test_run_device_loop_stays_silent_by_default_and_logs_when_asked(tmp_path: Path) -> None:
+    deps = RuntimeDependencies(
+        sensor=FakeSensor(),
+        radio=FakeRadio(),
+        scheduler=FakeScheduler(),
+        clock=None,
+        sleeper=FakeSleeper(),
+        max_send_attempts=1,
+    )
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    logs: list[str] = []
+
+    def run(**kwargs: object) -> int:
+        return run_device_loop(
+            machine_module=object(),
+            time_module=object(),
+            lora_client=object(),
+            hardware_config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7),
+            calibration_path=calibration_path,
+            max_loops=1,
+            build_dependencies=RecordingBuildDeps(deps),
+            **kwargs,
+        )
+
+    assert run() == 1
+    assert logs == []
+    assert run(log_fn=logs.append) == 1
+    assert logs[0] == "cycle due"
+    assert "send ok" in logs
 
 
 def test_run_device_loop_accumulates_sent_count_over_multiple_loops() -> None:
@@ -112,3 +156,63 @@ def test_run_device_loop_accumulates_sent_count_over_multiple_loops() -> None:
     )
 
     assert sent_count == 3
+
+
+def test_run_device_loop_shares_one_calibration_provider_across_loops() -> None:
+    deps = RuntimeDependencies(
+        sensor=FakeSensor(),
+        radio=FakeRadio(),
+        scheduler=FakeScheduler(),
+        clock=None,
+        sleeper=FakeSleeper(),
+        max_send_attempts=1,
+    )
+    run_iterations = RecordingRunIterations()
+
+    run_device_loop(
+        machine_module=object(),
+        time_module=object(),
+        lora_client=object(),
+        hardware_config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7),
+        calibration_path=Path("/tmp/calibration.json"),
+        max_loops=3,
+        build_dependencies=RecordingBuildDeps(deps),
+        run_iterations=run_iterations,
+    )
+
+    providers = [call["calibration_provider"] for call in run_iterations.calls]
+    assert len(providers) == 3
+    assert providers[0] is providers[1] is providers[2]
+
+
+def test_run_device_loop_uses_heap_profiler_as_stage_probe_and_logs_report() -> None:
+    from tidegauge.heap_profile import HeapProfiler
+
+    deps = RuntimeDependencies(
+        sensor=FakeSensor(),
+        radio=FakeRadio(),
+        scheduler=FakeScheduler(),
+        clock=None,
+        sleeper=FakeSleeper(),
+        max_send_attempts=1,
+    )
+    run_iterations = RecordingRunIterations()
+    profiler = HeapProfiler(mem_alloc=lambda: 0, mem_free=lambda: 0)
+    logs: list[str] = []
+
+    run_device_loop(
+        machine_module=object(),
+        time_module=object(),
+        lora_client=object(),
+        hardware_config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7),
+        calibration_path=Path("/tmp/calibration.json"),
+        max_loops=4,
+        log_fn=logs.append,
+        build_dependencies=RecordingBuildDeps(deps),
+        run_iterations=run_iterations,
+        profiler=profiler,
+        profile_log_every_loops=2,
+    )
+
+    assert all(call["stage_probe"] is profiler for call in run_iterations.calls)
+    assert sum(line.startswith("heap profile") for line in logs) == 2
@@ -74,3 +74,43 @@ def test_create_lora_client_uses_default_feather_driver_factory(
     assert client.send(b"\xAA") is True
     assert fake_driver.join_calls == 1
     assert fake_driver.sent_payloads == [b"\xAA"]
+
+
+def test_create_lora_client_resumes_abp_session_from_nvm() -> None:
+    board_main = importlib.import_module("main")
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+    credentials = importlib.import_module("tidegauge.ttn_credentials").TtnCredentials(
+        dev_addr="26011BEE",
+        nwk_skey="00112233445566778899AABBCCDDEEFF",
+        app_skey="FFEEDDCCBBAA99887766554433221100",
+    )
+    nvm = bytearray([0xFF] * 256)
+    radios: list[object] = []
+
+    class FakeAbpRadio:
+        def __init__(self) -> None:
+            self.frame_counter = 0
+            self.counters: list[int] = []
+
+        def send_data(self, data: bytes, data_length: int, frame_counter: int) -> None:
+            self.counters.append(frame_counter)
+
+    def build_driver(*, credentials: object) -> object:
+        radios.append(FakeAbpRadio())
+        return feather_lorawan.create_feather_lorawan_driver(
+            credentials=credentials,
+            radio_factory=lambda *, credentials: radios[-1],
+        )
+
+    for _ in range(2):
+        client = board_main.create_lora_client(
+            driver_factory=build_driver,
+            credentials_loader=lambda: credentials,
+            nvm=nvm,
+            session_persist_frames=4,
+        )
+        for _ in range(5):
+            client.send(b"\x01")
+
+    assert radios[0].counters == [0, 1, 2, 3, 4]
+    assert radios[1].counters == [8, 9, 10, 11, 12]
@@ -0,0 +1,112 @@
+import pytest
+
+from tidegauge.adapters.burst_sampling import (
+    FILTER_TRIMMED_MEAN,
+    BurstSamplingError,
+    BurstSamplingSensor,
+)
+from tidegauge.adapters.hcsr04 import UltrasonicTimeoutError
+
+
+class ScriptedSensor:
+    def __init__(self, readings: list[object]) -> None:
+        self._readings = readings
+        self.calls = 0
+
+    def read_distance_m(self) -> float:
+        self.calls += 1
+        reading = self._readings.pop(0)
+        if isinstance(reading, Exception):
+            raise reading
+        return reading
+
+
+def test_burst_sampling_sensor_returns_median_of_burst() -> None:
+    sleeps: list[float] = []
+    sensor = BurstSamplingSensor(
+        sensor=ScriptedSensor([1.30, 1.10, 1.20, 1.25, 1.15]),
+        sleep_fn=sleeps.append,
+        sample_count=5,
+        spacing_s=0.05,
+    )
+
+    assert sensor.read_distance_m() == pytest.approx(1.20)
+    assert sensor.valid_sample_count == 5
+    assert sleeps == [0.05, 0.05, 0.05, 0.05]
+
+
+def test_burst_sampling_sensor_averages_middle_pair_for_even_valid_count() -> None:
+    sensor = BurstSamplingSensor(
+        sensor=ScriptedSensor([1.0, 1.2, 1.1, 1.3]),
+        sleep_fn=lambda _s: None,
+        sample_count=4,
+    )
+
+    assert sensor.read_distance_m() == pytest.approx(1.15)
+
+
+def test_burst_sampling_sensor_rejects_timeouts_and_out_of_range_echoes() -> None:
+    sensor = BurstSamplingSensor(
+        sensor=ScriptedSensor(
+            [UltrasonicTimeoutError("no echo"), 1.2, 0.01, 1.4, 9.0]
+        ),
+        sleep_fn=lambda _s: None,
+        sample_count=5,
+        min_distance_m=0.02,
+        max_distance_m=4.0,
+    )
+
+    assert sensor.read_distance_m() == pytest.approx(1.3)
+    assert sensor.valid_sample_count == 2
+
+
+def test_burst_sampling_sensor_trimmed_mean_drops_extremes() -> None:
+    sensor = BurstSamplingSensor(
+        sensor=ScriptedSensor([1.0, 1.21, 1.19, 1.20, 3.0]),
+        sleep_fn=lambda _s: None,
+        sample_count=5,
+        method=FILTER_TRIMMED_MEAN,
+        trim_count=1,
+    )
+
+    assert sensor.read_distance_m() == pytest.approx(1.20, abs=1e-6)
+
+
+def test_burst_sampling_sensor_raises_when_too_few_valid_samples() -> None:
+    sensor = BurstSamplingSensor(
+        sensor=ScriptedSensor(
+            [UltrasonicTimeoutError("no echo"), 1.2, UltrasonicTimeoutError("no echo")]
+        ),
+        sleep_fn=lambda _s: None,
+        sample_count=3,
+        min_valid_count=2,
+    )
+
+    with pytest.raises(BurstSamplingError, match="Only 1 of 3 pings were valid"):
+        sensor.read_distance_m()
+    assert sensor.valid_sample_count == 1
+
+
+def test_burst_sampling_sensor_reuses_sample_buffer_between_reads() -> None:
+    sensor = BurstSamplingSensor(
+        sensor=ScriptedSensor([1.0, 1.1, 1.2, 2.0, 2.1, 2.2]),
+        sleep_fn=lambda _s: None,
+        sample_count=3,
+    )
+    buffer = sensor._samples
+
+    first = sensor.read_distance_m()
+    second = sensor.read_distance_m()
+
+    assert first == pytest.approx(1.1)
+    assert second == pytest.approx(2.1)
+    assert sensor._samples is buffer
+
+
+def test_burst_sampling_sensor_rejects_unknown_method() -> None:
+    with pytest.raises(ValueError, match="Unsupported burst filter method"):
+        BurstSamplingSensor(
+            sensor=ScriptedSensor([]),
+            sleep_fn=lambda _s: None,
+            method="mode",
+        )
@@ -1,7 +1,11 @@
 from pathlib import Path
 
 from tidegauge.calibration import CalibrationConfig
-from tidegauge.calibration_store import load_calibration_config, save_calibration_config
+from tidegauge.calibration_store import (
+    CachedCalibrationProvider,
+    load_calibration_config,
+    save_calibration_config,
+)
 
 
 def test_save_and_load_calibration_config_round_trip(tmp_path: Path) -> None:
@@ -32,3 +36,60 @@ def test_save_and_load_calibration_config_supports_string_path(tmp_path: Path) -
     loaded = load_calibration_config(path=calibration_path)
 
     assert loaded == original
+
+
+def test_cached_calibration_provider_loads_once_while_file_unchanged(
+    tmp_path: Path,
+) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    original = CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2)
+    save_calibration_config(path=calibration_path, config=original)
+    provider = CachedCalibrationProvider(path=calibration_path)
+
+    first = provider.get()
+    second = provider.get()
+
+    assert first == original
+    assert second is first
+    assert provider.reload_count == 1
+
+
+def test_cached_calibration_provider_reloads_when_file_changes(tmp_path: Path) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    provider = CachedCalibrationProvider(path=calibration_path)
+    provider.get()
+
+    updated = CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.35)
+    save_calibration_config(path=calibration_path, config=updated)
+
+    assert provider.get() == updated
+    assert provider.reload_count == 2
+
+
+def test_cached_calibration_provider_reloads_after_invalidate(tmp_path: Path) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    provider = CachedCalibrationProvider(path=calibration_path)
+    provider.get()
+
+    provider.invalidate()
+    provider.get()
+
+    assert provider.reload_count == 2
+
+
+def test_cached_calibration_provider_caches_missing_file(tmp_path: Path) -> None:
+    provider = CachedCalibrationProvider(path=tmp_path / "missing.json")
+
+    first = provider.get()
+    provider.get()
+
+    assert first.is_calibrated is False
+    assert provider.reload_count == 1
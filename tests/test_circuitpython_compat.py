@@ -70,8 +70,10 @@ def test_circuitpython_time_module_adapts_us_and_seconds_interfaces() -> None:
     adapted.sleep_us(10)
     start = adapted.ticks_us()
     end = adapted.ticks_us()
+    start_ms = adapted.ticks_ms()
     adapted.sleep(2)
 
     assert fake_time.sleep_calls[0] == 0.00001
     assert adapted.ticks_diff(end, start) > 0
+    assert adapted.ticks_diff(adapted.ticks_ms(), start_ms) >= 0
     assert adapted.time() == int(fake_time.monotonic())
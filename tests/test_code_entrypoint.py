@@ -42,7 +42,7 @@ def test_main_uses_circuitpython_compat_modules(monkeypatch: pytest.MonkeyPatch)
     monkeypatch.setitem(__import__("sys").modules, "board", FakeBoard)
     monkeypatch.setitem(__import__("sys").modules, "digitalio", FakeDigitalio)
     monkeypatch.setitem(__import__("sys").modules, "time", FakeTime())
-    monkeypatch.setattr(board_main, "create_lora_client", lambda: object())
+    monkeypatch.setattr(board_main, "create_lora_client", lambda **kwargs: object())
     monkeypatch.setattr(board_main, "run_main", fake_run_main)
 
     exit_code = board_main.main()
@@ -52,3 +52,4 @@ def test_main_uses_circuitpython_compat_modules(monkeypatch: pytest.MonkeyPatch)
     assert hasattr(captured["time_module"], "sleep_us")
     assert captured["trigger_pin_id"] == 6
     assert captured["echo_pin_id"] == 5
+    assert captured["log_fn"] is None
@@ -0,0 +1,72 @@
+import pytest
+
+from tidegauge.codec import (
+    decode_delta_bitpacked,
+    decode_delta_varint_frames,
+    decode_delta_varints,
+    delta_bit_width,
+    encode_delta_bitpacked_into,
+    encode_delta_varints_into,
+    zigzag_decode,
+    zigzag_encode,
+)
+
+
+def test_zigzag_maps_small_magnitudes_to_small_codes() -> None:
+    assert [zigzag_encode(v) for v in (0, -1, 1, -2, 2)] == [0, 1, 2, 3, 4]
+    assert [zigzag_decode(v) for v in (0, 1, 2, 3, 4)] == [0, -1, 1, -2, 2]
+
+
+def test_encode_delta_varints_into_writes_at_offset_and_returns_length() -> None:
+    buffer = bytearray(8)
+
+    length = encode_delta_varints_into(buffer, 2, [900, 903, 901])
+
+    assert length == 4
+    assert bytes(buffer[2:6]) == bytes([0x88, 0x0E, 0x06, 0x03])
+    assert decode_delta_varints(bytes(buffer[2:6])) == [900, 903, 901]
+
+
+def test_encode_delta_varints_into_rejects_small_buffer() -> None:
+    with pytest.raises(ValueError, match="buffer too small"):
+        encode_delta_varints_into(bytearray(2), 0, [900, 903])
+
+
+def test_decode_delta_varints_stops_after_count_and_rejects_truncation() -> None:
+    assert decode_delta_varints(bytes([0x02, 0x02, 0x02]), count=2) == [1, 2]
+
+    with pytest.raises(ValueError, match="truncated varint stream"):
+        decode_delta_varints(bytes([0x88]))
+
+
+def test_decode_delta_varint_frames_decodes_archive_in_bulk() -> None:
+    frames = []
+    expected = [[900, 903, 901], [-600, -650], []]
+    for readings in expected:
+        buffer = bytearray(16)
+        length = encode_delta_varints_into(buffer, 0, readings)
+        frames.append(bytes(buffer[:length]))
+
+    assert decode_delta_varint_frames(frames) == expected
+
+
+def test_delta_bit_width_picks_smallest_fitting_width() -> None:
+    assert delta_bit_width([900, 907, 899]) == 4
+    assert delta_bit_width([900, 920, 889]) == 6
+    assert delta_bit_width([900, 1000]) is None
+
+
+@pytest.mark.parametrize("bit_width", [4, 6])
+def test_bitpacked_round_trips_readings(bit_width: int) -> None:
+    readings = [1200, 1207, 1199, 1199, 1192, 1195, 1200]
+    buffer = bytearray(16)
+
+    length = encode_delta_bitpacked_into(buffer, 0, readings, bit_width)
+
+    assert length == 2 + (6 * bit_width + 7) // 8
+    assert decode_delta_bitpacked(bytes(buffer[:length]), len(readings), bit_width) == readings
+
+
+def test_bitpacked_rejects_delta_that_does_not_fit() -> None:
+    with pytest.raises(ValueError, match="delta does not fit in 4 bits"):
+        encode_delta_bitpacked_into(bytearray(8), 0, [0, 8], 4)
@@ -0,0 +1,259 @@
+from pathlib import Path
+
+import pytest
+
+from tidegauge.batching import UplinkBatcher
+from tidegauge.calibration import CalibrationConfig
+from tidegauge.calibration_store import (
+    CachedCalibrationProvider,
+    load_calibration_config,
+    save_calibration_config,
+)
+from tidegauge.downlink import (
+    ACK_APPLIED,
+    ACK_DUPLICATE,
+    ACK_MALFORMED,
+    ACK_OUT_OF_RANGE,
+    ACK_STORE_FAILED,
+    ACK_UNSUPPORTED,
+    COMMAND_SET_DATUM_OFFSET,
+    COMMAND_SET_INTERVAL,
+    COMMAND_SET_MAX_SEND_ATTEMPTS,
+    COMMAND_SET_MODES,
+    DOWNLINK_FPORT,
+    MODE_BATCHING,
+    MODE_BURST,
+    CommandDispatcher,
+    DownlinkFormatError,
+    decode_downlink_commands,
+    encode_downlink_commands,
+)
+from tidegauge.payload import decode_command_ack_payload, decode_tide_height_batch_payload
+
+
+class FakeScheduler:
+    def __init__(self) -> None:
+        self.intervals: list[int] = []
+
+    def set_interval_s(self, interval_s: int) -> None:
+        self.intervals.append(interval_s)
+
+
+class FakeTarget:
+    def __init__(self, *, sensor: object = None, batcher: object = None) -> None:
+        self.scheduler = FakeScheduler()
+        self.max_send_attempts = 3
+        self.sensor = sensor
+        self.batcher = batcher
+
+
+class FakeDownlink:
+    def __init__(self, downlinks: list[tuple[int, bytes]]) -> None:
+        self._downlinks = downlinks
+
+    def receive(self) -> tuple[int, bytes] | None:
+        if not self._downlinks:
+            return None
+        return self._downlinks.pop(0)
+
+
+def _calibration_path(tmp_path: Path) -> Path:
+    path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    return path
+
+
+def _dispatcher(target: FakeTarget, **kwargs: object) -> CommandDispatcher:
+    return CommandDispatcher(
+        target=target,
+        downlink=FakeDownlink([]),
+        interval_s=60,
+        **kwargs,
+    )
+
+
+def test_downlink_commands_round_trip() -> None:
+    payload = encode_downlink_commands(
+        sequence=7,
+        interval_s=900,
+        max_send_attempts=2,
+        datum_offset_m=-0.125,
+        modes=MODE_BURST,
+    )
+
+    assert payload == bytes([7, 0x01, 0x03, 0x84, 0x02, 2, 0x03, 0xFF, 0x83, 0x04, 0x02])
+    assert decode_downlink_commands(payload) == (
+        7,
+        [
+            (COMMAND_SET_INTERVAL, 900),
+            (COMMAND_SET_MAX_SEND_ATTEMPTS, 2),
+            (COMMAND_SET_DATUM_OFFSET, -125),
+            (COMMAND_SET_MODES, MODE_BURST),
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [b"", b"\x01", b"\x01\x09\x00", b"\x01\x01\x03"],
+)
+def test_decode_downlink_commands_rejects_malformed_payloads(payload: bytes) -> None:
+    with pytest.raises(DownlinkFormatError):
+        decode_downlink_commands(payload)
+
+
+def test_dispatcher_applies_commands_and_acks_resulting_settings(tmp_path: Path) -> None:
+    calibration_path = _calibration_path(tmp_path)
+    provider = CachedCalibrationProvider(path=calibration_path)
+    target = FakeTarget()
+    dispatcher = _dispatcher(
+        target,
+        calibration_path=calibration_path,
+        calibration_provider=provider,
+    )
+
+    status = dispatcher.handle(
+        encode_downlink_commands(sequence=1, interval_s=900, max_send_attempts=5, datum_offset_m=0.35)
+    )
+
+    assert status == ACK_APPLIED
+    assert target.scheduler.intervals == [900]
+    assert target.max_send_attempts == 5
+    assert load_calibration_config(path=calibration_path) == CalibrationConfig(
+        geometry_reference_m=2.5,
+        datum_offset_m=0.35,
+    )
+    assert provider.get().datum_offset_m == 0.35
+    assert decode_command_ack_payload(dispatcher.pending_ack) == {
+        "sequence": 1,
+        "status": ACK_APPLIED,
+        "interval_s": 900,
+        "max_send_attempts": 5,
+        "modes": 0,
+        "datum_offset_mm": 350,
+    }
+
+
+def test_dispatcher_acks_repeated_sequence_without_reapplying() -> None:
+    target = FakeTarget()
+    dispatcher = _dispatcher(target)
+    downlink = encode_downlink_commands(sequence=4, interval_s=120)
+
+    assert dispatcher.handle(downlink) == ACK_APPLIED
+    assert dispatcher.handle(downlink) == ACK_DUPLICATE
+    assert target.scheduler.intervals == [120]
+    assert decode_command_ack_payload(dispatcher.pending_ack)["status"] == ACK_DUPLICATE
+    # Like the LMIC firmware, a repeated sequence is a duplicate before it is malformed.
+    assert dispatcher.handle(b"\x04\x7F") == ACK_DUPLICATE
+    assert dispatcher.handle(b"\x04") == ACK_MALFORMED
+
+
+def test_dispatcher_flushes_pending_batch_when_batching_is_switched_off() -> None:
+    clock = [0]
+    batcher = UplinkBatcher(now_s=lambda: clock[0], max_readings=10)
+    target = FakeTarget(batcher=batcher)
+    dispatcher = _dispatcher(target, batcher=batcher)
+    for index in range(3):
+        clock[0] = index * 60
+        batcher.add_reading_m(0.9 + index / 1000)
+
+    assert dispatcher.handle(encode_downlink_commands(sequence=1, modes=0)) == ACK_APPLIED
+
+    assert target.batcher is None
+    assert batcher.pending_count == 0
+    assert len(dispatcher.pending_payloads) == 1
+    assert decode_tide_height_batch_payload(dispatcher.pending_payloads[0], received_at_s=120) == [
+        (0, 900),
+        (60, 901),
+        (120, 902),
+    ]
+
+
+def test_dispatcher_applies_nothing_when_any_command_is_invalid() -> None:
+    target = FakeTarget()
+    dispatcher = _dispatcher(target)
+
+    status = dispatcher.handle(encode_downlink_commands(sequence=2, interval_s=300, max_send_attempts=0))
+
+    assert status == ACK_OUT_OF_RANGE
+    assert target.scheduler.intervals == []
+    assert dispatcher.last_sequence is None
+    assert dispatcher.handle(encode_downlink_commands(sequence=2, interval_s=5)) == ACK_OUT_OF_RANGE
+
+
+def test_dispatcher_reports_unsupported_and_malformed_downlinks() -> None:
+    dispatcher = _dispatcher(FakeTarget())
+
+    assert dispatcher.handle(encode_downlink_commands(sequence=1, datum_offset_m=0.1)) == ACK_UNSUPPORTED
+    assert dispatcher.handle(encode_downlink_commands(sequence=2, modes=MODE_BATCHING)) == ACK_UNSUPPORTED
+    assert dispatcher.handle(b"\x03\x7F") == ACK_MALFORMED
+    assert decode_command_ack_payload(dispatcher.pending_ack)["sequence"] == 3
+
+
+def test_dispatcher_toggles_batching_and_burst_modes() -> None:
+    batcher = UplinkBatcher(now_s=lambda: 0)
+    burst_sensor = object()
+    single_sensor = object()
+    target = FakeTarget(sensor=burst_sensor, batcher=batcher)
+    dispatcher = _dispatcher(
+        target,
+        batcher=batcher,
+        burst_sensor=burst_sensor,
+        single_sensor=single_sensor,
+    )
+    assert dispatcher.modes == MODE_BATCHING | MODE_BURST
+
+    assert dispatcher.handle(encode_downlink_commands(sequence=1, modes=0)) == ACK_APPLIED
+    assert target.batcher is None
+    assert target.sensor is single_sensor
+
+    assert dispatcher.handle(encode_downlink_commands(sequence=2, modes=MODE_BURST)) == ACK_APPLIED
+    assert target.batcher is None
+    assert target.sensor is burst_sensor
+    assert decode_command_ack_payload(dispatcher.pending_ack)["modes"] == MODE_BURST
+
+
+def test_dispatcher_reports_store_failure_and_keeps_other_settings(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import tidegauge.downlink as downlink_module
+
+    def read_only_save(**kwargs: object) -> None:
+        raise OSError(30, "Read-only filesystem")
+
+    monkeypatch.setattr(downlink_module, "save_calibration_config", read_only_save)
+    target = FakeTarget()
+    dispatcher = _dispatcher(target, calibration_path=_calibration_path(tmp_path))
+
+    status = dispatcher.handle(
+        encode_downlink_commands(sequence=1, interval_s=120, datum_offset_m=0.4)
+    )
+
+    assert status == ACK_STORE_FAILED
+    assert target.scheduler.intervals == []
+    assert dispatcher.last_sequence is None
+    assert decode_command_ack_payload(dispatcher.pending_ack)["datum_offset_mm"] == 200
+
+
+def test_dispatcher_poll_only_handles_command_fport() -> None:
+    target = FakeTarget()
+    dispatcher = CommandDispatcher(
+        target=target,
+        downlink=FakeDownlink(
+            [
+                (1, encode_downlink_commands(sequence=1, interval_s=120)),
+                (DOWNLINK_FPORT, encode_downlink_commands(sequence=2, interval_s=180)),
+            ]
+        ),
+        interval_s=60,
+    )
+
+    assert dispatcher.poll() is False
+    assert dispatcher.pending_ack is None
+    assert dispatcher.poll() is True
+    assert target.scheduler.intervals == [180]
+    assert dispatcher.poll() is False
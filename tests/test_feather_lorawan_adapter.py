@@ -2,6 +2,7 @@ import importlib
 
 import pytest
 
+from tidegauge.lorawan_session import LoRaWanSession
 from tidegauge.ttn_credentials import TtnCredentials
 
 
@@ -380,3 +381,285 @@ def test_create_tinylora_radio_falls_back_to_otaa_positional_ttn_ctor(
         "8899AABBCCDDEEFF",
         "00112233445566778899AABBCCDDEEFF",
     )
+
+
+def test_feather_lorawan_driver_accepts_memoryview_slice() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+    raw_client = FakeTinyLoRaRadio()
+    driver = feather_lorawan.FeatherLoRaWanDriver(raw_radio=raw_client)
+    buffer = bytearray(b"\x03\x84\xff\xff")
+
+    assert driver.send(memoryview(buffer)[:2]) is True
+    assert bytes(raw_client.sent_payloads[0]) == b"\x03\x84"
+
+
+def test_feather_lorawan_driver_caches_capabilities_at_construction() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+    raw_client = FakeTinyLoRaRadio()
+    driver = feather_lorawan.FeatherLoRaWanDriver(raw_radio=raw_client)
+
+    assert driver.capabilities.send_form == feather_lorawan.SEND_KEYWORD_LENGTH
+    assert driver.capabilities.has_join is True
+    assert driver.capabilities.reports_status is True
+
+
+def test_probe_radio_capabilities_detects_each_send_form() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    class PositionalRadio:
+        def send_data(self, payload: bytes, length: int) -> bool:
+            return True
+
+    class CounterRadio:
+        frame_counter = 0
+
+        def send_data(self, data: bytes, data_length: int, frame_counter: int, timeout: int = 2) -> None:
+            return None
+
+    class PlainRadio:
+        def send(self, payload: bytes) -> bool:
+            return True
+
+    probe = feather_lorawan.probe_radio_capabilities
+    assert probe(PositionalRadio()).send_form == feather_lorawan.SEND_POSITIONAL_LENGTH
+    assert probe(CounterRadio()).send_form == feather_lorawan.SEND_FRAME_COUNTER
+    assert probe(CounterRadio()).reports_status is False
+    assert probe(PlainRadio()).send_form == feather_lorawan.SEND_PLAIN
+    assert probe(PlainRadio()).has_join is False
+
+
+def test_probe_radio_capabilities_uses_frame_counter_attribute_without_inspect() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    class CounterRadio:
+        frame_counter = 3
+
+        def send_data(self, data: bytes, data_length: int, frame_counter: int) -> None:
+            return None
+
+    class PositionalRadio:
+        def send_data(self, payload: bytes, length: int) -> bool:
+            return True
+
+    def no_signature(fn: object) -> None:
+        return None
+
+    probe = feather_lorawan.probe_radio_capabilities
+    assert probe(CounterRadio(), signature_fn=no_signature).send_form == feather_lorawan.SEND_FRAME_COUNTER
+    assert probe(PositionalRadio(), signature_fn=no_signature).send_form == feather_lorawan.SEND_POSITIONAL_LENGTH
+
+
+def test_feather_lorawan_driver_rejects_radio_without_send_at_construction() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    with pytest.raises(RuntimeError, match="does not expose send/send_data"):
+        feather_lorawan.FeatherLoRaWanDriver(raw_radio=object())
+    with pytest.raises(ValueError, match="Unsupported send form"):
+        feather_lorawan.FeatherLoRaWanDriver(raw_radio=FakeTinyLoRaRadio(), send_form="send_later")
+
+
+def test_feather_lorawan_driver_send_form_override_skips_probing() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    class VarargsRadio:
+        def __init__(self) -> None:
+            self.calls: list[tuple[object, ...]] = []
+
+        def send_data(self, *args: object) -> bool:
+            self.calls.append(args)
+            return True
+
+    raw = VarargsRadio()
+    driver = feather_lorawan.FeatherLoRaWanDriver(
+        raw_radio=raw,
+        send_form=feather_lorawan.SEND_POSITIONAL_LENGTH,
+    )
+
+    assert driver.send(b"\x01\x02\x03") is True
+    assert raw.calls == [(b"\x01\x02\x03", 3)]
+
+
+def test_feather_lorawan_driver_propagates_type_error_raised_inside_radio() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    class BrokenRadio:
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def send_data(self, payload: bytes, *, length: int) -> bool:
+            self.calls += 1
+            raise TypeError("unsupported operand in radio driver")
+
+    raw = BrokenRadio()
+    driver = feather_lorawan.FeatherLoRaWanDriver(raw_radio=raw)
+
+    with pytest.raises(TypeError, match="radio driver"):
+        driver.send(b"\x01")
+    assert raw.calls == 1
+
+
+def test_feather_lorawan_driver_treats_tinylora_none_return_as_sent() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    class TinyLoRaLikeRadio:
+        def __init__(self) -> None:
+            self.frame_counter = 0
+            self.calls: list[tuple[bytes, int, int]] = []
+
+        def send_data(self, data: bytes, data_length: int, frame_counter: int, timeout: int = 2) -> None:
+            self.calls.append((bytes(data), data_length, frame_counter))
+
+    raw = TinyLoRaLikeRadio()
+    driver = feather_lorawan.FeatherLoRaWanDriver(raw_radio=raw)
+
+    assert driver.send(b"\x05\x06") is True
+    assert driver.send(b"\x07") is True
+    assert raw.calls == [(b"\x05\x06", 2, 0), (b"\x07", 1, 1)]
+    assert driver.frame_counter == 2
+
+
+class FakeAbpTinyLoRa:
+    def __init__(self) -> None:
+        self.frame_counter = 0
+
+    def send_data(self, data: bytes, data_length: int, frame_counter: int, timeout: int = 2) -> None:
+        return None
+
+
+def _abp_session(fcnt_up: int = 0) -> LoRaWanSession:
+    return LoRaWanSession(
+        dev_addr=bytes.fromhex("26011BEE"),
+        nwk_skey=bytes.fromhex("00112233445566778899AABBCCDDEEFF"),
+        app_skey=bytes.fromhex("FFEEDDCCBBAA99887766554433221100"),
+        fcnt_up=fcnt_up,
+    )
+
+
+def test_feather_lorawan_driver_advances_frame_counter_even_when_send_raises() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    class FailingRadio(FakeAbpTinyLoRa):
+        def send_data(self, data: bytes, data_length: int, frame_counter: int, timeout: int = 2) -> None:
+            raise RuntimeError("tx timeout")
+
+    raw = FailingRadio()
+    driver = feather_lorawan.FeatherLoRaWanDriver(raw_radio=raw)
+
+    with pytest.raises(RuntimeError):
+        driver.send(b"\x01")
+    assert raw.frame_counter == 1
+
+
+def test_create_feather_lorawan_driver_resumes_abp_session_with_matching_keys() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+    credentials = TtnCredentials(
+        dev_addr="26011BEE",
+        nwk_skey="00112233445566778899AABBCCDDEEFF",
+        app_skey="FFEEDDCCBBAA99887766554433221100",
+    )
+    raw = FakeAbpTinyLoRa()
+    driver = feather_lorawan.create_feather_lorawan_driver(
+        credentials=credentials,
+        radio_factory=lambda *, credentials: raw,
+    )
+
+    assert driver.resume(_abp_session(fcnt_up=64)) is True
+    assert raw.frame_counter == 64
+    driver.send(b"\x01")
+    assert driver.session().fcnt_up == 65
+
+    other = _abp_session()
+    other.app_skey = bytes(16)
+    assert driver.resume(other) is False
+
+
+def test_feather_lorawan_driver_restores_session_on_radio_exposing_keys() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    class JoiningRadio(FakeAbpTinyLoRa):
+        def __init__(self) -> None:
+            super().__init__()
+            self.dev_addr = b"\x00" * 4
+            self.nwk_skey = b"\x00" * 16
+            self.app_skey = b"\x00" * 16
+
+        def join(self) -> None:
+            self.dev_addr = bytes.fromhex("26011BEE")
+
+    joined = JoiningRadio()
+    joined_driver = feather_lorawan.FeatherLoRaWanDriver(raw_radio=joined)
+    joined_driver.join()
+    assert joined_driver.session().dev_addr == bytes.fromhex("26011BEE")
+
+    fresh = JoiningRadio()
+    driver = feather_lorawan.FeatherLoRaWanDriver(raw_radio=fresh)
+    assert driver.resume(_abp_session(fcnt_up=5)) is True
+    assert fresh.nwk_skey == bytes.fromhex("00112233445566778899AABBCCDDEEFF")
+    assert fresh.frame_counter == 5
+
+
+def test_feather_lorawan_driver_without_frame_counter_cannot_persist_session() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+    driver = feather_lorawan.FeatherLoRaWanDriver(
+        raw_radio=FakeTinyLoRaRadio(),
+        session=_abp_session(),
+    )
+
+    assert driver.frame_counter is None
+    assert driver.session() is None
+    assert driver.resume(_abp_session()) is False
+
+
+def test_feather_lorawan_driver_forwards_downlinks_only_from_receiving_radio() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    class ReceivingRadio(FakeTinyLoRaRadio):
+        def receive(self) -> tuple[int, bytes] | None:
+            return 10, b"\x01\x01\x02\x58"
+
+    uplink_only = feather_lorawan.FeatherLoRaWanDriver(raw_radio=FakeTinyLoRaRadio())
+    receiving = feather_lorawan.FeatherLoRaWanDriver(raw_radio=ReceivingRadio())
+
+    assert uplink_only.capabilities.has_receive is False
+    assert uplink_only.receive() is None
+    assert receiving.capabilities.has_receive is True
+    assert receiving.receive() == (10, b"\x01\x01\x02\x58")
+
+
+def test_feather_lorawan_driver_tracks_downlink_counter_when_radio_keeps_one() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    class ReceivingAbpRadio(FakeAbpTinyLoRa):
+        def __init__(self) -> None:
+            super().__init__()
+            self.frame_counter_down = 0
+
+    raw = ReceivingAbpRadio()
+    driver = feather_lorawan.FeatherLoRaWanDriver(raw_radio=raw, session=_abp_session())
+    saved = _abp_session(fcnt_up=16)
+    saved.fcnt_down = 9
+
+    assert feather_lorawan.FeatherLoRaWanDriver(raw_radio=FakeAbpTinyLoRa()).frame_counter_down is None
+    assert driver.resume(saved) is True
+    assert raw.frame_counter_down == 9
+    raw.frame_counter_down = 10
+    assert driver.frame_counter_down == 10
+    assert driver.session().fcnt_down == 10
+
+
+def test_feather_lorawan_driver_reports_fixed_or_radio_data_rate_limits() -> None:
+    feather_lorawan = importlib.import_module("tidegauge.adapters.feather_lorawan")
+
+    class AdrRadio(FakeTinyLoRaRadio):
+        data_rate = 3
+
+    fixed = feather_lorawan.FeatherLoRaWanDriver(raw_radio=FakeTinyLoRaRadio())
+    slow = feather_lorawan.FeatherLoRaWanDriver(raw_radio=FakeTinyLoRaRadio(), data_rate=1)
+    raw_adr = AdrRadio()
+    adaptive = feather_lorawan.FeatherLoRaWanDriver(raw_radio=raw_adr)
+
+    assert fixed.uplink_limits() == (3, 242)
+    assert slow.uplink_limits() == (1, 53)
+    assert adaptive.capabilities.reports_data_rate is True
+    raw_adr.data_rate = 0
+    assert adaptive.uplink_limits() == (0, 11)
@@ -1,4 +1,13 @@
+import pytest
+
+from tidegauge.adapters.airtime import AirtimeBudgetRadio
+from tidegauge.adapters.hcsr04 import UltrasonicGateError
+from tidegauge.calibration import CalibrationConfig
 from tidegauge.hardware import HardwareConfig, build_runtime_dependencies
+from tidegauge.height_filter import HeightFilter
+from tidegauge.payload import decode_history_payload
+from tidegauge.redundancy import RedundantHistoryEncoder
+from tidegauge.scheduler import AdaptiveScheduler
 
 
 class FakeTimeModule:
@@ -22,6 +31,9 @@ class FakeTimeModule:
         self._ticks_us += 100
         return self._ticks_us
 
+    def ticks_ms(self) -> int:
+        return self._ticks_us // 1000
+
     def ticks_diff(self, current: int, start: int) -> int:
         return current - start
 
@@ -107,3 +119,354 @@ def test_build_runtime_dependencies_wires_scheduler_clock_and_sleeper() -> None:
 
     deps.sleeper.sleep_s(2)
     assert fake_time.sleep_calls == [2]
+
+
+def test_build_runtime_dependencies_uses_alarm_sleeper_when_alarm_module_given() -> None:
+    class FakeAlarmModule:
+        def __init__(self) -> None:
+            self.light_sleeps: list[float] = []
+
+            class FakeTimeAlarm:
+                def __init__(self, *, monotonic_time: float) -> None:
+                    self.monotonic_time = monotonic_time
+
+            class FakeAlarmTime:
+                TimeAlarm = FakeTimeAlarm
+
+            self.time = FakeAlarmTime
+
+        def light_sleep_until_alarms(self, time_alarm: object) -> None:
+            self.light_sleeps.append(time_alarm.monotonic_time)
+
+    class MonotonicTimeModule(FakeTimeModule):
+        def monotonic(self) -> float:
+            return 5.5
+
+    fake_time = MonotonicTimeModule()
+    alarm = FakeAlarmModule()
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=fake_time,
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7),
+        alarm_module=alarm,
+    )
+    deps.sleeper.sleep_s(60)
+
+    assert alarm.light_sleeps == [65.5]
+    assert fake_time.sleep_calls == []
+
+
+def test_build_runtime_dependencies_wraps_sensor_in_burst_sampler() -> None:
+    fake_time = FakeTimeModule()
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {7: [0, 1, 1, 1, 0] * 3}
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=fake_time,
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(
+            trigger_pin_id=6,
+            echo_pin_id=7,
+            burst_sample_count=3,
+            burst_spacing_s=0.06,
+        ),
+    )
+
+    distance_m = deps.sensor.read_distance_m()
+
+    assert distance_m > 0
+    assert deps.sensor.valid_sample_count == 3
+    assert fake_time.sleep_calls == [0.06, 0.06]
+
+
+def test_build_runtime_dependencies_falls_back_to_ram_uplink_queue(tmp_path) -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=FakeTimeModule(),
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(
+            trigger_pin_id=6,
+            echo_pin_id=7,
+            uplink_queue_capacity=4,
+            uplink_queue_path=str(tmp_path / "missing-dir" / "queue.bin"),
+        ),
+    )
+
+    deps.uplink_queue.push(timestamp_s=1, height_mm=2)
+    assert deps.uplink_queue.peek(1) == [(1, 2)]
+
+
+def test_build_runtime_dependencies_selects_adaptive_scheduler() -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=FakeTimeModule(),
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(
+            trigger_pin_id=6,
+            echo_pin_id=7,
+            measurement_interval_s=60,
+            adaptive_max_interval_s=600,
+        ),
+    )
+
+    assert isinstance(deps.scheduler, AdaptiveScheduler)
+
+
+def test_build_runtime_dependencies_adds_height_filter_when_window_set() -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=FakeTimeModule(),
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7, height_filter_window=5),
+    )
+
+    assert isinstance(deps.height_filter, HeightFilter)
+    assert deps.height_filter.hampel._window_size == 5
+
+
+def test_build_runtime_dependencies_adds_stage_probe_when_timing_enabled() -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+    time_module = FakeTimeModule()
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=time_module,
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7, stage_timing=True),
+    )
+
+    start = deps.stage_probe.mark()
+    deps.stage_probe.record(0, start)
+    assert deps.stage_probe.stage_stats(0) == (1, 100, 100, 100)
+
+
+class FakePulseIn:
+    def __init__(self, width_us: int) -> None:
+        self._width_us = width_us
+        self._captured: list[int] = []
+
+    def __len__(self) -> int:
+        if not self._captured:
+            self._captured.append(self._width_us)
+        return len(self._captured)
+
+    def popleft(self) -> int:
+        return self._captured.pop(0)
+
+    def clear(self) -> None:
+        self._captured = []
+
+    def pause(self) -> None:
+        return None
+
+    def resume(self) -> None:
+        return None
+
+
+def test_build_runtime_dependencies_prefers_pulsein_echo_reader() -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+
+    class FakePulseioModule:
+        @staticmethod
+        def PulseIn(pin: object, *, maxlen: int, idle_state: bool) -> FakePulseIn:
+            return FakePulseIn(5_831)
+
+    class FakeBoardModule:
+        D7 = object()
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=FakeTimeModule(),
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7),
+        pulseio_module=FakePulseioModule,
+        board_module=FakeBoardModule,
+    )
+
+    assert deps.sensor.read_distance_m() == pytest.approx(1.0, abs=0.01)
+    assert 7 not in FakeMachineModule.Pin._instances
+
+
+def test_build_runtime_dependencies_falls_back_to_busy_wait_reader() -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+
+    class ExhaustedPulseioModule:
+        @staticmethod
+        def PulseIn(pin: object, *, maxlen: int, idle_state: bool) -> FakePulseIn:
+            raise RuntimeError("All state machines in use")
+
+    class FakeBoardModule:
+        D7 = object()
+
+    build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=FakeTimeModule(),
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7),
+        pulseio_module=ExhaustedPulseioModule,
+        board_module=FakeBoardModule,
+    )
+
+    assert FakeMachineModule.Pin._instances[7].mode == FakeMachineModule.Pin.IN
+
+
+def test_build_runtime_dependencies_gates_echo_from_calibration_geometry() -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {7: [0, 1] + [1] * 300}
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=FakeTimeModule(),
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7),
+        calibration_config=CalibrationConfig(geometry_reference_m=1.5, datum_offset_m=0.2),
+    )
+
+    # ~11 ms gate for a 1.5 m tube: gives up long before the 30 ms default.
+    with pytest.raises(UltrasonicGateError):
+        deps.sensor.read_distance_m()
+    assert len(FakeMachineModule.Pin._input_sequences[7]) > 150
+
+
+def test_build_runtime_dependencies_adds_health_monitor_and_counts_boot() -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+    nvm = bytearray([0xFF] * 8)
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=FakeTimeModule(),
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7, health_report_cycles=10),
+        nvm=nvm,
+    )
+
+    assert deps.health is not None
+    assert deps.health.reboots == 1
+
+
+def test_build_runtime_dependencies_adds_command_dispatcher_for_receiving_client(tmp_path) -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+
+    class ReceivingLoRaClient(FakeLoRaClient):
+        def receive(self) -> tuple[int, bytes] | None:
+            return None
+
+    config = HardwareConfig(
+        trigger_pin_id=6,
+        echo_pin_id=7,
+        burst_sample_count=3,
+        batch_size=4,
+        downlink_commands=True,
+    )
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=FakeTimeModule(),
+        lora_client=ReceivingLoRaClient(),
+        config=config,
+        calibration_path=tmp_path / "calibration.json",
+    )
+    uplink_only = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=FakeTimeModule(),
+        lora_client=FakeLoRaClient(),
+        config=config,
+    )
+
+    assert deps.commands is not None
+    assert deps.commands.modes == 0x03
+    assert deps.commands.handle(bytes([1, 0x04, 0x00])) == 0
+    assert deps.batcher is None
+    assert deps.sensor.__class__.__name__ == "UltrasonicDurationAdapter"
+    assert uplink_only.commands is None
+
+
+def test_build_runtime_dependencies_uses_history_encoder_for_redundancy_depth() -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=FakeTimeModule(),
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(
+            trigger_pin_id=6,
+            echo_pin_id=7,
+            redundancy_depth=3,
+            health_report_cycles=10,
+        ),
+        nvm=bytearray([0xFF] * 8),
+    )
+
+    assert isinstance(deps.batcher, RedundantHistoryEncoder)
+    assert decode_history_payload(deps.batcher.add_reading_m(1.0))[0] == 1
+    assert deps.health.reboots == 1
+    with pytest.raises(ValueError, match="redundancy_depth"):
+        build_runtime_dependencies(
+            machine_module=FakeMachineModule,
+            time_module=FakeTimeModule(),
+            lora_client=FakeLoRaClient(),
+            config=HardwareConfig(
+                trigger_pin_id=6,
+                echo_pin_id=7,
+                batch_size=4,
+                redundancy_depth=3,
+            ),
+        )
+
+
+def test_build_runtime_dependencies_lets_airtime_budget_wait_with_blocking_sleep() -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+    time_module = FakeTimeModule()
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=time_module,
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(
+            trigger_pin_id=6,
+            echo_pin_id=7,
+            daily_airtime_budget_ms=30_000,
+            airtime_max_delay_s=600,
+        ),
+    )
+
+    assert isinstance(deps.radio, AirtimeBudgetRadio)
+    assert deps.radio._sleep_fn == time_module.sleep
+    assert deps.radio._max_delay_s == 600
+
+
+def test_build_runtime_dependencies_backs_off_with_blocking_sleep() -> None:
+    FakeMachineModule.Pin._instances = {}
+    FakeMachineModule.Pin._input_sequences = {}
+    time_module = FakeTimeModule()
+
+    deps = build_runtime_dependencies(
+        machine_module=FakeMachineModule,
+        time_module=time_module,
+        lora_client=FakeLoRaClient(),
+        config=HardwareConfig(trigger_pin_id=6, echo_pin_id=7, retry_backoff_base_s=2),
+    )
+    deps.retry_backoff.wait(1)
+
+    assert len(time_module.sleep_calls) == 1
+    assert 1 <= time_module.sleep_calls[0] <= 2
@@ -1,6 +1,16 @@
 import pytest
 
-from tidegauge.adapters.hcsr04 import Hcsr04PulseReader, UltrasonicTimeoutError
+from tidegauge.adapters.hcsr04 import (
+    REJECT_NO_ECHO,
+    REJECT_TOO_FAR,
+    REJECT_TOO_NEAR,
+    EchoRangeGate,
+    Hcsr04PulseReader,
+    UltrasonicGateError,
+    UltrasonicTimeoutError,
+    range_gate_from_calibration,
+)
+from tidegauge.calibration import CalibrationConfig, CalibrationNotSetError
 
 
 class FakeTimeModule:
@@ -89,3 +99,76 @@ def test_hcsr04_pulse_reader_times_out_waiting_for_pulse_end() -> None:
 
     with pytest.raises(UltrasonicTimeoutError, match="Timed out waiting for echo end"):
         reader.read_echo_duration_us()
+
+
+def _gated_reader(echo: FakeEchoPin, tick_step_us: int) -> Hcsr04PulseReader:
+    return Hcsr04PulseReader(
+        trigger_pin=FakeTriggerPin(),
+        echo_pin=echo,
+        time_module=FakeTimeModule(tick_step_us=tick_step_us),
+        range_gate=EchoRangeGate(min_distance_m=0.1, max_distance_m=1.75),
+    )
+
+
+def test_hcsr04_pulse_reader_gives_up_on_start_after_gate_timeout() -> None:
+    time_module = FakeTimeModule(tick_step_us=100)
+    reader = Hcsr04PulseReader(
+        trigger_pin=FakeTriggerPin(),
+        echo_pin=FakeEchoPin([], default=0),
+        time_module=time_module,
+        range_gate=EchoRangeGate(max_distance_m=1.75),
+    )
+
+    with pytest.raises(UltrasonicTimeoutError, match="echo start"):
+        reader.read_echo_duration_us()
+
+    # 2 ms start window instead of the 30 ms default.
+    assert time_module.ticks_us() < 3_000
+    assert reader.reject_counts[REJECT_NO_ECHO] == 1
+
+
+def test_hcsr04_pulse_reader_rejects_echo_beyond_gate() -> None:
+    reader = _gated_reader(FakeEchoPin([0, 1], default=1), tick_step_us=500)
+
+    with pytest.raises(UltrasonicGateError, match="beyond range gate"):
+        reader.read_echo_duration_us()
+
+    assert reader.reject_counts == {REJECT_NO_ECHO: 0, REJECT_TOO_FAR: 1, REJECT_TOO_NEAR: 0}
+
+
+def test_hcsr04_pulse_reader_rejects_echo_nearer_than_gate() -> None:
+    # 0.1 m needs ~555 us of echo even in hot air; this pulse ends after ~200 us.
+    reader = _gated_reader(FakeEchoPin([0, 1, 0]), tick_step_us=100)
+
+    with pytest.raises(UltrasonicGateError, match="nearer than range gate"):
+        reader.read_echo_duration_us()
+
+    assert reader.reject_counts[REJECT_TOO_NEAR] == 1
+
+
+def test_hcsr04_pulse_reader_accepts_echo_inside_gate() -> None:
+    reader = _gated_reader(FakeEchoPin([0] + [1] * 20 + [0]), tick_step_us=300)
+
+    assert 583 < reader.read_echo_duration_us() < 10_973
+    assert sum(reader.reject_counts.values()) == 0
+
+
+def test_range_gate_from_calibration_adds_margin_to_geometry_reference() -> None:
+    gate = range_gate_from_calibration(
+        CalibrationConfig(geometry_reference_m=1.5, datum_offset_m=0.2),
+        margin_m=0.25,
+    )
+
+    # Widened to cover echoes in the coldest and hottest compensated air.
+    assert gate.max_echo_us == 10_973
+    assert gate.min_echo_us == 111
+
+
+def test_range_gate_from_calibration_requires_geometry_reference() -> None:
+    with pytest.raises(CalibrationNotSetError):
+        range_gate_from_calibration(CalibrationConfig(geometry_reference_m=None, datum_offset_m=None))
+
+
+def test_echo_range_gate_rejects_inverted_window() -> None:
+    with pytest.raises(ValueError, match="range gate"):
+        EchoRangeGate(min_distance_m=2.0, max_distance_m=1.0)
@@ -0,0 +1,135 @@
+import pytest
+
+from tidegauge.adapters.battery import AnalogBatteryMonitor
+from tidegauge.adapters.timebase import TICKS_MAX, ticks_diff
+from tidegauge.health import HealthMonitor, increment_boot_count
+from tidegauge.payload import decode_health_payload
+
+
+class SteppingTicks:
+    def __init__(self, step_ms: int, start: int = 0) -> None:
+        self.step_ms = step_ms
+        self.ticks = start
+
+    def __call__(self) -> int:
+        self.ticks = (self.ticks + self.step_ms) & TICKS_MAX
+        return self.ticks
+
+
+class FakeAnalogIn:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+class BrokenBattery:
+    def read_battery_mv(self) -> int:
+        raise OSError("adc busy")
+
+
+def _ticks_diff(current: int, start: int) -> int:
+    return current - start
+
+
+def test_increment_boot_count_starts_fresh_nvm_at_one_and_persists() -> None:
+    nvm = bytearray([0xFF] * 8)
+
+    assert increment_boot_count(nvm) == 1
+    assert increment_boot_count(nvm) == 2
+    assert nvm[3:] == bytearray([0xFF] * 5)
+
+
+def test_health_monitor_tracks_worst_cycle_and_memory_low_water() -> None:
+    ticks = SteppingTicks(step_ms=250)
+    mem_free_values = [90_000, 60_000, 75_000]
+    health = HealthMonitor(
+        ticks_ms=ticks,
+        ticks_diff=_ticks_diff,
+        report_every_cycles=3,
+        mem_free=lambda: mem_free_values.pop(0),
+    )
+
+    due = []
+    for step_ms in [250, 1_500, 10]:
+        ticks.step_ms = step_ms
+        health.begin_cycle()
+        due.append(health.end_cycle())
+
+    assert due == [False, False, True]
+    assert health.worst_cycle_ms == 1500
+    assert health.mem_free_low_bytes == 60_000
+
+
+def test_health_monitor_reports_cycles_longer_than_the_microsecond_tick_period() -> None:
+    ticks = SteppingTicks(step_ms=600_000, start=TICKS_MAX - 700_000)
+    health = HealthMonitor(ticks_ms=ticks, ticks_diff=ticks_diff)
+
+    health.begin_cycle()
+    health.end_cycle()
+
+    assert health.worst_cycle_ms == 600_000
+
+
+def test_health_monitor_encodes_counters_and_resets_window() -> None:
+    health = HealthMonitor(
+        ticks_ms=SteppingTicks(step_ms=1),
+        ticks_diff=_ticks_diff,
+        battery_monitor=AnalogBatteryMonitor(analog_in=FakeAnalogIn(40_000)),
+        reboots=3,
+    )
+    health.sends = 58
+    health.retries = 4
+    health.failures = 2
+    health.sensor_timeouts = 1
+    health.worst_cycle_ms = 812
+
+    report = decode_health_payload(health.encode_payload())
+
+    assert report == {
+        "sends": 58,
+        "retries": 4,
+        "failures": 2,
+        "sensor_timeouts": 1,
+        "calibration_missing": 0,
+        "cycle_errors": 0,
+        "reboots": 3,
+        "mem_free_low_bytes": None,
+        "worst_cycle_ms": 812,
+        "battery_mv": 4028,
+        "burst_valid_low": None,
+        "burst_sample_count": 0,
+    }
+
+    health.reset()
+    assert health.sends == 0
+    assert health.reboots == 3
+
+
+def test_health_monitor_reports_fewest_valid_pings_per_window() -> None:
+    health = HealthMonitor(ticks_ms=SteppingTicks(step_ms=1), ticks_diff=_ticks_diff)
+
+    health.observe_burst(5, 5)
+    health.observe_burst(2, 5)
+    health.observe_burst(4, 5)
+    report = decode_health_payload(health.encode_payload())
+
+    assert report["burst_valid_low"] == 2
+    assert report["burst_sample_count"] == 5
+
+    health.reset()
+    health.observe_burst(4, 5)
+    assert decode_health_payload(health.encode_payload())["burst_valid_low"] == 4
+
+
+def test_health_monitor_reports_unknown_battery_when_monitor_fails() -> None:
+    health = HealthMonitor(
+        ticks_ms=SteppingTicks(step_ms=1),
+        ticks_diff=_ticks_diff,
+        battery_monitor=BrokenBattery(),
+    )
+
+    assert decode_health_payload(health.encode_payload())["battery_mv"] is None
+
+
+def test_health_monitor_rejects_non_positive_report_interval() -> None:
+    with pytest.raises(ValueError, match="report_every_cycles"):
+        HealthMonitor(ticks_ms=SteppingTicks(1), ticks_diff=_ticks_diff, report_every_cycles=0)
@@ -0,0 +1,106 @@
+from pathlib import Path
+
+from tidegauge.adapters.fakes import FakeRadioPort, FakeSleepPort
+from tidegauge.calibration import CalibrationConfig
+from tidegauge.calibration_store import save_calibration_config
+from tidegauge.heap_profile import HeapProfiler, create_heap_profiler, profile_host_heap
+from tidegauge.instrumentation import STAGE_ENCODE, STAGE_SENSOR
+
+
+class ScriptedHeap:
+    def __init__(self, alloc_values: list[int], heap_size: int = 100_000) -> None:
+        self._alloc_values = alloc_values
+        self._heap_size = heap_size
+        self.last_alloc = 0
+        self.collect_calls = 0
+
+    def mem_alloc(self) -> int:
+        self.last_alloc = self._alloc_values.pop(0)
+        return self.last_alloc
+
+    def mem_free(self) -> int:
+        return self._heap_size - self.last_alloc
+
+    def collect(self) -> None:
+        self.collect_calls += 1
+
+
+class AlwaysDue:
+    def is_due(self) -> bool:
+        return True
+
+
+class LeakySensor:
+    def __init__(self) -> None:
+        self.retained: list[bytes] = []
+
+    def read_distance_m(self) -> float:
+        self.retained.append(bytes(2048))
+        return 1.4
+
+
+def test_heap_profiler_records_net_allocation_per_stage() -> None:
+    heap = ScriptedHeap([1_000, 1_400, 1_400, 1_450, 1_450])
+    profiler = HeapProfiler(
+        mem_alloc=heap.mem_alloc,
+        mem_free=heap.mem_free,
+        collect=heap.collect,
+    )
+
+    alloc = profiler.mark()
+    alloc = profiler.record(STAGE_SENSOR, alloc)
+    profiler.record(STAGE_ENCODE, alloc)
+
+    assert heap.collect_calls == 1
+    assert profiler.stage_stats(STAGE_SENSOR) == (1, 400, 400, 0)
+    assert profiler.stage_stats(STAGE_ENCODE) == (1, 50, 50, 0)
+    assert profiler.mem_free_low_bytes == 98_550
+
+
+def test_heap_profiler_counts_stage_interrupted_by_collection() -> None:
+    heap = ScriptedHeap([5_000, 1_200, 1_200])
+    profiler = HeapProfiler(mem_alloc=heap.mem_alloc, mem_free=heap.mem_free)
+
+    profiler.record(STAGE_SENSOR, profiler.mark())
+
+    assert profiler.stage_stats(STAGE_SENSOR) == (0, 0, 0, 1)
+    assert "sensor n=0 mean=0 max=0 B gc=1" in str(profiler)
+
+
+def test_create_heap_profiler_uses_gc_module_functions() -> None:
+    heap = ScriptedHeap([10, 20, 20])
+
+    class FakeGc:
+        mem_alloc = staticmethod(heap.mem_alloc)
+        mem_free = staticmethod(heap.mem_free)
+        collect = staticmethod(heap.collect)
+
+    profiler = create_heap_profiler(gc_module=FakeGc)
+    profiler.record(STAGE_SENSOR, profiler.mark())
+
+    assert heap.collect_calls == 1
+    assert profiler.stage_stats(STAGE_SENSOR)[1] == 10
+
+
+def test_profile_host_heap_attributes_growth_to_leaking_stage(tmp_path: Path) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+
+    profiler = profile_host_heap(
+        iterations=5,
+        calibration_path=calibration_path,
+        scheduler=AlwaysDue(),
+        sensor=LeakySensor(),
+        radio=FakeRadioPort(),
+        sleeper=FakeSleepPort(),
+        sleep_seconds=1,
+    )
+
+    summary = profiler.summary()
+    assert summary["sensor"]["count"] == 5
+    assert summary["sensor"]["mean_bytes"] >= 2048
+    assert summary["encode"]["max_bytes"] < 512
+    assert profiler.mem_free_low_bytes is not None
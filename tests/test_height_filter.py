@@ -0,0 +1,124 @@
+import math
+
+import pytest
+
+from tidegauge.calibration import CalibrationConfig
+from tidegauge.height_filter import (
+    HampelFilter,
+    HeightFilter,
+    TidalKalmanFilter,
+    refilter_distances_m,
+)
+
+
+def test_hampel_filter_replaces_isolated_spike_with_window_median() -> None:
+    hampel = HampelFilter(window_size=5)
+
+    outputs = [hampel.filter_m(h) for h in [1.00, 1.01, 1.00, 1.02, 0.35, 1.01]]
+
+    assert outputs[:4] == pytest.approx([1.00, 1.01, 1.00, 1.02])
+    assert outputs[4] == pytest.approx(1.005)
+    assert outputs[5] == pytest.approx(1.01)
+    assert hampel.spike_count == 1
+
+
+def test_hampel_filter_accepts_sustained_step_change() -> None:
+    hampel = HampelFilter(window_size=5)
+    for _ in range(5):
+        hampel.filter_m(1.0)
+
+    outputs = [hampel.filter_m(1.5) for _ in range(4)]
+
+    assert outputs[-1] == pytest.approx(1.5)
+    assert hampel.spike_count < 4
+
+
+def test_hampel_filter_passes_noise_within_minimum_deviation() -> None:
+    hampel = HampelFilter(window_size=5, min_deviation_m=0.01)
+    for _ in range(5):
+        hampel.filter_m(1.0)
+
+    assert hampel.filter_m(1.02) == pytest.approx(1.02)
+    assert hampel.spike_count == 0
+
+
+def test_hampel_filter_rejects_too_small_window() -> None:
+    with pytest.raises(ValueError, match="window_size"):
+        HampelFilter(window_size=2)
+
+
+def test_kalman_filter_tracks_rising_tide_without_lag() -> None:
+    kalman = TidalKalmanFilter()
+    amplitude_m = 1.0
+    omega = 2 * math.pi / 44_712  # M2 period
+    estimate_m = 0.0
+    for step in range(150):
+        timestamp_s = step * 60
+        estimate_m = kalman.update(amplitude_m * math.sin(omega * timestamp_s), timestamp_s)
+
+    assert estimate_m == pytest.approx(amplitude_m * math.sin(omega * 149 * 60), abs=0.001)
+    assert kalman.rate_m_per_s == pytest.approx(
+        amplitude_m * omega * math.cos(omega * 149 * 60),
+        abs=5e-6,
+    )
+
+
+def test_kalman_filter_smooths_measurement_noise() -> None:
+    kalman = TidalKalmanFilter()
+    errors = []
+    for step in range(100):
+        noise_m = 0.005 if step % 2 else -0.005
+        estimate_m = kalman.update(2.0 + noise_m, step * 60)
+        if step > 20:
+            errors.append(abs(estimate_m - 2.0))
+
+    assert max(errors) < 0.003
+
+
+def test_kalman_filter_restarts_after_long_gap() -> None:
+    kalman = TidalKalmanFilter(reset_after_s=3600)
+    kalman.update(1.0, 0)
+    kalman.update(1.0, 60)
+
+    assert kalman.update(2.0, 60 + 7200) == pytest.approx(2.0)
+    assert kalman.rate_m_per_s == 0.0
+
+
+def test_height_filter_chains_spike_rejection_into_kalman() -> None:
+    now = [0]
+    height_filter = HeightFilter(now_s=lambda: now[0])
+    outputs = []
+    for height_m in [1.0, 1.0, 1.0, 1.0, 3.0, 1.0]:
+        outputs.append(height_filter.filter_m(height_m))
+        now[0] += 60
+
+    assert height_filter.hampel.spike_count == 1
+    assert max(outputs) == pytest.approx(1.0)
+
+
+def test_refilter_distances_m_matches_streaming_filter() -> None:
+    config = CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2)
+    distances_m = [1.40, 1.41, 1.40, 1.39, 0.30, 1.40, 1.41]
+    timestamps_s = [60 * index for index in range(len(distances_m))]
+
+    now = [0]
+    streaming = HeightFilter(now_s=lambda: now[0])
+    expected = []
+    for distance_m, timestamp_s in zip(distances_m, timestamps_s):
+        now[0] = timestamp_s
+        expected.append(streaming.filter_m(2.5 - distance_m - 0.2))
+
+    assert refilter_distances_m(
+        distances_m=distances_m,
+        timestamps_s=timestamps_s,
+        config=config,
+    ) == pytest.approx(expected)
+
+
+def test_refilter_distances_m_rejects_mismatched_lengths() -> None:
+    with pytest.raises(ValueError, match="same length"):
+        refilter_distances_m(
+            distances_m=[1.0, 1.1],
+            timestamps_s=[0],
+            config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+        )
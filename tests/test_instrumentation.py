@@ -0,0 +1,83 @@
+from tidegauge.adapters.timebase import TICKS_MAX, ticks_diff
+from tidegauge.instrumentation import (
+    HISTOGRAM_BUCKETS,
+    STAGE_SEND,
+    STAGE_SENSOR,
+    StageTimer,
+    histogram_bucket,
+)
+from tidegauge.payload import decode_diagnostic_payload
+
+
+class ScriptedTicks:
+    def __init__(self, ticks: list[int]) -> None:
+        self._ticks = ticks
+
+    def __call__(self) -> int:
+        return self._ticks.pop(0)
+
+
+def test_histogram_bucket_uses_powers_of_four() -> None:
+    assert histogram_bucket(0) == 0
+    assert histogram_bucket(1) == 1
+    assert histogram_bucket(3) == 1
+    assert histogram_bucket(4) == 2
+    assert histogram_bucket(1023) == 5
+    assert histogram_bucket(1024) == 6
+    assert histogram_bucket(10**9) == HISTOGRAM_BUCKETS - 1
+
+
+def test_stage_timer_accumulates_min_mean_max_and_histogram() -> None:
+    timer = StageTimer(ticks_us=ScriptedTicks([]), ticks_diff=ticks_diff)
+
+    for duration_us in [1200, 800, 1000]:
+        timer.record_us(STAGE_SENSOR, duration_us)
+
+    assert timer.stage_stats(STAGE_SENSOR) == (3, 800, 1000, 1200)
+    assert timer.histogram(STAGE_SENSOR)[5:7] == [2, 1]
+    assert timer.stage_stats(STAGE_SEND) == (0, 0, 0, 0)
+
+
+def test_stage_timer_record_chains_stages_across_tick_wraparound() -> None:
+    timer = StageTimer(
+        ticks_us=ScriptedTicks([TICKS_MAX - 99, 400, 2400]),
+        ticks_diff=ticks_diff,
+    )
+
+    ticks = timer.mark()
+    ticks = timer.record(STAGE_SENSOR, ticks)
+    timer.record(STAGE_SEND, ticks)
+
+    assert timer.stage_stats(STAGE_SENSOR) == (1, 500, 500, 500)
+    assert timer.stage_stats(STAGE_SEND) == (1, 2000, 2000, 2000)
+
+
+def test_stage_timer_signals_flush_every_n_cycles_and_resets() -> None:
+    timer = StageTimer(ticks_us=ScriptedTicks([]), ticks_diff=ticks_diff, flush_every_cycles=2)
+    timer.record_us(STAGE_SENSOR, 900)
+
+    assert [timer.end_cycle() for _ in range(4)] == [False, True, False, True]
+
+    timer.reset()
+    assert timer.stage_stats(STAGE_SENSOR) == (0, 0, 0, 0)
+    assert sum(timer.histogram(STAGE_SENSOR)) == 0
+
+
+def test_stage_timer_never_flushes_when_interval_is_zero() -> None:
+    timer = StageTimer(ticks_us=ScriptedTicks([]), ticks_diff=ticks_diff)
+
+    assert not any(timer.end_cycle() for _ in range(10))
+
+
+def test_stage_timer_encodes_diagnostic_frame_and_summary() -> None:
+    timer = StageTimer(ticks_us=ScriptedTicks([]), ticks_diff=ticks_diff)
+    timer.record_us(STAGE_SENSOR, 25_000)
+    timer.record_us(STAGE_SEND, 9_000_000)
+
+    stages = decode_diagnostic_payload(timer.encode_payload())
+
+    assert len(stages) == 5
+    assert stages[STAGE_SENSOR] == (1, 25_000, 25_000, 25_000)
+    assert stages[STAGE_SEND] == (1, 6_553_500, 6_553_500, 6_553_500)
+    assert timer.summary()["sensor"]["mean_us"] == 25_000
+    assert "sensor n=1 min=25000" in str(timer)
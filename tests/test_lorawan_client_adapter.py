@@ -48,3 +48,124 @@ def test_lorawan_client_adapter_passes_through_send_failures() -> None:
     sent = client.send(b"\x01")
 
     assert sent is False
+
+
+class FakeSession:
+    def __init__(self, fcnt_up: int) -> None:
+        self.fcnt_up = fcnt_up
+
+
+class FakeSessionDriver(FakeLoRaWanDriver):
+    def __init__(self, *, accept_resume: bool = True) -> None:
+        super().__init__()
+        self.accept_resume = accept_resume
+        self.resumed: list[FakeSession] = []
+        self.frame_counter = 0
+
+    def send(self, payload: bytes) -> bool:
+        self.frame_counter += 1
+        return super().send(payload)
+
+    def session(self) -> FakeSession:
+        return FakeSession(self.frame_counter)
+
+    def resume(self, session: FakeSession) -> bool:
+        self.resumed.append(session)
+        if self.accept_resume:
+            self.frame_counter = session.fcnt_up
+        return self.accept_resume
+
+
+class FakeSessionStore:
+    def __init__(self, saved: FakeSession | None) -> None:
+        self.saved = saved
+        self.uplinks: list[int] = []
+        self.downlinks: list[int] = []
+
+    def load(self) -> FakeSession | None:
+        return self.saved
+
+    def save(self, session: FakeSession) -> None:
+        self.saved = session
+
+    def record_uplink(self, fcnt_up: int) -> None:
+        self.uplinks.append(fcnt_up)
+
+    def record_downlink(self, fcnt_down: int) -> None:
+        self.downlinks.append(fcnt_down)
+
+
+def test_lorawan_client_adapter_resumes_saved_session_without_joining() -> None:
+    driver = FakeSessionDriver()
+    store = FakeSessionStore(FakeSession(48))
+    client = LoRaWanClientAdapter(driver=driver, session_store=store)
+
+    assert client.send(b"\x01") is True
+    assert driver.join_calls == 0
+    assert store.uplinks == [49]
+
+
+def test_lorawan_client_adapter_joins_and_saves_when_session_is_rejected() -> None:
+    driver = FakeSessionDriver(accept_resume=False)
+    store = FakeSessionStore(FakeSession(48))
+    client = LoRaWanClientAdapter(driver=driver, session_store=store)
+
+    client.send(b"\x01")
+
+    assert driver.join_calls == 1
+    assert store.saved.fcnt_up == 0
+    assert store.uplinks == [1]
+
+
+def test_lorawan_client_adapter_stops_persisting_when_driver_has_no_session() -> None:
+    driver = FakeSessionDriver()
+    driver.session = lambda: None
+    store = FakeSessionStore(None)
+    client = LoRaWanClientAdapter(driver=driver, session_store=store)
+
+    client.send(b"\x01")
+    client.send(b"\x02")
+
+    assert driver.join_calls == 1
+    assert store.saved is None
+    assert store.uplinks == []
+
+
+def test_lorawan_client_adapter_receive_forwards_to_driver_when_supported() -> None:
+    class ReceivingDriver(FakeLoRaWanDriver):
+        def receive(self) -> tuple[int, bytes] | None:
+            return 10, b"\x07\x02\x03"
+
+    assert LoRaWanClientAdapter(driver=FakeLoRaWanDriver()).receive() is None
+    assert LoRaWanClientAdapter(driver=ReceivingDriver()).receive() == (10, b"\x07\x02\x03")
+
+
+def test_lorawan_client_adapter_saves_downlink_counter_after_each_downlink() -> None:
+    class ReceivingSessionDriver(FakeSessionDriver):
+        def __init__(self) -> None:
+            super().__init__()
+            self.frame_counter_down = 0
+            self.downlinks: list[tuple[int, bytes] | None] = [(10, b"\x07\x02\x03"), None]
+
+        def receive(self) -> tuple[int, bytes] | None:
+            downlink = self.downlinks.pop(0)
+            if downlink is not None:
+                self.frame_counter_down += 1
+            return downlink
+
+    driver = ReceivingSessionDriver()
+    store = FakeSessionStore(FakeSession(48))
+    client = LoRaWanClientAdapter(driver=driver, session_store=store)
+
+    assert client.receive() == (10, b"\x07\x02\x03")
+    assert client.receive() is None
+    assert store.downlinks == [1]
+
+
+def test_lorawan_client_adapter_forwards_uplink_limits_query() -> None:
+    class RateAwareDriver(FakeLoRaWanDriver):
+        def uplink_limits(self) -> tuple[int, int]:
+            return 0, 11
+
+    assert LoRaWanClientAdapter(driver=FakeLoRaWanDriver()).uplink_limits() is None
+    assert LoRaWanClientAdapter(driver=RateAwareDriver()).uplink_limits() == (0, 11)
@@ -0,0 +1,26 @@
+import pytest
+
+from tidegauge.lorawan_region import TINYLORA_DATA_RATE, modulation, uplink_limits
+
+
+def test_uplink_limits_follow_us915_data_rates() -> None:
+    assert [uplink_limits(data_rate)[1] for data_rate in range(5)] == [11, 53, 125, 242, 242]
+    assert uplink_limits(TINYLORA_DATA_RATE) == (3, 242)
+    assert uplink_limits(0) is uplink_limits(0)
+
+
+def test_uplink_limits_reject_unknown_data_rate() -> None:
+    with pytest.raises(ValueError, match="data rate"):
+        uplink_limits(5)
+
+
+def test_modulation_follows_us915_data_rates() -> None:
+    assert [modulation(data_rate) for data_rate in range(5)] == [
+        (10, 125_000),
+        (9, 125_000),
+        (8, 125_000),
+        (7, 125_000),
+        (8, 500_000),
+    ]
+    with pytest.raises(ValueError, match="data rate"):
+        modulation(5)
@@ -0,0 +1,152 @@
+import pytest
+
+from tidegauge.health import increment_boot_count
+from tidegauge.lorawan_session import (
+    SESSION_NVM_OFFSET,
+    SESSION_RECORD_LENGTH,
+    LoRaWanSession,
+    SessionStore,
+    session_from_abp_credentials,
+)
+from tidegauge.ttn_credentials import TtnCredentials
+
+DEV_ADDR = bytes.fromhex("26011BEE")
+NWK_SKEY = bytes.fromhex("00112233445566778899AABBCCDDEEFF")
+APP_SKEY = bytes.fromhex("FFEEDDCCBBAA99887766554433221100")
+
+
+def _session(*, fcnt_up: int = 0, fcnt_down: int = 0) -> LoRaWanSession:
+    return LoRaWanSession(
+        dev_addr=DEV_ADDR,
+        nwk_skey=NWK_SKEY,
+        app_skey=APP_SKEY,
+        fcnt_up=fcnt_up,
+        fcnt_down=fcnt_down,
+    )
+
+
+class CountingNvm(bytearray):
+    def __init__(self, length: int) -> None:
+        super().__init__([0xFF] * length)
+        self.writes = 0
+
+    def __setitem__(self, index: object, value: object) -> None:
+        self.writes += 1
+        super().__setitem__(index, value)
+
+
+def test_session_store_returns_none_for_blank_nvm() -> None:
+    store = SessionStore(nvm=bytearray([0xFF] * 256))
+
+    assert store.load() is None
+    assert store.session is None
+
+
+def test_session_store_restores_keys_and_adds_safety_increment() -> None:
+    nvm = bytearray([0xFF] * 256)
+    SessionStore(nvm=nvm, persist_every_frames=8).save(_session(fcnt_up=40, fcnt_down=3))
+
+    restored = SessionStore(nvm=nvm, persist_every_frames=8).load()
+
+    assert restored is not None
+    assert restored.same_keys(_session())
+    assert restored.fcnt_up == 48
+    assert restored.fcnt_down == 3
+
+
+def test_session_store_keeps_advancing_across_repeated_reboots() -> None:
+    nvm = bytearray([0xFF] * 256)
+    SessionStore(nvm=nvm, persist_every_frames=4).save(_session(fcnt_up=10))
+
+    counters = [SessionStore(nvm=nvm, persist_every_frames=4).load().fcnt_up for _ in range(3)]
+
+    assert counters == [14, 18, 22]
+
+
+def test_session_store_writes_uplink_counter_every_n_frames() -> None:
+    nvm = CountingNvm(256)
+    store = SessionStore(nvm=nvm, persist_every_frames=16)
+    store.save(_session())
+
+    for fcnt_up in range(1, 40):
+        store.record_uplink(fcnt_up)
+
+    assert nvm.writes == 3
+    assert store.session.fcnt_up == 39
+    assert SessionStore(nvm=nvm, persist_every_frames=16).load().fcnt_up == 48
+
+
+def test_session_store_saves_newer_downlink_counter_immediately() -> None:
+    nvm = bytearray([0xFF] * 256)
+    store = SessionStore(nvm=nvm)
+    store.save(_session(fcnt_down=5))
+
+    store.record_downlink(5)
+    store.record_downlink(6)
+
+    assert store.write_count == 2
+    assert SessionStore(nvm=nvm).load().fcnt_down == 6
+
+
+def test_session_store_falls_back_to_previous_slot_after_torn_write() -> None:
+    nvm = bytearray([0xFF] * 256)
+    store = SessionStore(nvm=nvm, persist_every_frames=4)
+    store.save(_session(fcnt_up=4))
+    store.save(_session(fcnt_up=8))
+    # Corrupt the newest record (slot 1) as a reset mid-write would.
+    nvm[SESSION_NVM_OFFSET + SESSION_RECORD_LENGTH + 43] ^= 0xFF
+
+    restored = SessionStore(nvm=nvm, persist_every_frames=4).load()
+
+    assert restored.fcnt_up == 8
+
+
+def test_session_store_alternates_slots_and_leaves_boot_counter_alone() -> None:
+    nvm = bytearray([0xFF] * 256)
+    assert increment_boot_count(nvm) == 1
+    store = SessionStore(nvm=nvm)
+
+    store.save(_session(fcnt_up=1))
+    slot_a = bytes(nvm[SESSION_NVM_OFFSET:SESSION_NVM_OFFSET + SESSION_RECORD_LENGTH])
+    store.save(_session(fcnt_up=2))
+
+    assert bytes(nvm[SESSION_NVM_OFFSET:SESSION_NVM_OFFSET + SESSION_RECORD_LENGTH]) == slot_a
+    assert increment_boot_count(nvm) == 2
+
+
+def test_session_store_clear_forgets_session() -> None:
+    nvm = bytearray([0xFF] * 256)
+    store = SessionStore(nvm=nvm)
+    store.save(_session(fcnt_up=3))
+
+    store.clear()
+
+    assert SessionStore(nvm=nvm).load() is None
+
+
+def test_session_from_abp_credentials_decodes_hex_and_skips_otaa() -> None:
+    abp = TtnCredentials(
+        dev_addr="26011BEE",
+        nwk_skey="00112233445566778899AABBCCDDEEFF",
+        app_skey="FFEEDDCCBBAA99887766554433221100",
+    )
+    otaa = TtnCredentials(
+        dev_eui="0011223344556677",
+        app_eui="8899AABBCCDDEEFF",
+        app_key="00112233445566778899AABBCCDDEEFF",
+    )
+
+    session = session_from_abp_credentials(abp)
+
+    assert session.same_keys(_session())
+    assert session.fcnt_up == 0
+    assert session_from_abp_credentials(otaa) is None
+
+
+def test_lorawan_session_and_store_reject_invalid_values() -> None:
+    with pytest.raises(ValueError, match="dev_addr"):
+        LoRaWanSession(dev_addr=b"\x01", nwk_skey=NWK_SKEY, app_skey=APP_SKEY)
+    with pytest.raises(ValueError, match="session keys"):
+        LoRaWanSession(dev_addr=DEV_ADDR, nwk_skey=b"\x00", app_skey=APP_SKEY)
+    with pytest.raises(ValueError, match="persist_every_frames"):
+        SessionStore(nvm=bytearray(256), persist_every_frames=0)
@@ -34,3 +34,68 @@ def test_run_main_passes_config_and_returns_sent_count() -> None:
     assert config.measurement_interval_s == 60
     assert config.max_send_attempts == 3
     assert run_device_loop.calls[0]["calibration_path"] == "/tmp/calibration.json"
+    assert run_device_loop.calls[0]["log_fn"] is None
+
+
+def test_run_main_passes_alarm_module_and_deep_sleep_setting() -> None:
+    run_device_loop = FakeRunDeviceLoop()
+    alarm = object()
+
+    run_main(
+        machine_module=object(),
+        time_module=object(),
+        lora_client=object(),
+        trigger_pin_id=6,
+        echo_pin_id=7,
+        calibration_path="/tmp/calibration.json",
+        run_device_loop_fn=run_device_loop,
+        alarm_module=alarm,
+        deep_sleep=True,
+    )
+
+    assert run_device_loop.calls[0]["alarm_module"] is alarm
+    assert run_device_loop.calls[0]["hardware_config"].deep_sleep is True
+
+
+def test_run_main_passes_pulseio_and_board_modules() -> None:
+    run_device_loop = FakeRunDeviceLoop()
+    pulseio = object()
+    board = object()
+
+    run_main(
+        machine_module=object(),
+        time_module=object(),
+        lora_client=object(),
+        trigger_pin_id=6,
+        echo_pin_id=7,
+        calibration_path="/tmp/calibration.json",
+        run_device_loop_fn=run_device_loop,
+        pulseio_module=pulseio,
+        board_module=board,
+    )
+
+    assert run_device_loop.calls[0]["pulseio_module"] is pulseio
+    assert run_device_loop.calls[0]["board_module"] is board
+
+
+def test_run_main_passes_health_inputs() -> None:
+    run_device_loop = FakeRunDeviceLoop()
+    battery_monitor = object()
+    nvm = bytearray(16)
+
+    run_main(
+        machine_module=object(),
+        time_module=object(),
+        lora_client=object(),
+        trigger_pin_id=6,
+        echo_pin_id=7,
+        calibration_path="/tmp/calibration.json",
+        run_device_loop_fn=run_device_loop,
+        battery_monitor=battery_monitor,
+        nvm=nvm,
+        health_report_cycles=30,
+    )
+
+    assert run_device_loop.calls[0]["battery_monitor"] is battery_monitor
+    assert run_device_loop.calls[0]["nvm"] is nvm
+    assert run_device_loop.calls[0]["hardware_config"].health_report_cycles == 30
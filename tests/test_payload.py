@@ -1,6 +1,30 @@
 import pytest
 
-from tidegauge.payload import encode_tide_height_payload
+from tidegauge.payload import (
+    COMMAND_ACK_LENGTH,
+    FRAME_TYPE_BACKLOG,
+    FRAME_TYPE_BATCH,
+    FRAME_TYPE_COMMAND_ACK,
+    FRAME_TYPE_DIAGNOSTIC,
+    FRAME_TYPE_HEALTH,
+    FRAME_TYPE_HISTORY,
+    decode_backlog_payload,
+    decode_command_ack_payload,
+    decode_diagnostic_payload,
+    decode_health_payload,
+    decode_history_payload,
+    decode_tide_height_batch_payload,
+    decode_tide_height_payload,
+    encode_backlog_payload,
+    encode_command_ack_payload,
+    encode_diagnostic_payload,
+    encode_health_payload,
+    encode_history_payload_into,
+    encode_tide_height_batch_payload,
+    encode_tide_height_batch_payload_into,
+    encode_tide_height_payload,
+    encode_tide_height_payload_into,
+)
 
 
 def test_encode_tide_height_payload_encodes_signed_millimeters_big_endian() -> None:
@@ -16,3 +40,219 @@ def test_encode_tide_height_payload_supports_negative_heights() -> None:
 def test_encode_tide_height_payload_rejects_out_of_range_values() -> None:
     with pytest.raises(ValueError, match="tide_height_m out of encodable range"):
         encode_tide_height_payload(tide_height_m=100.0)
+
+
+def test_encode_tide_height_payload_into_writes_at_offset() -> None:
+    buffer = bytearray(b"\xee" * 4)
+
+    length = encode_tide_height_payload_into(buffer, 1, tide_height_m=-0.6)
+
+    assert length == 2
+    assert buffer == bytearray([0xEE, 0xFD, 0xA8, 0xEE])
+
+
+def test_encode_tide_height_batch_payload_into_uses_first_count_heights() -> None:
+    buffer = bytearray(16)
+
+    length = encode_tide_height_batch_payload_into(
+        buffer,
+        2,
+        sequence=3,
+        interval_s=60,
+        age_s=0,
+        heights_mm=[900, 905, 899, 1234],
+        count=3,
+    )
+
+    assert length == 11
+    assert bytes(buffer[2:13]) == encode_tide_height_batch_payload(
+        sequence=3,
+        interval_s=60,
+        age_s=0,
+        heights_mm=[900, 905, 899],
+    )
+
+
+def test_encode_tide_height_batch_payload_packs_base_and_int8_deltas() -> None:
+    payload = encode_tide_height_batch_payload(
+        sequence=3,
+        interval_s=60,
+        age_s=0,
+        heights_mm=[900, 905, 899],
+    )
+
+    assert payload == bytes(
+        [FRAME_TYPE_BATCH, 3, 3, 0x00, 0x3C, 0x00, 0x00, 0x03, 0x84, 0x05, 0xFA]
+    )
+
+
+def test_decode_tide_height_batch_payload_round_trips_with_timestamps() -> None:
+    payload = encode_tide_height_batch_payload(
+        sequence=0,
+        interval_s=60,
+        age_s=10,
+        heights_mm=[-600, -500, -600],
+    )
+
+    samples = decode_tide_height_batch_payload(payload, received_at_s=1_000)
+
+    assert samples == [(870, -600), (930, -500), (990, -600)]
+
+
+def test_encode_tide_height_batch_payload_rejects_delta_outside_int8() -> None:
+    with pytest.raises(ValueError, match="batch delta out of int8 range"):
+        encode_tide_height_batch_payload(
+            sequence=0,
+            interval_s=60,
+            age_s=0,
+            heights_mm=[0, 200],
+        )
+
+
+def test_decode_tide_height_batch_payload_rejects_truncated_frame() -> None:
+    payload = encode_tide_height_batch_payload(
+        sequence=0,
+        interval_s=60,
+        age_s=0,
+        heights_mm=[1, 2, 3],
+    )
+
+    with pytest.raises(ValueError, match="does not match reading count"):
+        decode_tide_height_batch_payload(payload[:-1], received_at_s=0)
+
+
+def test_decode_tide_height_payload_reads_signed_millimeters() -> None:
+    assert decode_tide_height_payload(bytes([0xFD, 0xA8])) == -600
+
+
+def test_encode_backlog_payload_round_trips_timestamped_readings() -> None:
+    payload = encode_backlog_payload(now_s=5_000, records=[(1_400, 900), (4_940, -12)])
+
+    assert payload[:2] == bytes([FRAME_TYPE_BACKLOG, 2])
+    assert len(payload) == 14
+    assert decode_backlog_payload(payload, received_at_s=5_000) == [
+        (1_400, 900),
+        (4_940, -12),
+    ]
+
+
+def test_encode_backlog_payload_clamps_future_timestamps_to_zero_age() -> None:
+    payload = encode_backlog_payload(now_s=10, records=[(50, 1)])
+
+    assert decode_backlog_payload(payload, received_at_s=10) == [(10, 1)]
+
+
+def test_diagnostic_payload_round_trips_in_100_us_units() -> None:
+    payload = encode_diagnostic_payload(stages=[(3, 840, 1_020, 1_260), (0, 0, 0, 0)])
+
+    assert payload[0] == FRAME_TYPE_DIAGNOSTIC
+    assert len(payload) == 18
+    assert decode_diagnostic_payload(payload) == [(3, 800, 1_000, 1_300), (0, 0, 0, 0)]
+
+
+def test_diagnostic_payload_rejects_empty_stage_list() -> None:
+    with pytest.raises(ValueError, match="1-255 stages"):
+        encode_diagnostic_payload(stages=[])
+
+
+def test_health_payload_saturates_counters_and_round_trips() -> None:
+    payload = encode_health_payload(
+        counters=[70_000, 1, 2, 3, 4, 5, 6],
+        mem_free_low_bytes=123_456,
+        worst_cycle_ms=1_200,
+        battery_mv=3_950,
+        burst_valid_low=3,
+        burst_sample_count=5,
+    )
+
+    assert payload[0] == FRAME_TYPE_HEALTH
+    assert len(payload) == 25
+    report = decode_health_payload(payload)
+    assert report["sends"] == 0xFFFF
+    assert report["reboots"] == 6
+    assert report["mem_free_low_bytes"] == 123_456
+    assert report["battery_mv"] == 3_950
+    assert report["burst_valid_low"] == 3
+    assert report["burst_sample_count"] == 5
+
+
+def test_health_payload_requires_every_counter() -> None:
+    with pytest.raises(ValueError, match="counter field"):
+        encode_health_payload(
+            counters=[1, 2],
+            mem_free_low_bytes=None,
+            worst_cycle_ms=0,
+            battery_mv=None,
+        )
+
+
+def test_command_ack_payload_round_trips_settings() -> None:
+    payload = encode_command_ack_payload(
+        sequence=258,
+        status=4,
+        interval_s=900,
+        max_send_attempts=3,
+        modes=0x03,
+        datum_offset_mm=-125,
+    )
+
+    assert len(payload) == COMMAND_ACK_LENGTH
+    assert payload[0] == FRAME_TYPE_COMMAND_ACK
+    assert decode_command_ack_payload(payload) == {
+        "sequence": 2,
+        "status": 4,
+        "interval_s": 900,
+        "max_send_attempts": 3,
+        "modes": 0x03,
+        "datum_offset_mm": -125,
+    }
+
+
+def test_command_ack_payload_marks_unknown_datum() -> None:
+    payload = encode_command_ack_payload(
+        sequence=1,
+        status=0,
+        interval_s=60,
+        max_send_attempts=1,
+        modes=0,
+        datum_offset_mm=None,
+    )
+
+    assert decode_command_ack_payload(payload)["datum_offset_mm"] is None
+    with pytest.raises(ValueError, match="command ack"):
+        decode_command_ack_payload(payload[:-1])
+
+
+def test_history_payload_round_trips_readings_oldest_first() -> None:
+    buffer = bytearray(32)
+
+    length = encode_history_payload_into(
+        buffer,
+        0,
+        epoch=7,
+        sequence=0x1234,
+        interval_s=60,
+        heights_mm=[-1200, -1180, -1181, 0],
+        count=3,
+    )
+
+    payload = bytes(buffer[:length])
+    assert payload[0] == FRAME_TYPE_HISTORY
+    assert length == 8 + 2 + 1 + 1
+    assert decode_history_payload(payload) == (7, 0x1234, 60, [-1200, -1180, -1181])
+
+
+def test_history_payload_rejects_count_mismatch() -> None:
+    buffer = bytearray(16)
+    length = encode_history_payload_into(
+        buffer,
+        0,
+        epoch=1,
+        sequence=1,
+        interval_s=60,
+        heights_mm=[5, 6],
+    )
+    buffer[7] = 3
+
+    with pytest.raises(ValueError, match="reading count"):
+        decode_history_payload(bytes(buffer[:length]))
@@ -33,3 +33,7 @@ def test_fake_radio_port_captures_sent_payloads() -> None:
     send_payload(radio, b"\xAA\xBB")
 
     assert radio.sent_payloads == [b"\x01\x02", b"\xAA\xBB"]
+    assert radio.uplink_limits() is None
+    radio.limits = (0, 11)
+    assert radio.uplink_limits() == (0, 11)
+
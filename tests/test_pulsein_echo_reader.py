@@ -0,0 +1,151 @@
+import pytest
+
+from tidegauge.adapters.hcsr04 import (
+    REJECT_TOO_NEAR,
+    EchoRangeGate,
+    UltrasonicGateError,
+    UltrasonicTimeoutError,
+)
+from tidegauge.adapters.pulsein import (
+    PULSEIN_OVERFLOW_US,
+    PulseInEchoReader,
+    create_pulsein_echo_reader,
+)
+
+
+class FakeTimeModule:
+    def __init__(self) -> None:
+        self._now_us = 0
+        self.sleep_calls_us: list[int] = []
+
+    def sleep_us(self, delay_us: int) -> None:
+        self.sleep_calls_us.append(delay_us)
+        self._now_us += delay_us
+
+    def ticks_us(self) -> int:
+        self._now_us += 1_000
+        return self._now_us
+
+    def ticks_diff(self, current: int, start: int) -> int:
+        return current - start
+
+
+class FakeTriggerPin:
+    def __init__(self) -> None:
+        self.writes: list[int] = []
+
+    def value(self, new_value: int | None = None) -> int:
+        if new_value is not None:
+            self.writes.append(new_value)
+        return self.writes[-1] if self.writes else 0
+
+
+class FakePulseIn:
+    """Deliver the next captured width after ``polls_until_ready`` length checks."""
+
+    def __init__(self, widths_us: list[int], polls_until_ready: int = 2) -> None:
+        self._widths_us = widths_us
+        self._polls_until_ready = polls_until_ready
+        self._captured: list[int] = []
+        self._polls = 0
+        self.events: list[str] = []
+
+    def __len__(self) -> int:
+        self._polls += 1
+        if self._polls >= self._polls_until_ready and self._widths_us and not self._captured:
+            self._captured.append(self._widths_us.pop(0))
+        return len(self._captured)
+
+    def popleft(self) -> int:
+        return self._captured.pop(0)
+
+    def clear(self) -> None:
+        self.events.append("clear")
+        self._captured = []
+        self._polls = 0
+
+    def pause(self) -> None:
+        self.events.append("pause")
+
+    def resume(self) -> None:
+        self.events.append("resume")
+
+
+def test_pulsein_echo_reader_returns_hardware_timed_width() -> None:
+    trigger = FakeTriggerPin()
+    pulse_in = FakePulseIn([5_831])
+    reader = PulseInEchoReader(
+        trigger_pin=trigger,
+        pulse_in=pulse_in,
+        time_module=FakeTimeModule(),
+    )
+
+    assert reader.read_echo_duration_us() == 5_831
+    assert trigger.writes == [0, 1, 0]
+    assert pulse_in.events == ["pause", "clear", "resume", "pause"]
+
+
+def test_pulsein_echo_reader_times_out_when_no_pulse_arrives() -> None:
+    pulse_in = FakePulseIn([])
+    reader = PulseInEchoReader(
+        trigger_pin=FakeTriggerPin(),
+        pulse_in=pulse_in,
+        time_module=FakeTimeModule(),
+        timeout_us=5_000,
+    )
+
+    with pytest.raises(UltrasonicTimeoutError, match="echo pulse"):
+        reader.read_echo_duration_us()
+    assert pulse_in.events[-1] == "pause"
+
+
+@pytest.mark.parametrize("width_us", [PULSEIN_OVERFLOW_US, 31_000])
+def test_pulsein_echo_reader_rejects_overlong_pulses(width_us: int) -> None:
+    reader = PulseInEchoReader(
+        trigger_pin=FakeTriggerPin(),
+        pulse_in=FakePulseIn([width_us]),
+        time_module=FakeTimeModule(),
+    )
+
+    with pytest.raises(UltrasonicTimeoutError, match="echo end"):
+        reader.read_echo_duration_us()
+
+
+def test_create_pulsein_echo_reader_claims_echo_board_pin() -> None:
+    created: list[tuple[object, int, bool]] = []
+
+    class FakePulseioModule:
+        @staticmethod
+        def PulseIn(pin: object, *, maxlen: int, idle_state: bool) -> FakePulseIn:
+            created.append((pin, maxlen, idle_state))
+            return FakePulseIn([1_000])
+
+    class FakeBoardModule:
+        D5 = "board.D5"
+
+    reader = create_pulsein_echo_reader(
+        pulseio_module=FakePulseioModule,
+        board_module=FakeBoardModule,
+        echo_pin_id=5,
+        trigger_pin=FakeTriggerPin(),
+        time_module=FakeTimeModule(),
+    )
+
+    assert created == [("board.D5", 2, False)]
+    assert reader.read_echo_duration_us() == 1_000
+
+
+def test_pulsein_echo_reader_applies_range_gate() -> None:
+    reader = PulseInEchoReader(
+        trigger_pin=FakeTriggerPin(),
+        pulse_in=FakePulseIn([300, 12_000, 5_831]),
+        time_module=FakeTimeModule(),
+        range_gate=EchoRangeGate(min_distance_m=0.1, max_distance_m=1.75),
+    )
+
+    with pytest.raises(UltrasonicGateError, match="nearer"):
+        reader.read_echo_duration_us()
+    with pytest.raises(UltrasonicGateError, match="beyond"):
+        reader.read_echo_duration_us()
+    assert reader.read_echo_duration_us() == 5_831
+    assert reader.reject_counts[REJECT_TOO_NEAR] == 1
@@ -43,3 +43,24 @@ def test_rfm95_radio_adapter_wraps_client_exceptions() -> None:
 
     with pytest.raises(RadioSendError, match="radio failure"):
         adapter.send(b"\xAA")
+
+
+def test_rfm95_radio_adapter_passes_memoryview_slice_without_copying() -> None:
+    client = FakeLoRaClient()
+    adapter = Rfm95RadioAdapter(client=client)
+    buffer = bytearray(b"\x01\x02\x03")
+    view = memoryview(buffer)[:2]
+
+    adapter.send(view)
+
+    assert client.sent_payloads[0] is view
+    assert bytes(client.sent_payloads[0]) == b"\x01\x02"
+
+
+def test_rfm95_radio_adapter_reports_client_uplink_limits_when_available() -> None:
+    class RateAwareClient(FakeLoRaClient):
+        def uplink_limits(self) -> tuple[int, int]:
+            return 1, 53
+
+    assert Rfm95RadioAdapter(client=FakeLoRaClient()).uplink_limits() is None
+    assert Rfm95RadioAdapter(client=RateAwareClient()).uplink_limits() == (1, 53)
@@ -0,0 +1,177 @@
+import pytest
+
+from tidegauge.payload import decode_history_payload
+from tidegauge.redundancy import (
+    HistoryReassembler,
+    RedundantHistoryEncoder,
+    history_frame_max_length,
+)
+
+
+def _frames(
+    heights_m: list[float],
+    *,
+    depth: int,
+    interval_s: int = 60,
+    epoch: int = 0,
+) -> list[bytes]:
+    times = iter(range(0, interval_s * len(heights_m), interval_s))
+    encoder = RedundantHistoryEncoder(now_s=lambda: next(times), depth=depth, epoch=epoch)
+    return [bytes(encoder.add_reading_m(height_m)) for height_m in heights_m]
+
+
+def test_encoder_repeats_the_previous_depth_readings_in_every_frame() -> None:
+    frames = _frames([0.9, 0.91, 0.93, 0.92], depth=2)
+
+    assert [decode_history_payload(frame) for frame in frames] == [
+        (0, 0, 0, [900]),
+        (0, 1, 60, [900, 910]),
+        (0, 2, 60, [900, 910, 930]),
+        (0, 3, 60, [910, 930, 920]),
+    ]
+    assert len(frames[3]) == 8 + 2 + 1 + 1
+    assert len(frames[3]) <= history_frame_max_length(2)
+
+
+def test_encoder_frame_fits_worst_case_length() -> None:
+    frames = _frames([-32.768, 32.767, -32.768], depth=2)
+
+    assert len(frames[-1]) == history_frame_max_length(2)
+
+
+def test_encoder_drops_oldest_copies_to_fit_max_payload() -> None:
+    times = iter(range(0, 600, 60))
+    encoder = RedundantHistoryEncoder(now_s=lambda: next(times), depth=4)
+    for height_m in (1.0, 1.001, 1.002, 1.003):
+        encoder.add_reading_m(height_m)
+
+    encoder.set_max_payload_length(11)
+    frame = bytes(encoder.add_reading_m(1.004))
+
+    assert len(frame) <= 11
+    assert decode_history_payload(frame) == (0, 4, 60, [1003, 1004])
+
+
+def test_encoder_frames_are_views_valid_until_the_next_reading() -> None:
+    times = iter(range(0, 600, 60))
+    encoder = RedundantHistoryEncoder(now_s=lambda: next(times), depth=1)
+    frame = encoder.add_reading_m(0.9)
+    kept = bytes(frame)
+
+    encoder.add_reading_m(0.91)
+
+    assert decode_history_payload(kept) == (0, 0, 0, [900])
+    assert bytes(frame) != kept
+
+
+def test_encoder_restarts_history_when_the_interval_changes() -> None:
+    times = iter([0, 60, 120, 240, 360, 480])
+    encoder = RedundantHistoryEncoder(now_s=lambda: next(times), depth=3)
+    frames = [
+        bytes(encoder.add_reading_m(height_m))
+        for height_m in (0.90, 0.91, 0.92, 0.93, 0.94, 0.95)
+    ]
+
+    assert [decode_history_payload(frame)[2:] for frame in frames] == [
+        (0, [900]),
+        (60, [900, 910]),
+        (60, [900, 910, 920]),
+        (120, [920, 930]),
+        (120, [920, 930, 940]),
+        (120, [920, 930, 940, 950]),
+    ]
+
+    reassembler = HistoryReassembler()
+    for frame, received_at_s in zip(reversed(frames), (480, 360, 240, 120, 60, 0)):
+        reassembler.add_frame(frame, received_at_s=received_at_s)
+    assert [reading[2] for reading in reassembler.readings()] == [0, 60, 120, 240, 360, 480]
+
+
+def test_encoder_rejects_depth_beyond_frame_count_limit() -> None:
+    with pytest.raises(ValueError, match="depth"):
+        RedundantHistoryEncoder(now_s=lambda: 0, depth=255)
+
+
+def test_reassembler_fills_lost_frame_from_later_history() -> None:
+    frames = _frames([0.9, 0.91, 0.93, 0.92, 0.95], depth=1)
+    reassembler = HistoryReassembler()
+
+    assert reassembler.add_frame(frames[0], received_at_s=1000) == 1
+    assert reassembler.add_frame(frames[2], received_at_s=1120) == 2
+    assert reassembler.add_frame(frames[4], received_at_s=1240) == 2
+
+    assert reassembler.readings() == [
+        (0, 0, 1000, 900),
+        (0, 1, 1060, 910),
+        (0, 2, 1120, 930),
+        (0, 3, 1180, 920),
+        (0, 4, 1240, 950),
+    ]
+    assert reassembler.missing() == []
+
+
+def test_reassembler_keeps_first_copy_and_reports_unrecoverable_gaps() -> None:
+    frames = _frames([0.9, 0.91, 0.93, 0.92, 0.95], depth=1)
+    reassembler = HistoryReassembler()
+
+    reassembler.add_frame(frames[4], received_at_s=240)
+    reassembler.add_frame(frames[0], received_at_s=0)
+    assert reassembler.add_frame(frames[4], received_at_s=240) == 0
+
+    assert [reading[1] for reading in reassembler.readings()] == [0, 3, 4]
+    assert reassembler.missing() == [(0, 1), (0, 2)]
+
+
+def test_reassembler_unwraps_sixteen_bit_sequence_numbers() -> None:
+    reassembler = HistoryReassembler()
+    encoder = RedundantHistoryEncoder(now_s=lambda: 0, depth=1)
+    encoder._sequence = 0xFFFD
+
+    frames = [bytes(encoder.add_reading_m(height_m)) for height_m in (0.1, 0.2, 0.3)]
+    reassembler.add_frame(frames[0], received_at_s=0)
+    reassembler.add_frame(frames[2], received_at_s=0)
+
+    assert [(reading[1], reading[3]) for reading in reassembler.readings()] == [
+        (0xFFFE, 100),
+        (0xFFFF, 200),
+        (0x10000, 300),
+    ]
+
+
+def test_reassembler_keeps_restarted_run_apart_by_epoch() -> None:
+    reassembler = HistoryReassembler()
+    before = _frames([0.9, 0.91, 0.93, 0.92], depth=1, epoch=1)
+    after = _frames([0.5, 0.52, 0.51], depth=1, epoch=2)
+
+    reassembler.add_frame(before[0], received_at_s=0)
+    reassembler.add_frame(before[3], received_at_s=180)
+    reassembler.add_frame(after[0], received_at_s=600)
+    reassembler.add_frame(after[2], received_at_s=720)
+
+    assert [(reading[0], reading[1], reading[3]) for reading in reassembler.readings()] == [
+        (1, 0, 900),
+        (1, 2, 930),
+        (1, 3, 920),
+        (2, 0, 500),
+        (2, 1, 520),
+        (2, 2, 510),
+    ]
+    assert reassembler.missing() == [(1, 1)]
+
+
+def test_reassembler_keeps_restarted_reading_with_equal_height() -> None:
+    reassembler = HistoryReassembler()
+    for frame in _frames([0.9, 0.91], depth=1, epoch=1):
+        reassembler.add_frame(frame, received_at_s=0)
+
+    restarted = _frames([0.9], depth=1, epoch=2)[0]
+    assert reassembler.add_frame(restarted, received_at_s=600) == 1
+    # A late frame from the old run still lands in its own run.
+    assert reassembler.add_frame(_frames([0.9, 0.91], depth=1, epoch=1)[1], received_at_s=60) == 0
+
+    assert [(reading[0], reading[1], reading[3]) for reading in reassembler.readings()] == [
+        (1, 0, 900),
+        (1, 1, 910),
+        (2, 0, 900),
+    ]
+    assert reassembler.missing() == []
@@ -0,0 +1,36 @@
+import pytest
+
+from tidegauge.redundancy_sim import run_redundancy_sim_cli, simulate_history_recovery
+
+
+def test_recovery_rate_grows_with_depth_at_fixed_loss() -> None:
+    reports = [
+        simulate_history_recovery(depth=depth, loss_rate=0.3, readings=4000, seed=7)
+        for depth in (0, 1, 3)
+    ]
+
+    assert reports[0].recovery_rate == pytest.approx(0.7, abs=0.03)
+    assert reports[1].recovery_rate == pytest.approx(1 - 0.3**2, abs=0.02)
+    assert reports[2].recovery_rate == pytest.approx(1 - 0.3**4, abs=0.01)
+    assert reports[0].mean_frame_bytes < reports[1].mean_frame_bytes < reports[2].mean_frame_bytes
+
+
+def test_lossless_channel_recovers_every_reading() -> None:
+    report = simulate_history_recovery(depth=0, loss_rate=0.0, readings=100)
+
+    assert report.recovery_rate == 1.0
+    assert report.delivered_frames == 100
+
+
+def test_redundancy_sim_cli_prints_one_line_per_depth() -> None:
+    output: list[str] = []
+
+    exit_code = run_redundancy_sim_cli(
+        argv=["--loss", "0.1", "--depth", "0", "2", "--readings", "500"],
+        output_fn=output.append,
+    )
+
+    assert exit_code == 0
+    assert len(output) == 2
+    assert output[0].startswith("depth=0 loss=0.10 delivered=")
+    assert output[1].startswith("depth=2 loss=0.10 ")
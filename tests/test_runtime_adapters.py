@@ -1,4 +1,4 @@
-from tidegauge.adapters.runtime import SystemClockAdapter, SystemSleepAdapter
+from tidegauge.adapters.runtime import AlarmSleepAdapter, SystemClockAdapter, SystemSleepAdapter
 
 
 class FakeTimeModule:
@@ -29,3 +29,62 @@ def test_system_sleep_adapter_delegates_sleep_seconds() -> None:
     sleeper.sleep_s(1)
 
     assert fake_time.sleep_calls == [2, 1]
+
+
+class FakeAlarmModule:
+    def __init__(self) -> None:
+        self.light_sleeps: list[object] = []
+        self.deep_sleeps: list[object] = []
+
+        class FakeTimeAlarm:
+            def __init__(self, *, monotonic_time: float) -> None:
+                self.monotonic_time = monotonic_time
+
+        class FakeAlarmTime:
+            TimeAlarm = FakeTimeAlarm
+
+        self.time = FakeAlarmTime
+
+    def light_sleep_until_alarms(self, *alarms: object) -> None:
+        self.light_sleeps.extend(alarms)
+
+    def exit_and_deep_sleep_until_alarms(self, *alarms: object) -> None:
+        self.deep_sleeps.extend(alarms)
+
+
+class FakeMonotonicTime:
+    def monotonic(self) -> float:
+        return 1000.25
+
+
+def test_alarm_sleep_adapter_light_sleeps_until_time_alarm() -> None:
+    alarm = FakeAlarmModule()
+    sleeper = AlarmSleepAdapter(alarm_module=alarm, time_module=FakeMonotonicTime())
+
+    sleeper.sleep_s(59)
+
+    assert [a.monotonic_time for a in alarm.light_sleeps] == [1059.25]
+    assert alarm.deep_sleeps == []
+
+
+def test_alarm_sleep_adapter_uses_deep_sleep_when_configured() -> None:
+    alarm = FakeAlarmModule()
+    sleeper = AlarmSleepAdapter(
+        alarm_module=alarm,
+        time_module=FakeMonotonicTime(),
+        deep_sleep=True,
+    )
+
+    sleeper.sleep_s(60)
+
+    assert [a.monotonic_time for a in alarm.deep_sleeps] == [1060.25]
+    assert alarm.light_sleeps == []
+
+
+def test_alarm_sleep_adapter_skips_alarm_for_zero_seconds() -> None:
+    alarm = FakeAlarmModule()
+    sleeper = AlarmSleepAdapter(alarm_module=alarm, time_module=FakeMonotonicTime())
+
+    sleeper.sleep_s(0)
+
+    assert alarm.light_sleeps == []
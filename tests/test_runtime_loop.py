@@ -2,11 +2,26 @@ from pathlib import Path
 
 import pytest
 
-from tidegauge.adapters.fakes import FakeRadioPort, FakeSleepPort, FakeUltrasonicSensorPort
+from tidegauge.adapters.fakes import (
+    FakeClockPort,
+    FakeRadioPort,
+    FakeSleepPort,
+    FakeUltrasonicSensorPort,
+)
+from tidegauge.adapters.airtime import AirtimeBudgetRadio
 from tidegauge.adapters.radio import RadioSendError
 from tidegauge.app.runtime_loop import run_runtime_iterations
+from tidegauge.backoff import ExponentialBackoff
+from tidegauge.batching import UplinkBatcher
 from tidegauge.calibration import CalibrationConfig
-from tidegauge.calibration_store import save_calibration_config
+from tidegauge.calibration_store import CachedCalibrationProvider, save_calibration_config
+from tidegauge.payload import (
+    decode_backlog_payload,
+    decode_history_payload,
+    decode_tide_height_batch_payload,
+)
+from tidegauge.redundancy import RedundantHistoryEncoder
+from tidegauge.uplink_queue import UplinkQueue
 
 
 class SequenceScheduler:
@@ -38,7 +53,18 @@ class FlakyRadio:
         self.calls += 1
         if self.calls <= self.fail_count:
             raise RadioSendError("transient failure")
-        self.sent_payloads.append(payload)
+        self.sent_payloads.append(bytes(payload))
+
+
+class ScriptedPingSensor:
+    def __init__(self, readings: list[object]) -> None:
+        self._readings = readings
+
+    def read_distance_m(self) -> float:
+        reading = self._readings.pop(0)
+        if isinstance(reading, Exception):
+            raise reading
+        return reading
 
 
 class FailingSensor:
@@ -266,3 +292,794 @@ def test_run_runtime_iterations_logs_radio_send_error_reason(
     )
 
     assert any("simulated uplink failure" in line for line in logs)
+
+
+def test_run_runtime_iterations_reuses_shared_calibration_provider(
+    tmp_path: Path,
+) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    provider = CachedCalibrationProvider(path=calibration_path)
+    sensor = FakeUltrasonicSensorPort(readings_m=[1.4, 1.4, 1.4])
+    radio = FakeRadioPort()
+
+    for _ in range(3):
+        run_runtime_iterations(
+            iterations=1,
+            calibration_path=calibration_path,
+            scheduler=SequenceScheduler([True]),
+            sensor=sensor,
+            radio=radio,
+            sleeper=FakeSleepPort(),
+            sleep_seconds=1,
+            calibration_provider=provider,
+        )
+
+    assert len(radio.sent_payloads) == 3
+    assert provider.reload_count == 1
+
+
+def test_run_runtime_iterations_sleeps_until_next_due_when_sleep_seconds_is_none(
+    tmp_path: Path,
+) -> None:
+    class CountdownScheduler(SequenceScheduler):
+        def seconds_until_due(self) -> int:
+            return 57
+
+    sleeper = FakeSleepPort()
+
+    run_runtime_iterations(
+        iterations=2,
+        calibration_path=tmp_path / "missing.json",
+        scheduler=CountdownScheduler([True, False]),
+        sensor=FakeUltrasonicSensorPort(readings_m=[1.4]),
+        radio=FakeRadioPort(),
+        sleeper=sleeper,
+        sleep_seconds=None,
+    )
+
+    assert sleeper.sleep_calls_s == [57, 57]
+
+
+def test_run_runtime_iterations_sends_one_uplink_per_full_batch(tmp_path: Path) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    times = iter([0, 60, 120, 180])
+    batcher = UplinkBatcher(now_s=lambda: next(times), max_readings=2)
+    radio = FakeRadioPort()
+
+    sent_count = run_runtime_iterations(
+        iterations=4,
+        calibration_path=calibration_path,
+        scheduler=SequenceScheduler([True, True, True, True]),
+        sensor=FakeUltrasonicSensorPort(readings_m=[1.4, 1.5, 1.4, 1.4]),
+        radio=radio,
+        sleeper=FakeSleepPort(),
+        sleep_seconds=60,
+        batcher=batcher,
+    )
+
+    assert sent_count == 2
+    assert decode_tide_height_batch_payload(radio.sent_payloads[0], received_at_s=60) == [
+        (0, 900),
+        (60, 800),
+    ]
+    assert len(radio.sent_payloads) == 2
+
+
+class OutageRadio:
+    def __init__(self) -> None:
+        self.online = False
+        self.sent_payloads: list[bytes] = []
+
+    def send(self, payload: bytes) -> None:
+        if not self.online:
+            raise RadioSendError("no gateway")
+        self.sent_payloads.append(bytes(payload))
+
+
+def test_run_runtime_iterations_queues_unsent_readings_and_drains_backlog(
+    tmp_path: Path,
+) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    clock = FakeClockPort(times_s=[60, 120, 180])
+    queue = UplinkQueue(capacity=10)
+    radio = OutageRadio()
+    sensor = FakeUltrasonicSensorPort(readings_m=[1.4, 1.5, 1.6])
+
+    def run_once() -> int:
+        return run_runtime_iterations(
+            iterations=1,
+            calibration_path=calibration_path,
+            scheduler=SequenceScheduler([True]),
+            sensor=sensor,
+            radio=radio,
+            sleeper=FakeSleepPort(),
+            sleep_seconds=60,
+            max_send_attempts=2,
+            uplink_queue=queue,
+            clock=clock,
+        )
+
+    assert run_once() == 0
+    assert run_once() == 0
+    assert queue.depth == 2
+
+    radio.online = True
+    assert run_once() == 2
+
+    assert radio.sent_payloads[0] == bytes([0x02, 0xBC])
+    assert decode_backlog_payload(radio.sent_payloads[1], received_at_s=180) == [
+        (60, 900),
+        (120, 800),
+    ]
+    assert queue.depth == 0
+
+
+def test_run_runtime_iterations_requires_clock_for_uplink_queue(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="clock is required"):
+        run_runtime_iterations(
+            iterations=1,
+            calibration_path=tmp_path / "missing.json",
+            scheduler=SequenceScheduler([]),
+            sensor=FakeUltrasonicSensorPort(readings_m=[]),
+            radio=FakeRadioPort(),
+            sleeper=FakeSleepPort(),
+            sleep_seconds=1,
+            uplink_queue=UplinkQueue(capacity=1),
+        )
+
+
+def test_run_runtime_iterations_backs_off_between_send_attempts(tmp_path: Path) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    sleeper = FakeSleepPort()
+    waits: list[float] = []
+
+    sent_count = run_runtime_iterations(
+        iterations=1,
+        calibration_path=calibration_path,
+        scheduler=SequenceScheduler([True]),
+        sensor=FakeUltrasonicSensorPort(readings_m=[1.4]),
+        radio=FlakyRadio(fail_count=2),
+        sleeper=sleeper,
+        sleep_seconds=60,
+        max_send_attempts=3,
+        retry_backoff=ExponentialBackoff(base_s=2, jitter=0.0, sleep_fn=waits.append),
+    )
+
+    assert sent_count == 1
+    assert waits == [2, 4]
+    assert sleeper.sleep_calls_s == [60]
+
+
+def test_run_runtime_iterations_retries_without_deep_sleeping(tmp_path: Path) -> None:
+    from tidegauge.adapters.runtime import AlarmSleepAdapter
+
+    class BoardReset(Exception):
+        pass
+
+    class DeepSleepAlarm:
+        class time:
+            class TimeAlarm:
+                def __init__(self, *, monotonic_time: float) -> None:
+                    self.monotonic_time = monotonic_time
+
+        def exit_and_deep_sleep_until_alarms(self, *alarms: object) -> None:
+            raise BoardReset()
+
+    class Monotonic:
+        def monotonic(self) -> float:
+            return 0.0
+
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    radio = FlakyRadio(fail_count=2)
+    waits: list[float] = []
+
+    with pytest.raises(BoardReset):
+        run_runtime_iterations(
+            iterations=1,
+            calibration_path=calibration_path,
+            scheduler=SequenceScheduler([True]),
+            sensor=FakeUltrasonicSensorPort(readings_m=[1.4]),
+            radio=radio,
+            sleeper=AlarmSleepAdapter(
+                alarm_module=DeepSleepAlarm(),
+                time_module=Monotonic(),
+                deep_sleep=True,
+            ),
+            sleep_seconds=60,
+            max_send_attempts=3,
+            retry_backoff=ExponentialBackoff(base_s=2, jitter=0.0, sleep_fn=waits.append),
+        )
+
+    # The reset comes from the end-of-cycle sleep, after the reading went out.
+    assert waits == [2, 4]
+    assert len(radio.sent_payloads) == 1
+
+
+def test_run_runtime_iterations_does_not_retry_when_airtime_budget_exhausted(
+    tmp_path: Path,
+) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    inner = FakeRadioPort()
+    radio = AirtimeBudgetRadio(radio=inner, now_s=lambda: 0, daily_budget_ms=10)
+    logs: list[str] = []
+
+    sent_count = run_runtime_iterations(
+        iterations=1,
+        calibration_path=calibration_path,
+        scheduler=SequenceScheduler([True]),
+        sensor=FakeUltrasonicSensorPort(readings_m=[1.4]),
+        radio=radio,
+        sleeper=FakeSleepPort(),
+        sleep_seconds=60,
+        max_send_attempts=3,
+        log_fn=logs.append,
+    )
+
+    assert sent_count == 0
+    assert radio.rejected_count == 1
+    assert any("send deferred" in line for line in logs)
+
+
+def test_run_runtime_iterations_feeds_heights_to_adaptive_scheduler(
+    tmp_path: Path,
+) -> None:
+    class ObservingScheduler(SequenceScheduler):
+        def __init__(self, due_sequence: list[bool]) -> None:
+            super().__init__(due_sequence)
+            self.observed_heights_m: list[float] = []
+
+        def observe_height_m(self, tide_height_m: float) -> None:
+            self.observed_heights_m.append(tide_height_m)
+
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    scheduler = ObservingScheduler([True, False, True])
+
+    run_runtime_iterations(
+        iterations=3,
+        calibration_path=calibration_path,
+        scheduler=scheduler,
+        sensor=FakeUltrasonicSensorPort(readings_m=[1.4, 1.5]),
+        radio=FakeRadioPort(),
+        sleeper=FakeSleepPort(),
+        sleep_seconds=1,
+    )
+
+    assert scheduler.observed_heights_m == pytest.approx([0.9, 0.8])
+
+
+def test_run_runtime_iterations_steady_state_cycle_does_not_allocate(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import tracemalloc
+    from array import array
+
+    import tidegauge.payload
+
+    # round(float) allocates a temporary on CPython but not on CircuitPython;
+    # swap in an equivalent for positive heights so only our own code is measured.
+    monkeypatch.setattr(
+        tidegauge.payload,
+        "round",
+        lambda value: int(value + 0.5),
+        raising=False,
+    )
+
+    class FixedCalibrationProvider:
+        def __init__(self) -> None:
+            self.config = CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2)
+
+        def get(self) -> CalibrationConfig:
+            return self.config
+
+    class ConstantSensor:
+        def read_distance_m(self) -> float:
+            return 1.4
+
+    class LastPayloadRadio:
+        def __init__(self) -> None:
+            self.last_payload = None
+
+        def send(self, payload) -> None:
+            self.last_payload = payload
+
+    class ConstantScheduler:
+        def __init__(self, due: bool) -> None:
+            self.due = due
+
+        def is_due(self) -> bool:
+            return self.due
+
+    class TracingSleeper:
+        """Sample traced memory at the sleep that closes each cycle."""
+
+        def __init__(self) -> None:
+            # Arrays store raw integers, so sampling allocates no int objects.
+            self.transient_bytes = array("q", [0]) * 200
+            self.retained_bytes = array("q", [0]) * 200
+            self.cycle = 0
+
+        def sleep_s(self, seconds: int) -> None:
+            current, peak = tracemalloc.get_traced_memory()
+            self.transient_bytes[self.cycle] = peak - current
+            self.retained_bytes[self.cycle] = current
+            self.cycle += 1
+            tracemalloc.reset_peak()
+
+    def trace_cycles(*, due: bool, radio: LastPayloadRadio) -> TracingSleeper:
+        sleeper = TracingSleeper()
+        tracemalloc.start()
+        try:
+            # Stay below 257 cycles so CPython's small-int cache covers the counters.
+            run_runtime_iterations(
+                iterations=200,
+                calibration_path=tmp_path / "calibration.json",
+                scheduler=ConstantScheduler(due),
+                sensor=ConstantSensor(),
+                radio=radio,
+                sleeper=sleeper,
+                sleep_seconds=0,
+                calibration_provider=FixedCalibrationProvider(),
+            )
+        finally:
+            tracemalloc.stop()
+        return sleeper
+
+    radio = LastPayloadRadio()
+    idle = trace_cycles(due=False, radio=radio)
+    busy = trace_cycles(due=True, radio=radio)
+
+    # Skip the first cycles while interpreter caches warm up.
+    assert max(busy.transient_bytes[10:]) <= max(idle.transient_bytes[10:])
+    assert len(set(busy.retained_bytes[10:])) == 1
+    assert bytes(radio.last_payload) == bytes([0x03, 0x84])
+
+
+def test_run_runtime_iterations_filters_heights_before_encoding(tmp_path: Path) -> None:
+    class HalvingFilter:
+        def __init__(self) -> None:
+            self.raw_heights_m: list[float] = []
+
+        def filter_m(self, height_m: float) -> float:
+            self.raw_heights_m.append(height_m)
+            return height_m / 2
+
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    height_filter = HalvingFilter()
+    radio = FakeRadioPort()
+
+    run_runtime_iterations(
+        iterations=1,
+        calibration_path=calibration_path,
+        scheduler=SequenceScheduler([True]),
+        sensor=FakeUltrasonicSensorPort(readings_m=[1.4]),
+        radio=radio,
+        sleeper=FakeSleepPort(),
+        sleep_seconds=1,
+        height_filter=height_filter,
+    )
+
+    assert height_filter.raw_heights_m == pytest.approx([0.9])
+    assert radio.sent_payloads == [bytes([0x01, 0xC2])]
+
+
+def test_run_runtime_iterations_times_stages_and_flushes_diagnostic_frame(
+    tmp_path: Path,
+) -> None:
+    from tidegauge.instrumentation import STAGE_NAMES, StageTimer
+    from tidegauge.payload import FRAME_TYPE_DIAGNOSTIC, decode_diagnostic_payload
+
+    class SteppingTicks:
+        def __init__(self) -> None:
+            self.ticks = 0
+
+        def __call__(self) -> int:
+            self.ticks += 1_000
+            return self.ticks
+
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    stage_probe = StageTimer(
+        ticks_us=SteppingTicks(),
+        ticks_diff=lambda current, start: current - start,
+        flush_every_cycles=2,
+    )
+    radio = FakeRadioPort()
+
+    sent_count = run_runtime_iterations(
+        iterations=2,
+        calibration_path=calibration_path,
+        scheduler=SequenceScheduler([True, True]),
+        sensor=FakeUltrasonicSensorPort(readings_m=[1.4, 1.5]),
+        radio=radio,
+        sleeper=FakeSleepPort(),
+        sleep_seconds=1,
+        stage_probe=stage_probe,
+    )
+
+    assert sent_count == 3
+    diagnostic = radio.sent_payloads[-1]
+    assert diagnostic[0] == FRAME_TYPE_DIAGNOSTIC
+    assert decode_diagnostic_payload(diagnostic) == [(2, 1_000, 1_000, 1_000)] * len(STAGE_NAMES)
+    assert stage_probe.stage_stats(0) == (0, 0, 0, 0)
+
+
+def test_run_runtime_iterations_counts_health_events_and_sends_report(
+    tmp_path: Path,
+) -> None:
+    from tidegauge.adapters.hcsr04 import UltrasonicTimeoutError
+    from tidegauge.health import HealthMonitor
+    from tidegauge.payload import FRAME_TYPE_HEALTH, decode_health_payload
+
+    class ScriptedSensor:
+        def __init__(self) -> None:
+            self._readings: list[object] = [1.4, UltrasonicTimeoutError("no echo"), 1.5]
+
+        def read_distance_m(self) -> float:
+            reading = self._readings.pop(0)
+            if isinstance(reading, Exception):
+                raise reading
+            return reading
+
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    health = HealthMonitor(
+        ticks_ms=lambda: 0,
+        ticks_diff=lambda current, start: current - start,
+        report_every_cycles=3,
+        reboots=2,
+    )
+    radio = FlakyRadio(fail_count=1)
+
+    sent_count = run_runtime_iterations(
+        iterations=3,
+        calibration_path=calibration_path,
+        scheduler=SequenceScheduler([True, True, True]),
+        sensor=ScriptedSensor(),
+        radio=radio,
+        sleeper=FakeSleepPort(),
+        sleep_seconds=1,
+        max_send_attempts=2,
+        health=health,
+    )
+
+    assert sent_count == 3
+    report_payload = radio.sent_payloads[-1]
+    assert report_payload[0] == FRAME_TYPE_HEALTH
+    report = decode_health_payload(report_payload)
+    assert report["sends"] == 2
+    assert report["retries"] == 1
+    assert report["failures"] == 0
+    assert report["sensor_timeouts"] == 1
+    assert report["reboots"] == 2
+    assert health.sends == 0
+
+
+def test_run_runtime_iterations_reports_burst_quality_in_health_frame(
+    tmp_path: Path,
+) -> None:
+    from tidegauge.adapters.burst_sampling import BurstSamplingSensor
+    from tidegauge.adapters.hcsr04 import UltrasonicTimeoutError
+    from tidegauge.health import HealthMonitor
+    from tidegauge.payload import decode_health_payload
+
+    timeout = UltrasonicTimeoutError("no echo")
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    sensor = BurstSamplingSensor(
+        sensor=ScriptedPingSensor([1.4, 1.4, 1.4, timeout, 1.4, timeout, 1.4, timeout, 1.4]),
+        sleep_fn=lambda _s: None,
+        sample_count=3,
+        min_valid_count=2,
+    )
+    health = HealthMonitor(
+        ticks_ms=lambda: 0,
+        ticks_diff=lambda current, start: current - start,
+        report_every_cycles=3,
+    )
+    radio = FakeRadioPort()
+
+    run_runtime_iterations(
+        iterations=3,
+        calibration_path=calibration_path,
+        scheduler=SequenceScheduler([True, True, True]),
+        sensor=sensor,
+        radio=radio,
+        sleeper=FakeSleepPort(),
+        sleep_seconds=1,
+        health=health,
+    )
+
+    report = decode_health_payload(radio.sent_payloads[-1])
+    assert report["sensor_timeouts"] == 1
+    # The failed burst (one valid ping of three) still counts towards the low.
+    assert report["burst_valid_low"] == 1
+    assert report["burst_sample_count"] == 3
+
+
+def test_run_runtime_iterations_applies_downlink_and_acks_on_next_uplink(
+    tmp_path: Path,
+) -> None:
+    from tidegauge.downlink import DOWNLINK_FPORT, CommandDispatcher, encode_downlink_commands
+    from tidegauge.payload import FRAME_TYPE_COMMAND_ACK, decode_command_ack_payload
+
+    class Settings:
+        def __init__(self) -> None:
+            self.scheduler = SequenceScheduler([True, True])
+            self.max_send_attempts = 1
+            self.sensor = FakeUltrasonicSensorPort(readings_m=[1.4, 1.4])
+            self.batcher = None
+
+    class ScriptedDownlink:
+        def __init__(self) -> None:
+            self.downlinks = [(DOWNLINK_FPORT, encode_downlink_commands(sequence=9, max_send_attempts=4))]
+
+        def receive(self) -> tuple[int, bytes] | None:
+            return self.downlinks.pop(0) if self.downlinks else None
+
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    settings = Settings()
+    commands = CommandDispatcher(target=settings, downlink=ScriptedDownlink(), interval_s=60)
+    radio = FakeRadioPort()
+
+    sent_count = run_runtime_iterations(
+        iterations=2,
+        calibration_path=calibration_path,
+        scheduler=settings.scheduler,
+        sensor=settings.sensor,
+        radio=radio,
+        sleeper=FakeSleepPort(),
+        sleep_seconds=1,
+        commands=commands,
+    )
+
+    assert sent_count == 3
+    assert len(radio.sent_payloads) == 3
+    ack = radio.sent_payloads[1]
+    assert ack[0] == FRAME_TYPE_COMMAND_ACK
+    assert decode_command_ack_payload(ack)["max_send_attempts"] == 4
+    assert settings.max_send_attempts == 4
+    assert commands.pending_ack is None
+
+
+def test_run_runtime_iterations_sends_batch_flushed_by_mode_command(tmp_path: Path) -> None:
+    from tidegauge.downlink import DOWNLINK_FPORT, CommandDispatcher, encode_downlink_commands
+    from tidegauge.payload import FRAME_TYPE_COMMAND_ACK
+
+    times = iter(range(0, 600, 60))
+    batcher = UplinkBatcher(now_s=lambda: next(times), max_readings=10)
+
+    class Settings:
+        def __init__(self) -> None:
+            self.scheduler = SequenceScheduler([True, True, True])
+            self.max_send_attempts = 1
+            self.sensor = FakeUltrasonicSensorPort(readings_m=[1.4, 1.4, 1.0])
+            self.batcher = batcher
+
+    class ScriptedDownlink:
+        def receive(self) -> tuple[int, bytes] | None:
+            return DOWNLINK_FPORT, encode_downlink_commands(sequence=1, modes=0)
+
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    settings = Settings()
+    commands = CommandDispatcher(
+        target=settings,
+        downlink=ScriptedDownlink(),
+        interval_s=60,
+        batcher=batcher,
+    )
+    radio = FakeRadioPort()
+
+    def run_once() -> int:
+        return run_runtime_iterations(
+            iterations=1,
+            calibration_path=calibration_path,
+            scheduler=settings.scheduler,
+            sensor=settings.sensor,
+            radio=radio,
+            sleeper=FakeSleepPort(),
+            sleep_seconds=1,
+            batcher=settings.batcher,
+            commands=commands,
+        )
+
+    assert run_once() == 0
+    assert run_once() == 0
+    # The jump closes the batch; the new reading is held until the mode command flushes it.
+    assert run_once() == 3
+
+    assert settings.batcher is None
+    assert radio.sent_payloads[1][0] == FRAME_TYPE_COMMAND_ACK
+    assert decode_tide_height_batch_payload(radio.sent_payloads[2], received_at_s=180) == [
+        (120, 1300),
+    ]
+    assert commands.pending_payloads == []
+
+
+def test_run_runtime_iterations_sends_history_frames_and_queues_only_newest_reading(
+    tmp_path: Path,
+) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    times = iter([0, 60, 120])
+    encoder = RedundantHistoryEncoder(now_s=lambda: next(times), depth=2)
+    queue = UplinkQueue(capacity=10)
+    radio = OutageRadio()
+    sensor = FakeUltrasonicSensorPort(readings_m=[1.4, 1.5, 1.6])
+
+    def run_once() -> int:
+        return run_runtime_iterations(
+            iterations=1,
+            calibration_path=calibration_path,
+            scheduler=SequenceScheduler([True]),
+            sensor=sensor,
+            radio=radio,
+            sleeper=FakeSleepPort(),
+            sleep_seconds=60,
+            batcher=encoder,
+            uplink_queue=queue,
+            clock=FakeClockPort(times_s=[1000]),
+        )
+
+    assert run_once() == 0
+    assert queue.depth == 1
+    radio.online = True
+    assert run_once() == 2
+    assert decode_history_payload(radio.sent_payloads[0]) == (0, 1, 60, [900, 800])
+    assert run_once() == 1
+    assert decode_history_payload(radio.sent_payloads[2]) == (0, 2, 60, [900, 800, 700])
+
+
+def test_run_runtime_iterations_flushes_early_when_data_rate_drops(tmp_path: Path) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    times = iter(range(0, 600, 60))
+    batcher = UplinkBatcher(now_s=lambda: next(times), max_readings=50, flush_interval_s=3600)
+    radio = FakeRadioPort(limits=(3, 242))
+    sensor = FakeUltrasonicSensorPort(readings_m=[1.4] * 8)
+
+    def run(iterations: int) -> int:
+        return run_runtime_iterations(
+            iterations=iterations,
+            calibration_path=calibration_path,
+            scheduler=SequenceScheduler([True] * iterations),
+            sensor=sensor,
+            radio=radio,
+            sleeper=FakeSleepPort(),
+            sleep_seconds=60,
+            batcher=batcher,
+        )
+
+    assert run(7) == 0
+    radio.limits = (0, 11)
+    assert run(1) == 3
+
+    assert [len(payload) for payload in radio.sent_payloads] == [11, 11, 9]
+    assert batcher.ready_payloads == []
+    assert batcher.pending_count == 1
+
+
+def test_run_runtime_iterations_queues_split_frames_that_fail_to_send(tmp_path: Path) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+
+    class OneShotRadio(FakeRadioPort):
+        def send(self, payload: bytes) -> None:
+            if self.sent_payloads:
+                raise RadioSendError("no gateway")
+            super().send(payload)
+
+    times = iter(range(0, 600, 60))
+    batcher = UplinkBatcher(now_s=lambda: next(times), max_readings=50, flush_interval_s=3600)
+    queue = UplinkQueue(capacity=20)
+    radio = OneShotRadio(limits=(3, 242))
+    sensor = FakeUltrasonicSensorPort(readings_m=[1.4] * 8)
+
+    def run(iterations: int) -> int:
+        return run_runtime_iterations(
+            iterations=iterations,
+            calibration_path=calibration_path,
+            scheduler=SequenceScheduler([True] * iterations),
+            sensor=sensor,
+            radio=radio,
+            sleeper=FakeSleepPort(),
+            sleep_seconds=60,
+            batcher=batcher,
+            uplink_queue=queue,
+            clock=FakeClockPort(times_s=[420] * 4),
+        )
+
+    assert run(7) == 0
+    radio.limits = (0, 11)
+    assert run(1) == 1
+
+    assert [len(payload) for payload in radio.sent_payloads] == [11]
+    assert batcher.ready_payloads == []
+    assert queue.peek(10) == [(180, 900), (240, 900), (300, 900), (360, 900)]
+
+
+def test_run_runtime_iterations_fills_backlog_frame_to_max_payload(tmp_path: Path) -> None:
+    calibration_path = tmp_path / "calibration.json"
+    save_calibration_config(
+        path=calibration_path,
+        config=CalibrationConfig(geometry_reference_m=2.5, datum_offset_m=0.2),
+    )
+    queue = UplinkQueue(capacity=20)
+    for index in range(12):
+        queue.push(timestamp_s=index * 60, height_mm=900)
+    radio = FakeRadioPort(limits=(1, 53))
+
+    sent_count = run_runtime_iterations(
+        iterations=1,
+        calibration_path=calibration_path,
+        scheduler=SequenceScheduler([True]),
+        sensor=FakeUltrasonicSensorPort(readings_m=[1.4]),
+        radio=radio,
+        sleeper=FakeSleepPort(),
+        sleep_seconds=60,
+        uplink_queue=queue,
+        clock=FakeClockPort(times_s=[1000]),
+    )
+
+    assert sent_count == 2
+    assert len(decode_backlog_payload(radio.sent_payloads[1], received_at_s=1000)) == 8
+    assert len(radio.sent_payloads[1]) <= 53
+    assert queue.depth == 4
@@ -1,4 +1,6 @@
-from tidegauge.scheduler import MinuteScheduler
+import pytest
+
+from tidegauge.scheduler import AdaptiveScheduler, DeadlineScheduler, MinuteScheduler
 
 
 class FakeClock:
@@ -27,3 +29,204 @@ def test_minute_scheduler_runs_immediately_then_every_60_seconds() -> None:
 
     clock.now_s = 120
     assert scheduler.is_due() is True
+
+
+def test_minute_scheduler_reports_seconds_until_next_due_cycle() -> None:
+    clock = FakeClock()
+    scheduler = MinuteScheduler(now_s=clock.now, interval_s=60)
+
+    assert scheduler.seconds_until_due() == 0
+    assert scheduler.is_due() is True
+    assert scheduler.seconds_until_due() == 60
+
+    clock.now_s = 45
+    assert scheduler.seconds_until_due() == 15
+
+    clock.now_s = 75
+    assert scheduler.seconds_until_due() == 0
+
+
+def test_minute_scheduler_counts_wakeups_per_cycle() -> None:
+    clock = FakeClock()
+    scheduler = MinuteScheduler(now_s=clock.now, interval_s=60)
+
+    scheduler.is_due()
+    for second in range(1, 61):
+        clock.now_s = second
+        scheduler.is_due()
+
+    assert scheduler.last_cycle_wakeups == 60
+    assert scheduler.wakeup_count == 61
+
+    clock.now_s = 120
+    scheduler.is_due()
+
+    assert scheduler.last_cycle_wakeups == 1
+
+
+def test_deadline_scheduler_stays_on_grid_after_late_wakeups() -> None:
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(now_s=clock.now, interval_s=60)
+
+    assert scheduler.is_due() is True
+
+    clock.now_s = 67
+    assert scheduler.is_due() is True
+    assert scheduler.seconds_until_due() == 53
+
+    clock.now_s = 119
+    assert scheduler.is_due() is False
+
+    clock.now_s = 120
+    assert scheduler.is_due() is True
+    assert scheduler.skipped_slots == 0
+
+
+def test_deadline_scheduler_skips_missed_slots_without_catching_up() -> None:
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(now_s=clock.now, interval_s=60)
+    scheduler.is_due()
+
+    clock.now_s = 250
+    assert scheduler.is_due() is True
+    assert scheduler.is_due() is False
+    assert scheduler.skipped_slots == 3
+    assert scheduler.seconds_until_due() == 50
+
+
+def test_deadline_scheduler_applies_phase_offset_to_grid() -> None:
+    clock = FakeClock()
+    clock.now_s = 100
+    scheduler = DeadlineScheduler(now_s=clock.now, interval_s=60, phase_offset_s=17)
+
+    assert scheduler.is_due() is True
+    assert scheduler.seconds_until_due() == 37
+
+    clock.now_s = 136
+    assert scheduler.is_due() is False
+
+    clock.now_s = 137
+    assert scheduler.is_due() is True
+
+
+def test_deadline_scheduler_rejects_non_positive_interval() -> None:
+    with pytest.raises(ValueError, match="interval_s must be > 0"):
+        DeadlineScheduler(now_s=lambda: 0, interval_s=0)
+
+
+def test_deadline_scheduler_moves_to_new_grid_without_rerunning_current_slot() -> None:
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(now_s=clock.now, interval_s=300)
+    assert scheduler.is_due() is True
+
+    clock.now_s = 30
+    scheduler.set_interval_s(60)
+
+    assert scheduler.is_due() is False
+    assert scheduler.seconds_until_due() == 30
+    clock.now_s = 60
+    assert scheduler.is_due() is True
+    assert scheduler.skipped_slots == 0
+
+
+def test_minute_and_adaptive_schedulers_accept_new_interval() -> None:
+    clock = FakeClock()
+    minute = MinuteScheduler(now_s=clock.now, interval_s=3600)
+    minute.is_due()
+    minute.set_interval_s(60)
+    assert minute.seconds_until_due() == 60
+
+    adaptive = AdaptiveScheduler(now_s=clock.now, min_interval_s=60, max_interval_s=600)
+    adaptive.is_due()
+    adaptive.set_interval_s(900)
+    assert adaptive.interval_s == 900
+    assert adaptive.seconds_until_due() == 900
+
+
+def test_adaptive_scheduler_stretches_interval_at_slack_water() -> None:
+    clock = FakeClock()
+    scheduler = AdaptiveScheduler(now_s=clock.now, min_interval_s=60, max_interval_s=600)
+
+    assert scheduler.is_due() is True
+    scheduler.observe_height_m(1.000)
+    clock.now_s = 60
+    assert scheduler.is_due() is False
+
+    clock.now_s = 600
+    assert scheduler.is_due() is True
+    scheduler.observe_height_m(1.001)
+
+    assert scheduler.interval_s == 600
+    assert scheduler.seconds_until_due() == 600
+
+
+def test_adaptive_scheduler_shortens_interval_when_water_moves_fast() -> None:
+    clock = FakeClock()
+    scheduler = AdaptiveScheduler(
+        now_s=clock.now,
+        min_interval_s=60,
+        max_interval_s=600,
+        target_step_m=0.01,
+    )
+
+    assert scheduler.is_due() is True
+    scheduler.observe_height_m(1.00)
+    clock.now_s = 600
+    assert scheduler.is_due() is True
+    # 0.05 m in 600 s -> 0.01 m every 120 s.
+    scheduler.observe_height_m(1.05)
+
+    assert scheduler.interval_s == 120
+    clock.now_s = 719
+    assert scheduler.is_due() is False
+    clock.now_s = 720
+    assert scheduler.is_due() is True
+
+
+def test_adaptive_scheduler_uses_min_interval_above_alert_height() -> None:
+    clock = FakeClock()
+    scheduler = AdaptiveScheduler(
+        now_s=clock.now,
+        min_interval_s=60,
+        max_interval_s=600,
+        alert_height_m=3.0,
+    )
+
+    assert scheduler.is_due() is True
+    scheduler.observe_height_m(3.2)
+
+    assert scheduler.interval_s == 60
+    assert scheduler.seconds_until_due() == 60
+
+
+def test_adaptive_scheduler_pulls_in_pending_deadline_when_rate_rises() -> None:
+    clock = FakeClock()
+    scheduler = AdaptiveScheduler(now_s=clock.now, min_interval_s=60, max_interval_s=600)
+
+    assert scheduler.is_due() is True
+    scheduler.observe_height_m(1.0)
+    assert scheduler.seconds_until_due() == 600
+
+    clock.now_s = 30
+    scheduler.observe_height_m(1.3)
+
+    assert scheduler.seconds_until_due() == 30
+
+
+def test_adaptive_scheduler_keeps_deadlines_on_min_interval_grid() -> None:
+    clock = FakeClock()
+    clock.now_s = 100
+    scheduler = AdaptiveScheduler(
+        now_s=clock.now,
+        min_interval_s=60,
+        max_interval_s=600,
+        phase_offset_s=17,
+    )
+
+    assert scheduler.is_due() is True
+    assert scheduler.seconds_until_due() == 37
+
+
+def test_adaptive_scheduler_rejects_inverted_bounds() -> None:
+    with pytest.raises(ValueError, match="interval bounds"):
+        AdaptiveScheduler(now_s=lambda: 0, min_interval_s=600, max_interval_s=60)
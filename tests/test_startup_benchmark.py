@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from tidegauge.startup_benchmark import (
+    StartupReport,
+    measure_startup,
+    run_startup_benchmark_cli,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_device_entry_point_imports_no_host_only_modules() -> None:
+    report = measure_startup(project_root=PROJECT_ROOT, repeat=1)
+
+    assert report.host_only_modules == []
+    assert "tidegauge.compat" in report.tidegauge_modules
+    assert "tidegauge.app.service" not in report.modules
+    # Feature modules load in build_runtime_dependencies once their config enables them.
+    for name in ("tidegauge.batching", "tidegauge.downlink", "tidegauge.uplink_queue"):
+        assert name not in report.modules
+    assert report.import_s > 0
+
+
+def test_startup_benchmark_cli_reports_and_fails_on_host_only_imports() -> None:
+    output: list[str] = []
+
+    def fake_measure(**kwargs: object) -> StartupReport:
+        return StartupReport(
+            import_s=0.0421,
+            modules=["argparse", "main", "tidegauge", "tidegauge.main"],
+        )
+
+    exit_code = run_startup_benchmark_cli(
+        argv=["--repeat", "1", "--list-modules"],
+        output_fn=output.append,
+        measure_fn=fake_measure,
+    )
+
+    assert exit_code == 1
+    assert output[0] == (
+        "import_s=0.0421 modules=4 tidegauge_modules=2\n"
+        "host-only modules loaded: argparse"
+    )
+    assert output[1:] == ["argparse", "main", "tidegauge", "tidegauge.main"]
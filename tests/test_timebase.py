@@ -0,0 +1,96 @@
+import pytest
+
+from tidegauge.adapters.circuitpython_compat import CircuitPythonTimeModule
+from tidegauge.adapters.fakes import SimulatedUptimeTime, circuitpython_float
+from tidegauge.adapters.timebase import (
+    TICKS_MAX,
+    TICKS_PERIOD,
+    Timebase,
+    ticks_add,
+    ticks_diff,
+)
+
+ECHO_US = 5_831  # 1.0 m round trip
+
+
+def _time_echo(timebase, clock: SimulatedUptimeTime) -> int:
+    start = timebase.ticks_us()
+    clock.fast_forward(seconds=ECHO_US / 1_000_000)
+    end = timebase.ticks_us()
+    return timebase.ticks_diff(end, start)
+
+
+def test_ticks_diff_handles_wraparound() -> None:
+    before_wrap = TICKS_MAX - 10
+    after_wrap = ticks_add(before_wrap, 25)
+
+    assert after_wrap == 14
+    assert ticks_diff(after_wrap, before_wrap) == 25
+    assert ticks_diff(before_wrap, after_wrap) == -25
+
+
+def test_ticks_add_wraps_into_period() -> None:
+    assert ticks_add(TICKS_PERIOD - 1, 1) == 0
+    assert ticks_add(0, -1) == TICKS_MAX
+
+
+@pytest.mark.parametrize("days", [1, 30, 365])
+def test_timebase_keeps_microsecond_precision_after_long_uptime(days: int) -> None:
+    clock = SimulatedUptimeTime()
+    clock.fast_forward(days=days, seconds=0.123457)
+    timebase = Timebase(time_module=clock, supervisor_module=clock)
+
+    assert _time_echo(timebase, clock) == ECHO_US
+
+
+@pytest.mark.parametrize("days", [1, 30, 365])
+def test_float_monotonic_loses_echo_precision_after_long_uptime(days: int) -> None:
+    clock = SimulatedUptimeTime()
+    clock.fast_forward(days=days, seconds=0.123457)
+
+    start = clock.monotonic()
+    clock.fast_forward(seconds=ECHO_US / 1_000_000)
+    end = clock.monotonic()
+
+    # Already a centimetre of error (~58 us) after a day on the board's float.
+    assert abs(int((end - start) * 1_000_000) - ECHO_US) > 58
+
+
+@pytest.mark.parametrize("days", [1, 30, 365])
+def test_timebase_falls_back_to_supervisor_ticks_without_monotonic_ns(days: int) -> None:
+    class FloatOnlyTime:
+        """A build without ``monotonic_ns``."""
+
+        def monotonic(self) -> float:
+            return clock.monotonic()
+
+    clock = SimulatedUptimeTime()
+    clock.fast_forward(days=days)
+    timebase = Timebase(time_module=FloatOnlyTime(), supervisor_module=clock)
+
+    start = timebase.ticks_ms()
+    clock.fast_forward(seconds=60.0)
+
+    assert timebase.ticks_diff(timebase.ticks_ms(), start) == 60_000
+    assert abs(_time_echo(timebase, clock) - ECHO_US) < 1_000
+
+
+def test_timebase_uptime_s_is_exact_after_a_year() -> None:
+    clock = SimulatedUptimeTime()
+    clock.fast_forward(days=365, seconds=59)
+
+    assert Timebase(time_module=clock).uptime_s() == 365 * 86_400 + 59
+
+
+def test_circuitpython_time_module_uses_timebase_ticks() -> None:
+    clock = SimulatedUptimeTime()
+    clock.fast_forward(days=30)
+    adapted = CircuitPythonTimeModule(time_module=clock, supervisor_module=clock)
+
+    assert _time_echo(adapted, clock) == ECHO_US
+    assert adapted.time() == 30 * 86_400
+
+
+def test_circuitpython_float_drops_low_mantissa_bits() -> None:
+    assert circuitpython_float(1.0) == 1.0
+    assert circuitpython_float(86_400.123457) != pytest.approx(86_400.123457, abs=1e-3)
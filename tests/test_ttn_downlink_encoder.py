@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from tidegauge.downlink import DOWNLINK_FPORT, MODE_BURST, encode_downlink_commands
+
+
+def _encode(data: dict) -> dict:
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node is required to run the TTN encoder")
+
+    encoder_path = Path(__file__).resolve().parents[1] / "ttn" / "downlink_encoder.js"
+    script = (
+        encoder_path.read_text(encoding="utf-8")
+        + "\nconsole.log(JSON.stringify(encodeDownlink("
+        + json.dumps({"data": data})
+        + ")));\n"
+    )
+    result = subprocess.run(
+        [node, "-e", script],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_encoder_matches_python_command_encoding() -> None:
+    encoded = _encode(
+        {
+            "sequence": 42,
+            "interval_s": 600,
+            "max_send_attempts": 2,
+            "datum_offset_m": -0.015,
+            "batching": False,
+            "burst": True,
+        }
+    )
+
+    assert encoded["fPort"] == DOWNLINK_FPORT
+    assert bytes(encoded["bytes"]) == encode_downlink_commands(
+        sequence=42,
+        interval_s=600,
+        max_send_attempts=2,
+        datum_offset_m=-0.015,
+        modes=MODE_BURST,
+    )
+
+
+def test_encoder_rejects_downlink_without_commands() -> None:
+    assert _encode({"sequence": 1}) == {"errors": ["at least one command is required"]}
+    assert "errors" in _encode({"interval_s": 60})
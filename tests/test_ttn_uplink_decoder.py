@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from tidegauge.payload import (
+    encode_backlog_payload,
+    encode_command_ack_payload,
+    encode_diagnostic_payload,
+    encode_health_payload,
+    encode_history_payload_into,
+    encode_tide_height_batch_payload,
+    encode_tide_height_payload,
+)
+
+
+def _decode(payload: bytes, recv_time: str = "2026-01-01T00:00:00Z") -> dict:
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node is required to run the TTN decoder")
+
+    decoder_path = Path(__file__).resolve().parents[1] / "ttn" / "uplink_decoder.js"
+    script = (
+        decoder_path.read_text(encoding="utf-8")
+        + "\nconsole.log(JSON.stringify(decodeUplink("
+        + json.dumps({"bytes": list(payload), "recvTime": recv_time})
+        + ")));\n"
+    )
+    result = subprocess.run(
+        [node, "-e", script],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_decoder_reads_lmic_tide_distance_battery_frame() -> None:
+    decoded = _decode(bytes([0x03, 0x84, 0x05, 0xDC, 0x0F, 0xA0]))
+
+    assert decoded["data"]["tide_height_mm"] == 900
+    assert decoded["data"]["raw_distance_mm"] == 1500
+    assert decoded["data"]["battery_mv"] == 4000
+
+
+def test_decoder_reads_python_single_reading_frame() -> None:
+    decoded = _decode(encode_tide_height_payload(tide_height_m=-0.6))
+
+    assert decoded["data"]["tide_height_mm"] == -600
+
+
+def test_decoder_expands_batch_frame_into_timestamped_samples() -> None:
+    payload = encode_tide_height_batch_payload(
+        sequence=4,
+        interval_s=60,
+        age_s=30,
+        heights_mm=[900, 905, 899],
+    )
+
+    decoded = _decode(payload)
+
+    assert decoded["data"]["sequence"] == 4
+    assert decoded["data"]["samples"] == [
+        {"time": "2025-12-31T23:57:30.000Z", "tide_height_mm": 900, "tide_height_m": 0.9},
+        {"time": "2025-12-31T23:58:30.000Z", "tide_height_mm": 905, "tide_height_m": 0.905},
+        {"time": "2025-12-31T23:59:30.000Z", "tide_height_mm": 899, "tide_height_m": 0.899},
+    ]
+
+
+def test_decoder_expands_backlog_frame_using_record_ages() -> None:
+    payload = encode_backlog_payload(now_s=100_000, records=[(96_400, 812), (99_940, -20)])
+
+    decoded = _decode(payload)
+
+    assert decoded["data"]["backlog"] is True
+    assert [s["time"] for s in decoded["data"]["samples"]] == [
+        "2025-12-31T23:00:00.000Z",
+        "2025-12-31T23:59:00.000Z",
+    ]
+    assert [s["tide_height_mm"] for s in decoded["data"]["samples"]] == [812, -20]
+
+
+def test_decoder_rejects_unknown_payloads() -> None:
+    decoded = _decode(bytes([0x7F, 0, 0, 0, 0, 0, 0, 0]))
+
+    assert decoded == {"errors": ["Unsupported payload"]}
+
+
+def test_decoder_reads_diagnostic_frame_stage_timings() -> None:
+    decoded = _decode(encode_diagnostic_payload(stages=[(2, 100, 150, 200), (2, 25_000, 26_000, 27_000)]))
+
+    assert decoded["data"]["diagnostic"] is True
+    assert decoded["data"]["stages"][1] == {
+        "stage": "sensor",
+        "count": 2,
+        "min_us": 25_000,
+        "mean_us": 26_000,
+        "max_us": 27_000,
+    }
+
+
+def test_decoder_reads_health_frame() -> None:
+    decoded = _decode(
+        encode_health_payload(
+            counters=[58, 4, 2, 1, 0, 3, 7],
+            mem_free_low_bytes=71_234,
+            worst_cycle_ms=812,
+            battery_mv=None,
+            burst_valid_low=3,
+            burst_sample_count=5,
+        )
+    )
+
+    assert decoded["data"] == {
+        "health": True,
+        "sends": 58,
+        "retries": 4,
+        "failures": 2,
+        "sensor_timeouts": 1,
+        "calibration_missing": 0,
+        "cycle_errors": 3,
+        "reboots": 7,
+        "mem_free_low_bytes": 71_234,
+        "worst_cycle_ms": 812,
+        "battery_mv": None,
+        "burst_valid_low": 3,
+        "burst_sample_count": 5,
+    }
+
+
+def test_decoder_reads_command_ack_frame() -> None:
+    decoded = _decode(
+        encode_command_ack_payload(
+            sequence=12,
+            status=4,
+            interval_s=900,
+            max_send_attempts=3,
+            modes=0x02,
+            datum_offset_mm=-40,
+        )
+    )
+
+    assert decoded["data"] == {
+        "command_ack": True,
+        "sequence": 12,
+        "status": "out_of_range",
+        "interval_s": 900,
+        "max_send_attempts": 3,
+        "batching": False,
+        "burst": True,
+        "datum_offset_mm": -40,
+    }
+
+
+def test_decoder_expands_history_frame_with_sequence_numbers() -> None:
+    buffer = bytearray(16)
+    length = encode_history_payload_into(
+        buffer,
+        0,
+        epoch=5,
+        sequence=1,
+        interval_s=60,
+        heights_mm=[-1200, -1180, 300],
+    )
+
+    decoded = _decode(bytes(buffer[:length]))
+
+    assert decoded["data"]["history"] is True
+    assert decoded["data"]["epoch"] == 5
+    assert decoded["data"]["samples"] == [
+        {"sequence": 65535, "time": "2025-12-31T23:58:00.000Z", "tide_height_mm": -1200, "tide_height_m": -1.2},
+        {"sequence": 0, "time": "2025-12-31T23:59:00.000Z", "tide_height_mm": -1180, "tide_height_m": -1.18},
+        {"sequence": 1, "time": "2026-01-01T00:00:00.000Z", "tide_height_mm": 300, "tide_height_m": 0.3},
+    ]
@@ -1,6 +1,15 @@
 import pytest
 
-from tidegauge.ultrasonic import echo_duration_us_to_distance_m
+from tidegauge.ultrasonic import (
+    SPEED_TABLE_MAX_C,
+    SPEED_TABLE_MIN_C,
+    distance_m_to_echo_duration_us,
+    echo_duration_us_to_distance_m,
+    echo_durations_us_to_distances_m,
+    echo_durations_us_to_distances_m_numpy,
+    speed_of_sound_lookup_m_per_s,
+    speed_of_sound_m_per_s,
+)
 
 
 def test_echo_duration_us_to_distance_m_converts_using_speed_of_sound() -> None:
@@ -11,3 +20,64 @@ def test_echo_duration_us_to_distance_m_converts_using_speed_of_sound() -> None:
 def test_echo_duration_us_to_distance_m_rejects_negative_duration() -> None:
     with pytest.raises(ValueError, match="echo_duration_us must be >= 0"):
         echo_duration_us_to_distance_m(-1)
+
+
+def test_distance_m_to_echo_duration_us_inverts_conversion() -> None:
+    assert distance_m_to_echo_duration_us(1.0) == 5830
+    assert echo_duration_us_to_distance_m(distance_m_to_echo_duration_us(1.5)) == pytest.approx(
+        1.5, abs=1e-3
+    )
+
+
+def test_speed_of_sound_lookup_tracks_exact_curve_within_15_ppm() -> None:
+    temperature_c = SPEED_TABLE_MIN_C
+    while temperature_c <= SPEED_TABLE_MAX_C:
+        assert speed_of_sound_lookup_m_per_s(temperature_c) == pytest.approx(
+            speed_of_sound_m_per_s(temperature_c), rel=1.5e-5
+        )
+        temperature_c += 0.7
+
+
+def test_speed_of_sound_lookup_clamps_outside_table() -> None:
+    assert speed_of_sound_lookup_m_per_s(-40) == speed_of_sound_lookup_m_per_s(SPEED_TABLE_MIN_C)
+    assert speed_of_sound_lookup_m_per_s(80) == speed_of_sound_lookup_m_per_s(SPEED_TABLE_MAX_C)
+
+
+def test_speed_of_sound_lookup_without_temperature_keeps_legacy_constant() -> None:
+    assert speed_of_sound_lookup_m_per_s(None) == 343.0
+
+
+def test_echo_duration_us_to_distance_m_compensates_for_air_temperature() -> None:
+    # The same 1.5 m tube reads ~4 cm apart between -5 and 35 degrees C.
+    cold_echo_us = distance_m_to_echo_duration_us(1.5, temperature_c=-5)
+    hot_echo_us = distance_m_to_echo_duration_us(1.5, temperature_c=35)
+
+    assert hot_echo_us < cold_echo_us
+    assert echo_duration_us_to_distance_m(cold_echo_us, temperature_c=-5) == pytest.approx(
+        1.5, abs=1e-3
+    )
+    assert echo_duration_us_to_distance_m(cold_echo_us) - 1.5 > 0.04
+
+
+def test_echo_durations_us_to_distances_m_matches_scalar_conversion() -> None:
+    durations_us = [5_831, 8_000, 9_500]
+    temperatures_c = [-5.0, 12.5, 35.0]
+
+    distances_m = echo_durations_us_to_distances_m(durations_us, temperatures_c)
+
+    assert distances_m == [
+        echo_duration_us_to_distance_m(duration_us, temperature_c)
+        for duration_us, temperature_c in zip(durations_us, temperatures_c)
+    ]
+    assert echo_durations_us_to_distances_m([5_831], 20.0) == [
+        echo_duration_us_to_distance_m(5_831, 20.0)
+    ]
+
+
+def test_echo_durations_us_to_distances_m_vectorizes_with_numpy() -> None:
+    np = pytest.importorskip("numpy")
+
+    distances_m = echo_durations_us_to_distances_m_numpy(np.array([5_831, 8_000]), 20.0)
+
+    assert isinstance(distances_m, np.ndarray)
+    assert distances_m[0] == pytest.approx(echo_duration_us_to_distance_m(5_831, 20.0))
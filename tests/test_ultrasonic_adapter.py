@@ -29,3 +29,35 @@ def test_ultrasonic_duration_adapter_supports_multiple_reads() -> None:
     second = adapter.read_distance_m()
 
     assert first > second
+
+
+class FakeTemperatureSensor:
+    def __init__(self, readings_c: list[float | Exception]) -> None:
+        self._readings_c = readings_c
+
+    def read_temperature_c(self) -> float:
+        reading = self._readings_c.pop(0)
+        if isinstance(reading, Exception):
+            raise reading
+        return reading
+
+
+def test_ultrasonic_duration_adapter_uses_fixed_site_temperature() -> None:
+    adapter = UltrasonicDurationAdapter(
+        echo_reader=FakeEchoDurationReader(durations_us=[5831]),
+        temperature_c=5.0,
+    )
+
+    assert adapter.read_distance_m() == echo_duration_us_to_distance_m(5831, 5.0)
+
+
+def test_ultrasonic_duration_adapter_prefers_temperature_sensor() -> None:
+    adapter = UltrasonicDurationAdapter(
+        echo_reader=FakeEchoDurationReader(durations_us=[5831, 5831]),
+        temperature_sensor=FakeTemperatureSensor([30.0, OSError("I2C NACK")]),
+        temperature_c=5.0,
+    )
+
+    assert adapter.read_distance_m() == echo_duration_us_to_distance_m(5831, 30.0)
+    assert adapter.read_distance_m() == echo_duration_us_to_distance_m(5831, 5.0)
+    assert adapter.temperature_error_count == 1
@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import pytest
+
+from tidegauge.payload import decode_backlog_payload, encode_backlog_payload
+from tidegauge.uplink_queue import RECORD_LENGTH, UplinkQueue
+
+
+def test_uplink_queue_ram_mode_returns_oldest_readings_first() -> None:
+    queue = UplinkQueue(capacity=4)
+
+    queue.push(timestamp_s=60, height_mm=900)
+    queue.push(timestamp_s=120, height_mm=-12)
+    queue.push(timestamp_s=180, height_mm=905)
+
+    assert queue.depth == 3
+    assert queue.peek(2) == [(60, 900), (120, -12)]
+    assert queue.depth == 3
+
+    queue.acknowledge(2)
+
+    assert queue.peek(5) == [(180, 905)]
+    assert queue.depth == 1
+
+
+def test_uplink_queue_drops_oldest_when_full() -> None:
+    queue = UplinkQueue(capacity=3)
+
+    for index in range(5):
+        queue.push(timestamp_s=index, height_mm=index)
+
+    assert queue.depth == 3
+    assert queue.dropped_count == 2
+    assert queue.peek(10) == [(2, 2), (3, 3), (4, 4)]
+
+
+def test_uplink_queue_file_mode_survives_reopen(tmp_path: Path) -> None:
+    path = str(tmp_path / "queue.bin")
+    queue = UplinkQueue(capacity=8, path=path)
+    queue.push(timestamp_s=60, height_mm=900)
+    queue.push(timestamp_s=120, height_mm=901)
+    queue.push(timestamp_s=180, height_mm=902)
+    queue.acknowledge(1)
+
+    reopened = UplinkQueue(capacity=8, path=path)
+
+    assert reopened.depth == 2
+    assert reopened.peek(10) == [(120, 901), (180, 902)]
+    reopened.push(timestamp_s=240, height_mm=903)
+    assert reopened.peek(10)[-1] == (240, 903)
+    assert (tmp_path / "queue.bin").stat().st_size == 8 * RECORD_LENGTH
+
+
+def test_uplink_queue_keeps_ages_when_reopened_with_reset_clock(tmp_path: Path) -> None:
+    path = str(tmp_path / "queue.bin")
+    queue = UplinkQueue(capacity=8, path=path, now_s=lambda: 0)
+    queue.push(timestamp_s=5000, height_mm=900)
+    queue.push(timestamp_s=5060, height_mm=901)
+
+    reopened = UplinkQueue(capacity=8, path=path, now_s=lambda: 10)
+    reopened.push(timestamp_s=70, height_mm=902)
+
+    assert reopened.peek(10) == [(-50, 900), (10, 901), (70, 902)]
+    backlog = encode_backlog_payload(now_s=130, records=reopened.peek(10))
+    assert decode_backlog_payload(backlog, received_at_s=130) == [
+        (-50, 900),
+        (10, 901),
+        (70, 902),
+    ]
+
+
+def test_uplink_queue_skips_torn_last_record_on_reopen(tmp_path: Path) -> None:
+    path = tmp_path / "queue.bin"
+    queue = UplinkQueue(capacity=8, path=str(path))
+    queue.push(timestamp_s=60, height_mm=900)
+    queue.push(timestamp_s=120, height_mm=901)
+
+    data = bytearray(path.read_bytes())
+    torn_offset = 2 * RECORD_LENGTH
+    data[torn_offset + 6] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    reopened = UplinkQueue(capacity=8, path=str(path))
+
+    assert reopened.corrupt_count == 1
+    assert reopened.peek(10) == [(60, 900)]
+    reopened.push(timestamp_s=180, height_mm=902)
+    assert reopened.peek(10) == [(60, 900), (180, 902)]
+
+
+def test_uplink_queue_wraps_ring_in_file_mode(tmp_path: Path) -> None:
+    path = str(tmp_path / "queue.bin")
+    queue = UplinkQueue(capacity=3, path=path)
+    for index in range(7):
+        queue.push(timestamp_s=index, height_mm=index)
+        queue.acknowledge(1)
+    queue.push(timestamp_s=99, height_mm=99)
+
+    reopened = UplinkQueue(capacity=3, path=path)
+
+    assert reopened.peek(10) == [(99, 99)]
+
+
+def test_uplink_queue_rejects_zero_capacity() -> None:
+    with pytest.raises(ValueError, match="capacity must be >= 1"):
+        UplinkQueue(capacity=0)
@@ -0,0 +1,133 @@
+from array import array
+
+from tidegauge.adapters.radio import AirtimeBudgetExceededError
+from tidegauge.compat import Callable
+from tidegauge.lorawan_region import modulation
+from tidegauge.ports import RadioPort
+
+
+# MHDR (1) + FHDR without FOpts (7) + FPort (1) + MIC (4).
+LORAWAN_OVERHEAD_BYTES = 13
+TTN_FAIR_USE_AIRTIME_MS = 30_000
+
+_WINDOW_BUCKETS = 24
+_BUCKET_S = 3600
+
+
+def lora_time_on_air_ms(
+    *,
+    payload_length: int,
+    spreading_factor: int = 7,
+    bandwidth_hz: int = 125_000,
+    coding_rate: int = 1,
+    preamble_symbols: int = 8,
+) -> float:
+    """Time-on-air of a LoRaWAN uplink carrying ``payload_length`` application bytes.
+
+    Uses the Semtech SX127x formula with explicit header, CRC on, and low data
+    rate optimisation for SF11/SF12 at 125 kHz. ``coding_rate`` is 1-4 for 4/5-4/8.
+    """
+    phy_length = payload_length + LORAWAN_OVERHEAD_BYTES
+    low_data_rate = 1 if spreading_factor >= 11 and bandwidth_hz <= 125_000 else 0
+    numerator = 8 * phy_length - 4 * spreading_factor + 28 + 16
+    denominator = 4 * (spreading_factor - 2 * low_data_rate)
+    payload_symbols = 8 + max(-(-numerator // denominator) * (coding_rate + 4), 0)
+    symbol_ms = (1 << spreading_factor) * 1000 / bandwidth_hz
+    return (preamble_symbols + 4.25 + payload_symbols) * symbol_ms
+
+
+class AirtimeBudgetRadio:
+    """Track time-on-air around a RadioPort and enforce a rolling 24 h budget.
+
+    Airtime is accumulated in 24 hourly buckets, so the window slides an hour
+    at a time. Over budget, the send waits for the oldest bucket to expire if
+    that is within ``max_delay_s``; otherwise it raises
+    ``AirtimeBudgetExceededError`` so the caller can queue or drop the reading.
+
+    Airtime is costed at the radio's current data rate when it reports
+    ``uplink_limits``, else at ``spreading_factor``/``bandwidth_hz``, and is
+    charged only once the wrapped send succeeds.
+    """
+
+    def __init__(
+        self,
+        *,
+        radio: RadioPort,
+        now_s: Callable[[], int],
+        daily_budget_ms: int = TTN_FAIR_USE_AIRTIME_MS,
+        spreading_factor: int = 7,
+        bandwidth_hz: int = 125_000,
+        sleep_fn: Callable[[int], None] | None = None,
+        max_delay_s: int = 0,
+    ) -> None:
+        self._radio = radio
+        self._now_s = now_s
+        self._daily_budget_ms = daily_budget_ms
+        self._spreading_factor = spreading_factor
+        self._bandwidth_hz = bandwidth_hz
+        self._sleep_fn = sleep_fn
+        self._max_delay_s = max_delay_s
+        self._buckets_ms = array("L", [0]) * _WINDOW_BUCKETS
+        self._current_hour: int | None = None
+        self._uplink_limits = getattr(radio, "uplink_limits", None)
+        self.rejected_count = 0
+
+    @property
+    def used_ms(self) -> int:
+        self._advance(self._now_s())
+        total = 0
+        for bucket_ms in self._buckets_ms:
+            total += bucket_ms
+        return total
+
+    @property
+    def remaining_ms(self) -> int:
+        return max(0, self._daily_budget_ms - self.used_ms)
+
+    def uplink_limits(self) -> tuple[int, int] | None:
+        if self._uplink_limits is None:
+            return None
+        return self._uplink_limits()
+
+    def send(self, payload: bytes) -> None:
+        spreading_factor = self._spreading_factor
+        bandwidth_hz = self._bandwidth_hz
+        limits = self.uplink_limits()
+        if limits is not None:
+            spreading_factor, bandwidth_hz = modulation(limits[0])
+        airtime_ms = int(
+            lora_time_on_air_ms(
+                payload_length=len(payload),
+                spreading_factor=spreading_factor,
+                bandwidth_hz=bandwidth_hz,
+            )
+            + 0.999
+        )
+        if self.used_ms + airtime_ms > self._daily_budget_ms:
+            wait_s = self._seconds_until_bucket_expires()
+            if self._sleep_fn is None or wait_s > self._max_delay_s:
+                self.rejected_count += 1
+                raise AirtimeBudgetExceededError("Daily airtime budget exhausted")
+            self._sleep_fn(wait_s)
+            if self.used_ms + airtime_ms > self._daily_budget_ms:
+                self.rejected_count += 1
+                raise AirtimeBudgetExceededError("Daily airtime budget exhausted")
+
+        self._radio.send(payload)
+        self._buckets_ms[self._current_hour % _WINDOW_BUCKETS] += airtime_ms
+
+    def _advance(self, now: int) -> None:
+        hour = now // _BUCKET_S
+        if self._current_hour is None:
+            self._current_hour = hour
+            return
+        elapsed = hour - self._current_hour
+        if elapsed <= 0:
+            return
+        for offset in range(1, min(elapsed, _WINDOW_BUCKETS) + 1):
+            self._buckets_ms[(self._current_hour + offset) % _WINDOW_BUCKETS] = 0
+        self._current_hour = hour
+
+    def _seconds_until_bucket_expires(self) -> int:
+        now = self._now_s()
+        return _BUCKET_S - now % _BUCKET_S
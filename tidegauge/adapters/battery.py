@@ -0,0 +1,22 @@
+from tidegauge.compat import Any
+
+
+class AnalogBatteryMonitor:
+    """Read the battery through a resistor divider on an ``analogio.AnalogIn``.
+
+    Feathers divide VBAT by two before the ADC; ``AnalogIn.value`` is scaled
+    to 16 bits whatever the ADC resolution.
+    """
+
+    def __init__(
+        self,
+        *,
+        analog_in: Any,
+        divider_ratio: float = 2.0,
+        reference_mv: int = 3300,
+    ) -> None:
+        self._analog_in = analog_in
+        self._scale = divider_ratio * reference_mv / 65535
+
+    def read_battery_mv(self) -> int:
+        return int(self._analog_in.value * self._scale + 0.5)
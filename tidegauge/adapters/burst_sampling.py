@@ -0,0 +1,93 @@
+from array import array
+
+from tidegauge.adapters.hcsr04 import BurstSamplingError, UltrasonicTimeoutError
+from tidegauge.compat import Callable
+from tidegauge.ports import UltrasonicSensorPort
+
+
+FILTER_MEDIAN = "median"
+FILTER_TRIMMED_MEAN = "trimmed_mean"
+
+
+class BurstSamplingSensor:
+    """Take a burst of pings and return their median or trimmed mean.
+
+    Timeouts and echoes outside ``[min_distance_m, max_distance_m]`` are
+    discarded. Valid samples are insertion-sorted into a buffer allocated once
+    at construction, so a read allocates no per-cycle lists.
+    """
+
+    def __init__(
+        self,
+        *,
+        sensor: UltrasonicSensorPort,
+        sleep_fn: Callable[[float], None],
+        sample_count: int = 5,
+        spacing_s: float = 0.06,
+        min_distance_m: float = 0.02,
+        max_distance_m: float = 4.0,
+        method: str = FILTER_MEDIAN,
+        trim_count: int = 1,
+        min_valid_count: int = 1,
+    ) -> None:
+        if sample_count < 1:
+            raise ValueError("sample_count must be >= 1")
+        if method not in (FILTER_MEDIAN, FILTER_TRIMMED_MEAN):
+            raise ValueError("Unsupported burst filter method: " + str(method))
+        if min_valid_count < 1 or min_valid_count > sample_count:
+            raise ValueError("min_valid_count must be between 1 and sample_count")
+
+        self._sensor = sensor
+        self._sleep_fn = sleep_fn
+        self._sample_count = sample_count
+        self._spacing_s = spacing_s
+        self._min_distance_m = min_distance_m
+        self._max_distance_m = max_distance_m
+        self._method = method
+        self._trim_count = trim_count
+        self._min_valid_count = min_valid_count
+        self._samples = array("f", [0.0]) * sample_count
+        self.valid_sample_count = 0
+
+    @property
+    def sample_count(self) -> int:
+        return self._sample_count
+
+    def read_distance_m(self) -> float:
+        samples = self._samples
+        valid_count = 0
+        for index in range(self._sample_count):
+            if index:
+                self._sleep_fn(self._spacing_s)
+            try:
+                distance_m = self._sensor.read_distance_m()
+            except UltrasonicTimeoutError:
+                continue
+            if distance_m < self._min_distance_m or distance_m > self._max_distance_m:
+                continue
+
+            position = valid_count
+            while position > 0 and samples[position - 1] > distance_m:
+                samples[position] = samples[position - 1]
+                position -= 1
+            samples[position] = distance_m
+            valid_count += 1
+
+        self.valid_sample_count = valid_count
+        if valid_count < self._min_valid_count:
+            raise BurstSamplingError(
+                "Only " + str(valid_count) + " of " + str(self._sample_count)
+                + " pings were valid"
+            )
+
+        if self._method == FILTER_MEDIAN:
+            middle = valid_count // 2
+            if valid_count % 2:
+                return samples[middle]
+            return (samples[middle - 1] + samples[middle]) / 2
+
+        trim = min(self._trim_count, (valid_count - 1) // 2)
+        total = 0.0
+        for position in range(trim, valid_count - trim):
+            total += samples[position]
+        return total / (valid_count - 2 * trim)
@@ -1,7 +1,5 @@
-try:
-    from typing import Any
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Any = object
+from tidegauge.adapters.timebase import Timebase, ticks_diff
+from tidegauge.compat import Any
 
 
 def create_machine_compat_module(*, board_module: Any, digitalio_module: Any) -> Any:
@@ -31,22 +29,27 @@ def create_machine_compat_module(*, board_module: Any, digitalio_module: Any) ->
 
 
 class CircuitPythonTimeModule:
-    def __init__(self, *, time_module: Any) -> None:
+    def __init__(self, *, time_module: Any, supervisor_module: Any = None) -> None:
         self._time = time_module
+        self._timebase = Timebase(time_module=time_module, supervisor_module=supervisor_module)
 
     def sleep_us(self, delay_us: int) -> None:
         self._time.sleep(delay_us / 1_000_000)
 
     def ticks_us(self) -> int:
-        if hasattr(self._time, "monotonic_ns"):
-            return int(self._time.monotonic_ns() // 1_000)
-        return int(self._time.monotonic() * 1_000_000)
+        return self._timebase.ticks_us()
+
+    def ticks_ms(self) -> int:
+        return self._timebase.ticks_ms()
 
     def ticks_diff(self, current: int, start: int) -> int:
-        return current - start
+        return ticks_diff(current, start)
 
     def time(self) -> int:
-        return int(self._time.monotonic())
+        return self._timebase.uptime_s()
+
+    def monotonic(self) -> float:
+        return self._time.monotonic()
 
     def sleep(self, seconds: float) -> None:
         self._time.sleep(seconds)
@@ -1,5 +1,8 @@
+import struct
 from dataclasses import dataclass, field
 
+from tidegauge.adapters.timebase import TICKS_MAX
+
 
 @dataclass
 class FakeUltrasonicSensorPort:
@@ -14,9 +17,14 @@ class FakeUltrasonicSensorPort:
 @dataclass
 class FakeRadioPort:
     sent_payloads: list[bytes] = field(default_factory=list)
+    # ``(data_rate, max_payload_length)``; set it mid-test to simulate ADR.
+    limits: tuple[int, int] | None = None
 
     def send(self, payload: bytes) -> None:
-        self.sent_payloads.append(payload)
+        self.sent_payloads.append(bytes(payload))
+
+    def uplink_limits(self) -> tuple[int, int] | None:
+        return self.limits
 
 
 @dataclass
@@ -35,3 +43,35 @@ class FakeSleepPort:
 
     def sleep_s(self, seconds: int) -> None:
         self.sleep_calls_s.append(seconds)
+
+
+def circuitpython_float(value: float) -> float:
+    """Round ``value`` to the 30-bit float CircuitPython uses on the RP2040."""
+    bits = struct.unpack("<I", struct.pack("<f", value))[0]
+    return struct.unpack("<f", struct.pack("<I", bits & ~0b11))[0]
+
+
+@dataclass
+class SimulatedUptimeTime:
+    """Stand-in for CircuitPython's ``time`` and ``supervisor`` at a chosen uptime.
+
+    ``monotonic()`` reproduces the board's float precision loss, so host tests
+    can fast-forward months of uptime and check what a ticks source would see.
+    """
+
+    uptime_ns: int = 0
+
+    def fast_forward(self, *, days: int = 0, seconds: float = 0) -> None:
+        self.uptime_ns += days * 86_400_000_000_000 + int(seconds * 1_000_000_000)
+
+    def monotonic_ns(self) -> int:
+        return self.uptime_ns
+
+    def monotonic(self) -> float:
+        return circuitpython_float(self.uptime_ns / 1_000_000_000)
+
+    def ticks_ms(self) -> int:
+        return (self.uptime_ns // 1_000_000) & TICKS_MAX
+
+    def sleep(self, seconds: float) -> None:
+        self.fast_forward(seconds=seconds)
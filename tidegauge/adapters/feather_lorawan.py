@@ -1,40 +1,243 @@
-try:
-    from typing import Any, Callable
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Any = object
-    class Callable:  # type: ignore[no-redef]
-        def __class_getitem__(cls, _item):
-            return cls
-
+from tidegauge.compat import Any, Callable
+from tidegauge.lorawan_region import TINYLORA_DATA_RATE, uplink_limits
+from tidegauge.lorawan_session import LoRaWanSession, session_from_abp_credentials
 from tidegauge.ttn_credentials import TtnCredentials
 
 
+SEND_KEYWORD_LENGTH = "send_data(payload, length=n)"
+SEND_POSITIONAL_LENGTH = "send_data(payload, n)"
+SEND_FRAME_COUNTER = "send_data(payload, n, frame_counter)"
+SEND_PLAIN = "send(payload)"
+SEND_FORMS = (SEND_KEYWORD_LENGTH, SEND_POSITIONAL_LENGTH, SEND_FRAME_COUNTER, SEND_PLAIN)
+
+
+class RadioCapabilities:
+    """How a raw TinyLoRa-style radio is driven, decided once at construction.
+
+    ``reports_status`` is False for the frame-counter form: TinyLoRa's
+    ``send_data`` returns None and signals failure only by raising.
+    ``exposes_session`` means the radio publishes ``dev_addr``, ``nwk_skey``
+    and ``app_skey`` once joined, so its session can be saved and restored.
+    ``has_receive`` means it returns downlinks from ``receive()`` as
+    ``(fport, payload)``; TinyLoRa is uplink-only. ``has_frame_counter_down``
+    means it keeps the last received downlink counter in ``frame_counter_down``.
+    ``reports_data_rate`` means it keeps its current US915 data rate, which ADR
+    may change, in ``data_rate``.
+    """
+
+    def __init__(
+        self,
+        *,
+        send_form: str,
+        has_join: bool,
+        reports_status: bool,
+        has_frame_counter: bool = False,
+        exposes_session: bool = False,
+        has_receive: bool = False,
+        has_frame_counter_down: bool = False,
+        reports_data_rate: bool = False,
+    ) -> None:
+        self.send_form = send_form
+        self.has_join = has_join
+        self.reports_status = reports_status
+        self.has_frame_counter = has_frame_counter
+        self.exposes_session = exposes_session
+        self.has_receive = has_receive
+        self.has_frame_counter_down = has_frame_counter_down
+        self.reports_data_rate = reports_data_rate
+
+
+def _signature_parameters(fn: Any) -> Any:
+    try:
+        import inspect
+
+        return inspect.signature(fn).parameters
+    except (ImportError, TypeError, ValueError):
+        # CircuitPython has no inspect; fall back to attribute heuristics.
+        return None
+
+
+def _send_form_from_parameters(parameters: Any) -> str:
+    length = parameters.get("length")
+    if length is not None and length.kind == length.KEYWORD_ONLY:
+        return SEND_KEYWORD_LENGTH
+    required_positional = 0
+    for parameter in parameters.values():
+        if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD):
+            if parameter.default is parameter.empty:
+                required_positional += 1
+    if required_positional >= 3:
+        return SEND_FRAME_COUNTER
+    return SEND_POSITIONAL_LENGTH
+
+
+def probe_radio_capabilities(
+    raw_radio: Any,
+    *,
+    send_form: str | None = None,
+    signature_fn: Callable[[Any], Any] = _signature_parameters,
+) -> RadioCapabilities:
+    """Work out the send signature of ``raw_radio`` without calling it.
+
+    ``send_form`` forces one of ``SEND_FORMS``. Otherwise the signature is
+    read with ``inspect`` where available; on the device, a ``frame_counter``
+    attribute identifies TinyLoRa and anything else gets positional length.
+    """
+    has_join = callable(getattr(raw_radio, "join", None))
+    send_data_fn = getattr(raw_radio, "send_data", None)
+    if send_form is None:
+        if callable(send_data_fn):
+            parameters = signature_fn(send_data_fn)
+            if parameters is not None:
+                send_form = _send_form_from_parameters(parameters)
+            elif hasattr(raw_radio, "frame_counter"):
+                send_form = SEND_FRAME_COUNTER
+            else:
+                send_form = SEND_POSITIONAL_LENGTH
+        elif callable(getattr(raw_radio, "send", None)):
+            send_form = SEND_PLAIN
+        else:
+            raise RuntimeError("TinyLoRa radio does not expose send/send_data")
+    elif send_form not in SEND_FORMS:
+        raise ValueError("Unsupported send form: " + str(send_form))
+
+    return RadioCapabilities(
+        send_form=send_form,
+        has_join=has_join,
+        reports_status=send_form != SEND_FRAME_COUNTER,
+        has_frame_counter=hasattr(raw_radio, "frame_counter"),
+        exposes_session=(
+            hasattr(raw_radio, "dev_addr")
+            and hasattr(raw_radio, "nwk_skey")
+            and hasattr(raw_radio, "app_skey")
+        ),
+        has_receive=callable(getattr(raw_radio, "receive", None)),
+        has_frame_counter_down=hasattr(raw_radio, "frame_counter_down"),
+        reports_data_rate=isinstance(getattr(raw_radio, "data_rate", None), int),
+    )
+
+
+def _bind_send(raw_radio: Any, send_form: str) -> Callable[[Any], bool]:
+    if send_form == SEND_PLAIN:
+        send_fn = raw_radio.send
+
+        def send(payload: Any) -> bool:
+            return bool(send_fn(payload))
+
+        return send
+
+    send_data_fn = raw_radio.send_data
+    if send_form == SEND_KEYWORD_LENGTH:
+        def send(payload: Any) -> bool:
+            return bool(send_data_fn(payload, length=len(payload)))
+    elif send_form == SEND_POSITIONAL_LENGTH:
+        def send(payload: Any) -> bool:
+            return bool(send_data_fn(payload, len(payload)))
+    else:
+        def send(payload: Any) -> bool:
+            try:
+                send_data_fn(payload, len(payload), raw_radio.frame_counter)
+            finally:
+                # TinyLoRa leaves counting to the caller; a counter is never reused.
+                raw_radio.frame_counter += 1
+            return True
+
+    return send
+
+
 class FeatherLoRaWanDriver:
-    def __init__(self, *, raw_radio: Any) -> None:
+    """Drive a TinyLoRa radio through one send callable bound at construction.
+
+    The hot path has no ``getattr`` or ``try``: a ``TypeError`` raised inside
+    the radio propagates instead of being mistaken for a signature mismatch.
+    ``session`` is the ABP session from the credentials; it lets a saved
+    session with the same keys be resumed. ``data_rate`` is the fixed rate
+    reported for radios that do not track their own.
+    """
+
+    def __init__(
+        self,
+        *,
+        raw_radio: Any,
+        send_form: str | None = None,
+        session: LoRaWanSession | None = None,
+        data_rate: int = TINYLORA_DATA_RATE,
+    ) -> None:
         self._raw_radio = raw_radio
+        self._session = session
+        self._uplink_limits = uplink_limits(data_rate)
+        self.capabilities = probe_radio_capabilities(raw_radio, send_form=send_form)
+        self._send = _bind_send(raw_radio, self.capabilities.send_form)
+
+    @property
+    def frame_counter(self) -> int | None:
+        if not self.capabilities.has_frame_counter:
+            return None
+        return self._raw_radio.frame_counter
+
+    @property
+    def frame_counter_down(self) -> int | None:
+        if not self.capabilities.has_frame_counter_down:
+            return None
+        return self._raw_radio.frame_counter_down
 
     def join(self) -> None:
-        join_fn = getattr(self._raw_radio, "join", None)
-        if callable(join_fn):
-            join_fn()
+        if self.capabilities.has_join:
+            self._raw_radio.join()
 
-    def send(self, payload: bytes) -> bool:
-        send_data_fn = getattr(self._raw_radio, "send_data", None)
-        if callable(send_data_fn):
-            try:
-                return bool(send_data_fn(payload, length=len(payload)))
-            except TypeError:
-                try:
-                    return bool(send_data_fn(payload, len(payload)))
-                except TypeError:
-                    frame_counter = int(getattr(self._raw_radio, "frame_counter", 0))
-                    return bool(send_data_fn(payload, len(payload), frame_counter))
-
-        send_fn = getattr(self._raw_radio, "send", None)
-        if callable(send_fn):
-            return bool(send_fn(payload))
+    def send(self, payload: bytes | memoryview) -> bool:
+        return self._send(payload)
 
-        raise RuntimeError("TinyLoRa radio does not expose send/send_data")
+    def receive(self) -> tuple[int, bytes] | None:
+        if not self.capabilities.has_receive:
+            return None
+        return self._raw_radio.receive()
+
+    def uplink_limits(self) -> tuple[int, int]:
+        """Return ``(data_rate, max_payload_length)`` for the next uplink."""
+        if self.capabilities.reports_data_rate:
+            return uplink_limits(self._raw_radio.data_rate)
+        return self._uplink_limits
+
+    def session(self) -> LoRaWanSession | None:
+        """Return the current session, or None when it cannot be persisted."""
+        if not self.capabilities.has_frame_counter:
+            return None
+        raw_radio = self._raw_radio
+        session = self._session
+        if session is None:
+            if not self.capabilities.exposes_session:
+                return None
+            session = LoRaWanSession(
+                dev_addr=raw_radio.dev_addr,
+                nwk_skey=raw_radio.nwk_skey,
+                app_skey=raw_radio.app_skey,
+            )
+            self._session = session
+        session.fcnt_up = raw_radio.frame_counter
+        if self.capabilities.has_frame_counter_down:
+            session.fcnt_down = raw_radio.frame_counter_down
+        return session
+
+    def resume(self, session: LoRaWanSession) -> bool:
+        """Continue ``session`` without joining; False if it does not belong to this radio."""
+        raw_radio = self._raw_radio
+        if not self.capabilities.has_frame_counter:
+            return False
+        if self._session is not None:
+            if not self._session.same_keys(session):
+                return False
+        elif self.capabilities.exposes_session:
+            raw_radio.dev_addr = session.dev_addr
+            raw_radio.nwk_skey = session.nwk_skey
+            raw_radio.app_skey = session.app_skey
+        else:
+            return False
+        raw_radio.frame_counter = session.fcnt_up
+        if self.capabilities.has_frame_counter_down:
+            raw_radio.frame_counter_down = session.fcnt_down
+        self._session = session
+        return True
 
 
 def _get_board_pin(board_module: Any, *names: str) -> Any:
@@ -110,7 +313,12 @@ def create_feather_lorawan_driver(
     *,
     credentials: TtnCredentials,
     radio_factory: Callable[..., Any] | None = None,
+    send_form: str | None = None,
 ) -> FeatherLoRaWanDriver:
     factory = radio_factory or create_tinylora_radio
     raw_radio = factory(credentials=credentials)
-    return FeatherLoRaWanDriver(raw_radio=raw_radio)
+    return FeatherLoRaWanDriver(
+        raw_radio=raw_radio,
+        send_form=send_form,
+        session=session_from_abp_credentials(credentials),
+    )
@@ -1,13 +1,76 @@
-try:
-    from typing import Protocol
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Protocol = object
+from tidegauge.calibration import CalibrationConfig, CalibrationNotSetError
+from tidegauge.compat import Protocol
+from tidegauge.ultrasonic import (
+    SPEED_TABLE_MAX_C,
+    SPEED_TABLE_MIN_C,
+    distance_m_to_echo_duration_us,
+)
+
+# The HC-SR04 raises ECHO about 0.5 ms after the trigger; clones can be slower.
+ECHO_START_TIMEOUT_US = 2_000
+HCSR04_MIN_DISTANCE_M = 0.02
+
+REJECT_NO_ECHO = "no_echo"
+REJECT_TOO_FAR = "too_far"
+REJECT_TOO_NEAR = "too_near"
 
 
 class UltrasonicTimeoutError(RuntimeError):
     """Raised when an HC-SR04 echo pulse does not arrive in time."""
 
 
+class UltrasonicGateError(UltrasonicTimeoutError):
+    """Raised when an echo falls outside the expected distance window."""
+
+
+class BurstSamplingError(RuntimeError):
+    """Raised when a burst yields fewer valid echoes than required."""
+
+
+class EchoRangeGate:
+    """Expected echo window for a sensor mounted a known distance above the water.
+
+    ``start_timeout_us`` bounds the wait for ECHO to rise after the trigger and
+    ``max_echo_us`` bounds the pulse itself, so a missed ping costs a few
+    milliseconds instead of the full 30 ms default.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_distance_m: float,
+        min_distance_m: float = HCSR04_MIN_DISTANCE_M,
+        start_timeout_us: int = ECHO_START_TIMEOUT_US,
+    ) -> None:
+        if min_distance_m < 0 or max_distance_m <= min_distance_m:
+            raise ValueError("range gate must satisfy 0 <= min < max")
+
+        # Size the window for the hottest and coldest air we compensate for.
+        self.min_echo_us = distance_m_to_echo_duration_us(min_distance_m, SPEED_TABLE_MAX_C)
+        self.max_echo_us = distance_m_to_echo_duration_us(max_distance_m, SPEED_TABLE_MIN_C)
+        self.start_timeout_us = start_timeout_us
+
+
+def range_gate_from_calibration(
+    config: CalibrationConfig,
+    *,
+    margin_m: float = 0.25,
+    min_distance_m: float = HCSR04_MIN_DISTANCE_M,
+) -> EchoRangeGate:
+    """Gate echoes to at most ``margin_m`` beyond the calibrated reference geometry."""
+    if config.geometry_reference_m is None:
+        raise CalibrationNotSetError("geometry_reference_m is not set")
+
+    return EchoRangeGate(
+        max_distance_m=float(config.geometry_reference_m) + margin_m,
+        min_distance_m=min_distance_m,
+    )
+
+
+def new_reject_counts() -> dict[str, int]:
+    return {REJECT_NO_ECHO: 0, REJECT_TOO_FAR: 0, REJECT_TOO_NEAR: 0}
+
+
 class TriggerPin(Protocol):
     def value(self, new_value: int | None = None) -> int:
         """Read or write pin value."""
@@ -37,11 +100,19 @@ class Hcsr04PulseReader:
         echo_pin: EchoPin,
         time_module: TimeModule,
         timeout_us: int = 30_000,
+        range_gate: EchoRangeGate | None = None,
     ) -> None:
         self._trigger_pin = trigger_pin
         self._echo_pin = echo_pin
         self._time = time_module
-        self._timeout_us = timeout_us
+        self._range_gate = range_gate
+        if range_gate is None:
+            self._start_timeout_us = timeout_us
+            self._end_timeout_us = timeout_us
+        else:
+            self._start_timeout_us = range_gate.start_timeout_us
+            self._end_timeout_us = range_gate.max_echo_us
+        self.reject_counts = new_reject_counts()
 
     def read_echo_duration_us(self) -> int:
         self._trigger_pin.value(0)
@@ -52,16 +123,24 @@ class Hcsr04PulseReader:
 
         wait_start_us = self._time.ticks_us()
         while self._echo_pin.value() == 0:
-            if self._elapsed_since(wait_start_us) > self._timeout_us:
+            if self._elapsed_since(wait_start_us) > self._start_timeout_us:
+                self.reject_counts[REJECT_NO_ECHO] += 1
                 raise UltrasonicTimeoutError("Timed out waiting for echo start")
 
         pulse_start_us = self._time.ticks_us()
         while self._echo_pin.value() == 1:
-            if self._elapsed_since(pulse_start_us) > self._timeout_us:
-                raise UltrasonicTimeoutError("Timed out waiting for echo end")
+            if self._elapsed_since(pulse_start_us) > self._end_timeout_us:
+                self.reject_counts[REJECT_TOO_FAR] += 1
+                if self._range_gate is None:
+                    raise UltrasonicTimeoutError("Timed out waiting for echo end")
+                raise UltrasonicGateError("Echo beyond range gate")
 
         pulse_end_us = self._time.ticks_us()
-        return self._time.ticks_diff(pulse_end_us, pulse_start_us)
+        duration_us = self._time.ticks_diff(pulse_end_us, pulse_start_us)
+        if self._range_gate is not None and duration_us < self._range_gate.min_echo_us:
+            self.reject_counts[REJECT_TOO_NEAR] += 1
+            raise UltrasonicGateError("Echo nearer than range gate")
+        return duration_us
 
     def _elapsed_since(self, start_us: int) -> int:
         now_us = self._time.ticks_us()
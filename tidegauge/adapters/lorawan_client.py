@@ -1,25 +1,64 @@
-try:
-    from typing import Protocol
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Protocol = object
+from tidegauge.compat import Any, Protocol
 
 
 class LoRaWanDriver(Protocol):
     def join(self) -> None:
         """Join the LoRaWAN network."""
 
-    def send(self, payload: bytes) -> bool:
+    def send(self, payload: bytes | memoryview) -> bool:
         """Send payload and return success."""
 
 
 class LoRaWanClientAdapter:
-    def __init__(self, *, driver: LoRaWanDriver) -> None:
+    """Join on first use, unless a saved session can be resumed.
+
+    With a ``tidegauge.lorawan_session.SessionStore``, the driver must also
+    offer ``session()``, ``resume(session)`` and ``frame_counter`` (see
+    ``FeatherLoRaWanDriver``). A session saved by an earlier boot is handed
+    to the driver at construction and the join is skipped if it accepts it.
+    ``receive`` and ``uplink_limits`` forward to the driver when it has them.
+    A driver with ``frame_counter_down`` has that counter saved after each
+    downlink, so a reset cannot reopen the window for replayed downlinks.
+    """
+
+    def __init__(self, *, driver: LoRaWanDriver, session_store: Any = None) -> None:
         self._driver = driver
+        self._session_store = session_store
+        self._receive = getattr(driver, "receive", None)
+        self._uplink_limits = getattr(driver, "uplink_limits", None)
+        self._tracks_downlinks = hasattr(driver, "frame_counter_down")
         self._is_joined = False
+        if session_store is not None:
+            session = session_store.load()
+            self._is_joined = session is not None and driver.resume(session)
 
-    def send(self, payload: bytes) -> bool:
+    def send(self, payload: bytes | memoryview) -> bool:
         if not self._is_joined:
             self._driver.join()
             self._is_joined = True
+            if self._session_store is not None:
+                session = self._driver.session()
+                if session is None:
+                    self._session_store = None
+                else:
+                    self._session_store.save(session)
+
+        sent = self._driver.send(payload)
+        if self._session_store is not None:
+            self._session_store.record_uplink(self._driver.frame_counter)
+        return sent
+
+    def receive(self) -> tuple[int, bytes] | None:
+        if self._receive is None:
+            return None
+        downlink = self._receive()
+        if downlink is not None and self._session_store is not None and self._tracks_downlinks:
+            fcnt_down = self._driver.frame_counter_down
+            if fcnt_down is not None:
+                self._session_store.record_downlink(fcnt_down)
+        return downlink
 
-        return self._driver.send(payload)
+    def uplink_limits(self) -> tuple[int, int] | None:
+        if self._uplink_limits is None:
+            return None
+        return self._uplink_limits()
@@ -0,0 +1,117 @@
+from tidegauge.adapters.hcsr04 import (
+    REJECT_NO_ECHO,
+    REJECT_TOO_FAR,
+    REJECT_TOO_NEAR,
+    EchoRangeGate,
+    TimeModule,
+    TriggerPin,
+    UltrasonicGateError,
+    UltrasonicTimeoutError,
+    new_reject_counts,
+)
+from tidegauge.compat import Any, Protocol
+
+# PulseIn reports this width when the pulse outlasted its 16-bit counter.
+PULSEIN_OVERFLOW_US = 0xFFFF
+
+
+class PulseIn(Protocol):
+    def __len__(self) -> int:
+        """Return the number of captured pulse widths."""
+
+    def popleft(self) -> int:
+        """Remove and return the oldest pulse width in microseconds."""
+
+    def clear(self) -> None:
+        """Discard captured pulse widths."""
+
+    def pause(self) -> None:
+        """Stop capturing."""
+
+    def resume(self) -> None:
+        """Start capturing."""
+
+
+class PulseInEchoReader:
+    """Time the HC-SR04 echo with ``pulseio.PulseIn`` instead of busy-waiting.
+
+    On the RP2040 ``PulseIn`` runs on a PIO state machine, so the pulse width
+    is counted in hardware at 1 us resolution and the interpreter only polls
+    for the finished capture.
+    """
+
+    def __init__(
+        self,
+        *,
+        trigger_pin: TriggerPin,
+        pulse_in: PulseIn,
+        time_module: TimeModule,
+        timeout_us: int = 30_000,
+        range_gate: EchoRangeGate | None = None,
+    ) -> None:
+        self._trigger_pin = trigger_pin
+        self._pulse_in = pulse_in
+        self._time = time_module
+        self._range_gate = range_gate
+        if range_gate is None:
+            self._capture_timeout_us = 2 * timeout_us
+            self._max_echo_us = timeout_us
+        else:
+            self._capture_timeout_us = range_gate.start_timeout_us + range_gate.max_echo_us
+            self._max_echo_us = range_gate.max_echo_us
+        self.reject_counts = new_reject_counts()
+        self._pulse_in.pause()
+
+    def read_echo_duration_us(self) -> int:
+        pulse_in = self._pulse_in
+        pulse_in.clear()
+        pulse_in.resume()
+        try:
+            self._trigger_pin.value(0)
+            self._time.sleep_us(2)
+            self._trigger_pin.value(1)
+            self._time.sleep_us(10)
+            self._trigger_pin.value(0)
+
+            # Capture completes at the falling edge: start latency plus the echo.
+            wait_start_us = self._time.ticks_us()
+            while len(pulse_in) == 0:
+                now_us = self._time.ticks_us()
+                if self._time.ticks_diff(now_us, wait_start_us) > self._capture_timeout_us:
+                    self.reject_counts[REJECT_NO_ECHO] += 1
+                    raise UltrasonicTimeoutError("Timed out waiting for echo pulse")
+            duration_us = pulse_in.popleft()
+        finally:
+            pulse_in.pause()
+
+        if duration_us >= PULSEIN_OVERFLOW_US or duration_us > self._max_echo_us:
+            self.reject_counts[REJECT_TOO_FAR] += 1
+            if self._range_gate is None:
+                raise UltrasonicTimeoutError("Timed out waiting for echo end")
+            raise UltrasonicGateError("Echo beyond range gate")
+        if self._range_gate is not None and duration_us < self._range_gate.min_echo_us:
+            self.reject_counts[REJECT_TOO_NEAR] += 1
+            raise UltrasonicGateError("Echo nearer than range gate")
+        return duration_us
+
+
+def create_pulsein_echo_reader(
+    *,
+    pulseio_module: Any,
+    board_module: Any,
+    echo_pin_id: int,
+    trigger_pin: TriggerPin,
+    time_module: TimeModule,
+    range_gate: EchoRangeGate | None = None,
+) -> PulseInEchoReader:
+    pulse_in = pulseio_module.PulseIn(
+        getattr(board_module, "D" + str(echo_pin_id)),
+        maxlen=2,
+        idle_state=False,
+    )
+    return PulseInEchoReader(
+        trigger_pin=trigger_pin,
+        pulse_in=pulse_in,
+        time_module=time_module,
+        range_gate=range_gate,
+    )
@@ -1,23 +1,31 @@
-try:
-    from typing import Protocol
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Protocol = object
+from tidegauge.compat import Protocol
 
 
 class RadioSendError(RuntimeError):
     """Raised when radio transmission fails."""
 
 
+class AirtimeBudgetExceededError(RadioSendError):
+    """Raised when a send would exceed the rolling airtime budget."""
+
+
 class LoRaClient(Protocol):
-    def send(self, payload: bytes) -> bool:
+    def send(self, payload: bytes | memoryview) -> bool:
         """Send payload and return success state."""
 
 
 class Rfm95RadioAdapter:
     def __init__(self, *, client: LoRaClient) -> None:
         self._client = client
+        self._uplink_limits = getattr(client, "uplink_limits", None)
+
+    def uplink_limits(self) -> tuple[int, int] | None:
+        """Return the client's ``(data_rate, max_payload_length)``, or None if unknown."""
+        if self._uplink_limits is None:
+            return None
+        return self._uplink_limits()
 
-    def send(self, payload: bytes) -> None:
+    def send(self, payload: bytes | memoryview) -> None:
         try:
             sent = self._client.send(payload)
         except Exception as exc:
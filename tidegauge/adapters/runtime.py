@@ -1,8 +1,6 @@
 import time
-try:
-    from typing import Protocol
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Protocol = object
+
+from tidegauge.compat import Any, Protocol
 
 
 class TimeModule(Protocol):
@@ -27,3 +25,39 @@ class SystemSleepAdapter:
 
     def sleep_s(self, seconds: int) -> None:
         self._time_module.sleep(seconds)
+
+
+class MonotonicTimeModule(Protocol):
+    def monotonic(self) -> float:
+        """Return monotonic seconds."""
+
+
+class AlarmSleepAdapter:
+    """Sleep on a CircuitPython ``alarm.time.TimeAlarm`` instead of busy ``time.sleep``.
+
+    Deep sleep resets the board on wake, so ``code.py`` starts again and all
+    in-memory state (scheduler phase, cached calibration) is rebuilt.
+    """
+
+    def __init__(
+        self,
+        *,
+        alarm_module: Any,
+        time_module: MonotonicTimeModule,
+        deep_sleep: bool = False,
+    ) -> None:
+        self._alarm = alarm_module
+        self._time_module = time_module
+        self._deep_sleep = deep_sleep
+
+    def sleep_s(self, seconds: int) -> None:
+        if seconds <= 0:
+            return
+
+        time_alarm = self._alarm.time.TimeAlarm(
+            monotonic_time=self._time_module.monotonic() + seconds
+        )
+        if self._deep_sleep:
+            self._alarm.exit_and_deep_sleep_until_alarms(time_alarm)
+        else:
+            self._alarm.light_sleep_until_alarms(time_alarm)
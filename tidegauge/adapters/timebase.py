@@ -0,0 +1,59 @@
+"""Wrapping tick counters that keep full precision for the life of the device.
+
+CircuitPython's ``time.monotonic()`` is a float: on the RP2040 it resolves about
+a millisecond after a few hours of uptime and whole seconds after a couple of
+months. Ticks here come from ``time.monotonic_ns()`` (an exact integer) or
+``supervisor.ticks_ms()`` and wrap at ``TICKS_PERIOD`` so they stay small ints
+that never allocate. Use ``ticks_diff`` rather than subtraction to compare them.
+"""
+
+from tidegauge.compat import Any
+
+# Same period as supervisor.ticks_ms() and adafruit_ticks.
+TICKS_PERIOD = 1 << 29
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD // 2
+
+
+def ticks_add(ticks: int, delta: int) -> int:
+    return (ticks + delta) % TICKS_PERIOD
+
+
+def ticks_diff(ticks1: int, ticks2: int) -> int:
+    """Return the signed distance from ``ticks2`` to ``ticks1``, handling wraparound.
+
+    Valid while the true interval is under half a period (about 4.5 minutes
+    for microsecond ticks, 3.1 days for millisecond ticks).
+    """
+    diff = (ticks1 - ticks2) & TICKS_MAX
+    return ((diff + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+
+class Timebase:
+    def __init__(self, *, time_module: Any, supervisor_module: Any = None) -> None:
+        self._time = time_module
+        self._has_monotonic_ns = hasattr(time_module, "monotonic_ns")
+        self._supervisor = supervisor_module
+
+    def ticks_us(self) -> int:
+        if self._has_monotonic_ns:
+            return (self._time.monotonic_ns() // 1_000) & TICKS_MAX
+        if self._supervisor is not None:
+            # Millisecond resolution, but it never degrades with uptime.
+            return (self._supervisor.ticks_ms() * 1_000) & TICKS_MAX
+        return int(self._time.monotonic() * 1_000_000) & TICKS_MAX
+
+    def ticks_ms(self) -> int:
+        if self._supervisor is not None:
+            return self._supervisor.ticks_ms()
+        if self._has_monotonic_ns:
+            return (self._time.monotonic_ns() // 1_000_000) & TICKS_MAX
+        return int(self._time.monotonic() * 1_000) & TICKS_MAX
+
+    def uptime_s(self) -> int:
+        if self._has_monotonic_ns:
+            return self._time.monotonic_ns() // 1_000_000_000
+        return int(self._time.monotonic())
+
+    def ticks_diff(self, current: int, start: int) -> int:
+        return ticks_diff(current, start)
@@ -1,8 +1,5 @@
-try:
-    from typing import Protocol
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Protocol = object
-
+from tidegauge.compat import Protocol
+from tidegauge.ports import TemperatureSensorPort
 from tidegauge.ultrasonic import echo_duration_us_to_distance_m
 
 
@@ -12,9 +9,34 @@ class EchoDurationReader(Protocol):
 
 
 class UltrasonicDurationAdapter:
-    def __init__(self, *, echo_reader: EchoDurationReader) -> None:
+    """Convert echo durations to distance, compensating for air temperature.
+
+    The temperature comes from ``temperature_sensor`` when one is wired, else
+    from the fixed site value ``temperature_c``; with neither, 343 m/s is used.
+    """
+
+    def __init__(
+        self,
+        *,
+        echo_reader: EchoDurationReader,
+        temperature_sensor: TemperatureSensorPort | None = None,
+        temperature_c: float | None = None,
+    ) -> None:
         self._echo_reader = echo_reader
+        self._temperature_sensor = temperature_sensor
+        self._temperature_c = temperature_c
+        self.temperature_error_count = 0
 
     def read_distance_m(self) -> float:
         echo_duration_us = self._echo_reader.read_echo_duration_us()
-        return echo_duration_us_to_distance_m(echo_duration_us)
+        return echo_duration_us_to_distance_m(echo_duration_us, self._read_temperature_c())
+
+    def _read_temperature_c(self) -> float | None:
+        if self._temperature_sensor is None:
+            return self._temperature_c
+        try:
+            return self._temperature_sensor.read_temperature_c()
+        except (OSError, RuntimeError):
+            # A flaky I2C sensor should not cost the reading.
+            self.temperature_error_count += 1
+            return self._temperature_c
@@ -1,20 +1,213 @@
-try:
-    from pathlib import Path
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Path = str
-try:
-    from typing import Callable
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    class Callable:  # type: ignore[no-redef]
-        def __class_getitem__(cls, _item):
-            return cls
-
-from tidegauge.adapters.radio import RadioSendError
-from tidegauge.app.service import SchedulerPort
+# Optional features (batching, queue, backoff, filter, health, downlinks) are
+# only named in string annotations, so a boot without them never imports them.
+from tidegauge.adapters.hcsr04 import BurstSamplingError, UltrasonicTimeoutError
+from tidegauge.adapters.radio import AirtimeBudgetExceededError, RadioSendError
 from tidegauge.calibration import CalibrationNotSetError, compute_tide_height_from_config_m
-from tidegauge.calibration_store import load_calibration_config
-from tidegauge.payload import encode_tide_height_payload
-from tidegauge.ports import RadioPort, SleepPort, UltrasonicSensorPort
+from tidegauge.calibration_store import CachedCalibrationProvider
+from tidegauge.compat import Callable, Path
+from tidegauge.payload import (
+    BACKLOG_HEADER_LENGTH,
+    BACKLOG_RECORD_LENGTH,
+    FRAME_TYPE_BATCH,
+    FRAME_TYPE_HISTORY,
+    SINGLE_READING_LENGTH,
+    decode_history_payload,
+    decode_tide_height_batch_payload,
+    decode_tide_height_payload,
+    encode_backlog_payload,
+    encode_tide_height_payload_into,
+)
+from tidegauge.ports import (
+    STAGE_CALIBRATION,
+    STAGE_ENCODE,
+    STAGE_HEIGHT,
+    STAGE_SEND,
+    STAGE_SENSOR,
+    ClockPort,
+    RadioPort,
+    SchedulerPort,
+    SleepPort,
+    StageProbe,
+    UltrasonicSensorPort,
+)
+
+
+def _send_with_retries(
+    *,
+    radio: RadioPort,
+    payload: bytes,
+    max_send_attempts: int,
+    log_fn: Callable[[str], None],
+    backoff: "ExponentialBackoff | None" = None,
+    health: "HealthMonitor | None" = None,
+) -> bool:
+    # A while loop avoids allocating a range object on every send.
+    attempt = 1
+    while attempt <= max_send_attempts:
+        if attempt > 1:
+            if health is not None:
+                health.retries += 1
+            if backoff is not None:
+                backoff.wait(attempt - 1)
+        try:
+            radio.send(payload)
+            log_fn("send ok")
+            return True
+        except AirtimeBudgetExceededError as exc:
+            log_fn("send deferred: " + str(exc))
+            return False
+        except RadioSendError as exc:
+            log_fn("send retry: " + str(exc))
+        attempt += 1
+    return False
+
+
+def _queue_unsent(*, uplink_queue: "UplinkQueue", payload: bytes, now_s: int) -> None:
+    if len(payload) == SINGLE_READING_LENGTH:
+        uplink_queue.push(timestamp_s=now_s, height_mm=decode_tide_height_payload(payload))
+        return
+    if payload[0] == FRAME_TYPE_BATCH:
+        for timestamp_s, height_mm in decode_tide_height_batch_payload(
+            payload,
+            received_at_s=now_s,
+        ):
+            uplink_queue.push(timestamp_s=timestamp_s, height_mm=height_mm)
+    elif payload[0] == FRAME_TYPE_HISTORY:
+        # Only the newest reading is new: each older one rode in an earlier frame
+        # of its own, which was either delivered or queued when it failed.
+        heights_mm = decode_history_payload(payload)[3]
+        uplink_queue.push(timestamp_s=now_s, height_mm=heights_mm[-1])
+
+
+def _queue_ready_batches(
+    *,
+    ready_payloads: list[bytes],
+    uplink_queue: "UplinkQueue",
+    now_s: int,
+) -> None:
+    for payload in ready_payloads:
+        _queue_unsent(uplink_queue=uplink_queue, payload=payload, now_s=now_s)
+    ready_payloads.clear()
+
+
+def _send_ready_batches(
+    *,
+    ready_payloads: list[bytes],
+    radio: RadioPort,
+    max_send_attempts: int,
+    log_fn: Callable[[str], None],
+    backoff: "ExponentialBackoff | None",
+    uplink_queue: "UplinkQueue | None",
+    clock: ClockPort | None,
+) -> int:
+    # Frames split off when the data rate dropped. Unsent ones are queued like the
+    # main payload, or wait for the next cycle when there is no queue.
+    sent_count = 0
+    while ready_payloads:
+        if not _send_with_retries(
+            radio=radio,
+            payload=ready_payloads[0],
+            max_send_attempts=max_send_attempts,
+            log_fn=log_fn,
+            backoff=backoff,
+        ):
+            if uplink_queue is not None:
+                _queue_ready_batches(
+                    ready_payloads=ready_payloads,
+                    uplink_queue=uplink_queue,
+                    now_s=clock.now_s(),
+                )
+            break
+        del ready_payloads[0]
+        sent_count += 1
+    return sent_count
+
+
+def _backlog_batch_size(*, limits: tuple[int, int] | None, default: int) -> int:
+    if limits is None:
+        return default
+    return max(1, min(255, (limits[1] - BACKLOG_HEADER_LENGTH) // BACKLOG_RECORD_LENGTH))
+
+
+def _drain_backlog(
+    *,
+    uplink_queue: "UplinkQueue",
+    radio: RadioPort,
+    now_s: int,
+    batch_size: int,
+    log_fn: Callable[[str], None],
+) -> bool:
+    records = uplink_queue.peek(batch_size)
+    if not records:
+        return False
+
+    try:
+        radio.send(encode_backlog_payload(now_s=now_s, records=records))
+    except RadioSendError as exc:
+        log_fn("backlog send failed: " + str(exc))
+        return False
+
+    uplink_queue.acknowledge(len(records))
+    log_fn("backlog sent=" + str(len(records)) + " depth=" + str(uplink_queue.depth))
+    return True
+
+
+def _flush_stage_timings(
+    *,
+    stage_probe: "StageTimer",
+    radio: RadioPort,
+    log_fn: Callable[[str], None],
+    verbose: bool,
+) -> bool:
+    if verbose:
+        log_fn("stage timings\n" + str(stage_probe))
+    try:
+        radio.send(stage_probe.encode_payload())
+    except RadioSendError as exc:
+        log_fn("diagnostic send failed: " + str(exc))
+        return False
+    stage_probe.reset()
+    return True
+
+
+def _send_health_report(
+    *,
+    health: "HealthMonitor",
+    radio: RadioPort,
+    log_fn: Callable[[str], None],
+) -> bool:
+    try:
+        radio.send(health.encode_payload())
+    except RadioSendError as exc:
+        # Keep the counts; the next report covers both windows.
+        log_fn("health send failed: " + str(exc))
+        return False
+    log_fn("health sent")
+    health.reset()
+    return True
+
+
+def _handle_downlinks(
+    *,
+    commands: "CommandDispatcher",
+    radio: RadioPort,
+    log_fn: Callable[[str], None],
+) -> bool:
+    # Class A devices only receive right after an uplink, so check now.
+    if commands.poll():
+        log_fn("downlink command handled")
+    ack = commands.pending_ack
+    if ack is None:
+        return False
+    try:
+        radio.send(ack)
+    except RadioSendError as exc:
+        # Keep the ack; it goes out after the next successful uplink.
+        log_fn("command ack send failed: " + str(exc))
+        return False
+    commands.pending_ack = None
+    log_fn("command ack sent")
+    return True
 
 
 def run_runtime_iterations(
@@ -25,48 +218,191 @@ def run_runtime_iterations(
     sensor: UltrasonicSensorPort,
     radio: RadioPort,
     sleeper: SleepPort,
-    sleep_seconds: int,
+    sleep_seconds: int | None,
     max_send_attempts: int = 1,
     log_fn: Callable[[str], None] | None = None,
+    calibration_provider: CachedCalibrationProvider | None = None,
+    batcher: "UplinkBatcher | RedundantHistoryEncoder | None" = None,
+    uplink_queue: "UplinkQueue | None" = None,
+    clock: ClockPort | None = None,
+    backlog_batch_size: int = 4,
+    retry_backoff: "ExponentialBackoff | None" = None,
+    height_filter: "HeightFilter | None" = None,
+    stage_probe: StageProbe | None = None,
+    health: "HealthMonitor | None" = None,
+    commands: "CommandDispatcher | None" = None,
 ) -> int:
+    # Formatting diagnostics allocates; skip it entirely when nobody listens.
+    verbose = log_fn is not None
     if log_fn is None:
         def log_fn(_msg: str) -> None:
             return None
 
-    config = load_calibration_config(path=calibration_path)
+    if uplink_queue is not None and clock is None:
+        raise ValueError("clock is required when uplink_queue is set")
+
+    if calibration_provider is None:
+        calibration_provider = CachedCalibrationProvider(path=calibration_path)
     sent_count = 0
+    payload_buffer = bytearray(SINGLE_READING_LENGTH)
+    single_payload = memoryview(payload_buffer)
+    observe_height_m = getattr(scheduler, "observe_height_m", None)
+    # Burst sensors report how many pings of the last read were valid.
+    burst_sample_count = None
+    if health is not None:
+        burst_sample_count = getattr(sensor, "sample_count", None)
+    # Radios that know their data rate report (data_rate, max_payload_length).
+    uplink_limits = getattr(radio, "uplink_limits", None)
+    if batcher is None and uplink_queue is None:
+        uplink_limits = None
+    set_max_payload_length = getattr(batcher, "set_max_payload_length", None)
+    ready_payloads = getattr(batcher, "ready_payloads", None)
 
     for _ in range(iterations):
         if scheduler.is_due():
             log_fn("cycle due")
+            if health is not None:
+                health.begin_cycle()
             try:
+                limits = None if uplink_limits is None else uplink_limits()
+                if stage_probe is not None:
+                    stage_ticks = stage_probe.mark()
+                config = calibration_provider.get()
+                if stage_probe is not None:
+                    stage_ticks = stage_probe.record(STAGE_CALIBRATION, stage_ticks)
                 measured_distance_m = sensor.read_distance_m()
-                log_fn("distance_m=" + str(measured_distance_m))
+                if burst_sample_count is not None:
+                    health.observe_burst(sensor.valid_sample_count, burst_sample_count)
+                if stage_probe is not None:
+                    stage_ticks = stage_probe.record(STAGE_SENSOR, stage_ticks)
+                if verbose:
+                    log_fn("distance_m=" + str(measured_distance_m))
                 tide_height_m = compute_tide_height_from_config_m(
                     measured_distance_m=measured_distance_m,
                     config=config,
                 )
-                log_fn("tide_height_m=" + str(tide_height_m))
-                payload = encode_tide_height_payload(tide_height_m=tide_height_m)
-                log_fn("payload=" + repr(payload))
+                if height_filter is not None:
+                    tide_height_m = height_filter.filter_m(tide_height_m)
+                if verbose:
+                    log_fn("tide_height_m=" + str(tide_height_m))
+                if observe_height_m is not None:
+                    observe_height_m(tide_height_m)
+                if stage_probe is not None:
+                    stage_ticks = stage_probe.record(STAGE_HEIGHT, stage_ticks)
+                if batcher is None:
+                    encode_tide_height_payload_into(
+                        payload_buffer,
+                        0,
+                        tide_height_m=tide_height_m,
+                    )
+                    payload = single_payload
+                else:
+                    if limits is not None and set_max_payload_length is not None:
+                        set_max_payload_length(limits[1])
+                    # A history frame is a view into the encoder's buffer, valid until
+                    # the next reading; it is sent or queued before this cycle ends.
+                    payload = batcher.add_reading_m(tide_height_m)
+                if stage_probe is not None:
+                    stage_ticks = stage_probe.record(STAGE_ENCODE, stage_ticks)
 
-                for _attempt in range(max_send_attempts):
-                    try:
-                        radio.send(payload)
+                if payload is None:
+                    if verbose:
+                        log_fn("batched readings=" + str(batcher.pending_count))
+                else:
+                    if verbose:
+                        log_fn("payload=" + repr(bytes(payload)))
+                    sent = _send_with_retries(
+                        radio=radio,
+                        payload=payload,
+                        max_send_attempts=max_send_attempts,
+                        log_fn=log_fn,
+                        backoff=retry_backoff,
+                        health=health,
+                    )
+                    if stage_probe is not None:
+                        stage_probe.record(STAGE_SEND, stage_ticks)
+                    if health is not None:
+                        if sent:
+                            health.sends += 1
+                        else:
+                            health.failures += 1
+                    if sent:
                         sent_count += 1
-                        log_fn("send ok")
-                        break
-                    except RadioSendError as exc:
-                        log_fn("send retry: " + str(exc))
-                        pass
+                        if ready_payloads:
+                            sent_count += _send_ready_batches(
+                                ready_payloads=ready_payloads,
+                                radio=radio,
+                                max_send_attempts=max_send_attempts,
+                                log_fn=log_fn,
+                                backoff=retry_backoff,
+                                uplink_queue=uplink_queue,
+                                clock=clock,
+                            )
+                        if uplink_queue is not None and _drain_backlog(
+                            uplink_queue=uplink_queue,
+                            radio=radio,
+                            now_s=clock.now_s(),
+                            batch_size=_backlog_batch_size(
+                                limits=limits,
+                                default=backlog_batch_size,
+                            ),
+                            log_fn=log_fn,
+                        ):
+                            sent_count += 1
+                        if commands is not None:
+                            if _handle_downlinks(commands=commands, radio=radio, log_fn=log_fn):
+                                sent_count += 1
+                            if commands.pending_payloads:
+                                sent_count += _send_ready_batches(
+                                    ready_payloads=commands.pending_payloads,
+                                    radio=radio,
+                                    max_send_attempts=max_send_attempts,
+                                    log_fn=log_fn,
+                                    backoff=retry_backoff,
+                                    uplink_queue=uplink_queue,
+                                    clock=clock,
+                                )
+                    elif uplink_queue is not None:
+                        now_s = clock.now_s()
+                        _queue_unsent(uplink_queue=uplink_queue, payload=payload, now_s=now_s)
+                        if ready_payloads:
+                            _queue_ready_batches(
+                                ready_payloads=ready_payloads,
+                                uplink_queue=uplink_queue,
+                                now_s=now_s,
+                            )
+                        log_fn("queued unsent depth=" + str(uplink_queue.depth))
             except CalibrationNotSetError:
+                if health is not None:
+                    health.calibration_missing += 1
                 log_fn("calibration missing")
-                pass
+            except (UltrasonicTimeoutError, BurstSamplingError) as exc:
+                if health is not None:
+                    health.sensor_timeouts += 1
+                if burst_sample_count is not None:
+                    health.observe_burst(sensor.valid_sample_count, burst_sample_count)
+                log_fn("cycle error: " + str(exc))
             except Exception as exc:
+                if health is not None:
+                    health.cycle_errors += 1
                 log_fn("cycle error: " + str(exc))
+            if stage_probe is not None and stage_probe.end_cycle():
+                if _flush_stage_timings(
+                    stage_probe=stage_probe,
+                    radio=radio,
+                    log_fn=log_fn,
+                    verbose=verbose,
+                ):
+                    sent_count += 1
+            if health is not None and health.end_cycle():
+                if _send_health_report(health=health, radio=radio, log_fn=log_fn):
+                    sent_count += 1
         else:
             log_fn("cycle not due")
 
-        sleeper.sleep_s(sleep_seconds)
+        if sleep_seconds is None:
+            sleeper.sleep_s(scheduler.seconds_until_due())
+        else:
+            sleeper.sleep_s(sleep_seconds)
 
     return sent_count
@@ -1,16 +1,6 @@
-try:
-    from typing import Protocol
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Protocol = object
-
 from tidegauge.app.pipeline import run_measurement_cycle
 from tidegauge.calibration import CalibrationConfig
-from tidegauge.ports import RadioPort, UltrasonicSensorPort
-
-
-class SchedulerPort(Protocol):
-    def is_due(self) -> bool:
-        """Return True when a measurement cycle should run."""
+from tidegauge.ports import RadioPort, SchedulerPort, UltrasonicSensorPort
 
 
 def run_cycle_if_due(
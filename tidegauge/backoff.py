@@ -0,0 +1,38 @@
+from random import random
+from time import sleep
+
+from tidegauge.compat import Callable
+
+
+class ExponentialBackoff:
+    """Delay before retry ``attempt`` (1-based): ``base_s * factor**(attempt-1)``.
+
+    The delay is capped at ``max_s`` and then scaled by a random factor in
+    ``[1 - jitter, 1]`` so gauges that failed together do not retry together.
+    ``wait`` blocks in ``sleep_fn``, never in the cycle's ``SleepPort``: a
+    deep-sleep sleeper would reset the board between two attempts of a send.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_s: float = 2.0,
+        factor: float = 2.0,
+        max_s: float = 60.0,
+        jitter: float = 0.5,
+        random_fn: Callable[[], float] = random,
+        sleep_fn: Callable[[float], None] = sleep,
+    ) -> None:
+        self._base_s = base_s
+        self._factor = factor
+        self._max_s = max_s
+        self._jitter = jitter
+        self._random_fn = random_fn
+        self._sleep_fn = sleep_fn
+
+    def delay_s(self, attempt: int) -> float:
+        delay = min(self._max_s, self._base_s * self._factor ** (attempt - 1))
+        return delay * (1 - self._jitter * self._random_fn())
+
+    def wait(self, attempt: int) -> None:
+        self._sleep_fn(self.delay_s(attempt))
@@ -0,0 +1,150 @@
+from array import array
+
+from tidegauge.compat import Callable
+from tidegauge.payload import (
+    BATCH_HEADER_LENGTH,
+    BATCH_MAX_READINGS,
+    encode_tide_height_batch_payload_into,
+    tide_height_m_to_mm,
+)
+
+
+class UplinkBatcher:
+    """Buffer up to ``max_readings`` heights and emit them as one batch frame.
+
+    A batch is flushed when it is full, when its oldest reading is at least
+    ``flush_interval_s`` old, or when the next reading cannot join it because
+    its spacing differs from the batch interval or its delta exceeds int8.
+
+    ``set_max_payload_length`` shrinks "full" to what one uplink can carry at
+    the current data rate. If the limit drops below the readings already
+    buffered, the flush splits them: ``add_reading_m`` returns the oldest
+    frame and the rest wait in ``ready_payloads``, oldest first, for the
+    caller to send and remove. At most ``max_ready_payloads`` frames wait;
+    beyond that the oldest is dropped and counted in ``dropped_payload_count``.
+    """
+
+    def __init__(
+        self,
+        *,
+        now_s: Callable[[], int],
+        max_readings: int = 10,
+        flush_interval_s: int = 600,
+        interval_tolerance_s: int = 1,
+        max_ready_payloads: int = 8,
+    ) -> None:
+        if max_readings < 1 or max_readings > BATCH_MAX_READINGS:
+            raise ValueError("max_readings must be between 1 and 255")
+        if max_ready_payloads < 1:
+            raise ValueError("max_ready_payloads must be >= 1")
+
+        self._now_s = now_s
+        self._max_readings = max_readings
+        self._capacity = max_readings
+        self._flush_interval_s = flush_interval_s
+        self._interval_tolerance_s = interval_tolerance_s
+        self._heights_mm = array("h", [0]) * max_readings
+        self._count = 0
+        self._first_at_s = 0
+        self._last_at_s = 0
+        self._interval_s = 0
+        self._sequence = 0
+        self._max_ready_payloads = max_ready_payloads
+        self.ready_payloads: list[bytes] = []
+        self.dropped_payload_count = 0
+
+    @property
+    def pending_count(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def set_max_payload_length(self, length: int) -> None:
+        """Fit future batch frames into ``length`` bytes, up to ``max_readings`` readings."""
+        self._capacity = max(1, min(self._max_readings, length - BATCH_HEADER_LENGTH + 1))
+
+    def flush(self) -> bytes | None:
+        """Emit the buffered readings now; None if there are none."""
+        if self._count == 0:
+            return None
+        return self._take_payloads(self._now_s())
+
+    def add_reading_m(self, tide_height_m: float) -> bytes | None:
+        """Buffer one reading and return a batch payload when one is ready."""
+        height_mm = tide_height_m_to_mm(tide_height_m)
+        now = self._now_s()
+
+        payload = None
+        if self._count and (
+            self._count >= self._capacity or not self._fits(height_mm, now)
+        ):
+            payload = self._take_payloads(now)
+
+        if self._count == 0:
+            self._first_at_s = now
+            self._interval_s = 0
+        elif self._count == 1:
+            self._interval_s = now - self._last_at_s
+        self._heights_mm[self._count] = height_mm
+        self._count += 1
+        self._last_at_s = now
+
+        if payload is None and (
+            self._count >= self._capacity
+            or now - self._first_at_s >= self._flush_interval_s
+        ):
+            payload = self._take_payloads(now)
+        return payload
+
+    def _fits(self, height_mm: int, now: int) -> bool:
+        delta_mm = height_mm - self._heights_mm[self._count - 1]
+        if delta_mm < -128 or delta_mm > 127:
+            return False
+        gap_s = now - self._last_at_s
+        if gap_s <= 0 or gap_s > 0xFFFF:
+            return False
+        if self._count == 1:
+            return True
+        return abs(gap_s - self._interval_s) <= self._interval_tolerance_s
+
+    def _take_payloads(self, now: int) -> bytes:
+        count = self._count
+        capacity = self._capacity
+        self._count = 0
+        if count <= capacity:
+            return self._encode(self._heights_mm, count, now - self._last_at_s)
+
+        # The limit dropped below what is buffered; this allocates, but only then.
+        first = None
+        for start in range(0, count, capacity):
+            chunk_count = min(capacity, count - start)
+            newer_count = count - start - chunk_count
+            payload = self._encode(
+                self._heights_mm[start:start + chunk_count],
+                chunk_count,
+                now - self._last_at_s + newer_count * self._interval_s,
+            )
+            if first is None:
+                first = payload
+            else:
+                if len(self.ready_payloads) >= self._max_ready_payloads:
+                    del self.ready_payloads[0]
+                    self.dropped_payload_count += 1
+                self.ready_payloads.append(payload)
+        return first
+
+    def _encode(self, heights_mm: array, count: int, age_s: int) -> bytes:
+        payload = bytearray(BATCH_HEADER_LENGTH + count - 1)
+        encode_tide_height_batch_payload_into(
+            payload,
+            0,
+            sequence=self._sequence,
+            interval_s=self._interval_s,
+            age_s=age_s,
+            heights_mm=heights_mm,
+            count=count,
+        )
+        self._sequence = (self._sequence + 1) & 0xFF
+        return bytes(payload)
@@ -1,12 +1,6 @@
-try:
-    from typing import Any, Callable
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Any = object
-    class Callable:  # type: ignore[no-redef]
-        def __class_getitem__(cls, _item):
-            return cls
-
 from tidegauge.app.runtime_loop import run_runtime_iterations
+from tidegauge.calibration_store import CachedCalibrationProvider
+from tidegauge.compat import Any, Callable
 from tidegauge.hardware import HardwareConfig, RuntimeDependencies, build_runtime_dependencies
 
 
@@ -18,17 +12,48 @@ def run_device_loop(
     hardware_config: HardwareConfig,
     calibration_path: Any,
     max_loops: int | None = None,
-    log_fn: Callable[[str], None] = print,
+    log_fn: Callable[[str], None] | None = None,
     build_dependencies: Callable[..., RuntimeDependencies] = build_runtime_dependencies,
     run_iterations: Callable[..., int] = run_runtime_iterations,
+    calibration_provider: CachedCalibrationProvider | None = None,
+    alarm_module: Any = None,
+    pulseio_module: Any = None,
+    board_module: Any = None,
+    battery_monitor: Any = None,
+    nvm: Any = None,
+    profiler: Any = None,
+    profile_log_every_loops: int = 60,
 ) -> int:
+    """Build the hardware dependencies and run the measurement loop.
+
+    Passing a ``tidegauge.heap_profile.HeapProfiler`` turns on heap profiling:
+    it takes the stage probe slot (replacing stage timing) and its report is
+    logged every ``profile_log_every_loops`` loops. The profiler module is not
+    imported here so normal boots skip it.
+
+    ``log_fn`` defaults to None so the loop skips formatting log lines;
+    pass ``print`` to watch the cycle on the serial console.
+    """
+    if calibration_provider is None:
+        calibration_provider = CachedCalibrationProvider(path=calibration_path)
+
+    # The echo range gate is sized from the geometry known at boot.
     deps = build_dependencies(
         machine_module=machine_module,
         time_module=time_module,
         lora_client=lora_client,
         config=hardware_config,
+        alarm_module=alarm_module,
+        pulseio_module=pulseio_module,
+        board_module=board_module,
+        calibration_config=calibration_provider.get(),
+        battery_monitor=battery_monitor,
+        nvm=nvm,
+        calibration_path=calibration_path,
+        calibration_provider=calibration_provider,
     )
 
+    stage_probe = deps.stage_probe if profiler is None else profiler
     sent_count_total = 0
     loop_count = 0
     while max_loops is None or loop_count < max_loops:
@@ -39,10 +64,25 @@ def run_device_loop(
             sensor=deps.sensor,
             radio=deps.radio,
             sleeper=deps.sleeper,
-            sleep_seconds=1,
+            sleep_seconds=None,
             max_send_attempts=deps.max_send_attempts,
             log_fn=log_fn,
+            calibration_provider=calibration_provider,
+            batcher=deps.batcher,
+            uplink_queue=deps.uplink_queue,
+            clock=deps.clock,
+            retry_backoff=deps.retry_backoff,
+            height_filter=deps.height_filter,
+            stage_probe=stage_probe,
+            health=deps.health,
+            commands=deps.commands,
         )
         loop_count += 1
+        if (
+            profiler is not None
+            and log_fn is not None
+            and loop_count % profile_log_every_loops == 0
+        ):
+            log_fn("heap profile\n" + str(profiler))
 
     return sent_count_total
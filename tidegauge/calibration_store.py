@@ -1,15 +1,8 @@
 import json
 import os
-try:
-    from pathlib import Path
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Path = str
-try:
-    from typing import Union
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Union = tuple
 
 from tidegauge.calibration import CalibrationConfig
+from tidegauge.compat import Path, Union
 
 
 try:
@@ -35,6 +28,39 @@ def load_calibration_config(*, path: PathValue) -> CalibrationConfig:
     )
 
 
+class CachedCalibrationProvider:
+    """Serve a parsed CalibrationConfig, re-reading the file only when it changes.
+
+    The file is stat'ed on each ``get()``; it is only opened and parsed again when
+    its size or mtime differ from the last load, or after ``invalidate()``.
+    """
+
+    def __init__(self, *, path: PathValue) -> None:
+        self._path_str = _path_str(path)
+        self._config: CalibrationConfig | None = None
+        self._signature: tuple[int, int] | None = None
+        self.reload_count = 0
+
+    def get(self) -> CalibrationConfig:
+        signature = self._stat_signature()
+        if self._config is None or signature != self._signature:
+            self._config = load_calibration_config(path=self._path_str)
+            self._signature = signature
+            self.reload_count += 1
+        return self._config
+
+    def invalidate(self) -> None:
+        self._config = None
+
+    def _stat_signature(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self._path_str)
+        except OSError:
+            return None
+        # CircuitPython returns a plain tuple: index 6 is size, 8 is mtime.
+        return (stat[6], getattr(stat, "st_mtime_ns", stat[8]))
+
+
 def save_calibration_config(*, path: PathValue, config: CalibrationConfig) -> None:
     path_str = _path_str(path)
     payload = {
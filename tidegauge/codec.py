@@ -0,0 +1,201 @@
+"""Compact codecs for sequences of millimetre readings.
+
+Both codecs store the first reading as a zig-zag varint and every following
+reading as its difference from the previous one:
+
+- varint mode: each difference is a zig-zag LEB128 varint (1 byte for +/-63 mm).
+- bit-packed mode: each difference is a two's-complement field of ``bit_width``
+  bits (4 or 6), packed MSB-first with the final byte zero-padded.
+
+The encoders write into a caller-supplied ``bytearray`` and return the number
+of bytes written, so they can run on CircuitPython without allocating.
+"""
+
+SUPPORTED_BIT_WIDTHS = (4, 6)
+
+
+def zigzag_encode(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def zigzag_decode(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_varint(buffer: bytearray, offset: int, value: int) -> int:
+    while value >= 0x80:
+        if offset >= len(buffer):
+            raise ValueError("buffer too small for encoded readings")
+        buffer[offset] = (value & 0x7F) | 0x80
+        value >>= 7
+        offset += 1
+    if offset >= len(buffer):
+        raise ValueError("buffer too small for encoded readings")
+    buffer[offset] = value
+    return offset + 1
+
+
+def encode_delta_varints_into(
+    buffer: bytearray,
+    offset: int,
+    readings_mm: list[int],
+    count: int | None = None,
+) -> int:
+    """Write ``readings_mm[:count]`` as zig-zag varint deltas; return bytes written."""
+    if count is None:
+        count = len(readings_mm)
+
+    position = offset
+    previous_mm = 0
+    for index in range(count):
+        reading_mm = readings_mm[index]
+        position = _write_varint(buffer, position, zigzag_encode(reading_mm - previous_mm))
+        previous_mm = reading_mm
+    return position - offset
+
+
+def decode_delta_varints(data: bytes, count: int | None = None) -> list[int]:
+    """Decode zig-zag varint deltas; stops after ``count`` readings if given."""
+    readings_mm: list[int] = []
+    previous_mm = 0
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous_mm += zigzag_decode(value)
+        readings_mm.append(previous_mm)
+        value = 0
+        shift = 0
+        if count is not None and len(readings_mm) == count:
+            return readings_mm
+
+    if shift or (count is not None and len(readings_mm) != count):
+        raise ValueError("truncated varint stream")
+    return readings_mm
+
+
+def decode_delta_varint_frames(frames: list[bytes]) -> list[list[int]]:
+    """Bulk-decode archived varint frames with the per-value work inlined."""
+    decoded: list[list[int]] = []
+    for frame in frames:
+        readings_mm: list[int] = []
+        append = readings_mm.append
+        previous_mm = 0
+        value = 0
+        shift = 0
+        for byte in frame:
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            previous_mm += (value >> 1) if not value & 1 else -((value + 1) >> 1)
+            append(previous_mm)
+            value = 0
+            shift = 0
+        if shift:
+            raise ValueError("truncated varint stream")
+        decoded.append(readings_mm)
+    return decoded
+
+
+def delta_bit_width(readings_mm: list[int], count: int | None = None) -> int | None:
+    """Return the smallest supported bit width that fits every delta, or None."""
+    if count is None:
+        count = len(readings_mm)
+
+    largest = 0
+    for index in range(1, count):
+        delta_mm = readings_mm[index] - readings_mm[index - 1]
+        magnitude = delta_mm if delta_mm >= 0 else -delta_mm - 1
+        if magnitude > largest:
+            largest = magnitude
+
+    for bit_width in SUPPORTED_BIT_WIDTHS:
+        if largest < 1 << (bit_width - 1):
+            return bit_width
+    return None
+
+
+def encode_delta_bitpacked_into(
+    buffer: bytearray,
+    offset: int,
+    readings_mm: list[int],
+    bit_width: int,
+    count: int | None = None,
+) -> int:
+    """Write the first reading as a varint then fixed-width deltas; return bytes written."""
+    if bit_width not in SUPPORTED_BIT_WIDTHS:
+        raise ValueError("bit_width must be 4 or 6")
+    if count is None:
+        count = len(readings_mm)
+    if count == 0:
+        return 0
+
+    position = _write_varint(buffer, offset, zigzag_encode(readings_mm[0]))
+    limit = 1 << (bit_width - 1)
+    mask = (1 << bit_width) - 1
+    accumulator = 0
+    pending_bits = 0
+    for index in range(1, count):
+        delta_mm = readings_mm[index] - readings_mm[index - 1]
+        if delta_mm < -limit or delta_mm >= limit:
+            raise ValueError("delta does not fit in " + str(bit_width) + " bits")
+        accumulator = (accumulator << bit_width) | (delta_mm & mask)
+        pending_bits += bit_width
+        while pending_bits >= 8:
+            pending_bits -= 8
+            if position >= len(buffer):
+                raise ValueError("buffer too small for encoded readings")
+            buffer[position] = (accumulator >> pending_bits) & 0xFF
+            position += 1
+        accumulator &= (1 << pending_bits) - 1
+
+    if pending_bits:
+        if position >= len(buffer):
+            raise ValueError("buffer too small for encoded readings")
+        buffer[position] = (accumulator << (8 - pending_bits)) & 0xFF
+        position += 1
+    return position - offset
+
+
+def decode_delta_bitpacked(data: bytes, count: int, bit_width: int) -> list[int]:
+    if bit_width not in SUPPORTED_BIT_WIDTHS:
+        raise ValueError("bit_width must be 4 or 6")
+    if count == 0:
+        return []
+
+    value = 0
+    shift = 0
+    position = 0
+    while True:
+        if position >= len(data):
+            raise ValueError("truncated bit-packed stream")
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+
+    readings_mm = [zigzag_decode(value)]
+    sign_bit = 1 << (bit_width - 1)
+    mask = (1 << bit_width) - 1
+    accumulator = 0
+    available_bits = 0
+    while len(readings_mm) < count:
+        if available_bits < bit_width:
+            if position >= len(data):
+                raise ValueError("truncated bit-packed stream")
+            accumulator = ((accumulator << 8) | data[position]) & 0xFFFF
+            position += 1
+            available_bits += 8
+            continue
+        available_bits -= bit_width
+        delta_mm = (accumulator >> available_bits) & mask
+        if delta_mm & sign_bit:
+            delta_mm -= 1 << bit_width
+        readings_mm.append(readings_mm[-1] + delta_mm)
+    return readings_mm
@@ -0,0 +1,21 @@
+"""Typing names and stdlib fallbacks shared by every device module.
+
+CircuitPython ships neither ``typing`` nor ``pathlib``. Importing them here,
+once, means boot pays for a single failed import instead of one per module.
+"""
+
+try:
+    from typing import Any, Callable, Protocol, Union
+except ImportError:  # pragma: no cover - CircuitPython compatibility
+    Any = object
+    Protocol = object
+    Union = tuple
+
+    class Callable:  # type: ignore[no-redef]
+        def __class_getitem__(cls, _item):
+            return cls
+
+try:
+    from pathlib import Path
+except ImportError:  # pragma: no cover - CircuitPython compatibility
+    Path = str
@@ -0,0 +1,275 @@
+"""Downlink commands that retune a deployed gauge without a site visit.
+
+Commands arrive on ``DOWNLINK_FPORT``. A downlink is a sequence number
+(uint8) followed by one or more commands, each an opcode and a fixed-size
+big-endian argument:
+
+- ``0x01`` measurement interval in seconds (uint16)
+- ``0x02`` max send attempts (uint8)
+- ``0x03`` datum offset in millimetres (int16)
+- ``0x04`` mode flags, ``MODE_*`` (uint8)
+
+Every command sets an absolute value, so applying one twice is harmless. A
+repeat of the last applied sequence number is acknowledged again but not
+re-applied; that check comes before the format check, as in the LMIC
+firmware. A downlink is validated in full before any of it is applied,
+and its outcome goes out as a command ack frame on the next uplink. The
+LMIC firmware implements the same protocol in ``downlink_commands.h``.
+"""
+
+from tidegauge.calibration import CalibrationConfig
+from tidegauge.calibration_store import (
+    CachedCalibrationProvider,
+    PathValue,
+    load_calibration_config,
+    save_calibration_config,
+)
+from tidegauge.compat import Any
+from tidegauge.payload import encode_command_ack_payload
+from tidegauge.ports import DownlinkPort
+
+DOWNLINK_FPORT = 10
+
+COMMAND_SET_INTERVAL = 0x01
+COMMAND_SET_MAX_SEND_ATTEMPTS = 0x02
+COMMAND_SET_DATUM_OFFSET = 0x03
+COMMAND_SET_MODES = 0x04
+# Argument length per opcode; index 0 is unused.
+_ARGUMENT_LENGTHS = (0, 2, 1, 2, 1)
+
+MODE_BATCHING = 0x01
+MODE_BURST = 0x02
+_KNOWN_MODES = MODE_BATCHING | MODE_BURST
+
+ACK_APPLIED = 0
+ACK_DUPLICATE = 1
+ACK_MALFORMED = 2
+ACK_UNSUPPORTED = 3
+ACK_OUT_OF_RANGE = 4
+ACK_STORE_FAILED = 5
+
+MIN_COMMAND_INTERVAL_S = 10
+MAX_COMMAND_SEND_ATTEMPTS = 10
+
+
+class DownlinkFormatError(ValueError):
+    """Raised when a downlink is not a well-formed command list."""
+
+
+def decode_downlink_commands(payload: bytes) -> tuple[int, list[tuple[int, int]]]:
+    """Return ``(sequence, [(opcode, value), ...])`` for a command downlink."""
+    if len(payload) < 2:
+        raise DownlinkFormatError("Command downlink needs a sequence and a command")
+
+    commands = []
+    offset = 1
+    while offset < len(payload):
+        opcode = payload[offset]
+        if opcode == 0 or opcode >= len(_ARGUMENT_LENGTHS):
+            raise DownlinkFormatError("Unknown command opcode: " + str(opcode))
+        length = _ARGUMENT_LENGTHS[opcode]
+        if offset + 1 + length > len(payload):
+            raise DownlinkFormatError("Truncated command argument")
+        if length == 1:
+            value = payload[offset + 1]
+        else:
+            value = (payload[offset + 1] << 8) | payload[offset + 2]
+            if opcode == COMMAND_SET_DATUM_OFFSET and value & 0x8000:
+                value -= 0x10000
+        commands.append((opcode, value))
+        offset += 1 + length
+    return payload[0], commands
+
+
+def encode_downlink_commands(
+    *,
+    sequence: int,
+    interval_s: int | None = None,
+    max_send_attempts: int | None = None,
+    datum_offset_m: float | None = None,
+    modes: int | None = None,
+) -> bytes:
+    """Build a command downlink; the host-side counterpart of the dispatcher."""
+    payload = bytearray([sequence & 0xFF])
+    if interval_s is not None:
+        payload.extend(bytes([COMMAND_SET_INTERVAL]) + int(interval_s).to_bytes(2, "big"))
+    if max_send_attempts is not None:
+        payload.extend(bytes([COMMAND_SET_MAX_SEND_ATTEMPTS, max_send_attempts]))
+    if datum_offset_m is not None:
+        datum_offset_mm = int(round(datum_offset_m * 1000))
+        payload.extend(
+            bytes([COMMAND_SET_DATUM_OFFSET]) + datum_offset_mm.to_bytes(2, "big", signed=True)
+        )
+    if modes is not None:
+        payload.extend(bytes([COMMAND_SET_MODES, modes]))
+    if len(payload) == 1:
+        raise ValueError("at least one command is required")
+    return bytes(payload)
+
+
+class CommandDispatcher:
+    """Apply downlink commands to the running gauge and hold their ack frame.
+
+    ``target`` is the ``RuntimeDependencies`` the board loop reads every
+    cycle, so a new max attempt count, batcher or sensor takes effect from
+    the next cycle. Modes switch ``target.batcher`` between ``batcher`` and
+    None, and ``target.sensor`` between ``burst_sensor`` and
+    ``single_sensor``; a mode whose component was not built is unsupported.
+    Switching batching off flushes the readings the batcher still holds into
+    ``pending_payloads``, which the runtime sends after the ack.
+    """
+
+    def __init__(
+        self,
+        *,
+        target: Any,
+        downlink: DownlinkPort,
+        interval_s: int,
+        calibration_path: PathValue | None = None,
+        calibration_provider: CachedCalibrationProvider | None = None,
+        batcher: Any = None,
+        burst_sensor: Any = None,
+        single_sensor: Any = None,
+        fport: int = DOWNLINK_FPORT,
+    ) -> None:
+        self._target = target
+        self._downlink = downlink
+        self._calibration_path = calibration_path
+        self._calibration_provider = calibration_provider
+        self._batcher = batcher
+        self._burst_sensor = burst_sensor
+        self._single_sensor = single_sensor
+        self._fport = fport
+        self.interval_s = interval_s
+        self.last_sequence: int | None = None
+        self.pending_ack: bytes | None = None
+        self.pending_payloads: list[bytes] = []
+
+    @property
+    def modes(self) -> int:
+        modes = 0
+        if self._batcher is not None and self._target.batcher is self._batcher:
+            modes |= MODE_BATCHING
+        if self._burst_sensor is not None and self._target.sensor is self._burst_sensor:
+            modes |= MODE_BURST
+        return modes
+
+    def poll(self) -> bool:
+        """Handle a downlink waiting on the command FPort; True if there was one."""
+        downlink = self._downlink.receive()
+        if downlink is None or downlink[0] != self._fport:
+            return False
+        self.handle(downlink[1])
+        return True
+
+    def handle(self, payload: bytes) -> int:
+        """Apply one command downlink, queue its ack and return the ack status."""
+        sequence = payload[0] if payload else 0
+        if len(payload) < 2:
+            status = ACK_MALFORMED
+        elif sequence == self.last_sequence:
+            status = ACK_DUPLICATE
+        else:
+            try:
+                commands = decode_downlink_commands(payload)[1]
+            except DownlinkFormatError:
+                status = ACK_MALFORMED
+            else:
+                status = self._validate(commands)
+                if status == ACK_APPLIED:
+                    status = self._apply(commands)
+                if status == ACK_APPLIED:
+                    self.last_sequence = sequence
+        self.pending_ack = self._encode_ack(sequence, status)
+        return status
+
+    def _validate(self, commands: list[tuple[int, int]]) -> int:
+        for opcode, value in commands:
+            if opcode == COMMAND_SET_INTERVAL:
+                if not hasattr(self._target.scheduler, "set_interval_s"):
+                    return ACK_UNSUPPORTED
+                if value < MIN_COMMAND_INTERVAL_S:
+                    return ACK_OUT_OF_RANGE
+            elif opcode == COMMAND_SET_MAX_SEND_ATTEMPTS:
+                if value < 1 or value > MAX_COMMAND_SEND_ATTEMPTS:
+                    return ACK_OUT_OF_RANGE
+            elif opcode == COMMAND_SET_DATUM_OFFSET:
+                if self._calibration_path is None:
+                    return ACK_UNSUPPORTED
+            elif opcode == COMMAND_SET_MODES:
+                if value & ~_KNOWN_MODES:
+                    return ACK_OUT_OF_RANGE
+                if value & MODE_BATCHING and self._batcher is None:
+                    return ACK_UNSUPPORTED
+                if value & MODE_BURST and self._burst_sensor is None:
+                    return ACK_UNSUPPORTED
+        return ACK_APPLIED
+
+    def _apply(self, commands: list[tuple[int, int]]) -> int:
+        # The calibration write is the only step that can fail; do it first
+        # so a failure leaves every other setting untouched.
+        for opcode, value in commands:
+            if opcode == COMMAND_SET_DATUM_OFFSET:
+                config = self._current_calibration()
+                try:
+                    save_calibration_config(
+                        path=self._calibration_path,
+                        config=CalibrationConfig(
+                            geometry_reference_m=config.geometry_reference_m,
+                            datum_offset_m=value / 1000,
+                        ),
+                    )
+                except OSError:
+                    # CircuitPython's filesystem is read-only unless boot.py remounts it.
+                    return ACK_STORE_FAILED
+                if self._calibration_provider is not None:
+                    self._calibration_provider.invalidate()
+
+        target = self._target
+        for opcode, value in commands:
+            if opcode == COMMAND_SET_INTERVAL:
+                target.scheduler.set_interval_s(value)
+                self.interval_s = value
+            elif opcode == COMMAND_SET_MAX_SEND_ATTEMPTS:
+                target.max_send_attempts = value
+            elif opcode == COMMAND_SET_MODES:
+                if self._batcher is not None:
+                    if not value & MODE_BATCHING and target.batcher is self._batcher:
+                        self._flush_batcher()
+                    target.batcher = self._batcher if value & MODE_BATCHING else None
+                if self._burst_sensor is not None:
+                    target.sensor = (
+                        self._burst_sensor if value & MODE_BURST else self._single_sensor
+                    )
+        return ACK_APPLIED
+
+    def _flush_batcher(self) -> None:
+        # Oldest first: frames already waiting, then the flushed batch and any split of it.
+        ready_payloads = self._batcher.ready_payloads
+        waiting = len(ready_payloads)
+        payload = self._batcher.flush()
+        self.pending_payloads.extend(ready_payloads[:waiting])
+        if payload is not None:
+            self.pending_payloads.append(payload)
+        self.pending_payloads.extend(ready_payloads[waiting:])
+        ready_payloads.clear()
+
+    def _current_calibration(self) -> CalibrationConfig:
+        if self._calibration_provider is not None:
+            return self._calibration_provider.get()
+        return load_calibration_config(path=self._calibration_path)
+
+    def _encode_ack(self, sequence: int, status: int) -> bytes:
+        datum_offset_mm = None
+        if self._calibration_path is not None:
+            datum_offset_m = self._current_calibration().datum_offset_m
+            if datum_offset_m is not None:
+                datum_offset_mm = int(round(datum_offset_m * 1000))
+        return encode_command_ack_payload(
+            sequence=sequence,
+            status=status,
+            interval_s=self.interval_s,
+            max_send_attempts=self._target.max_send_attempts,
+            modes=self.modes,
+            datum_offset_mm=datum_offset_mm,
+        )
@@ -1,13 +1,19 @@
-try:
-    from typing import Any
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Any = object
-
-from tidegauge.adapters.hcsr04 import Hcsr04PulseReader
+# Each optional feature module is imported inside the branch that enables it,
+# so boot only loads what the config turns on.
+from tidegauge.adapters.hcsr04 import (
+    HCSR04_MIN_DISTANCE_M,
+    EchoRangeGate,
+    Hcsr04PulseReader,
+    range_gate_from_calibration,
+)
 from tidegauge.adapters.radio import Rfm95RadioAdapter
-from tidegauge.adapters.runtime import SystemClockAdapter, SystemSleepAdapter
+from tidegauge.adapters.runtime import AlarmSleepAdapter, SystemClockAdapter, SystemSleepAdapter
 from tidegauge.adapters.ultrasonic import UltrasonicDurationAdapter
-from tidegauge.scheduler import MinuteScheduler
+from tidegauge.calibration import CalibrationConfig
+from tidegauge.calibration_store import CachedCalibrationProvider
+from tidegauge.compat import Any
+from tidegauge.ports import BatteryMonitorPort, SleepPort, StageProbe, TemperatureSensorPort
+from tidegauge.scheduler import AdaptiveScheduler, DeadlineScheduler
 
 
 class HardwareConfig:
@@ -18,11 +24,59 @@ class HardwareConfig:
         echo_pin_id: int,
         measurement_interval_s: int = 60,
         max_send_attempts: int = 3,
+        deep_sleep: bool = False,
+        phase_offset_s: int = 0,
+        burst_sample_count: int = 1,
+        burst_spacing_s: float = 0.06,
+        burst_method: str = "median",
+        batch_size: int = 1,
+        batch_flush_interval_s: int = 600,
+        redundancy_depth: int = 0,
+        uplink_queue_capacity: int = 0,
+        uplink_queue_path: str | None = None,
+        daily_airtime_budget_ms: int = 0,
+        spreading_factor: int = 7,
+        airtime_max_delay_s: int = 0,
+        retry_backoff_base_s: float = 0,
+        adaptive_max_interval_s: int = 0,
+        adaptive_alert_height_m: float | None = None,
+        range_gate_max_distance_m: float | None = None,
+        range_gate_min_distance_m: float = HCSR04_MIN_DISTANCE_M,
+        air_temperature_c: float | None = None,
+        height_filter_window: int = 0,
+        stage_timing: bool = False,
+        stage_timing_flush_cycles: int = 0,
+        health_report_cycles: int = 0,
+        downlink_commands: bool = False,
     ) -> None:
         self.trigger_pin_id = trigger_pin_id
         self.echo_pin_id = echo_pin_id
         self.measurement_interval_s = measurement_interval_s
         self.max_send_attempts = max_send_attempts
+        self.deep_sleep = deep_sleep
+        self.phase_offset_s = phase_offset_s
+        self.burst_sample_count = burst_sample_count
+        self.burst_spacing_s = burst_spacing_s
+        self.burst_method = burst_method
+        self.batch_size = batch_size
+        self.batch_flush_interval_s = batch_flush_interval_s
+        self.redundancy_depth = redundancy_depth
+        self.uplink_queue_capacity = uplink_queue_capacity
+        self.uplink_queue_path = uplink_queue_path
+        self.daily_airtime_budget_ms = daily_airtime_budget_ms
+        self.spreading_factor = spreading_factor
+        self.airtime_max_delay_s = airtime_max_delay_s
+        self.retry_backoff_base_s = retry_backoff_base_s
+        self.adaptive_max_interval_s = adaptive_max_interval_s
+        self.adaptive_alert_height_m = adaptive_alert_height_m
+        self.range_gate_max_distance_m = range_gate_max_distance_m
+        self.range_gate_min_distance_m = range_gate_min_distance_m
+        self.air_temperature_c = air_temperature_c
+        self.height_filter_window = height_filter_window
+        self.stage_timing = stage_timing
+        self.stage_timing_flush_cycles = stage_timing_flush_cycles
+        self.health_report_cycles = health_report_cycles
+        self.downlink_commands = downlink_commands
 
 
 class RuntimeDependencies:
@@ -31,10 +85,17 @@ class RuntimeDependencies:
         *,
         sensor: Any,
         radio: Any,
-        scheduler: MinuteScheduler,
+        scheduler: DeadlineScheduler | AdaptiveScheduler,
         clock: SystemClockAdapter,
-        sleeper: SystemSleepAdapter,
+        sleeper: SleepPort,
         max_send_attempts: int,
+        batcher: "UplinkBatcher | RedundantHistoryEncoder | None" = None,
+        uplink_queue: "UplinkQueue | None" = None,
+        retry_backoff: "ExponentialBackoff | None" = None,
+        height_filter: "HeightFilter | None" = None,
+        stage_probe: StageProbe | None = None,
+        health: "HealthMonitor | None" = None,
+        commands: "CommandDispatcher | None" = None,
     ) -> None:
         self.sensor = sensor
         self.radio = radio
@@ -42,6 +103,31 @@ class RuntimeDependencies:
         self.clock = clock
         self.sleeper = sleeper
         self.max_send_attempts = max_send_attempts
+        self.batcher = batcher
+        self.uplink_queue = uplink_queue
+        self.retry_backoff = retry_backoff
+        self.height_filter = height_filter
+        self.stage_probe = stage_probe
+        self.health = health
+        self.commands = commands
+
+
+def _build_range_gate(
+    *,
+    config: HardwareConfig,
+    calibration_config: CalibrationConfig | None,
+) -> EchoRangeGate | None:
+    if config.range_gate_max_distance_m is not None:
+        return EchoRangeGate(
+            max_distance_m=config.range_gate_max_distance_m,
+            min_distance_m=config.range_gate_min_distance_m,
+        )
+    if calibration_config is not None and calibration_config.geometry_reference_m is not None:
+        return range_gate_from_calibration(
+            calibration_config,
+            min_distance_m=config.range_gate_min_distance_m,
+        )
+    return None
 
 
 def build_runtime_dependencies(
@@ -50,30 +136,210 @@ def build_runtime_dependencies(
     time_module: Any,
     lora_client: Any,
     config: HardwareConfig,
+    alarm_module: Any = None,
+    pulseio_module: Any = None,
+    board_module: Any = None,
+    calibration_config: CalibrationConfig | None = None,
+    temperature_sensor: TemperatureSensorPort | None = None,
+    battery_monitor: BatteryMonitorPort | None = None,
+    nvm: Any = None,
+    calibration_path: Any = None,
+    calibration_provider: CachedCalibrationProvider | None = None,
 ) -> RuntimeDependencies:
     trigger_pin = machine_module.Pin(config.trigger_pin_id, machine_module.Pin.OUT)
-    echo_pin = machine_module.Pin(config.echo_pin_id, machine_module.Pin.IN)
+    range_gate = _build_range_gate(config=config, calibration_config=calibration_config)
+
+    pulse_reader = None
+    if pulseio_module is not None and board_module is not None:
+        from tidegauge.adapters.pulsein import create_pulsein_echo_reader
 
-    pulse_reader = Hcsr04PulseReader(
-        trigger_pin=trigger_pin,
-        echo_pin=echo_pin,
-        time_module=time_module,
+        try:
+            pulse_reader = create_pulsein_echo_reader(
+                pulseio_module=pulseio_module,
+                board_module=board_module,
+                echo_pin_id=config.echo_pin_id,
+                trigger_pin=trigger_pin,
+                time_module=time_module,
+                range_gate=range_gate,
+            )
+        except (AttributeError, RuntimeError, ValueError):
+            # No free PIO state machine or unsupported pin; busy-wait instead.
+            pulse_reader = None
+    if pulse_reader is None:
+        pulse_reader = Hcsr04PulseReader(
+            trigger_pin=trigger_pin,
+            echo_pin=machine_module.Pin(config.echo_pin_id, machine_module.Pin.IN),
+            time_module=time_module,
+            range_gate=range_gate,
+        )
+    sensor = UltrasonicDurationAdapter(
+        echo_reader=pulse_reader,
+        temperature_sensor=temperature_sensor,
+        temperature_c=config.air_temperature_c,
     )
-    sensor = UltrasonicDurationAdapter(echo_reader=pulse_reader)
+    single_sensor = sensor
+    if config.burst_sample_count > 1:
+        from tidegauge.adapters.burst_sampling import BurstSamplingSensor
+
+        sensor = BurstSamplingSensor(
+            sensor=sensor,
+            sleep_fn=time_module.sleep,
+            sample_count=config.burst_sample_count,
+            spacing_s=config.burst_spacing_s,
+            method=config.burst_method,
+        )
     radio = Rfm95RadioAdapter(client=lora_client)
 
     clock = SystemClockAdapter(time_module=time_module)
-    sleeper = SystemSleepAdapter(time_module=time_module)
-    scheduler = MinuteScheduler(
-        now_s=clock.now_s,
-        interval_s=config.measurement_interval_s,
-    )
+    if alarm_module is None:
+        sleeper = SystemSleepAdapter(time_module=time_module)
+    else:
+        sleeper = AlarmSleepAdapter(
+            alarm_module=alarm_module,
+            time_module=time_module,
+            deep_sleep=config.deep_sleep,
+        )
+    if config.adaptive_max_interval_s > config.measurement_interval_s:
+        scheduler = AdaptiveScheduler(
+            now_s=clock.now_s,
+            min_interval_s=config.measurement_interval_s,
+            max_interval_s=config.adaptive_max_interval_s,
+            alert_height_m=config.adaptive_alert_height_m,
+            phase_offset_s=config.phase_offset_s,
+        )
+    else:
+        scheduler = DeadlineScheduler(
+            now_s=clock.now_s,
+            interval_s=config.measurement_interval_s,
+            phase_offset_s=config.phase_offset_s,
+        )
+
+    if config.daily_airtime_budget_ms > 0:
+        from tidegauge.adapters.airtime import AirtimeBudgetRadio
+
+        radio = AirtimeBudgetRadio(
+            radio=radio,
+            now_s=clock.now_s,
+            daily_budget_ms=config.daily_airtime_budget_ms,
+            spreading_factor=config.spreading_factor,
+            # Blocking sleep: a deep-sleep sleeper would reset the board mid-send.
+            sleep_fn=time_module.sleep,
+            max_delay_s=config.airtime_max_delay_s,
+        )
+
+    retry_backoff = None
+    if config.retry_backoff_base_s > 0:
+        from tidegauge.backoff import ExponentialBackoff
+
+        retry_backoff = ExponentialBackoff(
+            base_s=config.retry_backoff_base_s,
+            sleep_fn=time_module.sleep,
+        )
+
+    if config.batch_size > 1 and config.redundancy_depth > 0:
+        raise ValueError("batch_size and redundancy_depth cannot both be enabled")
+    batcher = None
+    if config.batch_size > 1:
+        from tidegauge.batching import UplinkBatcher
+
+        batcher = UplinkBatcher(
+            now_s=clock.now_s,
+            max_readings=config.batch_size,
+            flush_interval_s=config.batch_flush_interval_s,
+        )
+    # Counted once per boot: health reports it and history frames carry it as their epoch.
+    boot_count = None
+    if nvm is not None and (config.health_report_cycles > 0 or config.redundancy_depth > 0):
+        from tidegauge.health import increment_boot_count
 
-    return RuntimeDependencies(
+        boot_count = increment_boot_count(nvm)
+
+    history_encoder = None
+    if config.redundancy_depth > 0:
+        import os
+        from tidegauge.redundancy import RedundantHistoryEncoder
+
+        history_encoder = RedundantHistoryEncoder(
+            now_s=clock.now_s,
+            depth=config.redundancy_depth,
+            # Without nvm a random epoch still tells this boot's sequence apart.
+            epoch=int.from_bytes(os.urandom(2), "big") if boot_count is None else boot_count,
+        )
+
+    height_filter = None
+    if config.height_filter_window > 0:
+        from tidegauge.height_filter import HampelFilter, HeightFilter
+
+        height_filter = HeightFilter(
+            now_s=clock.now_s,
+            hampel=HampelFilter(window_size=config.height_filter_window),
+        )
+
+    stage_probe = None
+    if config.stage_timing:
+        from tidegauge.instrumentation import StageTimer
+
+        stage_probe = StageTimer(
+            ticks_us=time_module.ticks_us,
+            ticks_diff=time_module.ticks_diff,
+            flush_every_cycles=config.stage_timing_flush_cycles,
+        )
+
+    health = None
+    if config.health_report_cycles > 0:
+        import gc
+        from tidegauge.health import HealthMonitor
+
+        health = HealthMonitor(
+            ticks_ms=time_module.ticks_ms,
+            ticks_diff=time_module.ticks_diff,
+            report_every_cycles=config.health_report_cycles,
+            mem_free=getattr(gc, "mem_free", None),
+            battery_monitor=battery_monitor,
+            reboots=0 if boot_count is None else boot_count,
+        )
+
+    uplink_queue = None
+    if config.uplink_queue_capacity > 0:
+        from tidegauge.uplink_queue import UplinkQueue
+
+        try:
+            uplink_queue = UplinkQueue(
+                capacity=config.uplink_queue_capacity,
+                path=config.uplink_queue_path,
+                now_s=clock.now_s,
+            )
+        except OSError:
+            # Filesystem is read-only to code unless boot.py remounts it.
+            uplink_queue = UplinkQueue(capacity=config.uplink_queue_capacity)
+
+    deps = RuntimeDependencies(
         sensor=sensor,
         radio=radio,
         scheduler=scheduler,
         clock=clock,
         sleeper=sleeper,
         max_send_attempts=config.max_send_attempts,
+        batcher=batcher if history_encoder is None else history_encoder,
+        uplink_queue=uplink_queue,
+        retry_backoff=retry_backoff,
+        height_filter=height_filter,
+        stage_probe=stage_probe,
+        health=health,
     )
+
+    receive = getattr(lora_client, "receive", None)
+    if config.downlink_commands and callable(receive):
+        from tidegauge.downlink import CommandDispatcher
+
+        deps.commands = CommandDispatcher(
+            target=deps,
+            downlink=lora_client,
+            interval_s=config.measurement_interval_s,
+            calibration_path=calibration_path,
+            calibration_provider=calibration_provider,
+            batcher=batcher,
+            burst_sensor=None if sensor is single_sensor else sensor,
+            single_sensor=single_sensor,
+        )
+    return deps
@@ -0,0 +1,126 @@
+"""In-memory health counters reported over LoRaWAN every N cycles.
+
+Failures the runtime used to only print to serial are counted here and sent
+as a health frame, so a gauge in the field can be diagnosed from TTN.
+"""
+
+from tidegauge.compat import Any, Callable
+from tidegauge.payload import encode_health_payload
+from tidegauge.ports import BatteryMonitorPort
+
+# Boot counter layout in microcontroller.nvm: magic byte then a uint16 count.
+BOOT_COUNT_NVM_OFFSET = 0
+BOOT_COUNT_NVM_LENGTH = 3
+_BOOT_COUNT_MAGIC = 0xB7
+
+
+def increment_boot_count(nvm: Any, *, offset: int = BOOT_COUNT_NVM_OFFSET) -> int:
+    """Count this boot in non-volatile memory and return the new total.
+
+    ``nvm`` is ``microcontroller.nvm`` on the device: unlike the filesystem it
+    stays writable from code. Uninitialised memory starts the count at 1.
+    """
+    record = nvm[offset:offset + BOOT_COUNT_NVM_LENGTH]
+    count = 0
+    if record[0] == _BOOT_COUNT_MAGIC:
+        count = (record[1] << 8) | record[2]
+    count = min(count + 1, 0xFFFF)
+    nvm[offset:offset + BOOT_COUNT_NVM_LENGTH] = bytes(
+        [_BOOT_COUNT_MAGIC, count >> 8, count & 0xFF]
+    )
+    return count
+
+
+class HealthMonitor:
+    """Count send, sensor and cycle outcomes and build the periodic health frame.
+
+    The runtime loop increments the public counters directly. ``begin_cycle``
+    and ``end_cycle`` bracket each due cycle to track the worst cycle time and
+    the ``mem_free`` low-water mark. Cycles are timed in millisecond ticks:
+    microsecond ticks wrap after 2**29 us (about 9 minutes), which a cycle
+    stuck in retries and backoff can outlast. Counters restart after every
+    report; ``reboots`` is the lifetime boot count. With burst sampling,
+    ``observe_burst`` keeps the fewest valid pings any burst in the window
+    returned, so a fouled transducer shows up before readings fail outright.
+    """
+
+    def __init__(
+        self,
+        *,
+        ticks_ms: Callable[[], int],
+        ticks_diff: Callable[[int, int], int],
+        report_every_cycles: int = 60,
+        mem_free: Callable[[], int] | None = None,
+        battery_monitor: BatteryMonitorPort | None = None,
+        reboots: int = 0,
+    ) -> None:
+        if report_every_cycles < 1:
+            raise ValueError("report_every_cycles must be >= 1")
+
+        self._ticks_ms = ticks_ms
+        self._ticks_diff = ticks_diff
+        self._report_every_cycles = report_every_cycles
+        self._mem_free = mem_free
+        self._battery_monitor = battery_monitor
+        self._cycle_start_ticks = 0
+        self.reboots = reboots
+        self.burst_sample_count = 0
+        self.cycle_count = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.sends = 0
+        self.retries = 0
+        self.failures = 0
+        self.sensor_timeouts = 0
+        self.calibration_missing = 0
+        self.cycle_errors = 0
+        self.worst_cycle_ms = 0
+        self.mem_free_low_bytes = None
+        self.burst_valid_low = None
+
+    def observe_burst(self, valid_count: int, sample_count: int) -> None:
+        self.burst_sample_count = sample_count
+        if self.burst_valid_low is None or valid_count < self.burst_valid_low:
+            self.burst_valid_low = valid_count
+
+    def begin_cycle(self) -> None:
+        self._cycle_start_ticks = self._ticks_ms()
+
+    def end_cycle(self) -> bool:
+        """Close the cycle and return True when a health report is due."""
+        cycle_ms = self._ticks_diff(self._ticks_ms(), self._cycle_start_ticks)
+        if cycle_ms > self.worst_cycle_ms:
+            self.worst_cycle_ms = cycle_ms
+        if self._mem_free is not None:
+            mem_free_bytes = self._mem_free()
+            if self.mem_free_low_bytes is None or mem_free_bytes < self.mem_free_low_bytes:
+                self.mem_free_low_bytes = mem_free_bytes
+        self.cycle_count += 1
+        return self.cycle_count % self._report_every_cycles == 0
+
+    def read_battery_mv(self) -> int | None:
+        if self._battery_monitor is None:
+            return None
+        try:
+            return self._battery_monitor.read_battery_mv()
+        except (OSError, RuntimeError, ValueError):
+            return None
+
+    def encode_payload(self) -> bytes:
+        return encode_health_payload(
+            counters=[
+                self.sends,
+                self.retries,
+                self.failures,
+                self.sensor_timeouts,
+                self.calibration_missing,
+                self.cycle_errors,
+                self.reboots,
+            ],
+            mem_free_low_bytes=self.mem_free_low_bytes,
+            worst_cycle_ms=self.worst_cycle_ms,
+            battery_mv=self.read_battery_mv(),
+            burst_valid_low=self.burst_valid_low,
+            burst_sample_count=self.burst_sample_count,
+        )
@@ -0,0 +1,177 @@
+"""Per-stage heap allocation profiling.
+
+``HeapProfiler`` plugs into the runtime loop's ``stage_probe`` hooks, but it
+reads the heap instead of the clock: each stage records how far
+``gc.mem_alloc()`` moved. On the host, ``TracemallocHeap`` supplies the same
+two readings from ``tracemalloc``, so ``profile_host_heap`` produces the same
+report against the fake ports before anything is deployed.
+"""
+
+from array import array
+
+from tidegauge.compat import Any, Callable
+from tidegauge.instrumentation import STAGE_NAMES
+
+
+class HeapProfiler:
+    """Record net bytes allocated per stage and the lowest free heap seen.
+
+    With ``collect`` set, a full collection runs when the cycle starts, which
+    is before the sensor stage, so no collection pauses the echo timing and
+    each cycle's deltas start from a clean heap. A stage whose allocation
+    count went down was interrupted by an automatic collection; it is counted
+    in ``collections`` instead of skewing the byte totals.
+    """
+
+    def __init__(
+        self,
+        *,
+        mem_alloc: Callable[[], int],
+        mem_free: Callable[[], int],
+        collect: Callable[[], Any] | None = None,
+        stage_names: tuple = STAGE_NAMES,
+    ) -> None:
+        stage_count = len(stage_names)
+        self._mem_alloc = mem_alloc
+        self._mem_free = mem_free
+        self._collect = collect
+        self.stage_names = stage_names
+        self._counts = array("L", [0]) * stage_count
+        self._total_bytes = array("q", [0]) * stage_count
+        self._max_bytes = array("l", [0]) * stage_count
+        self._collections = array("L", [0]) * stage_count
+        self.mem_free_low_bytes: int | None = None
+        self.cycle_count = 0
+
+    def mark(self) -> int:
+        if self._collect is not None:
+            self._collect()
+        return self._mem_alloc()
+
+    def record(self, stage: int, start_alloc: int) -> int:
+        now_alloc = self._mem_alloc()
+        delta_bytes = now_alloc - start_alloc
+        if delta_bytes < 0:
+            self._collections[stage] += 1
+        else:
+            self._counts[stage] += 1
+            self._total_bytes[stage] += delta_bytes
+            if delta_bytes > self._max_bytes[stage]:
+                self._max_bytes[stage] = delta_bytes
+        mem_free_bytes = self._mem_free()
+        if self.mem_free_low_bytes is None or mem_free_bytes < self.mem_free_low_bytes:
+            self.mem_free_low_bytes = mem_free_bytes
+        # Re-read so the profiler's own bookkeeping is not charged to the next stage.
+        return self._mem_alloc()
+
+    def end_cycle(self) -> bool:
+        """Count a cycle; heap reports are logged by the caller, never uplinked."""
+        self.cycle_count += 1
+        return False
+
+    def reset(self) -> None:
+        for stage in range(len(self.stage_names)):
+            self._counts[stage] = 0
+            self._total_bytes[stage] = 0
+            self._max_bytes[stage] = 0
+            self._collections[stage] = 0
+        self.mem_free_low_bytes = None
+
+    def stage_stats(self, stage: int) -> tuple[int, int, int, int]:
+        """Return ``(count, mean_bytes, max_bytes, collections)`` for a stage."""
+        count = self._counts[stage]
+        mean_bytes = self._total_bytes[stage] // count if count else 0
+        return count, mean_bytes, self._max_bytes[stage], self._collections[stage]
+
+    def summary(self) -> dict:
+        result = {}
+        for stage, name in enumerate(self.stage_names):
+            count, mean_bytes, max_bytes, collections = self.stage_stats(stage)
+            result[name] = {
+                "count": count,
+                "mean_bytes": mean_bytes,
+                "max_bytes": max_bytes,
+                "collections": collections,
+            }
+        return result
+
+    def __str__(self) -> str:
+        lines = []
+        for stage, name in enumerate(self.stage_names):
+            count, mean_bytes, max_bytes, collections = self.stage_stats(stage)
+            lines.append(
+                name
+                + " n="
+                + str(count)
+                + " mean="
+                + str(mean_bytes)
+                + " max="
+                + str(max_bytes)
+                + " B gc="
+                + str(collections)
+            )
+        lines.append("mem_free_low=" + str(self.mem_free_low_bytes))
+        return "\n".join(lines)
+
+
+def create_heap_profiler(*, gc_module: Any, collect: bool = True) -> HeapProfiler:
+    """Build a profiler over CircuitPython's ``gc.mem_alloc``/``gc.mem_free``."""
+    return HeapProfiler(
+        mem_alloc=gc_module.mem_alloc,
+        mem_free=gc_module.mem_free,
+        collect=gc_module.collect if collect else None,
+    )
+
+
+class TracemallocHeap:
+    """Host stand-in for ``gc.mem_alloc``/``gc.mem_free`` backed by ``tracemalloc``.
+
+    ``heap_size_bytes`` plays the part of the device heap so ``mem_free``
+    reads like it does on the board.
+    """
+
+    def __init__(self, *, heap_size_bytes: int = 192 * 1024) -> None:
+        import tracemalloc
+
+        self._tracemalloc = tracemalloc
+        self._heap_size_bytes = heap_size_bytes
+
+    def mem_alloc(self) -> int:
+        return self._tracemalloc.get_traced_memory()[0]
+
+    def mem_free(self) -> int:
+        return self._heap_size_bytes - self.mem_alloc()
+
+
+def profile_host_heap(
+    *,
+    iterations: int,
+    collect: bool = True,
+    heap_size_bytes: int = 192 * 1024,
+    **runtime_kwargs: Any,
+) -> HeapProfiler:
+    """Run the runtime loop under ``tracemalloc`` and return its heap profile.
+
+    ``runtime_kwargs`` are passed to ``run_runtime_iterations``, typically
+    with the fake ports from ``tidegauge.adapters.fakes``.
+    """
+    import gc
+    import tracemalloc
+
+    from tidegauge.app.runtime_loop import run_runtime_iterations
+
+    heap = TracemallocHeap(heap_size_bytes=heap_size_bytes)
+    profiler = HeapProfiler(
+        mem_alloc=heap.mem_alloc,
+        mem_free=heap.mem_free,
+        collect=gc.collect if collect else None,
+    )
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        run_runtime_iterations(iterations=iterations, stage_probe=profiler, **runtime_kwargs)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return profiler
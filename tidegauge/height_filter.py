@@ -0,0 +1,207 @@
+"""Streaming spike rejection and smoothing for tide heights.
+
+The same classes run on the device, one reading per cycle, and on the host,
+where ``refilter_distances_m`` replays archived raw distances through them so
+bulk reprocessing matches what the gauge would have sent.
+"""
+
+from array import array
+
+from tidegauge.calibration import CalibrationConfig, compute_tide_height_from_config_m
+from tidegauge.compat import Callable
+
+# Scales the median absolute deviation to a standard deviation for Gaussian noise.
+MAD_TO_SIGMA = 1.4826
+
+# M2 tide of ~2 m range: peak acceleration ~ A * omega**2 ~ 2e-8 m/s^2. The
+# white-noise acceleration density is loosened well above that so surges and
+# wind setup are still tracked within a few cycles.
+DEFAULT_ACCELERATION_NOISE_M2_PER_S3 = 1e-10
+# HC-SR04 ranging noise is a few millimetres.
+DEFAULT_MEASUREMENT_NOISE_M2 = 2.5e-5
+DEFAULT_INITIAL_RATE_VARIANCE_M2_PER_S2 = 1e-7
+
+
+def _insertion_sort(values: array, count: int) -> None:
+    for index in range(1, count):
+        value = values[index]
+        position = index
+        while position > 0 and values[position - 1] > value:
+            values[position] = values[position - 1]
+            position -= 1
+        values[position] = value
+
+
+def _median_of_sorted(values: array, count: int) -> float:
+    middle = count // 2
+    if count % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+
+class HampelFilter:
+    """Causal Hampel spike detector over the last ``window_size`` raw readings.
+
+    A reading further than ``threshold`` scaled MADs from the window median is
+    replaced by that median. Raw readings always enter the window, so a real
+    step change is accepted once it fills half the window.
+    """
+
+    def __init__(
+        self,
+        *,
+        window_size: int = 7,
+        threshold: float = 3.0,
+        min_deviation_m: float = 0.01,
+    ) -> None:
+        if window_size < 3:
+            raise ValueError("window_size must be >= 3")
+        if threshold <= 0:
+            raise ValueError("threshold must be > 0")
+
+        self._window_size = window_size
+        self._threshold = threshold
+        self._min_deviation_m = min_deviation_m
+        self._window = array("f", [0.0]) * window_size
+        self._scratch = array("f", [0.0]) * window_size
+        self._next_index = 0
+        self._count = 0
+        self.spike_count = 0
+
+    def reset(self) -> None:
+        self._next_index = 0
+        self._count = 0
+
+    def filter_m(self, height_m: float) -> float:
+        count = self._count
+        result = height_m
+        if count >= 3:
+            scratch = self._scratch
+            for index in range(count):
+                scratch[index] = self._window[index]
+            _insertion_sort(scratch, count)
+            median_m = _median_of_sorted(scratch, count)
+            for index in range(count):
+                scratch[index] = abs(scratch[index] - median_m)
+            _insertion_sort(scratch, count)
+            deviation_m = MAD_TO_SIGMA * _median_of_sorted(scratch, count)
+            if deviation_m < self._min_deviation_m:
+                deviation_m = self._min_deviation_m
+            if abs(height_m - median_m) > self._threshold * deviation_m:
+                self.spike_count += 1
+                result = median_m
+
+        self._window[self._next_index] = height_m
+        self._next_index = (self._next_index + 1) % self._window_size
+        if count < self._window_size:
+            self._count = count + 1
+        return result
+
+
+class TidalKalmanFilter:
+    """Constant-velocity Kalman filter on a single height axis.
+
+    The state is height and its rate of change, so a rising or falling tide
+    is tracked without the lag of a plain moving average. Covariances are
+    kept as three floats; there is no matrix library on the device.
+    """
+
+    def __init__(
+        self,
+        *,
+        acceleration_noise_m2_per_s3: float = DEFAULT_ACCELERATION_NOISE_M2_PER_S3,
+        measurement_noise_m2: float = DEFAULT_MEASUREMENT_NOISE_M2,
+        initial_rate_variance_m2_per_s2: float = DEFAULT_INITIAL_RATE_VARIANCE_M2_PER_S2,
+        reset_after_s: int = 6 * 3600,
+    ) -> None:
+        if measurement_noise_m2 <= 0:
+            raise ValueError("measurement_noise_m2 must be > 0")
+
+        self._q = acceleration_noise_m2_per_s3
+        self._r = measurement_noise_m2
+        self._initial_rate_variance = initial_rate_variance_m2_per_s2
+        self._reset_after_s = reset_after_s
+        self._last_s: int | None = None
+        self.height_m = 0.0
+        self.rate_m_per_s = 0.0
+        self._p_hh = 0.0
+        self._p_hr = 0.0
+        self._p_rr = 0.0
+
+    def reset(self) -> None:
+        self._last_s = None
+
+    def update(self, height_m: float, timestamp_s: int) -> float:
+        last_s = self._last_s
+        if last_s is None or timestamp_s - last_s > self._reset_after_s:
+            self.height_m = height_m
+            self.rate_m_per_s = 0.0
+            self._p_hh = self._r
+            self._p_hr = 0.0
+            self._p_rr = self._initial_rate_variance
+            self._last_s = timestamp_s
+            return height_m
+
+        dt = timestamp_s - last_s
+        if dt > 0:
+            q = self._q
+            self.height_m += self.rate_m_per_s * dt
+            p_hr_dt = self._p_hr * dt
+            self._p_hh += 2 * p_hr_dt + self._p_rr * dt * dt + q * dt * dt * dt / 3
+            self._p_hr += self._p_rr * dt + q * dt * dt / 2
+            self._p_rr += q * dt
+            self._last_s = timestamp_s
+
+        innovation_variance = self._p_hh + self._r
+        gain_h = self._p_hh / innovation_variance
+        gain_r = self._p_hr / innovation_variance
+        innovation_m = height_m - self.height_m
+        self.height_m += gain_h * innovation_m
+        self.rate_m_per_s += gain_r * innovation_m
+        self._p_rr -= gain_r * self._p_hr
+        self._p_hr -= gain_r * self._p_hh
+        self._p_hh -= gain_h * self._p_hh
+        return self.height_m
+
+
+class HeightFilter:
+    """Hampel spike rejection followed by the tidal Kalman filter."""
+
+    def __init__(
+        self,
+        *,
+        now_s: Callable[[], int],
+        hampel: HampelFilter | None = None,
+        kalman: TidalKalmanFilter | None = None,
+    ) -> None:
+        self._now_s = now_s
+        self.hampel = HampelFilter() if hampel is None else hampel
+        self.kalman = TidalKalmanFilter() if kalman is None else kalman
+
+    def filter_m(self, height_m: float) -> float:
+        return self.kalman.update(self.hampel.filter_m(height_m), self._now_s())
+
+
+def refilter_distances_m(
+    *,
+    distances_m,
+    timestamps_s,
+    config: CalibrationConfig,
+    hampel: HampelFilter | None = None,
+    kalman: TidalKalmanFilter | None = None,
+) -> list[float]:
+    """Replay archived raw distances through a fresh filter chain on the host."""
+    if len(distances_m) != len(timestamps_s):
+        raise ValueError("distances_m and timestamps_s must have the same length")
+
+    timestamp = [0]
+    height_filter = HeightFilter(now_s=lambda: timestamp[0], hampel=hampel, kalman=kalman)
+    filtered_m = []
+    for distance_m, timestamp_s in zip(distances_m, timestamps_s):
+        timestamp[0] = int(timestamp_s)
+        height_m = compute_tide_height_from_config_m(
+            measured_distance_m=float(distance_m),
+            config=config,
+        )
+        filtered_m.append(height_filter.filter_m(height_m))
+    return filtered_m
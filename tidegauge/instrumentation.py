@@ -0,0 +1,154 @@
+"""Per-stage cycle timing with fixed-size accumulators.
+
+A ``StageTimer`` is handed to the runtime loop as ``stage_probe``. Each stage
+boundary reads the tick clock once and folds the duration into preallocated
+arrays, so recording allocates nothing. Without a probe the loop only pays
+for a few ``is not None`` checks.
+"""
+
+from array import array
+
+from tidegauge.compat import Callable
+from tidegauge.payload import encode_diagnostic_payload
+from tidegauge.ports import (
+    STAGE_CALIBRATION,
+    STAGE_ENCODE,
+    STAGE_HEIGHT,
+    STAGE_SEND,
+    STAGE_SENSOR,
+)
+
+STAGE_NAMES = ("calibration", "sensor", "height", "encode", "send")
+
+# Bucket 0 holds 0 us; bucket b > 0 holds [4**(b - 1), 4**b) us; the last
+# bucket is open-ended. Twelve buckets reach about 4 s.
+HISTOGRAM_BUCKETS = 12
+
+_NO_SAMPLE_US = 0x7FFFFFFF
+
+
+def histogram_bucket(duration_us: int) -> int:
+    bucket = 0
+    limit = 1
+    last = HISTOGRAM_BUCKETS - 1
+    while duration_us >= limit and bucket < last:
+        bucket += 1
+        limit <<= 2
+    return bucket
+
+
+class StageTimer:
+    """Accumulate min/max/sum/count and a log4 histogram per stage.
+
+    ``ticks_us`` and ``ticks_diff`` follow the ``supervisor``/``Timebase``
+    convention, so wrapping tick counters are handled. ``flush_every_cycles``
+    sets how often ``end_cycle`` reports a diagnostic uplink as due.
+    """
+
+    def __init__(
+        self,
+        *,
+        ticks_us: Callable[[], int],
+        ticks_diff: Callable[[int, int], int],
+        stage_names: tuple = STAGE_NAMES,
+        flush_every_cycles: int = 0,
+    ) -> None:
+        stage_count = len(stage_names)
+        self._ticks_us = ticks_us
+        self._ticks_diff = ticks_diff
+        self.stage_names = stage_names
+        self._flush_every_cycles = flush_every_cycles
+        self._counts = array("L", [0]) * stage_count
+        self._min_us = array("l", [_NO_SAMPLE_US]) * stage_count
+        self._max_us = array("l", [0]) * stage_count
+        self._sum_us = array("q", [0]) * stage_count
+        self._histograms = array("H", [0]) * (stage_count * HISTOGRAM_BUCKETS)
+        self.cycle_count = 0
+
+    def mark(self) -> int:
+        return self._ticks_us()
+
+    def record(self, stage: int, start_ticks: int) -> int:
+        """Record the time since ``start_ticks`` and return the current ticks.
+
+        The returned ticks start the next stage, so back-to-back stages share
+        one clock read.
+        """
+        now_ticks = self._ticks_us()
+        self.record_us(stage, self._ticks_diff(now_ticks, start_ticks))
+        return now_ticks
+
+    def record_us(self, stage: int, duration_us: int) -> None:
+        if duration_us < 0:
+            duration_us = 0
+        self._counts[stage] += 1
+        self._sum_us[stage] += duration_us
+        if duration_us < self._min_us[stage]:
+            self._min_us[stage] = duration_us
+        if duration_us > self._max_us[stage]:
+            self._max_us[stage] = duration_us
+        index = stage * HISTOGRAM_BUCKETS + histogram_bucket(duration_us)
+        if self._histograms[index] < 0xFFFF:
+            self._histograms[index] += 1
+
+    def end_cycle(self) -> bool:
+        """Count a cycle and return True when a diagnostic flush is due."""
+        self.cycle_count += 1
+        return self._flush_every_cycles > 0 and self.cycle_count % self._flush_every_cycles == 0
+
+    def reset(self) -> None:
+        for stage in range(len(self.stage_names)):
+            self._counts[stage] = 0
+            self._min_us[stage] = _NO_SAMPLE_US
+            self._max_us[stage] = 0
+            self._sum_us[stage] = 0
+        for index in range(len(self._histograms)):
+            self._histograms[index] = 0
+
+    def stage_stats(self, stage: int) -> tuple[int, int, int, int]:
+        """Return ``(count, min_us, mean_us, max_us)``; all zero before any sample."""
+        count = self._counts[stage]
+        if not count:
+            return 0, 0, 0, 0
+        return count, self._min_us[stage], self._sum_us[stage] // count, self._max_us[stage]
+
+    def histogram(self, stage: int) -> list[int]:
+        start = stage * HISTOGRAM_BUCKETS
+        return list(self._histograms[start:start + HISTOGRAM_BUCKETS])
+
+    def summary(self) -> dict:
+        result = {}
+        for stage, name in enumerate(self.stage_names):
+            count, min_us, mean_us, max_us = self.stage_stats(stage)
+            result[name] = {
+                "count": count,
+                "min_us": min_us,
+                "mean_us": mean_us,
+                "max_us": max_us,
+                "histogram": self.histogram(stage),
+            }
+        return result
+
+    def encode_payload(self) -> bytes:
+        return encode_diagnostic_payload(
+            stages=[self.stage_stats(stage) for stage in range(len(self.stage_names))],
+        )
+
+    def __str__(self) -> str:
+        lines = []
+        for stage, name in enumerate(self.stage_names):
+            count, min_us, mean_us, max_us = self.stage_stats(stage)
+            lines.append(
+                name
+                + " n="
+                + str(count)
+                + " min="
+                + str(min_us)
+                + " mean="
+                + str(mean_us)
+                + " max="
+                + str(max_us)
+                + " us hist="
+                + str(self.histogram(stage))
+            )
+        return "\n".join(lines)
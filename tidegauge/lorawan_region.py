@@ -0,0 +1,35 @@
+"""US915 uplink data rates and the application payload each one allows.
+
+Values follow the LoRaWAN Regional Parameters for US915 with no repeater
+and no MAC commands in FOpts: DR0-DR3 are SF10-SF7 at 125 kHz and DR4 is
+SF8 at 500 kHz. TinyLoRa transmits at SF7BW125, which is DR3.
+"""
+
+US915_MAX_PAYLOAD_LENGTHS = (11, 53, 125, 242, 242)
+# ``(data_rate, max_payload_length)`` per data rate, prebuilt so queries allocate nothing.
+US915_UPLINK_LIMITS = tuple(
+    (data_rate, length) for data_rate, length in enumerate(US915_MAX_PAYLOAD_LENGTHS)
+)
+# ``(spreading_factor, bandwidth_hz)`` per data rate.
+US915_MODULATIONS = (
+    (10, 125_000),
+    (9, 125_000),
+    (8, 125_000),
+    (7, 125_000),
+    (8, 500_000),
+)
+TINYLORA_DATA_RATE = 3
+
+
+def uplink_limits(data_rate: int) -> tuple[int, int]:
+    """Return ``(data_rate, max_payload_length)`` for a US915 uplink data rate."""
+    if data_rate < 0 or data_rate >= len(US915_UPLINK_LIMITS):
+        raise ValueError("Unsupported US915 data rate: " + str(data_rate))
+    return US915_UPLINK_LIMITS[data_rate]
+
+
+def modulation(data_rate: int) -> tuple[int, int]:
+    """Return ``(spreading_factor, bandwidth_hz)`` for a US915 uplink data rate."""
+    if data_rate < 0 or data_rate >= len(US915_MODULATIONS):
+        raise ValueError("Unsupported US915 data rate: " + str(data_rate))
+    return US915_MODULATIONS[data_rate]
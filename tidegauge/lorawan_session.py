@@ -0,0 +1,186 @@
+"""LoRaWAN session state kept in ``microcontroller.nvm`` across resets.
+
+A saved session lets a rebooted gauge resume uplinks without a new join and
+without reusing frame counters. Two record slots follow the boot counter and
+are written alternately, so a reset during a write leaves the previous
+record intact. Slot layout:
+
+- byte 0: magic
+- bytes 1-4: generation (uint32; the higher valid generation wins)
+- bytes 5-8: DevAddr
+- bytes 9-24: NwkSKey
+- bytes 25-40: AppSKey
+- bytes 41-44: uplink frame counter, the next one to send (uint32)
+- bytes 45-48: downlink frame counter, the last one received (uint32)
+- bytes 49-50: CRC-16/CCITT over bytes 0-48
+"""
+
+from tidegauge.compat import Any
+from tidegauge.health import BOOT_COUNT_NVM_LENGTH, BOOT_COUNT_NVM_OFFSET
+from tidegauge.ttn_credentials import TtnCredentials
+
+SESSION_NVM_OFFSET = BOOT_COUNT_NVM_OFFSET + BOOT_COUNT_NVM_LENGTH
+SESSION_RECORD_LENGTH = 51
+SESSION_NVM_LENGTH = 2 * SESSION_RECORD_LENGTH
+DEFAULT_PERSIST_EVERY_FRAMES = 16
+
+_SESSION_MAGIC = 0x5E
+_CRC_OFFSET = SESSION_RECORD_LENGTH - 2
+
+
+def _crc16(data: bytes | bytearray, length: int) -> int:
+    crc = 0xFFFF
+    for index in range(length):
+        crc ^= data[index] << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+    return crc
+
+
+class LoRaWanSession:
+    def __init__(
+        self,
+        *,
+        dev_addr: bytes,
+        nwk_skey: bytes,
+        app_skey: bytes,
+        fcnt_up: int = 0,
+        fcnt_down: int = 0,
+    ) -> None:
+        if len(dev_addr) != 4:
+            raise ValueError("dev_addr must be 4 bytes")
+        if len(nwk_skey) != 16 or len(app_skey) != 16:
+            raise ValueError("session keys must be 16 bytes")
+
+        self.dev_addr = bytes(dev_addr)
+        self.nwk_skey = bytes(nwk_skey)
+        self.app_skey = bytes(app_skey)
+        self.fcnt_up = fcnt_up
+        self.fcnt_down = fcnt_down
+
+    def same_keys(self, other: "LoRaWanSession") -> bool:
+        return (
+            self.dev_addr == other.dev_addr
+            and self.nwk_skey == other.nwk_skey
+            and self.app_skey == other.app_skey
+        )
+
+
+def session_from_abp_credentials(credentials: TtnCredentials) -> LoRaWanSession | None:
+    """Build a fresh session from ABP credentials; None for OTAA credentials."""
+    if credentials.dev_addr is None or credentials.nwk_skey is None or credentials.app_skey is None:
+        return None
+    return LoRaWanSession(
+        dev_addr=bytes.fromhex(credentials.dev_addr),
+        nwk_skey=bytes.fromhex(credentials.nwk_skey),
+        app_skey=bytes.fromhex(credentials.app_skey),
+    )
+
+
+class SessionStore:
+    """Persist a ``LoRaWanSession`` in two alternating nvm slots.
+
+    Flash wears with every write, so the uplink counter is written only once
+    it has advanced ``persist_every_frames`` past the saved value. ``load``
+    adds the same amount to the restored counter, which skips every counter
+    that could have been sent since the last write, and saves the result.
+    """
+
+    def __init__(
+        self,
+        *,
+        nvm: Any,
+        offset: int = SESSION_NVM_OFFSET,
+        persist_every_frames: int = DEFAULT_PERSIST_EVERY_FRAMES,
+    ) -> None:
+        if persist_every_frames < 1:
+            raise ValueError("persist_every_frames must be >= 1")
+
+        self._nvm = nvm
+        self._offset = offset
+        self._persist_every_frames = persist_every_frames
+        self._record = bytearray(SESSION_RECORD_LENGTH)
+        self._generation = 0
+        self._next_slot = 0
+        self._saved_fcnt_up = 0
+        self.session: LoRaWanSession | None = None
+        self.write_count = 0
+
+    def load(self) -> LoRaWanSession | None:
+        best_slot = -1
+        for slot in (0, 1):
+            generation = self._read_slot(slot)
+            if generation is not None and (best_slot < 0 or generation > self._generation):
+                best_slot = slot
+                self._generation = generation
+        self._next_slot = 0 if best_slot < 0 else 1 - best_slot
+        if best_slot < 0:
+            return None
+
+        self._read_slot(best_slot)
+        record = self._record
+        session = LoRaWanSession(
+            dev_addr=bytes(record[5:9]),
+            nwk_skey=bytes(record[9:25]),
+            app_skey=bytes(record[25:41]),
+            fcnt_up=int.from_bytes(record[41:45], "big") + self._persist_every_frames,
+            fcnt_down=int.from_bytes(record[45:49], "big"),
+        )
+        self.save(session)
+        return session
+
+    def save(self, session: LoRaWanSession) -> None:
+        self._generation = (self._generation + 1) & 0xFFFFFFFF
+        record = self._record
+        record[0] = _SESSION_MAGIC
+        record[1:5] = self._generation.to_bytes(4, "big")
+        record[5:9] = session.dev_addr
+        record[9:25] = session.nwk_skey
+        record[25:41] = session.app_skey
+        record[41:45] = (session.fcnt_up & 0xFFFFFFFF).to_bytes(4, "big")
+        record[45:49] = (session.fcnt_down & 0xFFFFFFFF).to_bytes(4, "big")
+        crc = _crc16(record, _CRC_OFFSET)
+        record[_CRC_OFFSET] = crc >> 8
+        record[_CRC_OFFSET + 1] = crc & 0xFF
+        start = self._offset + self._next_slot * SESSION_RECORD_LENGTH
+        self._nvm[start:start + SESSION_RECORD_LENGTH] = record
+        self._next_slot = 1 - self._next_slot
+        self._saved_fcnt_up = session.fcnt_up
+        self.session = session
+        self.write_count += 1
+
+    def record_uplink(self, fcnt_up: int) -> None:
+        """Note the next uplink counter and save it once it is far enough ahead."""
+        session = self.session
+        if session is None:
+            return
+        session.fcnt_up = fcnt_up
+        if fcnt_up - self._saved_fcnt_up >= self._persist_every_frames:
+            self.save(session)
+
+    def record_downlink(self, fcnt_down: int) -> None:
+        """Save a newer downlink counter at once; downlinks are rare and replays must stay rejected."""
+        session = self.session
+        if session is None or fcnt_down <= session.fcnt_down:
+            return
+        session.fcnt_down = fcnt_down
+        self.save(session)
+
+    def clear(self) -> None:
+        self._nvm[self._offset:self._offset + SESSION_NVM_LENGTH] = bytes(SESSION_NVM_LENGTH)
+        self._generation = 0
+        self._next_slot = 0
+        self.session = None
+
+    def _read_slot(self, slot: int) -> int | None:
+        start = self._offset + slot * SESSION_RECORD_LENGTH
+        record = self._record
+        record[:] = self._nvm[start:start + SESSION_RECORD_LENGTH]
+        if record[0] != _SESSION_MAGIC:
+            return None
+        if _crc16(record, _CRC_OFFSET) != (record[_CRC_OFFSET] << 8) | record[_CRC_OFFSET + 1]:
+            return None
+        return int.from_bytes(record[1:5], "big")
@@ -1,12 +1,5 @@
-try:
-    from typing import Any, Callable
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Any = object
-    class Callable:  # type: ignore[no-redef]
-        def __class_getitem__(cls, _item):
-            return cls
-
 from tidegauge.board import run_device_loop
+from tidegauge.compat import Any, Callable
 from tidegauge.hardware import HardwareConfig
 
 
@@ -22,12 +15,59 @@ def run_main(
     max_send_attempts: int = 3,
     max_loops: int | None = None,
     run_device_loop_fn: Callable[..., int] = run_device_loop,
+    log_fn: Callable[[str], None] | None = None,
+    alarm_module: Any = None,
+    pulseio_module: Any = None,
+    board_module: Any = None,
+    battery_monitor: Any = None,
+    nvm: Any = None,
+    profiler: Any = None,
+    deep_sleep: bool = False,
+    phase_offset_s: int = 0,
+    burst_sample_count: int = 1,
+    batch_size: int = 1,
+    batch_flush_interval_s: int = 600,
+    redundancy_depth: int = 0,
+    uplink_queue_capacity: int = 0,
+    uplink_queue_path: str | None = None,
+    daily_airtime_budget_ms: int = 0,
+    airtime_max_delay_s: int = 0,
+    retry_backoff_base_s: float = 0,
+    adaptive_max_interval_s: int = 0,
+    adaptive_alert_height_m: float | None = None,
+    range_gate_max_distance_m: float | None = None,
+    air_temperature_c: float | None = None,
+    height_filter_window: int = 0,
+    stage_timing: bool = False,
+    stage_timing_flush_cycles: int = 0,
+    health_report_cycles: int = 0,
+    downlink_commands: bool = False,
 ) -> int:
     hardware_config = HardwareConfig(
         trigger_pin_id=trigger_pin_id,
         echo_pin_id=echo_pin_id,
         measurement_interval_s=measurement_interval_s,
         max_send_attempts=max_send_attempts,
+        deep_sleep=deep_sleep,
+        phase_offset_s=phase_offset_s,
+        burst_sample_count=burst_sample_count,
+        batch_size=batch_size,
+        batch_flush_interval_s=batch_flush_interval_s,
+        redundancy_depth=redundancy_depth,
+        uplink_queue_capacity=uplink_queue_capacity,
+        uplink_queue_path=uplink_queue_path,
+        daily_airtime_budget_ms=daily_airtime_budget_ms,
+        airtime_max_delay_s=airtime_max_delay_s,
+        retry_backoff_base_s=retry_backoff_base_s,
+        adaptive_max_interval_s=adaptive_max_interval_s,
+        adaptive_alert_height_m=adaptive_alert_height_m,
+        range_gate_max_distance_m=range_gate_max_distance_m,
+        air_temperature_c=air_temperature_c,
+        height_filter_window=height_filter_window,
+        stage_timing=stage_timing,
+        stage_timing_flush_cycles=stage_timing_flush_cycles,
+        health_report_cycles=health_report_cycles,
+        downlink_commands=downlink_commands,
     )
     return run_device_loop_fn(
         machine_module=machine_module,
@@ -36,4 +76,11 @@ def run_main(
         hardware_config=hardware_config,
         calibration_path=calibration_path,
         max_loops=max_loops,
+        log_fn=log_fn,
+        alarm_module=alarm_module,
+        pulseio_module=pulseio_module,
+        board_module=board_module,
+        battery_monitor=battery_monitor,
+        nvm=nvm,
+        profiler=profiler,
     )
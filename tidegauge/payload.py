@@ -1,8 +1,446 @@
-def encode_tide_height_payload(*, tide_height_m: float) -> bytes:
-    """Encode tide height as signed millimeters, big-endian int16."""
+"""Uplink payload encoders and host-side reference decoders.
+
+Besides the legacy 2-byte single reading, uplinks may be typed frames: the
+first byte is a ``FRAME_TYPE_*`` tag and every typed frame is at least
+``MIN_TYPED_FRAME_LENGTH`` bytes, so a decoder can tell them apart from the
+2-byte Python frame and the 6-byte LMIC frame on the same FPort.
+"""
+
+from tidegauge.codec import decode_delta_varints, encode_delta_varints_into
+
+FRAME_TYPE_BATCH = 0x01
+FRAME_TYPE_BACKLOG = 0x02
+FRAME_TYPE_DIAGNOSTIC = 0x03
+FRAME_TYPE_HEALTH = 0x04
+FRAME_TYPE_COMMAND_ACK = 0x05
+FRAME_TYPE_HISTORY = 0x06
+
+SINGLE_READING_LENGTH = 2
+MIN_TYPED_FRAME_LENGTH = 7
+BATCH_HEADER_LENGTH = 9
+BATCH_MAX_READINGS = 255
+BACKLOG_HEADER_LENGTH = 2
+BACKLOG_RECORD_LENGTH = 6
+DIAGNOSTIC_HEADER_LENGTH = 2
+DIAGNOSTIC_STAGE_LENGTH = 8
+DIAGNOSTIC_UNIT_US = 100
+HEALTH_FRAME_LENGTH = 25
+HEALTH_COUNTER_FIELDS = (
+    "sends",
+    "retries",
+    "failures",
+    "sensor_timeouts",
+    "calibration_missing",
+    "cycle_errors",
+    "reboots",
+)
+HEALTH_UNKNOWN_MEM_FREE = 0xFFFFFFFF
+HEALTH_UNKNOWN_BURST_VALID = 0xFF
+COMMAND_ACK_LENGTH = 9
+COMMAND_ACK_UNKNOWN_DATUM = -0x8000
+HISTORY_HEADER_LENGTH = 8
+HISTORY_MAX_READINGS = 255
+# A zig-zag varint of any int16 height or of the change between two fits in 3 bytes.
+HISTORY_MAX_READING_LENGTH = 3
+
+
+def tide_height_m_to_mm(tide_height_m: float) -> int:
     tide_height_mm = int(round(tide_height_m * 1000))
 
     if tide_height_mm < -32768 or tide_height_mm > 32767:
         raise ValueError("tide_height_m out of encodable range")
 
-    return tide_height_mm.to_bytes(2, byteorder="big", signed=True)
+    return tide_height_mm
+
+
+def encode_tide_height_payload(*, tide_height_m: float) -> bytes:
+    """Encode tide height as signed millimeters, big-endian int16."""
+    return tide_height_m_to_mm(tide_height_m).to_bytes(2, byteorder="big", signed=True)
+
+
+def encode_tide_height_payload_into(
+    buffer: bytearray,
+    offset: int,
+    *,
+    tide_height_m: float,
+) -> int:
+    """Write the 2-byte single-reading frame into ``buffer`` and return its length.
+
+    Lets the runtime reuse one buffer every cycle instead of allocating.
+    """
+    _write_i16(buffer, offset, tide_height_m_to_mm(tide_height_m))
+    return SINGLE_READING_LENGTH
+
+
+def decode_tide_height_payload(payload: bytes) -> int:
+    """Return the signed millimetre height held in a 2-byte single-reading frame."""
+    if len(payload) != 2:
+        raise ValueError("Not a single-reading frame")
+    return _read_i16(payload, 0)
+
+
+def encode_tide_height_batch_payload(
+    *,
+    sequence: int,
+    interval_s: int,
+    age_s: int,
+    heights_mm: list[int],
+) -> bytes:
+    """Encode evenly spaced readings as a base height plus int8 deltas.
+
+    Layout: type, sequence (uint8), count (uint8), interval_s (uint16),
+    age_s of the newest reading (uint16), first height (int16), then one
+    signed byte per following reading holding the change from its predecessor.
+    """
+    payload = bytearray(BATCH_HEADER_LENGTH + max(len(heights_mm), 1) - 1)
+    encode_tide_height_batch_payload_into(
+        payload,
+        0,
+        sequence=sequence,
+        interval_s=interval_s,
+        age_s=age_s,
+        heights_mm=heights_mm,
+    )
+    return bytes(payload)
+
+
+def encode_tide_height_batch_payload_into(
+    buffer: bytearray,
+    offset: int,
+    *,
+    sequence: int,
+    interval_s: int,
+    age_s: int,
+    heights_mm: list[int],
+    count: int | None = None,
+) -> int:
+    """Write a batch frame of the first ``count`` heights and return its length."""
+    if count is None:
+        count = len(heights_mm)
+    if count < 1 or count > BATCH_MAX_READINGS:
+        raise ValueError("batch must hold 1-255 readings")
+
+    buffer[offset] = FRAME_TYPE_BATCH
+    buffer[offset + 1] = sequence & 0xFF
+    buffer[offset + 2] = count
+    _write_u16(buffer, offset + 3, _clamp_u16(interval_s))
+    _write_u16(buffer, offset + 5, _clamp_u16(age_s))
+    _write_i16(buffer, offset + 7, heights_mm[0])
+
+    previous_mm = heights_mm[0]
+    for index in range(1, count):
+        delta_mm = heights_mm[index] - previous_mm
+        if delta_mm < -128 or delta_mm > 127:
+            raise ValueError("batch delta out of int8 range")
+        buffer[offset + BATCH_HEADER_LENGTH + index - 1] = delta_mm & 0xFF
+        previous_mm = heights_mm[index]
+
+    return BATCH_HEADER_LENGTH + count - 1
+
+
+def decode_tide_height_batch_payload(
+    payload: bytes,
+    *,
+    received_at_s: int,
+) -> list[tuple[int, int]]:
+    """Expand a batch frame into ``(timestamp_s, tide_height_mm)`` pairs."""
+    if len(payload) < BATCH_HEADER_LENGTH or payload[0] != FRAME_TYPE_BATCH:
+        raise ValueError("Not a tide height batch frame")
+
+    count = payload[2]
+    if len(payload) != BATCH_HEADER_LENGTH + count - 1:
+        raise ValueError("Batch frame length does not match reading count")
+
+    interval_s = _read_u16(payload, 3)
+    age_s = _read_u16(payload, 5)
+    height_mm = _read_i16(payload, 7)
+    newest_at_s = received_at_s - age_s
+
+    samples = [(newest_at_s - (count - 1) * interval_s, height_mm)]
+    for index in range(1, count):
+        delta_mm = payload[BATCH_HEADER_LENGTH + index - 1]
+        if delta_mm & 0x80:
+            delta_mm -= 0x100
+        height_mm += delta_mm
+        samples.append((newest_at_s - (count - 1 - index) * interval_s, height_mm))
+    return samples
+
+
+def encode_backlog_payload(*, now_s: int, records: list[tuple[int, int]]) -> bytes:
+    """Encode queued ``(timestamp_s, tide_height_mm)`` readings for re-delivery.
+
+    Layout: type, count (uint8), then per reading its age in seconds at send
+    time (uint32) and its height (int16). Future timestamps encode as age 0.
+    """
+    count = len(records)
+    if count < 1 or count > 255:
+        raise ValueError("backlog must hold 1-255 readings")
+
+    payload = bytearray(BACKLOG_HEADER_LENGTH + count * BACKLOG_RECORD_LENGTH)
+    payload[0] = FRAME_TYPE_BACKLOG
+    payload[1] = count
+    offset = BACKLOG_HEADER_LENGTH
+    for timestamp_s, height_mm in records:
+        age_s = max(0, min(0xFFFFFFFF, now_s - timestamp_s))
+        payload[offset:offset + 4] = age_s.to_bytes(4, "big")
+        payload[offset + 4:offset + 6] = height_mm.to_bytes(2, "big", signed=True)
+        offset += BACKLOG_RECORD_LENGTH
+    return bytes(payload)
+
+
+def decode_backlog_payload(
+    payload: bytes,
+    *,
+    received_at_s: int,
+) -> list[tuple[int, int]]:
+    """Expand a backlog frame into ``(timestamp_s, tide_height_mm)`` pairs."""
+    if len(payload) < BACKLOG_HEADER_LENGTH or payload[0] != FRAME_TYPE_BACKLOG:
+        raise ValueError("Not a backlog frame")
+
+    count = payload[1]
+    if len(payload) != BACKLOG_HEADER_LENGTH + count * BACKLOG_RECORD_LENGTH:
+        raise ValueError("Backlog frame length does not match reading count")
+
+    samples = []
+    offset = BACKLOG_HEADER_LENGTH
+    for _ in range(count):
+        age_s = (_read_u16(payload, offset) << 16) | _read_u16(payload, offset + 2)
+        samples.append((received_at_s - age_s, _read_i16(payload, offset + 4)))
+        offset += BACKLOG_RECORD_LENGTH
+    return samples
+
+
+def encode_diagnostic_payload(
+    *,
+    stages: list[tuple[int, int, int, int]],
+) -> bytes:
+    """Encode per-stage ``(count, min_us, mean_us, max_us)`` timing summaries.
+
+    Layout: type, stage count, then per stage its sample count, minimum, mean
+    and maximum (uint16 each). Durations are in ``DIAGNOSTIC_UNIT_US`` units
+    and saturate at 65535, so one frame covers 0.1 ms to 6.5 s.
+    """
+    count = len(stages)
+    if count < 1 or count > 255:
+        raise ValueError("diagnostic frame must hold 1-255 stages")
+
+    payload = bytearray(DIAGNOSTIC_HEADER_LENGTH + count * DIAGNOSTIC_STAGE_LENGTH)
+    payload[0] = FRAME_TYPE_DIAGNOSTIC
+    payload[1] = count
+    offset = DIAGNOSTIC_HEADER_LENGTH
+    for sample_count, min_us, mean_us, max_us in stages:
+        _write_u16(payload, offset, _clamp_u16(sample_count))
+        _write_u16(payload, offset + 2, _clamp_u16(_to_diagnostic_units(min_us)))
+        _write_u16(payload, offset + 4, _clamp_u16(_to_diagnostic_units(mean_us)))
+        _write_u16(payload, offset + 6, _clamp_u16(_to_diagnostic_units(max_us)))
+        offset += DIAGNOSTIC_STAGE_LENGTH
+    return bytes(payload)
+
+
+def decode_diagnostic_payload(payload: bytes) -> list[tuple[int, int, int, int]]:
+    """Return ``(count, min_us, mean_us, max_us)`` per stage from a diagnostic frame."""
+    if len(payload) < DIAGNOSTIC_HEADER_LENGTH or payload[0] != FRAME_TYPE_DIAGNOSTIC:
+        raise ValueError("Not a diagnostic frame")
+
+    count = payload[1]
+    if len(payload) != DIAGNOSTIC_HEADER_LENGTH + count * DIAGNOSTIC_STAGE_LENGTH:
+        raise ValueError("Diagnostic frame length does not match stage count")
+
+    stages = []
+    offset = DIAGNOSTIC_HEADER_LENGTH
+    for _ in range(count):
+        stages.append(
+            (
+                _read_u16(payload, offset),
+                _read_u16(payload, offset + 2) * DIAGNOSTIC_UNIT_US,
+                _read_u16(payload, offset + 4) * DIAGNOSTIC_UNIT_US,
+                _read_u16(payload, offset + 6) * DIAGNOSTIC_UNIT_US,
+            )
+        )
+        offset += DIAGNOSTIC_STAGE_LENGTH
+    return stages
+
+
+def encode_health_payload(
+    *,
+    counters: list[int],
+    mem_free_low_bytes: int | None,
+    worst_cycle_ms: int,
+    battery_mv: int | None,
+    burst_valid_low: int | None = None,
+    burst_sample_count: int = 0,
+) -> bytes:
+    """Encode the health report.
+
+    Layout: type, then the ``HEALTH_COUNTER_FIELDS`` counters (uint16 each,
+    saturating), the lowest ``gc.mem_free()`` seen (uint32, all ones when
+    unknown), the worst cycle time in ms (uint16), the battery voltage in
+    mV (uint16, 0 when unknown), the fewest valid pings in one burst (uint8,
+    0xFF when no burst ran) and the pings per burst (uint8, 0 without burst
+    sampling).
+    """
+    if len(counters) != len(HEALTH_COUNTER_FIELDS):
+        raise ValueError("health frame needs one value per counter field")
+
+    payload = bytearray(HEALTH_FRAME_LENGTH)
+    payload[0] = FRAME_TYPE_HEALTH
+    offset = 1
+    for value in counters:
+        _write_u16(payload, offset, _clamp_u16(value))
+        offset += 2
+    if mem_free_low_bytes is None:
+        mem_free_low_bytes = HEALTH_UNKNOWN_MEM_FREE
+    mem_free_low_bytes = max(0, min(HEALTH_UNKNOWN_MEM_FREE, mem_free_low_bytes))
+    _write_u16(payload, offset, mem_free_low_bytes >> 16)
+    _write_u16(payload, offset + 2, mem_free_low_bytes & 0xFFFF)
+    _write_u16(payload, offset + 4, _clamp_u16(worst_cycle_ms))
+    _write_u16(payload, offset + 6, _clamp_u16(0 if battery_mv is None else battery_mv))
+    if burst_valid_low is None:
+        burst_valid_low = HEALTH_UNKNOWN_BURST_VALID
+    payload[offset + 8] = max(0, min(HEALTH_UNKNOWN_BURST_VALID, burst_valid_low))
+    payload[offset + 9] = max(0, min(0xFF, burst_sample_count))
+    return bytes(payload)
+
+
+def decode_health_payload(payload: bytes) -> dict:
+    """Return the health report fields by name; unknown values decode as None."""
+    if len(payload) != HEALTH_FRAME_LENGTH or payload[0] != FRAME_TYPE_HEALTH:
+        raise ValueError("Not a health frame")
+
+    report = {}
+    offset = 1
+    for name in HEALTH_COUNTER_FIELDS:
+        report[name] = _read_u16(payload, offset)
+        offset += 2
+    mem_free_low_bytes = (_read_u16(payload, offset) << 16) | _read_u16(payload, offset + 2)
+    battery_mv = _read_u16(payload, offset + 6)
+    report["mem_free_low_bytes"] = (
+        None if mem_free_low_bytes == HEALTH_UNKNOWN_MEM_FREE else mem_free_low_bytes
+    )
+    report["worst_cycle_ms"] = _read_u16(payload, offset + 4)
+    report["battery_mv"] = battery_mv or None
+    burst_valid_low = payload[offset + 8]
+    report["burst_valid_low"] = (
+        None if burst_valid_low == HEALTH_UNKNOWN_BURST_VALID else burst_valid_low
+    )
+    report["burst_sample_count"] = payload[offset + 9]
+    return report
+
+
+def encode_command_ack_payload(
+    *,
+    sequence: int,
+    status: int,
+    interval_s: int,
+    max_send_attempts: int,
+    modes: int,
+    datum_offset_mm: int | None,
+) -> bytes:
+    """Encode the acknowledgement of a downlink command.
+
+    Layout: type, command sequence, status, then the settings in force
+    afterwards: measurement interval in s (uint16), max send attempts,
+    mode flags and the datum offset in mm (int16, -32768 when unknown).
+    """
+    if datum_offset_mm is None:
+        datum_offset_mm = COMMAND_ACK_UNKNOWN_DATUM
+    payload = bytearray(COMMAND_ACK_LENGTH)
+    payload[0] = FRAME_TYPE_COMMAND_ACK
+    payload[1] = sequence & 0xFF
+    payload[2] = status & 0xFF
+    _write_u16(payload, 3, _clamp_u16(interval_s))
+    payload[5] = max(0, min(0xFF, max_send_attempts))
+    payload[6] = modes & 0xFF
+    _write_i16(payload, 7, max(COMMAND_ACK_UNKNOWN_DATUM, min(0x7FFF, datum_offset_mm)))
+    return bytes(payload)
+
+
+def decode_command_ack_payload(payload: bytes) -> dict:
+    if len(payload) != COMMAND_ACK_LENGTH or payload[0] != FRAME_TYPE_COMMAND_ACK:
+        raise ValueError("Not a command ack frame")
+
+    datum_offset_mm = _read_i16(payload, 7)
+    return {
+        "sequence": payload[1],
+        "status": payload[2],
+        "interval_s": _read_u16(payload, 3),
+        "max_send_attempts": payload[5],
+        "modes": payload[6],
+        "datum_offset_mm": None if datum_offset_mm == COMMAND_ACK_UNKNOWN_DATUM else datum_offset_mm,
+    }
+
+
+def encode_history_payload_into(
+    buffer: bytearray,
+    offset: int,
+    *,
+    epoch: int,
+    sequence: int,
+    interval_s: int,
+    heights_mm: list[int],
+    count: int | None = None,
+) -> int:
+    """Write a redundant-history frame of the first ``count`` heights; return its length.
+
+    Layout: type, boot epoch (uint16), sequence of the newest reading
+    (uint16), spacing between readings in s (uint16), reading count (uint8),
+    then the readings oldest first as zig-zag varint deltas
+    (``tidegauge.codec``). The newest reading is the last one and each
+    earlier reading has the previous sequence number. The epoch changes
+    with every boot, when the sequence restarts.
+    """
+    if count is None:
+        count = len(heights_mm)
+    if count < 1 or count > HISTORY_MAX_READINGS:
+        raise ValueError("history frame must hold 1-255 readings")
+
+    buffer[offset] = FRAME_TYPE_HISTORY
+    _write_u16(buffer, offset + 1, epoch & 0xFFFF)
+    _write_u16(buffer, offset + 3, sequence & 0xFFFF)
+    _write_u16(buffer, offset + 5, _clamp_u16(interval_s))
+    buffer[offset + 7] = count
+    return HISTORY_HEADER_LENGTH + encode_delta_varints_into(
+        buffer,
+        offset + HISTORY_HEADER_LENGTH,
+        heights_mm,
+        count,
+    )
+
+
+def decode_history_payload(payload: bytes) -> tuple[int, int, int, list[int]]:
+    """Return ``(epoch, newest_sequence, interval_s, heights_mm)`` with heights oldest first."""
+    if len(payload) < MIN_TYPED_FRAME_LENGTH or payload[0] != FRAME_TYPE_HISTORY:
+        raise ValueError("Not a history frame")
+
+    heights_mm = decode_delta_varints(bytes(payload[HISTORY_HEADER_LENGTH:]))
+    if len(heights_mm) != payload[7]:
+        raise ValueError("History frame length does not match reading count")
+    return _read_u16(payload, 1), _read_u16(payload, 3), _read_u16(payload, 5), heights_mm
+
+
+def _to_diagnostic_units(duration_us: int) -> int:
+    return (duration_us + DIAGNOSTIC_UNIT_US // 2) // DIAGNOSTIC_UNIT_US
+
+
+def _clamp_u16(value: int) -> int:
+    return max(0, min(0xFFFF, value))
+
+
+def _read_u16(data: bytes, offset: int) -> int:
+    return (data[offset] << 8) | data[offset + 1]
+
+
+def _read_i16(data: bytes, offset: int) -> int:
+    value = _read_u16(data, offset)
+    if value & 0x8000:
+        value -= 0x10000
+    return value
+
+
+def _write_u16(buffer: bytearray, offset: int, value: int) -> None:
+    buffer[offset] = (value >> 8) & 0xFF
+    buffer[offset + 1] = value & 0xFF
+
+
+def _write_i16(buffer: bytearray, offset: int, value: int) -> None:
+    _write_u16(buffer, offset, value & 0xFFFF)
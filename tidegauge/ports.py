@@ -1,7 +1,11 @@
-try:
-    from typing import Protocol
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Protocol = object
+from tidegauge.compat import Protocol
+
+# Cycle stages a StageProbe records, in loop order.
+STAGE_CALIBRATION = 0
+STAGE_SENSOR = 1
+STAGE_HEIGHT = 2
+STAGE_ENCODE = 3
+STAGE_SEND = 4
 
 
 class UltrasonicSensorPort(Protocol):
@@ -10,8 +14,24 @@ class UltrasonicSensorPort(Protocol):
 
 
 class RadioPort(Protocol):
-    def send(self, payload: bytes) -> None:
-        """Send a binary payload over radio transport."""
+    def send(self, payload: bytes | memoryview) -> None:
+        """Send a binary payload over radio transport.
+
+        The payload may be a view of a buffer the caller reuses next cycle.
+        """
+
+
+class DownlinkPort(Protocol):
+    def receive(self) -> tuple[int, bytes] | None:
+        """Return ``(fport, payload)`` of a downlink received since the last call."""
+
+
+class SchedulerPort(Protocol):
+    def is_due(self) -> bool:
+        """Return True when a measurement cycle should run."""
+
+    def seconds_until_due(self) -> int:
+        """Return whole seconds left until the next cycle is due."""
 
 
 class ClockPort(Protocol):
@@ -22,3 +42,27 @@ class ClockPort(Protocol):
 class SleepPort(Protocol):
     def sleep_s(self, seconds: int) -> None:
         """Suspend execution for a number of seconds."""
+
+
+class TemperatureSensorPort(Protocol):
+    def read_temperature_c(self) -> float:
+        """Return air temperature near the ultrasonic sensor in degrees Celsius."""
+
+
+class StageProbe(Protocol):
+    def mark(self) -> int:
+        """Return the reading a stage starts from (ticks or allocated bytes)."""
+
+    def record(self, stage: int, start_ticks: int) -> int:
+        """Fold one stage into the totals and return the next stage's start."""
+
+    def end_cycle(self) -> bool:
+        """Close a cycle; return True when the totals are due to be flushed."""
+
+    def reset(self) -> None:
+        """Clear the totals after a flush."""
+
+
+class BatteryMonitorPort(Protocol):
+    def read_battery_mv(self) -> int:
+        """Return the battery voltage in millivolts."""
@@ -0,0 +1,193 @@
+"""Redundant-history uplinks that let the host fill gaps left by lost frames.
+
+With ``depth`` M, every uplink is a history frame carrying the current
+reading plus the previous M, each tagged by sequence number. A reading is
+lost only if its own frame and the next M frames are all lost. The readings
+travel as varint deltas, so each extra reading usually costs one byte.
+"""
+
+from array import array
+
+from tidegauge.compat import Callable
+from tidegauge.payload import (
+    HISTORY_HEADER_LENGTH,
+    HISTORY_MAX_READING_LENGTH,
+    HISTORY_MAX_READINGS,
+    decode_history_payload,
+    encode_history_payload_into,
+    tide_height_m_to_mm,
+)
+
+
+def history_frame_max_length(depth: int) -> int:
+    """Worst-case frame length for ``depth``; steady tides usually need 1 byte per extra reading."""
+    return HISTORY_HEADER_LENGTH + (depth + 1) * HISTORY_MAX_READING_LENGTH
+
+
+class RedundantHistoryEncoder:
+    """Encode each reading as a history frame holding the last ``depth`` readings too.
+
+    Implements ``add_reading_m`` like ``UplinkBatcher`` so it takes the
+    batcher's place in the runtime loop, but it never holds a reading back.
+    ``epoch`` must differ on every boot (the board uses the nvm boot count)
+    so the host can tell a restarted sequence from a repeated one.
+    Returned frames are views into one buffer and stay valid until the next
+    reading; copy one with ``bytes()`` to keep it longer.
+    ``set_max_payload_length`` drops the oldest copies from frames that would
+    not fit an uplink at the current data rate.
+
+    A frame has one spacing for all its readings. When the gap to the new
+    reading differs from it by more than ``interval_tolerance_s`` (the
+    adaptive scheduler changed the interval), the history restarts from the
+    previous reading, so the host never rebuilds older timestamps with the
+    new spacing. Those older readings already went out in earlier frames.
+    """
+
+    def __init__(
+        self,
+        *,
+        now_s: Callable[[], int],
+        depth: int = 2,
+        epoch: int = 0,
+        interval_tolerance_s: int = 1,
+    ) -> None:
+        if depth < 0 or depth >= HISTORY_MAX_READINGS:
+            raise ValueError("depth must be between 0 and 254")
+
+        self._now_s = now_s
+        self._epoch = epoch & 0xFFFF
+        self._interval_tolerance_s = interval_tolerance_s
+        self._capacity = depth + 1
+        self._heights_mm = array("h", [0]) * self._capacity
+        self._buffer = bytearray(history_frame_max_length(depth))
+        self._frame = memoryview(self._buffer)
+        self._max_payload_length = len(self._buffer)
+        self._count = 0
+        self._sequence = -1
+        self._last_at_s = 0
+        self._interval_s = 0
+
+    @property
+    def pending_count(self) -> int:
+        return 0
+
+    def set_max_payload_length(self, length: int) -> None:
+        self._max_payload_length = length
+
+    def add_reading_m(self, tide_height_m: float) -> memoryview:
+        height_mm = tide_height_m_to_mm(tide_height_m)
+        now = self._now_s()
+        heights_mm = self._heights_mm
+        if (
+            self._count > 1
+            and abs(now - self._last_at_s - self._interval_s) > self._interval_tolerance_s
+        ):
+            heights_mm[0] = heights_mm[self._count - 1]
+            self._count = 1
+        if self._count == self._capacity:
+            for index in range(1, self._count):
+                heights_mm[index - 1] = heights_mm[index]
+        else:
+            self._count += 1
+        if self._count > 1:
+            self._interval_s = now - self._last_at_s
+        heights_mm[self._count - 1] = height_mm
+        self._last_at_s = now
+        self._sequence = (self._sequence + 1) & 0xFFFF
+
+        length = encode_history_payload_into(
+            self._buffer,
+            0,
+            epoch=self._epoch,
+            sequence=self._sequence,
+            interval_s=self._interval_s,
+            heights_mm=heights_mm,
+            count=self._count,
+        )
+        start = 0
+        while length > self._max_payload_length and start < self._count - 1:
+            # Only reached after a data rate drop, so the slice allocation is rare.
+            start += 1
+            length = encode_history_payload_into(
+                self._buffer,
+                0,
+                epoch=self._epoch,
+                sequence=self._sequence,
+                interval_s=self._interval_s,
+                heights_mm=heights_mm[start:self._count],
+            )
+        return self._frame[:length]
+
+
+class _HistoryRun:
+    def __init__(self, *, order: int) -> None:
+        self.order = order
+        self.readings: dict[int, tuple[int, int]] = {}
+        self.newest_sequence: int | None = None
+
+    def unwrap(self, sequence: int) -> int:
+        if self.newest_sequence is None:
+            return sequence
+        delta = (sequence - self.newest_sequence) & 0xFFFF
+        if delta >= 0x8000:
+            delta -= 0x10000
+        return self.newest_sequence + delta
+
+
+class HistoryReassembler:
+    """Merge received history frames into gap-filled series (host side).
+
+    Every boot epoch is a separate run: the gauge restarts its sequence
+    numbers on boot, so readings are keyed by ``(epoch, sequence)`` and runs
+    are listed in the order their first frame arrived. Within a run, frames
+    may arrive in any order and carry overlapping readings; the first copy
+    of each sequence number is kept, and sequence numbers are unwrapped from
+    16 bits against the newest frame of that run.
+    """
+
+    def __init__(self) -> None:
+        self._runs: dict[int, _HistoryRun] = {}
+
+    def add_frame(self, payload: bytes, *, received_at_s: int) -> int:
+        """Add one history frame and return how many new readings it supplied."""
+        epoch, sequence, interval_s, heights_mm = decode_history_payload(payload)
+        run = self._runs.get(epoch)
+        if run is None:
+            run = _HistoryRun(order=len(self._runs))
+            self._runs[epoch] = run
+        newest = run.unwrap(sequence)
+        if run.newest_sequence is None or newest > run.newest_sequence:
+            run.newest_sequence = newest
+
+        added = 0
+        oldest = newest - len(heights_mm) + 1
+        for index, height_mm in enumerate(heights_mm):
+            reading_sequence = oldest + index
+            if reading_sequence not in run.readings:
+                timestamp_s = received_at_s - (newest - reading_sequence) * interval_s
+                run.readings[reading_sequence] = (timestamp_s, height_mm)
+                added += 1
+        return added
+
+    def _ordered_runs(self) -> list[tuple[int, _HistoryRun]]:
+        return sorted(self._runs.items(), key=lambda item: item[1].order)
+
+    def readings(self) -> list[tuple[int, int, int, int]]:
+        """Return ``(epoch, sequence, timestamp_s, tide_height_mm)`` run by run."""
+        result = []
+        for epoch, run in self._ordered_runs():
+            for sequence in sorted(run.readings):
+                timestamp_s, height_mm = run.readings[sequence]
+                result.append((epoch, sequence, timestamp_s, height_mm))
+        return result
+
+    def missing(self) -> list[tuple[int, int]]:
+        """``(epoch, sequence)`` between the first and newest reading of each run that never arrived."""
+        result = []
+        for epoch, run in self._ordered_runs():
+            if not run.readings:
+                continue
+            for sequence in range(min(run.readings), run.newest_sequence + 1):
+                if sequence not in run.readings:
+                    result.append((epoch, sequence))
+        return result
@@ -0,0 +1,121 @@
+"""Host simulator for choosing ``REDUNDANCY_DEPTH`` against a packet loss rate.
+
+Feeds a synthetic tide through ``RedundantHistoryEncoder``, drops each frame
+independently with the given probability and reports how many readings the
+``HistoryReassembler`` recovered and what the frames cost in bytes.
+"""
+
+import argparse
+import math
+import random
+from typing import Callable, Sequence
+
+from tidegauge.redundancy import HistoryReassembler, RedundantHistoryEncoder
+
+TIDE_PERIOD_S = 44_712
+TIDE_AMPLITUDE_M = 1.5
+
+
+class RecoveryReport:
+    def __init__(
+        self,
+        *,
+        depth: int,
+        loss_rate: float,
+        readings: int,
+        delivered_frames: int,
+        recovered_readings: int,
+        payload_bytes: int,
+        max_frame_bytes: int,
+    ) -> None:
+        self.depth = depth
+        self.loss_rate = loss_rate
+        self.readings = readings
+        self.delivered_frames = delivered_frames
+        self.recovered_readings = recovered_readings
+        self.payload_bytes = payload_bytes
+        self.max_frame_bytes = max_frame_bytes
+
+    @property
+    def recovery_rate(self) -> float:
+        return self.recovered_readings / self.readings
+
+    @property
+    def mean_frame_bytes(self) -> float:
+        return self.payload_bytes / self.readings
+
+
+def simulate_history_recovery(
+    *,
+    depth: int,
+    loss_rate: float,
+    readings: int = 10_000,
+    interval_s: int = 60,
+    seed: int = 1,
+) -> RecoveryReport:
+    """Send ``readings`` frames through an independent-loss channel and reassemble them."""
+    if not 0 <= loss_rate <= 1:
+        raise ValueError("loss_rate must be between 0 and 1")
+    if readings < 1:
+        raise ValueError("readings must be >= 1")
+
+    rng = random.Random(seed)
+    clock = [0]
+    encoder = RedundantHistoryEncoder(now_s=lambda: clock[0], depth=depth)
+    reassembler = HistoryReassembler()
+    delivered_frames = 0
+    payload_bytes = 0
+    max_frame_bytes = 0
+    for index in range(readings):
+        clock[0] = index * interval_s
+        tide_height_m = TIDE_AMPLITUDE_M * math.sin(2 * math.pi * clock[0] / TIDE_PERIOD_S)
+        frame = bytes(encoder.add_reading_m(tide_height_m + rng.gauss(0, 0.005)))
+        payload_bytes += len(frame)
+        max_frame_bytes = max(max_frame_bytes, len(frame))
+        if rng.random() >= loss_rate:
+            reassembler.add_frame(frame, received_at_s=clock[0])
+            delivered_frames += 1
+
+    return RecoveryReport(
+        depth=depth,
+        loss_rate=loss_rate,
+        readings=readings,
+        delivered_frames=delivered_frames,
+        recovered_readings=len(reassembler.readings()),
+        payload_bytes=payload_bytes,
+        max_frame_bytes=max_frame_bytes,
+    )
+
+
+def format_recovery_report(report: RecoveryReport) -> str:
+    return (
+        "depth=" + str(report.depth)
+        + " loss=" + format(report.loss_rate, ".2f")
+        + " delivered=" + format(report.delivered_frames / report.readings, ".4f")
+        + " recovered=" + format(report.recovery_rate, ".4f")
+        + " mean_bytes=" + format(report.mean_frame_bytes, ".1f")
+        + " max_bytes=" + str(report.max_frame_bytes)
+    )
+
+
+def run_redundancy_sim_cli(
+    *,
+    argv: Sequence[str],
+    output_fn: Callable[[str], None] = print,
+) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loss", type=float, required=True)
+    parser.add_argument("--depth", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--readings", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    for depth in args.depth:
+        report = simulate_history_recovery(
+            depth=depth,
+            loss_rate=args.loss,
+            readings=args.readings,
+            seed=args.seed,
+        )
+        output_fn(format_recovery_report(report))
+    return 0
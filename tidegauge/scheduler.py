@@ -1,26 +1,218 @@
-try:
-    from collections.abc import Callable
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    class Callable:  # type: ignore[no-redef]
-        def __class_getitem__(cls, _item):
-            return cls
+from tidegauge.compat import Callable
 
 
-class MinuteScheduler:
+class _WakeupCountingScheduler:
+    def __init__(self) -> None:
+        self._wakeups_since_due = 0
+        self.wakeup_count = 0
+        self.last_cycle_wakeups = 0
+
+    def _record_wakeup(self) -> None:
+        self.wakeup_count += 1
+        self._wakeups_since_due += 1
+
+    def _mark_due(self) -> None:
+        self.last_cycle_wakeups = self._wakeups_since_due
+        self._wakeups_since_due = 0
+
+
+class MinuteScheduler(_WakeupCountingScheduler):
     def __init__(self, *, now_s: Callable[[], int], interval_s: int = 60) -> None:
+        super().__init__()
         self._now_s = now_s
         self._interval_s = interval_s
         self._next_due_s: int | None = None
 
     def is_due(self) -> bool:
         now = self._now_s()
+        self._record_wakeup()
 
         if self._next_due_s is None:
             self._next_due_s = now + self._interval_s
+            self._mark_due()
             return True
 
         if now < self._next_due_s:
             return False
 
         self._next_due_s = now + self._interval_s
+        self._mark_due()
+        return True
+
+    def seconds_until_due(self) -> int:
+        if self._next_due_s is None:
+            return 0
+        return max(0, self._next_due_s - self._now_s())
+
+    def set_interval_s(self, interval_s: int) -> None:
+        self._interval_s = interval_s
+        if self._next_due_s is not None:
+            self._next_due_s = min(self._next_due_s, self._now_s() + interval_s)
+
+
+class DeadlineScheduler(_WakeupCountingScheduler):
+    """Fire on the fixed grid ``epoch_s + phase_offset_s + k * interval_s``.
+
+    A late wakeup does not shift later deadlines. Slots that pass entirely
+    without a wakeup are skipped and counted in ``skipped_slots`` instead of
+    being replayed back-to-back.
+    """
+
+    def __init__(
+        self,
+        *,
+        now_s: Callable[[], int],
+        interval_s: int = 60,
+        epoch_s: int = 0,
+        phase_offset_s: int = 0,
+    ) -> None:
+        if interval_s <= 0:
+            raise ValueError("interval_s must be > 0")
+
+        super().__init__()
+        self._now_s = now_s
+        self._interval_s = interval_s
+        self._epoch_s = epoch_s
+        self._phase_offset_s = phase_offset_s
+        self._anchor_s = epoch_s + phase_offset_s % interval_s
+        self._last_slot: int | None = None
+        self.skipped_slots = 0
+
+    def is_due(self) -> bool:
+        now = self._now_s()
+        self._record_wakeup()
+        slot = (now - self._anchor_s) // self._interval_s
+
+        if self._last_slot is not None:
+            if slot <= self._last_slot:
+                return False
+            self.skipped_slots += slot - self._last_slot - 1
+
+        self._last_slot = slot
+        self._mark_due()
         return True
+
+    def seconds_until_due(self) -> int:
+        if self._last_slot is None:
+            return 0
+        next_due_s = self._anchor_s + (self._last_slot + 1) * self._interval_s
+        return max(0, next_due_s - self._now_s())
+
+    def set_interval_s(self, interval_s: int) -> None:
+        """Move to a new grid; the slot in progress counts as already run."""
+        if interval_s <= 0:
+            raise ValueError("interval_s must be > 0")
+
+        self._interval_s = interval_s
+        self._anchor_s = self._epoch_s + self._phase_offset_s % interval_s
+        if self._last_slot is not None:
+            self._last_slot = (self._now_s() - self._anchor_s) // interval_s
+
+
+class AdaptiveScheduler(_WakeupCountingScheduler):
+    """Pick the interval from the recent rate of change of the tide height.
+
+    The interval is the time the water needs to move ``target_step_m`` at the
+    current dh/dt, clamped to ``[min_interval_s, max_interval_s]`` and rounded
+    down to a multiple of ``min_interval_s``. While the height is at or above
+    ``alert_height_m`` the minimum interval is used. Deadlines stay on the
+    ``min_interval_s`` grid, so late wakeups do not drift the phase.
+    """
+
+    def __init__(
+        self,
+        *,
+        now_s: Callable[[], int],
+        min_interval_s: int = 60,
+        max_interval_s: int = 600,
+        target_step_m: float = 0.01,
+        alert_height_m: float | None = None,
+        history_size: int = 4,
+        phase_offset_s: int = 0,
+    ) -> None:
+        if min_interval_s <= 0 or max_interval_s < min_interval_s:
+            raise ValueError("interval bounds must satisfy 0 < min <= max")
+        if history_size < 2:
+            raise ValueError("history_size must be >= 2")
+
+        super().__init__()
+        self._now_s = now_s
+        self._min_interval_s = min_interval_s
+        self._max_interval_s = max_interval_s
+        self._target_step_m = target_step_m
+        self._alert_height_m = alert_height_m
+        self._phase_offset_s = phase_offset_s
+        self._anchor_s = phase_offset_s % min_interval_s
+        self._history_size = history_size
+        self._history_s = [0] * history_size
+        self._history_m = [0.0] * history_size
+        self._history_count = 0
+        self._last_slot_s: int | None = None
+        self._next_due_s: int | None = None
+        self.interval_s = min_interval_s
+
+    @property
+    def rate_m_per_s(self) -> float:
+        if self._history_count < 2:
+            return 0.0
+        newest = (self._history_count - 1) % self._history_size
+        oldest = 0 if self._history_count <= self._history_size else (
+            self._history_count % self._history_size
+        )
+        elapsed_s = self._history_s[newest] - self._history_s[oldest]
+        if elapsed_s <= 0:
+            return 0.0
+        return (self._history_m[newest] - self._history_m[oldest]) / elapsed_s
+
+    def observe_height_m(self, tide_height_m: float) -> None:
+        index = self._history_count % self._history_size
+        self._history_s[index] = self._now_s()
+        self._history_m[index] = tide_height_m
+        self._history_count += 1
+
+        if self._alert_height_m is not None and tide_height_m >= self._alert_height_m:
+            interval_s = self._min_interval_s
+        else:
+            rate = abs(self.rate_m_per_s)
+            if rate == 0:
+                interval_s = self._max_interval_s
+            else:
+                interval_s = int(round(self._target_step_m / rate))
+            interval_s = max(self._min_interval_s, min(self._max_interval_s, interval_s))
+            interval_s -= interval_s % self._min_interval_s
+
+        self.interval_s = interval_s
+        if self._last_slot_s is not None:
+            self._next_due_s = self._last_slot_s + interval_s
+
+    def is_due(self) -> bool:
+        now = self._now_s()
+        self._record_wakeup()
+
+        if self._next_due_s is not None and now < self._next_due_s:
+            return False
+
+        slot_s = now - (now - self._anchor_s) % self._min_interval_s
+        self._last_slot_s = slot_s
+        self._next_due_s = slot_s + self.interval_s
+        self._mark_due()
+        return True
+
+    def seconds_until_due(self) -> int:
+        if self._next_due_s is None:
+            return 0
+        return max(0, self._next_due_s - self._now_s())
+
+    def set_interval_s(self, interval_s: int) -> None:
+        """Change the minimum interval, raising the maximum if it is now below it."""
+        if interval_s <= 0:
+            raise ValueError("interval_s must be > 0")
+
+        self._min_interval_s = interval_s
+        if self._max_interval_s < interval_s:
+            self._max_interval_s = interval_s
+        self._anchor_s = self._phase_offset_s % interval_s
+        self.interval_s = max(interval_s, min(self._max_interval_s, self.interval_s))
+        self.interval_s -= self.interval_s % interval_s
+        if self._last_slot_s is not None:
+            self._next_due_s = self._last_slot_s + self.interval_s
@@ -0,0 +1,120 @@
+"""Host benchmark for what the device entry point imports at boot.
+
+Each run starts a fresh interpreter so earlier imports cannot hide cost. The
+report lists the import time, every module the entry point pulls in, and
+any host-only module that leaked into the device path.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, Sequence
+
+# What code.py -> main.main() imports on the board, including its lazy imports.
+DEVICE_ENTRY_MODULES = (
+    "main",
+    "tidegauge.adapters.circuitpython_compat",
+    "tidegauge.adapters.lorawan_client",
+    "tidegauge.adapters.feather_lorawan",
+    "tidegauge.ttn_credentials",
+)
+
+# Tooling that must never load on the device. ``tidegauge.heap_profile`` is not
+# listed: main.py imports its device profiler when HEAP_PROFILE is set.
+HOST_ONLY_MODULES = (
+    "argparse",
+    "tidegauge.calibration_cli",
+    "tidegauge.calibration_update",
+    "tidegauge.deploy",
+    "tidegauge.deploy_cli",
+    "tidegauge.redundancy_sim",
+    "tidegauge.startup_benchmark",
+    "tidegauge.adapters.fakes",
+)
+
+_PROBE_SCRIPT = """
+import sys
+import time
+sys.path.insert(0, {root!r})
+before = set(sys.modules)
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(elapsed)
+for name in sorted(set(sys.modules) - before):
+    print(name)
+"""
+
+
+class StartupReport:
+    def __init__(self, *, import_s: float, modules: list[str]) -> None:
+        self.import_s = import_s
+        self.modules = modules
+
+    @property
+    def tidegauge_modules(self) -> list[str]:
+        return [name for name in self.modules if name == "tidegauge" or name.startswith("tidegauge.")]
+
+    @property
+    def host_only_modules(self) -> list[str]:
+        return [name for name in self.modules if name in HOST_ONLY_MODULES]
+
+
+def measure_startup(
+    *,
+    project_root: Path,
+    modules: Sequence[str] = DEVICE_ENTRY_MODULES,
+    repeat: int = 5,
+    python: str = sys.executable,
+) -> StartupReport:
+    """Import ``modules`` in ``repeat`` fresh interpreters; keep the fastest run."""
+    if repeat < 1:
+        raise ValueError("repeat must be >= 1")
+
+    best = None
+    script = _PROBE_SCRIPT.format(root=str(project_root), modules=tuple(modules))
+    for _ in range(repeat):
+        result = subprocess.run(
+            [python, "-c", script],
+            cwd=project_root,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        lines = result.stdout.split()
+        report = StartupReport(import_s=float(lines[0]), modules=lines[1:])
+        if best is None or report.import_s < best.import_s:
+            best = report
+    return best
+
+
+def format_startup_report(report: StartupReport) -> str:
+    lines = [
+        "import_s=" + format(report.import_s, ".4f")
+        + " modules=" + str(len(report.modules))
+        + " tidegauge_modules=" + str(len(report.tidegauge_modules)),
+        "host-only modules loaded: " + (", ".join(report.host_only_modules) or "none"),
+    ]
+    return "\n".join(lines)
+
+
+def run_startup_benchmark_cli(
+    *,
+    argv: Sequence[str],
+    output_fn: Callable[[str], None] = print,
+    measure_fn: Callable[..., StartupReport] = measure_startup,
+) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--project-root", type=Path, default=Path.cwd())
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--list-modules", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = measure_fn(project_root=args.project_root, repeat=args.repeat)
+    output_fn(format_startup_report(report))
+    if args.list_modules:
+        for name in report.modules:
+            output_fn(name)
+    return 1 if report.host_only_modules else 0
@@ -1,10 +1,4 @@
-try:
-    from typing import Any, Callable
-except ImportError:  # pragma: no cover - CircuitPython compatibility
-    Any = object
-    class Callable:  # type: ignore[no-redef]
-        def __class_getitem__(cls, _item):
-            return cls
+from tidegauge.compat import Any, Callable
 
 
 class TtnCredentialsError(RuntimeError):
@@ -1,9 +1,112 @@
+import math
+from array import array
+
+from tidegauge.compat import Any
+
 SPEED_OF_SOUND_M_PER_S = 343.0
 
+# Speed of sound in dry air, tabulated so the device never needs a sqrt per sample.
+SPEED_TABLE_MIN_C = -20
+SPEED_TABLE_MAX_C = 50
+SPEED_TABLE_STEP_C = 5
+
+
+def speed_of_sound_m_per_s(temperature_c: float) -> float:
+    """Exact dry-air speed of sound; used to build the lookup table."""
+    return 331.3 * math.sqrt(1 + temperature_c / 273.15)
+
+
+SPEED_TABLE_M_PER_S = array(
+    "f",
+    [
+        speed_of_sound_m_per_s(temperature_c)
+        for temperature_c in range(
+            SPEED_TABLE_MIN_C,
+            SPEED_TABLE_MAX_C + SPEED_TABLE_STEP_C,
+            SPEED_TABLE_STEP_C,
+        )
+    ],
+)
+
+
+def speed_of_sound_lookup_m_per_s(temperature_c: float | None) -> float:
+    """Interpolate the speed of sound from the table, clamping outside its range.
+
+    ``None`` means no temperature is known and returns the legacy 343 m/s.
+    Linear interpolation over 5 degree steps stays within 15 ppm of the exact curve.
+    """
+    if temperature_c is None:
+        return SPEED_OF_SOUND_M_PER_S
+    if temperature_c <= SPEED_TABLE_MIN_C:
+        return SPEED_TABLE_M_PER_S[0]
+    if temperature_c >= SPEED_TABLE_MAX_C:
+        return SPEED_TABLE_M_PER_S[-1]
+
+    position = (temperature_c - SPEED_TABLE_MIN_C) / SPEED_TABLE_STEP_C
+    index = int(position)
+    fraction = position - index
+    lower = SPEED_TABLE_M_PER_S[index]
+    return lower + (SPEED_TABLE_M_PER_S[index + 1] - lower) * fraction
+
 
-def echo_duration_us_to_distance_m(echo_duration_us: int) -> float:
+def echo_duration_us_to_distance_m(
+    echo_duration_us: int,
+    temperature_c: float | None = None,
+) -> float:
     if echo_duration_us < 0:
         raise ValueError("echo_duration_us must be >= 0")
 
     round_trip_time_s = echo_duration_us / 1_000_000
-    return (round_trip_time_s * SPEED_OF_SOUND_M_PER_S) / 2
+    return (round_trip_time_s * speed_of_sound_lookup_m_per_s(temperature_c)) / 2
+
+
+def distance_m_to_echo_duration_us(
+    distance_m: float,
+    temperature_c: float | None = None,
+) -> int:
+    if distance_m < 0:
+        raise ValueError("distance_m must be >= 0")
+
+    return int(distance_m * 2 * 1_000_000 / speed_of_sound_lookup_m_per_s(temperature_c))
+
+
+def echo_durations_us_to_distances_m(
+    echo_durations_us: list[int],
+    temperatures_c: list[float] | float | None = None,
+) -> list[float]:
+    """Convert archived echo durations in bulk on the host.
+
+    ``temperatures_c`` may be a list matching the durations or a single value
+    applied to all of them. ``echo_durations_us_to_distances_m_numpy`` does
+    the same for large archives when numpy is installed.
+    """
+    if temperatures_c is None or isinstance(temperatures_c, (int, float)):
+        temperatures_c = [temperatures_c] * len(echo_durations_us)
+    return [
+        echo_duration_us_to_distance_m(duration_us, temperature_c)
+        for duration_us, temperature_c in zip(echo_durations_us, temperatures_c)
+    ]
+
+
+def echo_durations_us_to_distances_m_numpy(
+    echo_durations_us: Any,
+    temperatures_c: Any,
+) -> "numpy.ndarray":
+    """Vectorised ``echo_durations_us_to_distances_m`` over array-likes; needs numpy."""
+    import numpy as np
+
+    durations_us = np.asarray(echo_durations_us, dtype=np.float64)
+    if np.any(durations_us < 0):
+        raise ValueError("echo_duration_us must be >= 0")
+    table_c = np.arange(
+        SPEED_TABLE_MIN_C,
+        SPEED_TABLE_MAX_C + SPEED_TABLE_STEP_C,
+        SPEED_TABLE_STEP_C,
+        dtype=np.float64,
+    )
+    speeds = np.interp(
+        np.asarray(temperatures_c, dtype=np.float64),
+        table_c,
+        np.asarray(SPEED_TABLE_M_PER_S, dtype=np.float64),
+    )
+    return durations_us / 1_000_000 * speeds / 2
@@ -0,0 +1,183 @@
+"""Bounded store-and-forward queue for readings that could not be sent.
+
+Readings live in a ring of fixed 12-byte records, either in a file on the
+device filesystem or, with ``path=None``, in RAM only. Record layout:
+
+- bytes 0-3: sequence number (uint32, starts at 1; 0 marks an empty slot)
+- bytes 4-7: timestamp in queue seconds (uint32), see below
+- bytes 8-9: tide height in millimetres (int16)
+- byte 10: CRC-8 over bytes 0-9
+- byte 11: state (``1`` pending, ``0`` delivered)
+
+A record torn by a reset fails its CRC and is skipped on the next open. The
+state byte sits outside the CRC so delivery is recorded with a 1-byte write.
+
+The CircuitPython filesystem is read-only to code unless ``boot.py`` remounts
+it writable. A board clock restarts on reboot, so records are stamped in
+queue time: ClockPort seconds plus an offset fixed when the file is opened,
+chosen so queue time never runs behind the newest stored record. Restored
+readings keep their order and spacing; their ages only miss the downtime.
+"""
+import os
+
+from tidegauge.compat import Callable
+
+RECORD_LENGTH = 12
+_STATE_OFFSET = 11
+_STATE_PENDING = 1
+_STATE_DELIVERED = 0
+
+
+def _crc8(data: bytes | bytearray, length: int) -> int:
+    crc = 0xFF
+    for index in range(length):
+        crc ^= data[index]
+        for _ in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ 0x07) & 0xFF
+            else:
+                crc = (crc << 1) & 0xFF
+    return crc
+
+
+class UplinkQueue:
+    def __init__(
+        self,
+        *,
+        capacity: int = 1440,
+        path: str | None = None,
+        now_s: Callable[[], int] | None = None,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+
+        self._capacity = capacity
+        self._path = path
+        self._record = bytearray(RECORD_LENGTH)
+        self._buffer: bytearray | None = None
+        self._head_seq = 1
+        self._next_seq = 1
+        self.dropped_count = 0
+        self.corrupt_count = 0
+        self._offset_s = 0
+
+        if path is None:
+            self._buffer = bytearray(capacity * RECORD_LENGTH)
+        else:
+            self._prepare_file()
+            newest_timestamp_s = self._scan()
+            if now_s is not None:
+                self._offset_s = max(0, newest_timestamp_s - now_s())
+
+    @property
+    def depth(self) -> int:
+        return self._next_seq - self._head_seq
+
+    def push(self, *, timestamp_s: int, height_mm: int) -> None:
+        if self.depth >= self._capacity:
+            self._head_seq += 1
+            self.dropped_count += 1
+
+        seq = self._next_seq
+        record = self._record
+        record[0:4] = seq.to_bytes(4, "big")
+        record[4:8] = ((timestamp_s + self._offset_s) & 0xFFFFFFFF).to_bytes(4, "big")
+        record[8:10] = height_mm.to_bytes(2, "big", signed=True)
+        record[10] = _crc8(record, 10)
+        record[_STATE_OFFSET] = _STATE_PENDING
+        self._write(self._slot_offset(seq), record)
+        self._next_seq = seq + 1
+
+    def peek(self, max_count: int) -> list[tuple[int, int]]:
+        """Return up to ``max_count`` oldest pending ``(timestamp_s, height_mm)`` readings."""
+        readings: list[tuple[int, int]] = []
+        seq = self._head_seq
+        while seq < self._next_seq and len(readings) < max_count:
+            reading = self._read_pending(seq)
+            if reading is not None:
+                readings.append(reading)
+            elif seq == self._head_seq:
+                self._head_seq += 1
+            seq += 1
+        return readings
+
+    def acknowledge(self, count: int) -> None:
+        """Mark the ``count`` oldest pending readings as delivered."""
+        while count > 0 and self._head_seq < self._next_seq:
+            if self._read_pending(self._head_seq) is not None:
+                self._write(
+                    self._slot_offset(self._head_seq) + _STATE_OFFSET,
+                    bytes([_STATE_DELIVERED]),
+                )
+                count -= 1
+            self._head_seq += 1
+
+    def _slot_offset(self, seq: int) -> int:
+        return (seq % self._capacity) * RECORD_LENGTH
+
+    def _read_pending(self, seq: int) -> tuple[int, int] | None:
+        record = self._record
+        self._read_into(self._slot_offset(seq), record)
+        if _crc8(record, 10) != record[10]:
+            return None
+        if int.from_bytes(record[0:4], "big") != seq:
+            return None
+        if record[_STATE_OFFSET] != _STATE_PENDING:
+            return None
+        height_mm = (record[8] << 8) | record[9]
+        if height_mm & 0x8000:
+            height_mm -= 0x10000
+        return (int.from_bytes(record[4:8], "big") - self._offset_s, height_mm)
+
+    def _scan(self) -> int:
+        """Restore the ring pointers and return the newest stored timestamp."""
+        record = self._record
+        oldest_pending = None
+        newest = 0
+        newest_timestamp_s = 0
+        for slot in range(self._capacity):
+            self._read_into(slot * RECORD_LENGTH, record)
+            seq = int.from_bytes(record[0:4], "big")
+            if seq == 0:
+                continue
+            if _crc8(record, 10) != record[10]:
+                self.corrupt_count += 1
+                continue
+            newest = max(newest, seq)
+            newest_timestamp_s = max(newest_timestamp_s, int.from_bytes(record[4:8], "big"))
+            if record[_STATE_OFFSET] == _STATE_PENDING:
+                if oldest_pending is None or seq < oldest_pending:
+                    oldest_pending = seq
+
+        self._next_seq = newest + 1
+        self._head_seq = self._next_seq if oldest_pending is None else oldest_pending
+        return newest_timestamp_s
+
+    def _prepare_file(self) -> None:
+        size = self._capacity * RECORD_LENGTH
+        try:
+            existing = os.stat(self._path)[6]
+        except OSError:
+            existing = -1
+        if existing < 0:
+            with open(self._path, "wb") as file:
+                file.write(bytes(size))
+        elif existing < size:
+            with open(self._path, "ab") as file:
+                file.write(bytes(size - existing))
+
+    def _read_into(self, offset: int, record: bytearray) -> None:
+        if self._buffer is not None:
+            record[:] = self._buffer[offset:offset + RECORD_LENGTH]
+            return
+        with open(self._path, "rb") as file:
+            file.seek(offset)
+            file.readinto(record)
+
+    def _write(self, offset: int, data: bytes | bytearray) -> None:
+        if self._buffer is not None:
+            self._buffer[offset:offset + len(data)] = data
+            return
+        with open(self._path, "r+b") as file:
+            file.seek(offset)
+            file.write(data)
@@ -0,0 +1,34 @@
+const DOWNLINK_FPORT = 10;
+const COMMAND_SET_INTERVAL = 0x01;
+const COMMAND_SET_MAX_SEND_ATTEMPTS = 0x02;
+const COMMAND_SET_DATUM_OFFSET = 0x03;
+const COMMAND_SET_MODES = 0x04;
+const MODE_BATCHING = 0x01;
+const MODE_BURST = 0x02;
+
+function encodeDownlink(input) {
+  const data = input.data || {};
+  if (!Number.isInteger(data.sequence) || data.sequence < 0 || data.sequence > 255) {
+    return { errors: ["sequence must be an integer between 0 and 255"] };
+  }
+
+  const bytes = [data.sequence];
+  if (data.interval_s !== undefined) {
+    bytes.push(COMMAND_SET_INTERVAL, (data.interval_s >> 8) & 0xff, data.interval_s & 0xff);
+  }
+  if (data.max_send_attempts !== undefined) {
+    bytes.push(COMMAND_SET_MAX_SEND_ATTEMPTS, data.max_send_attempts & 0xff);
+  }
+  if (data.datum_offset_m !== undefined) {
+    const mm = Math.round(data.datum_offset_m * 1000) & 0xffff;
+    bytes.push(COMMAND_SET_DATUM_OFFSET, (mm >> 8) & 0xff, mm & 0xff);
+  }
+  if (data.batching !== undefined || data.burst !== undefined) {
+    const modes = (data.batching ? MODE_BATCHING : 0) | (data.burst ? MODE_BURST : 0);
+    bytes.push(COMMAND_SET_MODES, modes);
+  }
+  if (bytes.length === 1) {
+    return { errors: ["at least one command is required"] };
+  }
+  return { bytes, fPort: DOWNLINK_FPORT };
+}
@@ -1,13 +1,36 @@
-function decodeUplink(input) {
-  if (!input.bytes || input.bytes.length < 6) {
-    return { errors: ["Need 6-byte payload"] };
-  }
+const FRAME_TYPE_BATCH = 0x01;
+const FRAME_TYPE_BACKLOG = 0x02;
+const FRAME_TYPE_DIAGNOSTIC = 0x03;
+const FRAME_TYPE_HEALTH = 0x04;
+const FRAME_TYPE_COMMAND_ACK = 0x05;
+const FRAME_TYPE_HISTORY = 0x06;
+const COMMAND_ACK_STATUSES = ["applied", "duplicate", "malformed", "unsupported", "out_of_range", "store_failed"];
+const HEALTH_COUNTER_FIELDS = [
+  "sends",
+  "retries",
+  "failures",
+  "sensor_timeouts",
+  "calibration_missing",
+  "cycle_errors",
+  "reboots"
+];
+const DIAGNOSTIC_STAGE_NAMES = ["calibration", "sensor", "height", "encode", "send"];
+const DIAGNOSTIC_UNIT_US = 100;
 
-  let tide_mm = (input.bytes[0] << 8) | input.bytes[1];
-  if (tide_mm & 0x8000) tide_mm -= 0x10000;
+function readInt16(bytes, offset) {
+  let value = (bytes[offset] << 8) | bytes[offset + 1];
+  if (value & 0x8000) value -= 0x10000;
+  return value;
+}
+
+function readUint16(bytes, offset) {
+  return (bytes[offset] << 8) | bytes[offset + 1];
+}
 
-  const raw_distance_mm = (input.bytes[2] << 8) | input.bytes[3];
-  const battery_mv = (input.bytes[4] << 8) | input.bytes[5];
+function decodeTideDistanceBattery(bytes) {
+  const tide_mm = readInt16(bytes, 0);
+  const raw_distance_mm = readUint16(bytes, 2);
+  const battery_mv = readUint16(bytes, 4);
 
   return {
     data: {
@@ -20,3 +43,194 @@ function decodeUplink(input) {
     }
   };
 }
+
+function decodeTideHeight(bytes) {
+  const tide_mm = readInt16(bytes, 0);
+  return {
+    data: {
+      tide_height_mm: tide_mm,
+      tide_height_m: tide_mm / 1000
+    }
+  };
+}
+
+function decodeBatch(bytes, receivedAtMs) {
+  if (bytes.length < 9 || bytes.length !== 9 + bytes[2] - 1) {
+    return { errors: ["Malformed batch frame"] };
+  }
+
+  const count = bytes[2];
+  const interval_s = readUint16(bytes, 3);
+  const age_s = readUint16(bytes, 5);
+  const newestAtMs = receivedAtMs - age_s * 1000;
+  let height_mm = readInt16(bytes, 7);
+  const samples = [];
+
+  for (let i = 0; i < count; i++) {
+    if (i > 0) {
+      let delta_mm = bytes[9 + i - 1];
+      if (delta_mm & 0x80) delta_mm -= 0x100;
+      height_mm += delta_mm;
+    }
+    samples.push({
+      time: new Date(newestAtMs - (count - 1 - i) * interval_s * 1000).toISOString(),
+      tide_height_mm: height_mm,
+      tide_height_m: height_mm / 1000
+    });
+  }
+
+  return {
+    data: {
+      sequence: bytes[1],
+      interval_s,
+      samples
+    }
+  };
+}
+
+function decodeBacklog(bytes, receivedAtMs) {
+  const count = bytes[1];
+  if (bytes.length !== 2 + count * 6) {
+    return { errors: ["Malformed backlog frame"] };
+  }
+
+  const samples = [];
+  for (let i = 0; i < count; i++) {
+    const offset = 2 + i * 6;
+    const age_s = readUint16(bytes, offset) * 65536 + readUint16(bytes, offset + 2);
+    const height_mm = readInt16(bytes, offset + 4);
+    samples.push({
+      time: new Date(receivedAtMs - age_s * 1000).toISOString(),
+      tide_height_mm: height_mm,
+      tide_height_m: height_mm / 1000
+    });
+  }
+
+  return { data: { backlog: true, samples } };
+}
+
+function decodeDiagnostic(bytes) {
+  const count = bytes[1];
+  if (bytes.length !== 2 + count * 8) {
+    return { errors: ["Malformed diagnostic frame"] };
+  }
+
+  const stages = [];
+  for (let i = 0; i < count; i++) {
+    const offset = 2 + i * 8;
+    stages.push({
+      stage: DIAGNOSTIC_STAGE_NAMES[i] || "stage_" + i,
+      count: readUint16(bytes, offset),
+      min_us: readUint16(bytes, offset + 2) * DIAGNOSTIC_UNIT_US,
+      mean_us: readUint16(bytes, offset + 4) * DIAGNOSTIC_UNIT_US,
+      max_us: readUint16(bytes, offset + 6) * DIAGNOSTIC_UNIT_US
+    });
+  }
+
+  return { data: { diagnostic: true, stages } };
+}
+
+function decodeHealth(bytes) {
+  if (bytes.length !== 25) {
+    return { errors: ["Malformed health frame"] };
+  }
+
+  const data = { health: true };
+  HEALTH_COUNTER_FIELDS.forEach((name, i) => {
+    data[name] = readUint16(bytes, 1 + i * 2);
+  });
+  const memFree = readUint16(bytes, 15) * 65536 + readUint16(bytes, 17);
+  const battery_mv = readUint16(bytes, 21);
+  data.mem_free_low_bytes = memFree === 0xffffffff ? null : memFree;
+  data.worst_cycle_ms = readUint16(bytes, 19);
+  data.battery_mv = battery_mv === 0 ? null : battery_mv;
+  data.burst_valid_low = bytes[23] === 0xff ? null : bytes[23];
+  data.burst_sample_count = bytes[24];
+  return { data };
+}
+
+function decodeCommandAck(bytes) {
+  if (bytes.length !== 9) {
+    return { errors: ["Malformed command ack frame"] };
+  }
+
+  const datum_offset_mm = readInt16(bytes, 7);
+  return {
+    data: {
+      command_ack: true,
+      sequence: bytes[1],
+      status: COMMAND_ACK_STATUSES[bytes[2]] || "status_" + bytes[2],
+      interval_s: readUint16(bytes, 3),
+      max_send_attempts: bytes[5],
+      batching: (bytes[6] & 0x01) !== 0,
+      burst: (bytes[6] & 0x02) !== 0,
+      datum_offset_mm: datum_offset_mm === -32768 ? null : datum_offset_mm
+    }
+  };
+}
+
+function decodeHistory(bytes, receivedAtMs) {
+  const epoch = readUint16(bytes, 1);
+  const count = bytes[7];
+  const newestSequence = readUint16(bytes, 3);
+  const interval_s = readUint16(bytes, 5);
+  const heights = [];
+  let previous_mm = 0;
+  let value = 0;
+  let shift = 0;
+
+  for (let i = 8; i < bytes.length; i++) {
+    value += (bytes[i] & 0x7f) * Math.pow(2, shift);
+    if (bytes[i] & 0x80) {
+      shift += 7;
+      continue;
+    }
+    previous_mm += value % 2 === 0 ? value / 2 : -(value + 1) / 2;
+    heights.push(previous_mm);
+    value = 0;
+    shift = 0;
+  }
+  if (shift !== 0 || heights.length !== count) {
+    return { errors: ["Malformed history frame"] };
+  }
+
+  const samples = heights.map((height_mm, i) => ({
+    sequence: (newestSequence - (count - 1 - i) + 0x10000) % 0x10000,
+    time: new Date(receivedAtMs - (count - 1 - i) * interval_s * 1000).toISOString(),
+    tide_height_mm: height_mm,
+    tide_height_m: height_mm / 1000
+  }));
+
+  return { data: { history: true, epoch, sequence: newestSequence, interval_s, samples } };
+}
+
+function decodeUplink(input) {
+  const bytes = input.bytes || [];
+  const receivedAtMs = input.recvTime ? new Date(input.recvTime).getTime() : Date.now();
+
+  if (bytes.length === 2) {
+    return decodeTideHeight(bytes);
+  }
+  if (bytes.length === 6) {
+    return decodeTideDistanceBattery(bytes);
+  }
+  if (bytes.length >= 7 && bytes[0] === FRAME_TYPE_BATCH) {
+    return decodeBatch(bytes, receivedAtMs);
+  }
+  if (bytes.length >= 7 && bytes[0] === FRAME_TYPE_BACKLOG) {
+    return decodeBacklog(bytes, receivedAtMs);
+  }
+  if (bytes.length >= 7 && bytes[0] === FRAME_TYPE_DIAGNOSTIC) {
+    return decodeDiagnostic(bytes);
+  }
+  if (bytes.length >= 7 && bytes[0] === FRAME_TYPE_HEALTH) {
+    return decodeHealth(bytes);
+  }
+  if (bytes.length >= 7 && bytes[0] === FRAME_TYPE_COMMAND_ACK) {
+    return decodeCommandAck(bytes);
+  }
+  if (bytes.length >= 7 && bytes[0] === FRAME_TYPE_HISTORY) {
+    return decodeHistory(bytes, receivedAtMs);
+  }
+  return { errors: ["Unsupported payload"] };
+}